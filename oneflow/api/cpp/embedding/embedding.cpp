@@ -22,24 +22,15 @@ namespace embedding {
 std::string CreateKeyValueStore(const std::string& key_value_store_options, int64_t local_rank_id,
                                 int64_t rank_id, int64_t world_size) {
   oneflow::embedding::KeyValueStoreOptions options(key_value_store_options);
-#ifdef WITH_CUDA
   oneflow::Singleton<oneflow::embedding::EmbeddingManager>::Get()->CreateKeyValueStore(
       options, local_rank_id, rank_id, world_size);
   return options.Name();
-#else
-  UNIMPLEMENTED() << "OneEmbedding Only Support with CUDA";
-#endif
-  return "";
 }
 
 void LoadSnapshot(const std::string& snapshot_name, const std::string& embedding_name,
                   int64_t local_rank_id, int64_t rank_id) {
-#ifdef WITH_CUDA
   oneflow::Singleton<oneflow::embedding::EmbeddingManager>::Get()->LoadSnapshot(
       embedding_name, local_rank_id, rank_id, snapshot_name);
-#else
-  UNIMPLEMENTED() << "OneEmbedding Only Support with CUDA";
-#endif
 }
 
 }  // namespace embedding
@@ -0,0 +1,40 @@
+/*
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+*/
+#include <pybind11/pybind11.h>
+#include "oneflow/api/python/of_api_registry.h"
+#include "oneflow/core/framework/autocast.h"
+#include "oneflow/core/framework/dtype.h"
+#include "oneflow/core/framework/to_string.h"
+
+namespace py = pybind11;
+
+namespace oneflow {
+
+namespace autocast {
+
+ONEFLOW_API_PYBIND11_MODULE("amp", m) {
+  py::class_<AutoAutocastMode, std::shared_ptr<AutoAutocastMode>>(m, "AutoAutocastMode")
+      .def(py::init([](bool enabled, const std::string& device_type, const Symbol<DType>& dtype) {
+        return std::make_shared<AutoAutocastMode>(
+            enabled, DeviceType4DeviceTag(device_type).GetOrThrow(), dtype->data_type());
+      }));
+  m.def("is_autocast_enabled", &AutocastMode::is_enabled);
+  m.def("get_autocast_dtype", []() { return CHECK_JUST(DType::Get(AutocastMode::dtype())); });
+}
+
+}  // namespace autocast
+
+}  // namespace oneflow
@@ -0,0 +1,98 @@
+/*
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+*/
+#include <pybind11/pybind11.h>
+#include <pybind11/stl.h>
+#include <atomic>
+#include "oneflow/api/python/of_api_registry.h"
+#include "oneflow/core/common/blocking_counter.h"
+#include "oneflow/core/ep/include/stream.h"
+#include "oneflow/core/framework/instructions_builder.h"
+#include "oneflow/core/framework/tensor.h"
+#include "oneflow/core/vm/virtual_machine.h"
+
+namespace py = pybind11;
+
+namespace oneflow {
+
+namespace {
+
+// Completion handle of an asynchronous collective. One access instruction is issued for every
+// output tensor after the collective, the handle is completed once all of them are executed by
+// the vm.
+class CommWork final {
+ public:
+  OF_DISALLOW_COPY_AND_MOVE(CommWork);
+  explicit CommWork(int64_t num_pending) : num_pending_(num_pending), blocking_counter_(1) {
+    if (num_pending_ == 0) { blocking_counter_.Decrease(); }
+  }
+  ~CommWork() = default;
+
+  void Notify() {
+    if (--num_pending_ == 0) { blocking_counter_.Decrease(); }
+  }
+
+  bool IsCompleted() const { return num_pending_ == 0; }
+
+  Maybe<void> Wait() {
+    JUST(blocking_counter_.WaitUntilCntEqualZero(
+        VirtualMachine::GetPredicatorNoMoreInstructionsFinished()));
+    return Maybe<void>::Ok();
+  }
+
+ private:
+  std::atomic<int64_t> num_pending_;
+  BlockingCounter blocking_counter_;
+};
+
+Maybe<CommWork> MakeCommWork(const std::vector<std::shared_ptr<one::Tensor>>& tensors) {
+  auto work = std::make_shared<CommWork>(tensors.size());
+  JUST(PhysicalRun([&](InstructionsBuilder* builder) -> Maybe<void> {
+    for (const auto& tensor : tensors) {
+      std::shared_ptr<one::LocalTensor> local_tensor;
+      if (tensor->is_local()) {
+        local_tensor = JUST(tensor->AsLocalTensor());
+      } else {
+        local_tensor = JUST(tensor->cur_rank_phy_tensor());
+      }
+      const bool is_cpu = JUST(local_tensor->device())->type() == "cpu";
+      JUST(builder->AccessBlobByCallback(
+          local_tensor,
+          [work, is_cpu](ep::Stream* stream, const std::shared_ptr<vm::EagerBlobObject>&) {
+            // Kernels on devices are asynchronous to the vm worker thread.
+            if (!is_cpu) { CHECK_JUST(stream->Sync()); }
+            work->Notify();
+          },
+          "const"));
+    }
+    return Maybe<void>::Ok();
+  }));
+  return work;
+}
+
+}  // namespace
+
+ONEFLOW_API_PYBIND11_MODULE("comm", m) {
+  py::class_<CommWork, std::shared_ptr<CommWork>>(m, "Work")
+      .def(py::init([](const std::vector<std::shared_ptr<one::Tensor>>& tensors) {
+        return MakeCommWork(tensors).GetPtrOrThrow();
+      }))
+      .def("is_completed", &CommWork::IsCompleted)
+      .def(
+          "wait", [](CommWork* work) { return work->Wait().GetOrThrow(); },
+          py::call_guard<py::gil_scoped_release>());
+}
+
+}  // namespace oneflow
@@ -23,8 +23,10 @@ limitations under the License.
 #include "oneflow/core/framework/tensor.h"
 #include "oneflow/core/framework/nn_graph.h"
 #include "oneflow/core/job/runtime.h"
+#include "oneflow/core/job/id_manager.h"
 #include "oneflow/core/register/blob.h"
 #include "oneflow/core/job/job.pb.h"
+#include "oneflow/core/job/plan.pb.h"
 #include "oneflow/core/job/job_ir.h"
 
 namespace py = pybind11;
@@ -71,6 +73,17 @@ ONEFLOW_API_PYBIND11_MODULE("nn.graph.", m) {
             }
             nn_graph.restore_job(job);
           })
+      .def_property(
+          "plan", /*getter*/
+          [](const NNGraph& nn_graph) { return py::bytes(nn_graph.plan().SerializeAsString()); },
+          /*setter*/
+          [](NNGraph& nn_graph, const std::string& serialized_plan) {
+            Plan plan;
+            if (!plan.ParseFromString(serialized_plan)) {
+              PyErr_SetString(PyExc_TypeError, "the value is not a valid plan");
+            }
+            nn_graph.restore_plan(plan);
+          })
       .def_property("job_id", &NNGraph::job_id,
                     [](NNGraph& nn_graph, int64_t job_id) { nn_graph.restore_job_id(job_id); })
       .def("register_input_op_names_and_tensors", &NNGraph::RegisterInputOpNamesAndTensors)
@@ -81,9 +94,11 @@ ONEFLOW_API_PYBIND11_MODULE("nn.graph.", m) {
       .def_property_readonly("additional_var_names", &APINNGraphAdditionalVarNames)
       .def_property_readonly("additional_var_tensors", &APINNGraphAdditionalVarTensors)
       .def("complie_and_init_runtime", &NNGraph::CompileAndInitRuntime)
+      .def("close", &NNGraph::Close)
       .def("get_current_job_str", &APINNGraphGetCurrentSerializedJob);
 
   m.def("RunLazyNNGraph", &RunLazyNNGraph);
+  m.def("GetIdMgrState", []() { return Singleton<IDMgr>::Get()->DumpState(); });
   m.def("SoftSyncNNGraphBuffers", &SoftSyncNNGraphBuffers);
   m.def("AddTensorAsGraphLoss", &AddTensorAsGraphLoss);
   m.def("MarkVariableGradients", [](const std::vector<std::shared_ptr<one::Tensor>>& variables,
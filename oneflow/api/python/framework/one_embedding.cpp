@@ -38,31 +38,19 @@ class OneEmbeddingHandler final {
   }
 
   void LoadSnapshot(const std::string& snapshot_name) {
-#ifdef WITH_CUDA
     Singleton<embedding::EmbeddingManager>::Get()->LoadSnapshot(embedding_name_, local_rank_id_,
                                                                 rank_id_, snapshot_name);
-#else
-    UNIMPLEMENTED() << "Only Support with CUDA";
-#endif
   }
 
   void SaveSnapshot(const std::string& snapshot_name) {
-#ifdef WITH_CUDA
     Singleton<embedding::EmbeddingManager>::Get()->SaveSnapshot(embedding_name_, local_rank_id_,
                                                                 rank_id_, snapshot_name);
-#else
-    UNIMPLEMENTED() << "Only Support with CUDA";
-#endif
   }
 
  private:
   void CreateKeyValueStore(const embedding::KeyValueStoreOptions& key_value_store_options) {
-#ifdef WITH_CUDA
     Singleton<embedding::EmbeddingManager>::Get()->CreateKeyValueStore(
         key_value_store_options, local_rank_id_, rank_id_, world_size_);
-#else
-    UNIMPLEMENTED() << "Only Support with CUDA";
-#endif
   }
 
   std::string embedding_name_;
@@ -60,6 +60,7 @@ ONEFLOW_FUNCTION_LIBRARY(m) {
       [](const std::shared_ptr<OpExpr>& op, const std::string& data_dir, int32_t data_part_num,
          const std::string& part_name_prefix, int32_t part_name_suffix_length, int32_t batch_size,
          int32_t shuffle_buffer_size, bool random_shuffle, bool shuffle_after_epoch, int64_t seed,
+         int32_t num_loader_threads, bool indexed, int64_t start_epoch, int64_t start_position,
          const Optional<Symbol<Device>>& device) -> Maybe<Tensor> {
         MutableAttrMap attrs;
         JUST(attrs.SetAttr("data_dir", data_dir));
@@ -71,6 +72,10 @@ ONEFLOW_FUNCTION_LIBRARY(m) {
         JUST(attrs.SetAttr("random_shuffle", random_shuffle));
         JUST(attrs.SetAttr("shuffle_after_epoch", shuffle_after_epoch));
         JUST(attrs.SetAttr("seed", seed));
+        JUST(attrs.SetAttr("num_loader_threads", num_loader_threads));
+        JUST(attrs.SetAttr("indexed", indexed));
+        JUST(attrs.SetAttr("start_epoch", start_epoch));
+        JUST(attrs.SetAttr("start_position", start_position));
         return OpInterpUtil::Dispatch<Tensor>(*op, {}, OpExprInterpContext(attrs, JUST(device)));
       });
   m.add_functor(
@@ -78,6 +83,7 @@ ONEFLOW_FUNCTION_LIBRARY(m) {
       [](const std::shared_ptr<OpExpr>& op, const std::string& data_dir, int32_t data_part_num,
          const std::string& part_name_prefix, int32_t part_name_suffix_length, int32_t batch_size,
          int32_t shuffle_buffer_size, bool random_shuffle, bool shuffle_after_epoch, int64_t seed,
+         int32_t num_loader_threads, bool indexed, int64_t start_epoch, int64_t start_position,
          const Symbol<ParallelDesc>& placement,
          const std::vector<Symbol<SbpParallel>>& sbp_tuple) -> Maybe<Tensor> {
         MutableAttrMap attrs;
@@ -90,6 +96,10 @@ ONEFLOW_FUNCTION_LIBRARY(m) {
         JUST(attrs.SetAttr("random_shuffle", random_shuffle));
         JUST(attrs.SetAttr("shuffle_after_epoch", shuffle_after_epoch));
         JUST(attrs.SetAttr("seed", seed));
+        JUST(attrs.SetAttr("num_loader_threads", num_loader_threads));
+        JUST(attrs.SetAttr("indexed", indexed));
+        JUST(attrs.SetAttr("start_epoch", start_epoch));
+        JUST(attrs.SetAttr("start_position", start_position));
         JUST(attrs.SetAttr("nd_sbp", *JUST(GetNdSbpStrList(sbp_tuple))));
         auto nd_sbp = JUST(GetNdSbp(sbp_tuple));
         return OpInterpUtil::Dispatch<Tensor>(*op, {},
@@ -342,7 +352,8 @@ ONEFLOW_FUNCTION_LIBRARY(m) {
       [](const std::shared_ptr<OpExpr>& op, const std::vector<std::string>& files,
          const int64_t batch_size, const bool random_shuffle, const std::string& shuffle_mode,
          const int32_t shuffle_buffer_size, const bool shuffle_after_epoch, int64_t random_seed,
-         const bool verify_example, const Optional<Symbol<Device>>& device) -> Maybe<Tensor> {
+         const bool verify_example, const int32_t num_loader_threads,
+         const Optional<Symbol<Device>>& device) -> Maybe<Tensor> {
         MutableAttrMap attrs;
         JUST(attrs.SetAttr<std::vector<std::string>>("files", files));
         JUST(attrs.SetAttr<int64_t>("batch_size", batch_size));
@@ -352,6 +363,7 @@ ONEFLOW_FUNCTION_LIBRARY(m) {
         JUST(attrs.SetAttr<bool>("shuffle_after_epoch", shuffle_after_epoch));
         JUST(attrs.SetAttr<int64_t>("seed", random_seed));
         JUST(attrs.SetAttr<bool>("verify_example", verify_example));
+        JUST(attrs.SetAttr<int32_t>("num_loader_threads", num_loader_threads));
         return OpInterpUtil::Dispatch<Tensor>(*op, {}, OpExprInterpContext(attrs, JUST(device)));
       });
   m.add_functor(
@@ -359,7 +371,8 @@ ONEFLOW_FUNCTION_LIBRARY(m) {
       [](const std::shared_ptr<OpExpr>& op, const std::vector<std::string>& files,
          const int64_t batch_size, const bool random_shuffle, const std::string& shuffle_mode,
          const int32_t shuffle_buffer_size, const bool shuffle_after_epoch, int64_t random_seed,
-         const bool verify_example, const Symbol<ParallelDesc>& placement,
+         const bool verify_example, const int32_t num_loader_threads,
+         const Symbol<ParallelDesc>& placement,
          const std::vector<Symbol<SbpParallel>>& sbp_tuple) -> Maybe<Tensor> {
         MutableAttrMap attrs;
         JUST(attrs.SetAttr<std::vector<std::string>>("files", files));
@@ -370,6 +383,7 @@ ONEFLOW_FUNCTION_LIBRARY(m) {
         JUST(attrs.SetAttr<bool>("shuffle_after_epoch", shuffle_after_epoch));
         JUST(attrs.SetAttr<int64_t>("seed", random_seed));
         JUST(attrs.SetAttr<bool>("verify_example", verify_example));
+        JUST(attrs.SetAttr<int32_t>("num_loader_threads", num_loader_threads));
         JUST(attrs.SetAttr("nd_sbp", *JUST(GetNdSbpStrList(sbp_tuple))));
         auto nd_sbp = JUST(GetNdSbp(sbp_tuple));
         return OpInterpUtil::Dispatch<Tensor>(*op, {},
@@ -15,6 +15,7 @@ limitations under the License.
 */
 #include <pybind11/pybind11.h>
 #include <pybind11/stl.h>
+#include <atomic>
 #include "oneflow/api/python/of_api_registry.h"
 #include "oneflow/core/ipc/shared_memory.h"
 
@@ -36,7 +37,13 @@ ONEFLOW_API_PYBIND11_MODULE("multiprocessing", m) {
                                return py::memoryview::from_memory(shm->mut_buf(), shm->size());
                              })
       .def_property_readonly("name", &ipc::SharedMemory::name)
-      .def_property_readonly("size", &ipc::SharedMemory::size);
+      .def_property_readonly("size", &ipc::SharedMemory::size)
+      // The first 8 bytes of a pooled segment hold a reference count shared by all processes.
+      .def("_add_refcnt", [](ipc::SharedMemory* shm, int64_t delta) {
+        CHECK_GE(shm->size(), sizeof(std::atomic<int64_t>));
+        auto* refcnt = reinterpret_cast<std::atomic<int64_t>*>(shm->mut_buf());
+        return refcnt->fetch_add(delta) + delta;
+      });
   m.def("unlink_all_shared_memory",
         []() { return ipc::SharedMemoryManager::get().UnlinkAllShms(); });
 }
@@ -0,0 +1,73 @@
+/*
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+*/
+#include <pybind11/pybind11.h>
+#include <lz4.h>
+#include <lz4hc.h>
+#include "oneflow/api/python/of_api_registry.h"
+#include "oneflow/core/common/util.h"
+
+namespace py = pybind11;
+
+namespace oneflow {
+
+namespace {
+
+// Compress data into one LZ4 block of a block-compressed file (see
+// oneflow/core/persistence/block_compressed_in_stream.h), level > 0 means LZ4 HC with that
+// compression level.
+py::bytes LZ4CompressBlock(const py::bytes& data, int level) {
+  char* src = nullptr;
+  Py_ssize_t src_size = 0;
+  PyBytes_AsStringAndSize(data.ptr(), &src, &src_size);
+  CHECK_LE(src_size, LZ4_MAX_INPUT_SIZE);
+  std::string dst(LZ4_compressBound(src_size), '\0');
+  int dst_size = 0;
+  {
+    py::gil_scoped_release release;
+    if (level > 0) {
+      dst_size = LZ4_compress_HC(src, &dst[0], src_size, dst.size(), level);
+    } else {
+      dst_size = LZ4_compress_default(src, &dst[0], src_size, dst.size());
+    }
+  }
+  CHECK_GT(dst_size, 0);
+  dst.resize(dst_size);
+  return py::bytes(dst);
+}
+
+py::bytes LZ4DecompressBlock(const py::bytes& data, int64_t uncompressed_size) {
+  char* src = nullptr;
+  Py_ssize_t src_size = 0;
+  PyBytes_AsStringAndSize(data.ptr(), &src, &src_size);
+  std::string dst(uncompressed_size, '\0');
+  int dst_size = 0;
+  {
+    py::gil_scoped_release release;
+    dst_size = LZ4_decompress_safe(src, &dst[0], src_size, uncompressed_size);
+  }
+  if (dst_size != uncompressed_size) { throw std::runtime_error("corrupted LZ4 block"); }
+  return py::bytes(dst);
+}
+
+}  // namespace
+
+ONEFLOW_API_PYBIND11_MODULE("", m) {
+  m.def("LZ4CompressBlock", &LZ4CompressBlock, py::arg("data"), py::arg("level") = 0);
+  m.def("LZ4DecompressBlock", &LZ4DecompressBlock, py::arg("data"),
+        py::arg("uncompressed_size"));
+}
+
+}  // namespace oneflow
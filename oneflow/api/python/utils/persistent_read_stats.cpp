@@ -0,0 +1,36 @@
+/*
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+*/
+#include <pybind11/pybind11.h>
+#include "oneflow/api/python/of_api_registry.h"
+#include "oneflow/core/persistence/readahead.h"
+
+namespace py = pybind11;
+
+namespace oneflow {
+
+ONEFLOW_API_PYBIND11_MODULE("", m) {
+  m.def("GetPersistentReadStats", []() {
+    const auto* stats = PersistentReadStats::Get();
+    py::dict ret;
+    ret["bytes_read"] = stats->bytes_read.load();
+    ret["stall_count"] = stats->stall_count.load();
+    ret["stall_seconds"] = static_cast<double>(stats->stall_ns.load()) / 1e9;
+    return ret;
+  });
+  m.def("ResetPersistentReadStats", []() { PersistentReadStats::Get()->Reset(); });
+}
+
+}  // namespace oneflow
@@ -0,0 +1,144 @@
+/*
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+*/
+#ifndef ONEFLOW_CORE_COMMON_BFLOAT16_H_
+#define ONEFLOW_CORE_COMMON_BFLOAT16_H_
+
+#include <cmath>
+#include <cstdint>
+#include <cstring>
+#include <limits>
+
+namespace oneflow {
+
+// The storage type of DataType::kBFloat16 on host. It keeps the upper 16 bits of a float, and all
+// the arithmetic is done in float, so the accumulations of kernels should use float explicitly
+// instead of bfloat16 to avoid rounding at each step.
+struct alignas(2) bfloat16 {
+  uint16_t x;
+
+  bfloat16() = default;
+  bfloat16(float value) : x(RoundToNearestEven(value)) {}  // NOLINT
+  operator float() const {                                  // NOLINT
+    uint32_t bits = static_cast<uint32_t>(x) << 16;
+    float value;
+    std::memcpy(&value, &bits, sizeof(value));
+    return value;
+  }
+
+  static constexpr bfloat16 FromBits(uint16_t bits) { return bfloat16(bits, FromBitsTag()); }
+
+ private:
+  struct FromBitsTag {};
+  constexpr bfloat16(uint16_t bits, FromBitsTag) : x(bits) {}
+
+  static uint16_t RoundToNearestEven(float value) {
+    if (std::isnan(value)) { return 0x7FC0; }
+    uint32_t bits;
+    std::memcpy(&bits, &value, sizeof(bits));
+    const uint32_t rounding_bias = 0x7FFF + ((bits >> 16) & 1);
+    return static_cast<uint16_t>((bits + rounding_bias) >> 16);
+  }
+};
+
+static_assert(sizeof(bfloat16) == 2, "sizeof(bfloat16) != 2");
+
+// Arithmetic with bfloat16 is done in float and rounded back to bfloat16, arithmetic with float
+// or double returns float or double like the other floating types.
+
+#define OF_BFLOAT16_BINARY_OPERATOR(op)                                                       \
+  inline bfloat16 operator op(const bfloat16& a, const bfloat16& b) {                         \
+    return bfloat16(static_cast<float>(a) op static_cast<float>(b));                          \
+  }                                                                                           \
+  inline bfloat16& operator op##=(bfloat16& a, const bfloat16& b) {                           \
+    a = a op b;                                                                               \
+    return a;                                                                                 \
+  }                                                                                           \
+  inline float operator op(const bfloat16& a, float b) { return static_cast<float>(a) op b; } \
+  inline float operator op(float a, const bfloat16& b) { return a op static_cast<float>(b); } \
+  inline double operator op(const bfloat16& a, double b) {                                    \
+    return static_cast<double>(static_cast<float>(a)) op b;                                   \
+  }                                                                                           \
+  inline double operator op(double a, const bfloat16& b) {                                    \
+    return a op static_cast<double>(static_cast<float>(b));                                   \
+  }                                                                                           \
+  inline bfloat16 operator op(const bfloat16& a, int b) { return a op bfloat16(b); }          \
+  inline bfloat16 operator op(int a, const bfloat16& b) { return bfloat16(a) op b; }          \
+  inline bfloat16 operator op(const bfloat16& a, int64_t b) { return a op bfloat16(b); }      \
+  inline bfloat16 operator op(int64_t a, const bfloat16& b) { return bfloat16(a) op b; }
+
+OF_BFLOAT16_BINARY_OPERATOR(+)
+OF_BFLOAT16_BINARY_OPERATOR(-)
+OF_BFLOAT16_BINARY_OPERATOR(*)
+OF_BFLOAT16_BINARY_OPERATOR(/)
+
+#undef OF_BFLOAT16_BINARY_OPERATOR
+
+inline bfloat16 operator-(const bfloat16& a) {
+  return bfloat16::FromBits(static_cast<uint16_t>(a.x ^ 0x8000));
+}
+
+inline bfloat16& operator+=(bfloat16& a, float b) { return a = static_cast<float>(a) + b; }
+inline bfloat16& operator-=(bfloat16& a, float b) { return a = static_cast<float>(a) - b; }
+inline bfloat16& operator*=(bfloat16& a, float b) { return a = static_cast<float>(a) * b; }
+inline bfloat16& operator/=(bfloat16& a, float b) { return a = static_cast<float>(a) / b; }
+
+}  // namespace oneflow
+
+namespace std {
+
+template<>
+class numeric_limits<oneflow::bfloat16> {
+ public:
+  static constexpr bool is_specialized = true;
+  static constexpr bool is_signed = true;
+  static constexpr bool is_integer = false;
+  static constexpr bool is_exact = false;
+  static constexpr bool has_infinity = true;
+  static constexpr bool has_quiet_NaN = true;
+  static constexpr bool has_signaling_NaN = true;
+  static constexpr float_denorm_style has_denorm = numeric_limits<float>::has_denorm;
+  static constexpr bool has_denorm_loss = numeric_limits<float>::has_denorm_loss;
+  static constexpr float_round_style round_style = round_to_nearest;
+  static constexpr bool is_iec559 = false;
+  static constexpr bool is_bounded = true;
+  static constexpr bool is_modulo = false;
+  static constexpr int digits = 8;
+  static constexpr int digits10 = 2;
+  static constexpr int max_digits10 = 4;
+  static constexpr int radix = 2;
+  static constexpr int min_exponent = numeric_limits<float>::min_exponent;
+  static constexpr int min_exponent10 = numeric_limits<float>::min_exponent10;
+  static constexpr int max_exponent = numeric_limits<float>::max_exponent;
+  static constexpr int max_exponent10 = numeric_limits<float>::max_exponent10;
+  static constexpr bool traps = numeric_limits<float>::traps;
+  static constexpr bool tinyness_before = numeric_limits<float>::tinyness_before;
+
+  static constexpr oneflow::bfloat16 min() { return oneflow::bfloat16::FromBits(0x0080); }
+  static constexpr oneflow::bfloat16 lowest() { return oneflow::bfloat16::FromBits(0xFF7F); }
+  static constexpr oneflow::bfloat16 max() { return oneflow::bfloat16::FromBits(0x7F7F); }
+  static constexpr oneflow::bfloat16 epsilon() { return oneflow::bfloat16::FromBits(0x3C00); }
+  static constexpr oneflow::bfloat16 round_error() { return oneflow::bfloat16::FromBits(0x3F00); }
+  static constexpr oneflow::bfloat16 infinity() { return oneflow::bfloat16::FromBits(0x7F80); }
+  static constexpr oneflow::bfloat16 quiet_NaN() { return oneflow::bfloat16::FromBits(0x7FC0); }
+  static constexpr oneflow::bfloat16 signaling_NaN() {
+    return oneflow::bfloat16::FromBits(0x7F80 | 0x0001);
+  }
+  static constexpr oneflow::bfloat16 denorm_min() { return oneflow::bfloat16::FromBits(0x0001); }
+};
+
+}  // namespace std
+
+#endif  // ONEFLOW_CORE_COMMON_BFLOAT16_H_
@@ -25,6 +25,7 @@ limitations under the License.
 #include <cuda_bf16.h>
 #endif  // CUDA_VERSION >= 11000
 #endif
+#include "oneflow/core/common/bfloat16.h"
 #include "oneflow/core/common/data_type.pb.h"
 #include "oneflow/core/common/data_type_seq.h"
 #include "oneflow/core/record/record.pb.h"
@@ -96,7 +97,8 @@ struct GetDataType<void> : std::integral_constant<DataType, DataType::kChar> {};
   template<>                                                                      \
   struct GetDataType<type_cpp> : std::integral_constant<DataType, type_proto> {}; \
   inline type_cpp GetTypeByDataType(std::integral_constant<DataType, type_proto>) { return {}; }
-OF_PP_FOR_EACH_TUPLE(SPECIALIZE_GET_DATA_TYPE, ALL_DATA_TYPE_SEQ FLOAT16_DATA_TYPE_SEQ);
+OF_PP_FOR_EACH_TUPLE(SPECIALIZE_GET_DATA_TYPE,
+                     ALL_DATA_TYPE_SEQ FLOAT16_DATA_TYPE_SEQ BFLOAT16_DATA_TYPE_SEQ);
 #undef SPECIALIZE_GET_DATA_TYPE
 
 template<typename T>
@@ -189,6 +191,19 @@ OF_PP_FOR_EACH_TUPLE(SPECIALIZE_MAX_VAL, MAX_VAL_SEQ);
 OF_PP_FOR_EACH_TUPLE(SPECIALIZE_MIN_VAL, MIN_VAL_SEQ);
 #undef SPECIALIZE_MIN_VAL
 
+// bfloat16 is the host type of kBFloat16, the device code uses nv_bfloat16 instead.
+#if !defined(__CUDACC__)
+template<>
+inline bfloat16 GetMaxVal<bfloat16>() {
+  return std::numeric_limits<bfloat16>::max();
+}
+
+template<>
+inline bfloat16 GetMinVal<bfloat16>() {
+  return std::numeric_limits<bfloat16>::lowest();
+}
+#endif  // !defined(__CUDACC__)
+
 template<typename T>
 const T* GetZeroPtr() {
   static const T ret = GetZeroVal<T>();
@@ -238,6 +253,18 @@ struct DevDType<DeviceType::kCUDA, float16> {
 };
 #endif
 
+// The type to compute T in on host, bfloat16 is computed in float so that the accumulations do
+// not round at each step.
+template<typename T>
+struct HostComputeType {
+  typedef T type;
+};
+
+template<>
+struct HostComputeType<bfloat16> {
+  typedef float type;
+};
+
 // Func
 
 bool IsBoolDataType(DataType data_type);
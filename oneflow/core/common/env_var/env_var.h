@@ -45,6 +45,9 @@ DEFINE_ENV_INTEGER(ONEFLOW_CHECK_TIMEOUT_SLEEP_SECONDS, EnvInteger<ONEFLOW_TIMEO
 
 DEFINE_ENV_INTEGER(ONEFLOW_VM_BLOCKING_DEBUG_INSTRUCTIONS_DISPLAY_LIMIT, 100);
 DEFINE_ENV_INTEGER(ONEFLOW_DELETE_OUTDATED_SHM_NAMES_INTERVAL, 1000);
+DEFINE_ENV_INTEGER(ONEFLOW_DATA_DECOMPRESS_THREAD_NUM, 4);
+DEFINE_ENV_INTEGER(ONEFLOW_PERSISTENT_IN_STREAM_READAHEAD_MB, 8);
+DEFINE_ENV_INTEGER(ONEFLOW_PERSISTENT_IN_STREAM_READAHEAD_THREAD_NUM, 4);
 
 template<typename env_var>
 bool ThreadLocalEnvBool();
@@ -22,6 +22,19 @@ namespace oneflow {
 namespace embedding {
 
 std::unique_ptr<Cache> NewCache(const CacheOptions& options) {
+  if (options.device_type == DeviceType::kCPU) {
+    CHECK_GT(options.key_size, 0);
+    CHECK_GT(options.value_size, 0);
+    CHECK_GT(options.capacity, 0);
+    if (options.policy == CacheOptions::Policy::kLRU) {
+      return NewHostLruCache(options);
+    } else if (options.policy == CacheOptions::Policy::kFull) {
+      return NewHostFullCache(options);
+    } else {
+      UNIMPLEMENTED();
+      return nullptr;
+    }
+  }
 #ifdef WITH_CUDA
   CHECK_GT(options.key_size, 0);
   CHECK_GT(options.value_size, 0);
@@ -20,6 +20,7 @@ limitations under the License.
 #include "oneflow/core/common/util.h"
 #include "oneflow/core/ep/include/stream.h"
 #include "oneflow/core/common/data_type.h"
+#include "oneflow/core/common/device_type.h"
 
 namespace oneflow {
 
@@ -41,6 +42,8 @@ struct CacheOptions {
   uint32_t value_size{};
   DataType value_type{};
   float load_factor = 0.75;
+  // Caches on kCPU are implemented on host memory, whose keys and values are host pointers.
+  DeviceType device_type = DeviceType::kCUDA;
 };
 
 class Cache {
@@ -26,6 +26,10 @@ namespace embedding {
 std::unique_ptr<KeyValueStore> NewCachedKeyValueStore(std::unique_ptr<KeyValueStore>&& store,
                                                       std::unique_ptr<Cache>&& cache);
 
+// The store and the cache must be on host, see CacheOptions::device_type.
+std::unique_ptr<KeyValueStore> NewHostCachedKeyValueStore(std::unique_ptr<KeyValueStore>&& store,
+                                                          std::unique_ptr<Cache>&& cache);
+
 }  // namespace embedding
 
 }  // namespace oneflow
@@ -22,8 +22,6 @@ namespace oneflow {
 
 namespace embedding {
 
-#ifdef WITH_CUDA
-
 constexpr size_t kDefaultMaxQueryLength = 131072;
 
 constexpr int64_t kRingBufferSize = 8;
@@ -35,6 +33,16 @@ struct IdStatistics {
   int64_t iter;
 };
 
+#ifdef WITH_CUDA
+
+std::unique_ptr<CudaCurrentDeviceGuard> NewCurrentDeviceGuard(DeviceType device_type,
+                                                              int64_t local_rank_id) {
+  if (device_type != DeviceType::kCUDA) { return nullptr; }
+  return std::make_unique<CudaCurrentDeviceGuard>(local_rank_id);
+}
+
+#endif  // WITH_CUDA
+
 #if CUDA_VERSION >= 11020
 
 class DynamicTmpBufferAllocator final : public TmpBufferAllocator {
@@ -473,7 +481,10 @@ KeyValueStore* EmbeddingManager::GetKeyValueStore(const std::string& embedding_n
 void EmbeddingManager::CreateKeyValueStore(const KeyValueStoreOptions& key_value_store_options,
                                            int64_t local_rank_id, int64_t rank_id,
                                            int64_t world_size) {
-  CudaCurrentDeviceGuard guard(local_rank_id);
+  const DeviceType device_type = key_value_store_options.GetDeviceType();
+#ifdef WITH_CUDA
+  std::unique_ptr<CudaCurrentDeviceGuard> guard = NewCurrentDeviceGuard(device_type, local_rank_id);
+#endif  // WITH_CUDA
   const std::string& name = key_value_store_options.Name();
   const uint32_t line_size = key_value_store_options.LineSize();
   std::pair<std::string, int64_t> map_key = std::make_pair(name, rank_id);
@@ -491,15 +502,31 @@ void EmbeddingManager::CreateKeyValueStore(const KeyValueStoreOptions& key_value
       key_value_store_options.PersistentTablePhysicalBlockSize();
   options.table_options.target_chunk_size_mb = 4 * 1024;
   options.table_options.capacity_hint = key_value_store_options.PersistentTableCapacityHint();
-  store = NewPersistentTableKeyValueStore(options);
   const std::vector<CacheOptions>& cache_options = key_value_store_options.GetCachesOptions();
-  for (int i = cache_options.size() - 1; i >= 0; --i) {
-    std::unique_ptr<Cache> cache = NewCache(cache_options.at(i));
-    store = NewCachedKeyValueStore(std::move(store), std::move(cache));
+  if (device_type == DeviceType::kCPU) {
+    CHECK(!UseDynamicMemoryAllocation())
+        << "ONEFLOW_ONE_EMBEDDING_USE_DYNAMIC_MEMORY_ALLOCATION is not supported on cpu";
+    store = NewHostPersistentTableKeyValueStore(options);
+    for (int i = cache_options.size() - 1; i >= 0; --i) {
+      std::unique_ptr<Cache> cache = NewCache(cache_options.at(i));
+      store = NewHostCachedKeyValueStore(std::move(store), std::move(cache));
+    }
+  } else {
+#ifdef WITH_CUDA
+    store = NewPersistentTableKeyValueStore(options);
+    for (int i = cache_options.size() - 1; i >= 0; --i) {
+      std::unique_ptr<Cache> cache = NewCache(cache_options.at(i));
+      store = NewCachedKeyValueStore(std::move(store), std::move(cache));
+    }
+#else
+    UNIMPLEMENTED() << "Embedding " << name << " is placed on cuda, but OneFlow is built without "
+                    << "CUDA, use device=\"cpu\" in the store options instead";
+#endif  // WITH_CUDA
   }
   store->ReserveQueryLength(kDefaultMaxQueryLength);
   CHECK(key_value_store_map_.emplace(map_key, std::move(store)).second)
       << "Can't create an embedding with same name of an existing embedding, the name: " << name;
+  device_type_map_[map_key] = device_type;
 
   if (UseDynamicMemoryAllocation()) {
 #if CUDA_VERSION >= 11020
@@ -520,8 +547,11 @@ void EmbeddingManager::CreateKeyValueStore(const KeyValueStoreOptions& key_value
 
 void EmbeddingManager::SaveSnapshot(const std::string& embedding_name, int64_t local_rank_id,
                                     int64_t rank_id, const std::string& snapshot_name) {
-  CudaCurrentDeviceGuard guard(local_rank_id);
   std::pair<std::string, int64_t> map_key = std::make_pair(embedding_name, rank_id);
+#ifdef WITH_CUDA
+  std::unique_ptr<CudaCurrentDeviceGuard> guard =
+      NewCurrentDeviceGuard(GetDeviceType(map_key), local_rank_id);
+#endif  // WITH_CUDA
   std::unique_lock<std::mutex> lock(mutex_);
 
   auto it = key_value_store_map_.find(map_key);
@@ -532,8 +562,11 @@ void EmbeddingManager::SaveSnapshot(const std::string& embedding_name, int64_t l
 
 void EmbeddingManager::LoadSnapshot(const std::string& embedding_name, int64_t local_rank_id,
                                     int64_t rank_id, const std::string& snapshot_name) {
-  CudaCurrentDeviceGuard guard(local_rank_id);
   std::pair<std::string, int64_t> map_key = std::make_pair(embedding_name, rank_id);
+#ifdef WITH_CUDA
+  std::unique_ptr<CudaCurrentDeviceGuard> guard =
+      NewCurrentDeviceGuard(GetDeviceType(map_key), local_rank_id);
+#endif  // WITH_CUDA
   auto it = key_value_store_map_.find(map_key);
   CHECK(it != key_value_store_map_.end())
       << "Can not find embedding: " << embedding_name << "-" << rank_id;
@@ -545,7 +578,13 @@ void EmbeddingManager::LoadSnapshot(const std::string& embedding_name, int64_t l
   }
 }
 
-#endif  // WITH_CUDA
+DeviceType EmbeddingManager::GetDeviceType(const std::pair<std::string, int64_t>& map_key) {
+  std::unique_lock<std::mutex> lock(mutex_);
+  auto it = device_type_map_.find(map_key);
+  CHECK(it != device_type_map_.end())
+      << "Can not find embedding: " << map_key.first << "-" << map_key.second;
+  return it->second;
+}
 
 }  // namespace embedding
 
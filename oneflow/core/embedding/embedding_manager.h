@@ -112,8 +112,6 @@ inline bool UseEmbeddingGradientShuffleP2PKernel(DataType embedding_dtype, DataT
 #endif
 }
 
-#ifdef WITH_CUDA
-
 class TmpBufferAllocator {
  public:
   TmpBufferAllocator() = default;
@@ -176,13 +174,14 @@ class EmbeddingManager final {
                            int64_t rank_id, int64_t world_size);
 
  private:
+  DeviceType GetDeviceType(const std::pair<std::string, int64_t>& map_key);
+
   HashMap<std::pair<std::string, int64_t>, std::unique_ptr<KeyValueStore>> key_value_store_map_;
   HashMap<std::pair<std::string, int64_t>, std::unique_ptr<EmbeddingState>> embedding_state_map_;
+  HashMap<std::pair<std::string, int64_t>, DeviceType> device_type_map_;
   std::mutex mutex_;
 };
 
-#endif  // WITH_CUDA
-
 }  // namespace embedding
 }  // namespace oneflow
 
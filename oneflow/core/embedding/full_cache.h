@@ -29,6 +29,8 @@ std::unique_ptr<Cache> NewFullCache(const CacheOptions& options);
 
 #endif  // WITH_CUDA
 
+std::unique_ptr<Cache> NewHostFullCache(const CacheOptions& options);
+
 }  // namespace embedding
 
 }  // namespace oneflow
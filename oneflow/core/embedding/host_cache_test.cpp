@@ -0,0 +1,317 @@
+/*
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+*/
+#include "oneflow/core/embedding/cache.h"
+#include "oneflow/core/embedding/cached_key_value_store.h"
+#include "oneflow/core/embedding/persistent_table_key_value_store.h"
+#include "oneflow/core/embedding/posix_file.h"
+#include <gtest/gtest.h>
+#include <chrono>
+#include <cmath>
+#include <numeric>
+#include <random>
+#include <unordered_set>
+
+namespace oneflow {
+
+namespace embedding {
+
+namespace {
+
+std::unique_ptr<Cache> NewTestHostCache(CacheOptions::Policy policy, uint64_t capacity,
+                                        uint32_t line_size) {
+  CacheOptions options{};
+  options.policy = policy;
+  options.device_type = DeviceType::kCPU;
+  options.value_memory_kind = CacheOptions::MemoryKind::kHost;
+  options.value_size = line_size * sizeof(float);
+  options.value_type = DataType::kFloat;
+  options.capacity = capacity;
+  options.key_size = sizeof(int64_t);
+  return NewCache(options);
+}
+
+void TestHostCache(Cache* cache, uint32_t line_size) {
+  std::unordered_set<int64_t> in_cache;
+  const size_t n_iter = 32;
+  const uint32_t n_keys = 1024;
+  std::vector<int64_t> keys(n_keys);
+  std::vector<int64_t> missing_keys(n_keys);
+  std::vector<uint32_t> missing_indices(n_keys);
+  std::vector<float> values(n_keys * line_size);
+  std::vector<int64_t> evicted_keys(n_keys);
+  std::vector<float> evicted_values(n_keys * line_size);
+  std::vector<uint8_t> mask(n_keys);
+  uint32_t n_missing = 0;
+  uint32_t n_evicted = 0;
+  std::vector<int64_t> random_keys(n_keys * 32);
+  std::iota(random_keys.begin(), random_keys.end(), 1);
+  std::mt19937 g(0);
+  for (size_t iter = 0; iter < n_iter; ++iter) {
+    std::shuffle(random_keys.begin(), random_keys.end(), g);
+    std::copy(random_keys.begin(), random_keys.begin() + n_keys, keys.begin());
+    std::unordered_set<int64_t> expect_missing_keys_set;
+    std::unordered_set<uint32_t> expect_missing_indices_set;
+    std::unordered_set<int64_t> keys_set;
+    for (size_t i = 0; i < n_keys; ++i) {
+      keys_set.emplace(keys[i]);
+      if (in_cache.count(keys[i]) == 0) {
+        expect_missing_keys_set.emplace(keys[i]);
+        expect_missing_indices_set.emplace(i);
+      }
+    }
+    // test
+    cache->Test(nullptr, n_keys, keys.data(), &n_missing, missing_keys.data(),
+                missing_indices.data());
+    ASSERT_EQ(n_missing, expect_missing_keys_set.size());
+    std::unordered_set<int64_t> test_missing_keys_set;
+    std::unordered_set<uint32_t> test_missing_indices_set;
+    for (size_t i = 0; i < n_missing; ++i) {
+      test_missing_keys_set.emplace(missing_keys[i]);
+      test_missing_indices_set.emplace(missing_indices[i]);
+      ASSERT_EQ(keys[missing_indices[i]], missing_keys[i]);
+    }
+    ASSERT_EQ(test_missing_keys_set, expect_missing_keys_set);
+    ASSERT_EQ(test_missing_indices_set, expect_missing_indices_set);
+
+    // get
+    if (cache->Policy() == CacheOptions::Policy::kFull) {
+      cache->Get(nullptr, n_keys, keys.data(), values.data(), mask.data());
+      for (size_t i = 0; i < n_keys; ++i) {
+        ASSERT_EQ(mask[i] == 0, expect_missing_indices_set.count(i) > 0);
+      }
+    }
+    cache->Get(nullptr, n_keys, keys.data(), values.data(), &n_missing, missing_keys.data(),
+               missing_indices.data());
+    ASSERT_EQ(n_missing, expect_missing_keys_set.size());
+    std::unordered_set<int64_t> get_missing_keys_set;
+    for (size_t i = 0; i < n_missing; ++i) {
+      get_missing_keys_set.emplace(missing_keys[i]);
+      ASSERT_EQ(keys[missing_indices[i]], missing_keys[i]);
+    }
+    ASSERT_EQ(get_missing_keys_set, expect_missing_keys_set);
+    for (size_t i = 0; i < n_keys; ++i) {
+      if (get_missing_keys_set.count(keys[i]) == 0) {
+        for (size_t j = 0; j < line_size; ++j) {
+          ASSERT_EQ(values[i * line_size + j], static_cast<float>(keys[i] * line_size + j))
+              << "iter " << iter << " i " << i << " j " << j;
+        }
+      }
+    }
+
+    // put
+    for (size_t i = 0; i < n_keys; ++i) {
+      for (size_t j = 0; j < line_size; ++j) {
+        values[i * line_size + j] = static_cast<float>(keys[i] * line_size + j);
+      }
+    }
+    cache->Put(nullptr, n_keys, keys.data(), values.data(), &n_evicted, evicted_keys.data(),
+               evicted_values.data());
+    for (size_t i = 0; i < n_evicted; ++i) {
+      ASSERT_TRUE(in_cache.count(evicted_keys[i]) > 0 || keys_set.count(evicted_keys[i]) > 0);
+      for (size_t j = 0; j < line_size; ++j) {
+        ASSERT_EQ(evicted_values[i * line_size + j],
+                  static_cast<float>(evicted_keys[i] * line_size + j));
+      }
+    }
+    for (size_t i = 0; i < n_keys; ++i) { in_cache.emplace(keys[i]); }
+    for (size_t i = 0; i < n_evicted; ++i) { in_cache.erase(evicted_keys[i]); }
+    ASSERT_LE(in_cache.size(), cache->Capacity());
+  }
+  const uint64_t dump_capacity = cache->DumpCapacity();
+  for (size_t start_key_index = 0; start_key_index < dump_capacity; start_key_index += n_keys) {
+    cache->Dump(nullptr, start_key_index, std::min(start_key_index + n_keys, dump_capacity),
+                &n_evicted, evicted_keys.data(), evicted_values.data());
+    for (size_t i = 0; i < n_evicted; ++i) {
+      ASSERT_TRUE(in_cache.count(evicted_keys[i]) > 0);
+      in_cache.erase(evicted_keys[i]);
+      for (size_t j = 0; j < line_size; ++j) {
+        ASSERT_EQ(evicted_values[i * line_size + j],
+                  static_cast<float>(evicted_keys[i] * line_size + j));
+      }
+    }
+  }
+  ASSERT_EQ(in_cache.size(), 0);
+}
+
+TEST(HostCache, FullCache) {
+  const uint32_t line_size = 128;
+  std::unique_ptr<Cache> cache = NewTestHostCache(CacheOptions::Policy::kFull, 65536, line_size);
+  cache->ReserveQueryLength(65536);
+  TestHostCache(cache.get(), line_size);
+}
+
+TEST(HostCache, LruCache) {
+  const uint32_t line_size = 128;
+  std::unique_ptr<Cache> cache = NewTestHostCache(CacheOptions::Policy::kLRU, 8192, line_size);
+  cache->ReserveQueryLength(65536);
+  TestHostCache(cache.get(), line_size);
+}
+
+std::string CreateTempDirectory() {
+  const char* tmp_env = getenv("TMPDIR");
+  const char* tmp_dir = tmp_env == nullptr ? "/tmp" : tmp_env;
+  std::string tpl = std::string(tmp_dir) + "/test_host_kv_XXXXXX";
+  char* path = mkdtemp(const_cast<char*>(tpl.c_str()));
+  PCHECK(path != nullptr);
+  return std::string(path);
+}
+
+void TestHostCachedKeyValueStore(CacheOptions::Policy policy, uint64_t cache_capacity) {
+  const uint32_t line_size = 32;
+  const uint32_t num_keys = 4096;
+  const uint32_t batch_size = 128;
+  PersistentTableKeyValueStoreOptions store_options{};
+  std::string path = CreateTempDirectory();
+  store_options.table_options.path = path;
+  store_options.table_options.value_size = line_size * sizeof(float);
+  store_options.table_options.key_size = sizeof(uint64_t);
+  store_options.table_options.physical_block_size = 512;
+  std::unique_ptr<KeyValueStore> store = NewHostCachedKeyValueStore(
+      NewHostPersistentTableKeyValueStore(store_options),
+      NewTestHostCache(policy, cache_capacity, line_size));
+  store->ReserveQueryLength(batch_size);
+  std::vector<uint64_t> keys(batch_size);
+  std::vector<float> values(batch_size * line_size);
+  std::vector<uint32_t> missing_indices(batch_size);
+  uint32_t n_missing = 0;
+  for (uint32_t start = 0; start < num_keys; start += batch_size) {
+    for (uint32_t i = 0; i < batch_size; ++i) {
+      keys[i] = start + i;
+      std::fill_n(values.data() + i * line_size, line_size, static_cast<float>(start + i));
+    }
+    store->Get(nullptr, batch_size, keys.data(), values.data(), &n_missing,
+               missing_indices.data());
+    ASSERT_EQ(n_missing, batch_size);
+    for (uint32_t i = 0; i < batch_size; ++i) {
+      std::fill_n(values.data() + i * line_size, line_size, static_cast<float>(start + i));
+    }
+    store->Put(nullptr, batch_size, keys.data(), values.data());
+  }
+  store->SaveSnapshot("test");
+  store->LoadSnapshot("test");
+  for (uint32_t start = 0; start < num_keys; start += batch_size) {
+    for (uint32_t i = 0; i < batch_size; ++i) { keys[i] = start + i; }
+    store->Get(nullptr, batch_size, keys.data(), values.data(), &n_missing,
+               missing_indices.data());
+    ASSERT_EQ(n_missing, 0);
+    for (uint32_t i = 0; i < batch_size * line_size; ++i) {
+      ASSERT_EQ(values[i], static_cast<float>(start + i / line_size));
+    }
+  }
+  store.reset();
+  PosixFile::RecursiveDelete(path);
+}
+
+TEST(HostCachedKeyValueStore, LRU) {
+  TestHostCachedKeyValueStore(CacheOptions::Policy::kLRU, 1024);
+}
+
+TEST(HostCachedKeyValueStore, Full) {
+  TestHostCachedKeyValueStore(CacheOptions::Policy::kFull, 8192);
+}
+
+// Keys are sampled from a Zipfian distribution over [0, num_keys), then scattered by a
+// multiplicative hash, so that hot keys are not consecutive.
+class ZipfianGenerator {
+ public:
+  ZipfianGenerator(uint64_t num_keys, double exponent, uint64_t seed)
+      : cdf_(num_keys), gen_(seed), dist_(0.0, 1.0) {
+    double sum = 0;
+    for (uint64_t i = 0; i < num_keys; ++i) {
+      sum += 1.0 / std::pow(static_cast<double>(i + 1), exponent);
+      cdf_[i] = sum;
+    }
+    for (auto& c : cdf_) { c /= sum; }
+  }
+
+  uint64_t Next() {
+    const uint64_t rank = std::lower_bound(cdf_.begin(), cdf_.end(), dist_(gen_)) - cdf_.begin();
+    return (std::min<uint64_t>(rank, cdf_.size() - 1) + 1) * 0x9E3779B97F4A7C15ULL;
+  }
+
+ private:
+  std::vector<double> cdf_;
+  std::mt19937_64 gen_;
+  std::uniform_real_distribution<double> dist_;
+};
+
+// Emulates an embedding lookup and update step: Get a batch, then Put the batch back.
+void BenchmarkHostCache(const std::string& name, Cache* cache,
+                        const std::vector<std::vector<uint64_t>>& batches, uint32_t line_size) {
+  const uint32_t batch_size = batches.front().size();
+  std::vector<float> values(static_cast<uint64_t>(batch_size) * line_size, 1.0);
+  std::vector<uint64_t> out_keys(batch_size);
+  std::vector<uint32_t> missing_indices(batch_size);
+  std::vector<float> evicted_values(static_cast<uint64_t>(batch_size) * line_size);
+  uint32_t n_missing = 0;
+  uint32_t n_evicted = 0;
+  uint64_t total_missing = 0;
+  double get_seconds = 0;
+  double put_seconds = 0;
+  for (const auto& batch : batches) {
+    auto start = std::chrono::steady_clock::now();
+    cache->Get(nullptr, batch_size, batch.data(), values.data(), &n_missing, out_keys.data(),
+               missing_indices.data());
+    auto mid = std::chrono::steady_clock::now();
+    cache->Put(nullptr, batch_size, batch.data(), values.data(), &n_evicted, out_keys.data(),
+               evicted_values.data());
+    auto end = std::chrono::steady_clock::now();
+    get_seconds += std::chrono::duration<double>(mid - start).count();
+    put_seconds += std::chrono::duration<double>(end - mid).count();
+    total_missing += n_missing;
+  }
+  const double total_keys = static_cast<double>(batch_size) * batches.size();
+  LOG(INFO) << name << ": hit rate " << 1.0 - total_missing / total_keys << ", get "
+            << total_keys / get_seconds / 1e6 << " Mkeys/s, put " << total_keys / put_seconds / 1e6
+            << " Mkeys/s";
+}
+
+TEST(HostCache, ZipfianBenchmark) {
+  const uint64_t num_keys =
+      ParseIntegerFromEnv("ONEFLOW_TEST_HOST_CACHE_BENCHMARK_NUM_KEYS", 1 << 20);
+  const uint32_t batch_size =
+      ParseIntegerFromEnv("ONEFLOW_TEST_HOST_CACHE_BENCHMARK_BATCH_SIZE", 1 << 16);
+  const uint32_t num_batches = ParseIntegerFromEnv("ONEFLOW_TEST_HOST_CACHE_BENCHMARK_STEPS", 32);
+  const uint32_t line_size = 16;
+  for (const double exponent : {0.9, 1.05, 1.2}) {
+    ZipfianGenerator zipf(num_keys, exponent, 0);
+    std::vector<std::vector<uint64_t>> batches(num_batches, std::vector<uint64_t>(batch_size));
+    for (auto& batch : batches) {
+      for (auto& key : batch) { key = zipf.Next(); }
+    }
+    LOG(INFO) << "zipf exponent " << exponent << ", " << num_keys << " keys, batch size "
+              << batch_size;
+    // The full cache holds all keys, which is a sharded hash map without eviction.
+    std::unique_ptr<Cache> full =
+        NewTestHostCache(CacheOptions::Policy::kFull, num_keys, line_size);
+    full->ReserveQueryLength(batch_size);
+    BenchmarkHostCache("full (sharded hash map)", full.get(), batches, line_size);
+    full.reset();
+    for (const uint64_t divisor : {10, 100}) {
+      std::unique_ptr<Cache> lru =
+          NewTestHostCache(CacheOptions::Policy::kLRU, num_keys / divisor, line_size);
+      lru->ReserveQueryLength(batch_size);
+      BenchmarkHostCache("lru (capacity 1/" + std::to_string(divisor) + ")", lru.get(), batches,
+                         line_size);
+    }
+  }
+}
+
+}  // namespace
+
+}  // namespace embedding
+
+}  // namespace oneflow
@@ -0,0 +1,145 @@
+/*
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+*/
+#ifndef ONEFLOW_CORE_EMBEDDING_HOST_CACHE_UTIL_H_
+#define ONEFLOW_CORE_EMBEDDING_HOST_CACHE_UTIL_H_
+
+#include "oneflow/core/common/util.h"
+#include "oneflow/core/common/balanced_splitter.h"
+#include "oneflow/core/common/blocking_counter.h"
+#include "oneflow/core/thread/thread_pool.h"
+#include <thread>
+
+namespace oneflow {
+
+namespace embedding {
+
+inline uint64_t HostCacheShardHash(uint64_t key) {
+  // fmix64 of MurmurHash3, so that consecutive keys spread over shards.
+  key ^= key >> 33U;
+  key *= 0xff51afd7ed558ccdULL;
+  key ^= key >> 33U;
+  key *= 0xc4ceb9fe1a85ec53ULL;
+  key ^= key >> 33U;
+  return key;
+}
+
+inline uint32_t GetHostCacheNumShards(uint64_t capacity) {
+  constexpr uint64_t kMaxNumShards = 64;
+  constexpr uint64_t kMinShardCapacity = 1024;
+  return std::max<uint64_t>(1, std::min<uint64_t>(kMaxNumShards, capacity / kMinShardCapacity));
+}
+
+// Host caches are split into shards by key hash, each shard is guarded by its own mutex. A batch
+// of keys is partitioned by shard, and shards are processed by a thread pool in parallel.
+class HostCacheShardedBatch final {
+ public:
+  OF_DISALLOW_COPY_AND_MOVE(HostCacheShardedBatch);
+  explicit HostCacheShardedBatch(uint32_t num_shards)
+      : num_shards_(num_shards), shard_offsets_(num_shards + 1), shard_counts_(num_shards) {
+    const int64_t num_threads = ParseIntegerFromEnv(
+        "ONEFLOW_ONE_EMBEDDING_HOST_CACHE_NUM_THREADS",
+        std::min<int64_t>(std::thread::hardware_concurrency(), num_shards));
+    if (num_threads > 1) { thread_pool_.reset(new ThreadPool(num_threads)); }
+  }
+  ~HostCacheShardedBatch() = default;
+
+  uint32_t NumShards() const { return num_shards_; }
+
+  void ReserveQueryLength(uint32_t query_length) {
+    if (query_length > indices_.size()) { indices_.resize(query_length); }
+  }
+
+  template<typename Key>
+  void Partition(uint32_t n_keys, const Key* keys) {
+    CHECK_LE(n_keys, indices_.size());
+    std::fill(shard_counts_.begin(), shard_counts_.end(), 0);
+    shard_ids_.resize(n_keys);
+    for (uint32_t i = 0; i < n_keys; ++i) {
+      const uint32_t shard = HostCacheShardHash(static_cast<uint64_t>(keys[i])) % num_shards_;
+      shard_ids_[i] = shard;
+      shard_counts_[shard] += 1;
+    }
+    shard_offsets_[0] = 0;
+    for (uint32_t shard = 0; shard < num_shards_; ++shard) {
+      shard_offsets_[shard + 1] = shard_offsets_[shard] + shard_counts_[shard];
+      shard_counts_[shard] = 0;
+    }
+    // Keys of each shard keep their order in the batch.
+    for (uint32_t i = 0; i < n_keys; ++i) {
+      const uint32_t shard = shard_ids_[i];
+      indices_[shard_offsets_[shard] + shard_counts_[shard]] = i;
+      shard_counts_[shard] += 1;
+    }
+  }
+
+  // Indices in the batch of the keys of `shard` are in [ShardBegin(shard), ShardEnd(shard)).
+  const uint32_t* ShardBegin(uint32_t shard) const {
+    return indices_.data() + shard_offsets_[shard];
+  }
+  const uint32_t* ShardEnd(uint32_t shard) const {
+    return indices_.data() + shard_offsets_[shard + 1];
+  }
+  uint32_t ShardOffset(uint32_t shard) const { return shard_offsets_[shard]; }
+
+  // Run `DoEachShard(shard)` for all non-empty shards in parallel.
+  void ParallelForShards(const std::function<void(uint32_t shard)>& DoEachShard) const {
+    if (!thread_pool_) {
+      for (uint32_t shard = 0; shard < num_shards_; ++shard) {
+        if (ShardBegin(shard) != ShardEnd(shard)) { DoEachShard(shard); }
+      }
+      return;
+    }
+    const size_t num_works = std::min<size_t>(thread_pool_->thread_num(), num_shards_);
+    BalancedSplitter bs(num_shards_, num_works);
+    BlockingCounter bc(num_works);
+    for (size_t work = 0; work < num_works; ++work) {
+      thread_pool_->AddWork([&, work] {
+        for (int64_t shard = bs.At(work).begin(); shard < bs.At(work).end(); ++shard) {
+          if (ShardBegin(shard) != ShardEnd(shard)) { DoEachShard(shard); }
+        }
+        bc.Decrease();
+      });
+    }
+    bc.WaitForeverUntilCntEqualZero();
+  }
+
+  // Each shard writes its `counts[shard]` results from ShardOffset(shard), move them to be
+  // contiguous by `Move(dst, src, n)` in shard order and return the total number of results.
+  uint32_t Compact(const std::vector<uint32_t>& counts,
+                   const std::function<void(uint32_t dst, uint32_t src, uint32_t n)>& Move) const {
+    uint32_t total = 0;
+    for (uint32_t shard = 0; shard < num_shards_; ++shard) {
+      const uint32_t count = counts.at(shard);
+      if (count != 0 && total != ShardOffset(shard)) { Move(total, ShardOffset(shard), count); }
+      total += count;
+    }
+    return total;
+  }
+
+ private:
+  uint32_t num_shards_;
+  std::vector<uint32_t> indices_;
+  std::vector<uint32_t> shard_ids_;
+  std::vector<uint32_t> shard_offsets_;
+  std::vector<uint32_t> shard_counts_;
+  std::unique_ptr<ThreadPool> thread_pool_;
+};
+
+}  // namespace embedding
+
+}  // namespace oneflow
+
+#endif  // ONEFLOW_CORE_EMBEDDING_HOST_CACHE_UTIL_H_
@@ -0,0 +1,213 @@
+/*
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+*/
+#include "oneflow/core/embedding/cached_key_value_store.h"
+
+namespace oneflow {
+
+namespace embedding {
+
+namespace {
+
+class HostCacheKeyValueStoreImpl : public KeyValueStore {
+ public:
+  OF_DISALLOW_COPY_AND_MOVE(HostCacheKeyValueStoreImpl);
+  HostCacheKeyValueStoreImpl(std::unique_ptr<KeyValueStore>&& store,
+                             std::unique_ptr<Cache>&& cache)
+      : store_(std::move(store)), cache_(std::move(cache)), synced_(true), max_query_length_(0) {
+    CHECK_EQ(store_->KeySize(), cache_->KeySize());
+    CHECK_EQ(store_->ValueSize(), cache_->ValueSize());
+  }
+  ~HostCacheKeyValueStoreImpl() override {
+    cache_.reset();
+    store_.reset();
+  }
+
+  uint32_t KeySize() const override { return store_->KeySize(); }
+  uint32_t ValueSize() const override { return store_->ValueSize(); }
+  uint32_t MaxQueryLength() const override { return max_query_length_; }
+
+  void ReserveQueryLength(uint32_t query_length) override {
+    if (query_length <= max_query_length_) { return; }
+    if (query_length > cache_->MaxQueryLength()) { cache_->ReserveQueryLength(query_length); }
+    if (query_length > store_->MaxQueryLength()) { store_->ReserveQueryLength(query_length); }
+    keys_buffer_.resize(query_length * store_->KeySize());
+    values_buffer_.resize(static_cast<uint64_t>(query_length) * store_->ValueSize());
+    indices_buffer0_.resize(query_length);
+    indices_buffer1_.resize(query_length);
+    max_query_length_ = query_length;
+  }
+
+  void Get(ep::Stream* stream, uint32_t num_keys, const void* keys, void* values,
+           uint32_t* n_missing, uint32_t* missing_indices) override;
+  void Get(ep::Stream* stream, uint32_t num_keys, const void* keys, void* values,
+           uint8_t* mask) override;
+  void Put(ep::Stream* stream, uint32_t num_keys, const void* keys, const void* values) override;
+  void FusedHalfUpdatePut(ep::Stream* stream, uint32_t n_keys, const void* keys, const void* values,
+                          const void* update, const float* lr, float scale) override;
+  bool IsFusionSupported() override {
+    return cache_->Policy() == CacheOptions::Policy::kFull
+           && cache_->ValueType() == DataType::kFloat;
+  }
+  bool SnapshotExists(const std::string& name) override;
+  void LoadSnapshot(const std::string& name) override;
+  void SaveSnapshot(const std::string& name) override;
+  void LoadSnapshot(const std::string& name,
+                    const std::function<void(KVIterator* iter)>& Hook) override;
+
+ private:
+  void SyncCacheToStore();
+
+  std::unique_ptr<KeyValueStore> store_;
+  std::unique_ptr<Cache> cache_;
+
+  std::vector<uint8_t> keys_buffer_;
+  std::vector<uint8_t> values_buffer_;
+  std::vector<uint32_t> indices_buffer0_;
+  std::vector<uint32_t> indices_buffer1_;
+  std::recursive_mutex mutex_;
+  bool synced_;
+  uint32_t max_query_length_;
+};
+
+void HostCacheKeyValueStoreImpl::Get(ep::Stream* stream, uint32_t num_keys, const void* keys,
+                                     void* values, uint32_t* n_missing,
+                                     uint32_t* missing_indices) {
+  std::lock_guard<std::recursive_mutex> lock(mutex_);
+  if (cache_->Policy() == CacheOptions::Policy::kFull) {
+    cache_->Get(stream, num_keys, keys, values, n_missing, keys_buffer_.data(), missing_indices);
+    return;
+  }
+  uint32_t num_cache_missing = 0;
+  cache_->Get(stream, num_keys, keys, values, &num_cache_missing, keys_buffer_.data(),
+              indices_buffer0_.data());
+  if (num_cache_missing == 0) {
+    *n_missing = 0;
+    return;
+  }
+  store_->Get(stream, num_cache_missing, keys_buffer_.data(), values_buffer_.data(), n_missing,
+              indices_buffer1_.data());
+  const uint32_t value_size = store_->ValueSize();
+  uint8_t* values_ptr = static_cast<uint8_t*>(values);
+  for (uint32_t i = 0; i < num_cache_missing; ++i) {
+    std::memcpy(values_ptr + static_cast<uint64_t>(indices_buffer0_[i]) * value_size,
+                values_buffer_.data() + static_cast<uint64_t>(i) * value_size, value_size);
+  }
+  for (uint32_t i = 0; i < *n_missing; ++i) {
+    missing_indices[i] = indices_buffer0_[indices_buffer1_[i]];
+  }
+}
+
+void HostCacheKeyValueStoreImpl::Get(ep::Stream* stream, uint32_t num_keys, const void* keys,
+                                     void* values, uint8_t* mask) {
+  std::lock_guard<std::recursive_mutex> lock(mutex_);
+  if (cache_->Policy() == CacheOptions::Policy::kFull) {
+    cache_->Get(stream, num_keys, keys, values, mask);
+  } else {
+    UNIMPLEMENTED();
+  }
+}
+
+void HostCacheKeyValueStoreImpl::Put(ep::Stream* stream, uint32_t num_keys, const void* keys,
+                                     const void* values) {
+  std::lock_guard<std::recursive_mutex> lock(mutex_);
+  synced_ = false;
+  uint32_t num_evicted = 0;
+  cache_->Put(stream, num_keys, keys, values, &num_evicted, keys_buffer_.data(),
+              values_buffer_.data());
+  if (cache_->Policy() == CacheOptions::Policy::kFull) { return; }
+  store_->Put(stream, num_evicted, keys_buffer_.data(), values_buffer_.data());
+}
+
+void HostCacheKeyValueStoreImpl::FusedHalfUpdatePut(ep::Stream* stream, uint32_t num_keys,
+                                                    const void* keys, const void* values,
+                                                    const void* update, const float* lr,
+                                                    float scale) {
+  std::lock_guard<std::recursive_mutex> lock(mutex_);
+  if (cache_->Policy() != CacheOptions::Policy::kFull || cache_->ValueType() != DataType::kFloat) {
+    UNIMPLEMENTED();
+  }
+  synced_ = false;
+  uint32_t num_evicted = 0;
+  cache_->FusedHalfUpdatePut(stream, num_keys, keys, values, update, lr, scale, &num_evicted,
+                             keys_buffer_.data(), values_buffer_.data());
+}
+
+bool HostCacheKeyValueStoreImpl::SnapshotExists(const std::string& name) {
+  return store_->SnapshotExists(name);
+}
+
+void HostCacheKeyValueStoreImpl::LoadSnapshot(const std::string& name) {
+  LoadSnapshot(name, nullptr);
+}
+
+void HostCacheKeyValueStoreImpl::LoadSnapshot(
+    const std::string& name, const std::function<void(KVIterator* iter)>& Hook) {
+  std::lock_guard<std::recursive_mutex> lock(mutex_);
+  CHECK_GT(max_query_length_, 0);
+  cache_->Clear();
+  store_->LoadSnapshot(name, [&](KVIterator* iter) {
+    if (cache_->Policy() == CacheOptions::Policy::kFull) {
+      while (true) {
+        uint32_t num_keys = 0;
+        iter->NextN(nullptr, max_query_length_, &num_keys, keys_buffer_.data(),
+                    values_buffer_.data());
+        if (num_keys == 0) { break; }
+        cache_->Put(nullptr, num_keys, keys_buffer_.data(), values_buffer_.data(), nullptr,
+                    nullptr, nullptr);
+      }
+    }
+    if (Hook) {
+      iter->Reset();
+      Hook(iter);
+    }
+  });
+  store_->LoadSnapshot(name);
+}
+
+void HostCacheKeyValueStoreImpl::SaveSnapshot(const std::string& name) {
+  std::lock_guard<std::recursive_mutex> lock(mutex_);
+  SyncCacheToStore();
+  store_->SaveSnapshot(name);
+}
+
+void HostCacheKeyValueStoreImpl::SyncCacheToStore() {
+  if (synced_) { return; }
+  const uint64_t dump_capacity = cache_->DumpCapacity();
+  CHECK_GT(max_query_length_, 0);
+  for (uint64_t start_key_index = 0; start_key_index < dump_capacity;
+       start_key_index += max_query_length_) {
+    uint32_t num_dumped = 0;
+    cache_->Dump(nullptr, start_key_index,
+                 std::min(start_key_index + max_query_length_, dump_capacity), &num_dumped,
+                 keys_buffer_.data(), values_buffer_.data());
+    if (num_dumped == 0) { continue; }
+    store_->Put(nullptr, num_dumped, keys_buffer_.data(), values_buffer_.data());
+  }
+  synced_ = true;
+}
+
+}  // namespace
+
+std::unique_ptr<KeyValueStore> NewHostCachedKeyValueStore(std::unique_ptr<KeyValueStore>&& store,
+                                                          std::unique_ptr<Cache>&& cache) {
+  CHECK(store->KeySize() == sizeof(uint32_t) || store->KeySize() == sizeof(uint64_t));
+  return std::unique_ptr<KeyValueStore>(
+      new HostCacheKeyValueStoreImpl(std::move(store), std::move(cache)));
+}
+
+}  // namespace embedding
+
+}  // namespace oneflow
@@ -0,0 +1,269 @@
+/*
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+*/
+#include "oneflow/core/embedding/full_cache.h"
+#include "oneflow/core/embedding/host_cache_util.h"
+#include <robin_hood.h>
+
+namespace oneflow {
+
+namespace embedding {
+
+namespace {
+
+template<typename Key>
+struct FullShard {
+  OF_DISALLOW_COPY_AND_MOVE(FullShard);
+  FullShard() = default;
+
+  std::mutex mutex;
+  robin_hood::unordered_flat_map<Key, uint64_t> key2row;
+};
+
+template<typename Key>
+class HostFullCache : public Cache {
+ public:
+  OF_DISALLOW_COPY_AND_MOVE(HostFullCache);
+  explicit HostFullCache(const CacheOptions& options)
+      : options_(options),
+        batch_(GetHostCacheNumShards(options.capacity)),
+        counts_(batch_.NumShards()),
+        row_keys_(options.capacity),
+        size_(0),
+        max_query_length_(0) {
+    for (uint32_t i = 0; i < batch_.NumShards(); ++i) { shards_.emplace_back(new FullShard<Key>); }
+    values_.reset(new uint8_t[options_.capacity * options_.value_size]);
+  }
+  ~HostFullCache() override = default;
+
+  uint32_t KeySize() const override { return options_.key_size; }
+  uint32_t ValueSize() const override { return options_.value_size; }
+  DataType ValueType() const override { return options_.value_type; }
+  uint32_t MaxQueryLength() const override { return max_query_length_; }
+  void ReserveQueryLength(uint32_t query_length) override {
+    if (query_length <= max_query_length_) { return; }
+    batch_.ReserveQueryLength(query_length);
+    max_query_length_ = query_length;
+  }
+  uint64_t Capacity() const override { return options_.capacity; }
+  CacheOptions::Policy Policy() const override { return CacheOptions::Policy::kFull; }
+
+  void Test(ep::Stream* stream, uint32_t n_keys, const void* keys, uint32_t* n_missing,
+            void* missing_keys, uint32_t* missing_indices) override;
+  void Get(ep::Stream* stream, uint32_t n_keys, const void* keys, void* values, uint32_t* n_missing,
+           void* missing_keys, uint32_t* missing_indices) override;
+  void Get(ep::Stream* stream, uint32_t n_keys, const void* keys, void* values,
+           uint8_t* mask) override;
+  void Put(ep::Stream* stream, uint32_t n_keys, const void* keys, const void* values,
+           uint32_t* n_evicted, void* evicted_keys, void* evicted_values) override;
+  void FusedHalfUpdatePut(ep::Stream* stream, uint32_t n_keys, const void* keys,
+                          const void* values, const void* update, const float* lr, float scale,
+                          uint32_t* n_evicted, void* evicted_keys, void* evicted_values) override;
+  void Dump(ep::Stream* stream, uint64_t start_key_index, uint64_t end_key_index,
+            uint32_t* n_dumped, void* keys, void* values) override;
+  void Clear() override {
+    for (auto& shard : shards_) {
+      std::lock_guard<std::mutex> lock(shard->mutex);
+      shard->key2row.clear();
+    }
+    size_ = 0;
+  }
+
+ private:
+  uint8_t* RowValue(uint64_t row) const { return values_.get() + row * options_.value_size; }
+  template<bool return_value>
+  void Lookup(uint32_t n_keys, const Key* keys, void* values, uint32_t* n_missing,
+              void* missing_keys, uint32_t* missing_indices);
+  // Call `Update(row, i)` for the i-th key of the batch whose row is `row`, keys are inserted if
+  // not exist.
+  template<typename UpdateFn>
+  void Insert(uint32_t n_keys, const Key* keys, const UpdateFn& Update);
+
+  CacheOptions options_;
+  HostCacheShardedBatch batch_;
+  std::vector<uint32_t> counts_;
+  std::vector<std::unique_ptr<FullShard<Key>>> shards_;
+  std::vector<Key> row_keys_;
+  std::atomic<uint64_t> size_;
+  std::unique_ptr<uint8_t[]> values_;
+  uint32_t max_query_length_;
+};
+
+template<typename Key>
+template<bool return_value>
+void HostFullCache<Key>::Lookup(uint32_t n_keys, const Key* keys, void* values,
+                                uint32_t* n_missing, void* missing_keys,
+                                uint32_t* missing_indices) {
+  *n_missing = 0;
+  if (n_keys == 0) { return; }
+  CHECK_LE(n_keys, max_query_length_);
+  uint8_t* values_ptr = static_cast<uint8_t*>(values);
+  const uint32_t value_size = options_.value_size;
+  batch_.Partition(n_keys, keys);
+  std::fill(counts_.begin(), counts_.end(), 0);
+  batch_.ParallelForShards([&](uint32_t shard_id) {
+    FullShard<Key>* shard = shards_.at(shard_id).get();
+    uint32_t* shard_missing_indices = missing_indices + batch_.ShardOffset(shard_id);
+    uint32_t count = 0;
+    std::lock_guard<std::mutex> lock(shard->mutex);
+    for (const uint32_t* it = batch_.ShardBegin(shard_id); it != batch_.ShardEnd(shard_id); ++it) {
+      auto entry = shard->key2row.find(keys[*it]);
+      if (entry == shard->key2row.end()) {
+        shard_missing_indices[count++] = *it;
+      } else if (return_value) {
+        std::memcpy(values_ptr + static_cast<uint64_t>(*it) * value_size, RowValue(entry->second),
+                    value_size);
+      }
+    }
+    counts_[shard_id] = count;
+  });
+  *n_missing = batch_.Compact(counts_, [&](uint32_t dst, uint32_t src, uint32_t n) {
+    std::memmove(missing_indices + dst, missing_indices + src, n * sizeof(uint32_t));
+  });
+  if (missing_keys != nullptr) {
+    Key* missing_keys_ptr = static_cast<Key*>(missing_keys);
+    for (uint32_t i = 0; i < *n_missing; ++i) { missing_keys_ptr[i] = keys[missing_indices[i]]; }
+  }
+}
+
+template<typename Key>
+template<typename UpdateFn>
+void HostFullCache<Key>::Insert(uint32_t n_keys, const Key* keys, const UpdateFn& Update) {
+  if (n_keys == 0) { return; }
+  CHECK_LE(n_keys, max_query_length_);
+  batch_.Partition(n_keys, keys);
+  batch_.ParallelForShards([&](uint32_t shard_id) {
+    FullShard<Key>* shard = shards_.at(shard_id).get();
+    std::lock_guard<std::mutex> lock(shard->mutex);
+    for (const uint32_t* it = batch_.ShardBegin(shard_id); it != batch_.ShardEnd(shard_id); ++it) {
+      const Key key = keys[*it];
+      auto entry = shard->key2row.find(key);
+      uint64_t row = 0;
+      if (entry == shard->key2row.end()) {
+        row = size_.fetch_add(1, std::memory_order_relaxed);
+        CHECK_LT(row, options_.capacity) << "The capacity of full cache is exceeded.";
+        row_keys_[row] = key;
+        shard->key2row.emplace(key, row);
+      } else {
+        row = entry->second;
+      }
+      Update(row, *it);
+    }
+  });
+}
+
+template<typename Key>
+void HostFullCache<Key>::Test(ep::Stream* stream, uint32_t n_keys, const void* keys,
+                              uint32_t* n_missing, void* missing_keys,
+                              uint32_t* missing_indices) {
+  Lookup<false>(n_keys, static_cast<const Key*>(keys), nullptr, n_missing, missing_keys,
+                missing_indices);
+}
+
+template<typename Key>
+void HostFullCache<Key>::Get(ep::Stream* stream, uint32_t n_keys, const void* keys, void* values,
+                             uint32_t* n_missing, void* missing_keys,
+                             uint32_t* missing_indices) {
+  Lookup<true>(n_keys, static_cast<const Key*>(keys), values, n_missing, missing_keys,
+               missing_indices);
+}
+
+template<typename Key>
+void HostFullCache<Key>::Get(ep::Stream* stream, uint32_t n_keys, const void* keys, void* values,
+                             uint8_t* mask) {
+  if (n_keys == 0) { return; }
+  CHECK_LE(n_keys, max_query_length_);
+  const Key* keys_ptr = static_cast<const Key*>(keys);
+  uint8_t* values_ptr = static_cast<uint8_t*>(values);
+  const uint32_t value_size = options_.value_size;
+  batch_.Partition(n_keys, keys_ptr);
+  batch_.ParallelForShards([&](uint32_t shard_id) {
+    FullShard<Key>* shard = shards_.at(shard_id).get();
+    std::lock_guard<std::mutex> lock(shard->mutex);
+    for (const uint32_t* it = batch_.ShardBegin(shard_id); it != batch_.ShardEnd(shard_id); ++it) {
+      auto entry = shard->key2row.find(keys_ptr[*it]);
+      mask[*it] = entry != shard->key2row.end();
+      if (mask[*it]) {
+        std::memcpy(values_ptr + static_cast<uint64_t>(*it) * value_size, RowValue(entry->second),
+                    value_size);
+      }
+    }
+  });
+}
+
+template<typename Key>
+void HostFullCache<Key>::Put(ep::Stream* stream, uint32_t n_keys, const void* keys,
+                             const void* values, uint32_t* n_evicted, void* evicted_keys,
+                             void* evicted_values) {
+  // Full cache never evicts.
+  if (n_evicted != nullptr) { *n_evicted = 0; }
+  const uint8_t* values_ptr = static_cast<const uint8_t*>(values);
+  const uint32_t value_size = options_.value_size;
+  Insert(n_keys, static_cast<const Key*>(keys), [&](uint64_t row, uint32_t i) {
+    std::memcpy(RowValue(row), values_ptr + static_cast<uint64_t>(i) * value_size, value_size);
+  });
+}
+
+template<typename Key>
+void HostFullCache<Key>::FusedHalfUpdatePut(ep::Stream* stream, uint32_t n_keys, const void* keys,
+                                            const void* values, const void* update,
+                                            const float* lr, float scale, uint32_t* n_evicted,
+                                            void* evicted_keys, void* evicted_values) {
+  if (options_.value_type != DataType::kFloat) { UNIMPLEMENTED(); }
+  if (n_evicted != nullptr) { *n_evicted = 0; }
+  const uint32_t line_size = options_.value_size / sizeof(float);
+  const float* values_ptr = static_cast<const float*>(values);
+  const float16* update_ptr = static_cast<const float16*>(update);
+  const float alpha = -*lr * scale;
+  Insert(n_keys, static_cast<const Key*>(keys), [&](uint64_t row, uint32_t i) {
+    float* row_value = reinterpret_cast<float*>(RowValue(row));
+    const float* value = values_ptr + static_cast<uint64_t>(i) * line_size;
+    const float16* row_update = update_ptr + static_cast<uint64_t>(i) * line_size;
+    for (uint32_t j = 0; j < line_size; ++j) {
+      row_value[j] = value[j] + static_cast<float>(row_update[j]) * alpha;
+    }
+  });
+}
+
+template<typename Key>
+void HostFullCache<Key>::Dump(ep::Stream* stream, uint64_t start_key_index,
+                              uint64_t end_key_index, uint32_t* n_dumped, void* keys,
+                              void* values) {
+  // Rows are allocated in order, so the dumped keys are in [0, size).
+  const uint64_t end = std::min<uint64_t>(end_key_index, size_);
+  const uint64_t n = end > start_key_index ? end - start_key_index : 0;
+  if (n != 0) {
+    std::memcpy(keys, row_keys_.data() + start_key_index, n * sizeof(Key));
+    std::memcpy(values, RowValue(start_key_index), n * options_.value_size);
+  }
+  *n_dumped = n;
+}
+
+}  // namespace
+
+std::unique_ptr<Cache> NewHostFullCache(const CacheOptions& options) {
+  if (options.key_size == sizeof(uint32_t)) {
+    return std::unique_ptr<Cache>(new HostFullCache<uint32_t>(options));
+  } else if (options.key_size == sizeof(uint64_t)) {
+    return std::unique_ptr<Cache>(new HostFullCache<uint64_t>(options));
+  } else {
+    UNIMPLEMENTED();
+    return nullptr;
+  }
+}
+
+}  // namespace embedding
+
+}  // namespace oneflow
@@ -0,0 +1,300 @@
+/*
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+*/
+#include "oneflow/core/embedding/lru_cache.h"
+#include "oneflow/core/embedding/host_cache_util.h"
+#include <robin_hood.h>
+
+namespace oneflow {
+
+namespace embedding {
+
+namespace {
+
+template<typename Key>
+struct LruShard {
+  OF_DISALLOW_COPY_AND_MOVE(LruShard);
+  explicit LruShard(uint32_t capacity)
+      : capacity(capacity), slot_keys(capacity), prev(capacity + 1), next(capacity + 1) {
+    key2slot.reserve(capacity);
+    Clear();
+  }
+
+  void Clear() {
+    key2slot.clear();
+    size = 0;
+    prev[capacity] = capacity;
+    next[capacity] = capacity;
+  }
+
+  // The list is ordered from the most recently used slot to the least recently used one, slot
+  // `capacity` is the sentinel.
+  void Unlink(uint32_t slot) {
+    next[prev[slot]] = next[slot];
+    prev[next[slot]] = prev[slot];
+  }
+
+  void PushFront(uint32_t slot) {
+    prev[slot] = capacity;
+    next[slot] = next[capacity];
+    prev[next[capacity]] = slot;
+    next[capacity] = slot;
+  }
+
+  void MoveToFront(uint32_t slot) {
+    Unlink(slot);
+    PushFront(slot);
+  }
+
+  uint32_t LeastRecentlyUsed() const { return prev[capacity]; }
+
+  std::mutex mutex;
+  uint32_t capacity;
+  uint32_t size{};
+  robin_hood::unordered_flat_map<Key, uint32_t> key2slot;
+  std::vector<Key> slot_keys;
+  std::vector<uint32_t> prev;
+  std::vector<uint32_t> next;
+};
+
+template<typename Key>
+class HostLruCache : public Cache {
+ public:
+  OF_DISALLOW_COPY_AND_MOVE(HostLruCache);
+  explicit HostLruCache(const CacheOptions& options)
+      : options_(options),
+        batch_(GetHostCacheNumShards(options.capacity)),
+        counts_(batch_.NumShards()),
+        max_query_length_(0) {
+    const uint32_t num_shards = batch_.NumShards();
+    shard_capacity_ = (options.capacity + num_shards - 1) / num_shards;
+    for (uint32_t i = 0; i < num_shards; ++i) {
+      shards_.emplace_back(new LruShard<Key>(shard_capacity_));
+    }
+    values_.reset(new uint8_t[Capacity() * options_.value_size]);
+  }
+  ~HostLruCache() override = default;
+
+  uint32_t KeySize() const override { return options_.key_size; }
+  uint32_t ValueSize() const override { return options_.value_size; }
+  DataType ValueType() const override { return options_.value_type; }
+  uint32_t MaxQueryLength() const override { return max_query_length_; }
+  void ReserveQueryLength(uint32_t query_length) override {
+    if (query_length <= max_query_length_) { return; }
+    batch_.ReserveQueryLength(query_length);
+    max_query_length_ = query_length;
+  }
+  uint64_t Capacity() const override {
+    return static_cast<uint64_t>(shard_capacity_) * batch_.NumShards();
+  }
+  CacheOptions::Policy Policy() const override { return CacheOptions::Policy::kLRU; }
+
+  void Test(ep::Stream* stream, uint32_t n_keys, const void* keys, uint32_t* n_missing,
+            void* missing_keys, uint32_t* missing_indices) override;
+  void Get(ep::Stream* stream, uint32_t n_keys, const void* keys, void* values, uint32_t* n_missing,
+           void* missing_keys, uint32_t* missing_indices) override;
+  void Put(ep::Stream* stream, uint32_t n_keys, const void* keys, const void* values,
+           uint32_t* n_evicted, void* evicted_keys, void* evicted_values) override;
+  void Dump(ep::Stream* stream, uint64_t start_key_index, uint64_t end_key_index,
+            uint32_t* n_dumped, void* keys, void* values) override;
+  void Clear() override {
+    for (auto& shard : shards_) {
+      std::lock_guard<std::mutex> lock(shard->mutex);
+      shard->Clear();
+    }
+  }
+
+ private:
+  uint8_t* SlotValue(uint32_t shard, uint32_t slot) const {
+    return values_.get()
+           + (static_cast<uint64_t>(shard) * shard_capacity_ + slot) * options_.value_size;
+  }
+  uint32_t CompactMissing(const Key* keys, void* missing_keys, uint32_t* missing_indices);
+
+  CacheOptions options_;
+  HostCacheShardedBatch batch_;
+  std::vector<uint32_t> counts_;
+  std::vector<std::unique_ptr<LruShard<Key>>> shards_;
+  uint32_t shard_capacity_{};
+  std::unique_ptr<uint8_t[]> values_;
+  uint32_t max_query_length_;
+};
+
+template<typename Key>
+uint32_t HostLruCache<Key>::CompactMissing(const Key* keys, void* missing_keys,
+                                           uint32_t* missing_indices) {
+  const uint32_t n_missing =
+      batch_.Compact(counts_, [&](uint32_t dst, uint32_t src, uint32_t n) {
+        std::memmove(missing_indices + dst, missing_indices + src, n * sizeof(uint32_t));
+      });
+  if (missing_keys != nullptr) {
+    Key* missing_keys_ptr = static_cast<Key*>(missing_keys);
+    for (uint32_t i = 0; i < n_missing; ++i) { missing_keys_ptr[i] = keys[missing_indices[i]]; }
+  }
+  return n_missing;
+}
+
+template<typename Key>
+void HostLruCache<Key>::Test(ep::Stream* stream, uint32_t n_keys, const void* keys,
+                             uint32_t* n_missing, void* missing_keys, uint32_t* missing_indices) {
+  *n_missing = 0;
+  if (n_keys == 0) { return; }
+  CHECK_LE(n_keys, max_query_length_);
+  const Key* keys_ptr = static_cast<const Key*>(keys);
+  batch_.Partition(n_keys, keys_ptr);
+  std::fill(counts_.begin(), counts_.end(), 0);
+  batch_.ParallelForShards([&](uint32_t shard_id) {
+    LruShard<Key>* shard = shards_.at(shard_id).get();
+    uint32_t* shard_missing_indices = missing_indices + batch_.ShardOffset(shard_id);
+    uint32_t count = 0;
+    std::lock_guard<std::mutex> lock(shard->mutex);
+    for (const uint32_t* it = batch_.ShardBegin(shard_id); it != batch_.ShardEnd(shard_id); ++it) {
+      if (shard->key2slot.find(keys_ptr[*it]) == shard->key2slot.end()) {
+        shard_missing_indices[count++] = *it;
+      }
+    }
+    counts_[shard_id] = count;
+  });
+  *n_missing = CompactMissing(keys_ptr, missing_keys, missing_indices);
+}
+
+template<typename Key>
+void HostLruCache<Key>::Get(ep::Stream* stream, uint32_t n_keys, const void* keys, void* values,
+                            uint32_t* n_missing, void* missing_keys, uint32_t* missing_indices) {
+  *n_missing = 0;
+  if (n_keys == 0) { return; }
+  CHECK_LE(n_keys, max_query_length_);
+  const Key* keys_ptr = static_cast<const Key*>(keys);
+  uint8_t* values_ptr = static_cast<uint8_t*>(values);
+  const uint32_t value_size = options_.value_size;
+  batch_.Partition(n_keys, keys_ptr);
+  std::fill(counts_.begin(), counts_.end(), 0);
+  batch_.ParallelForShards([&](uint32_t shard_id) {
+    LruShard<Key>* shard = shards_.at(shard_id).get();
+    uint32_t* shard_missing_indices = missing_indices + batch_.ShardOffset(shard_id);
+    uint32_t count = 0;
+    std::lock_guard<std::mutex> lock(shard->mutex);
+    for (const uint32_t* it = batch_.ShardBegin(shard_id); it != batch_.ShardEnd(shard_id); ++it) {
+      auto entry = shard->key2slot.find(keys_ptr[*it]);
+      if (entry == shard->key2slot.end()) {
+        shard_missing_indices[count++] = *it;
+      } else {
+        std::memcpy(values_ptr + static_cast<uint64_t>(*it) * value_size,
+                    SlotValue(shard_id, entry->second), value_size);
+        shard->MoveToFront(entry->second);
+      }
+    }
+    counts_[shard_id] = count;
+  });
+  *n_missing = CompactMissing(keys_ptr, missing_keys, missing_indices);
+}
+
+template<typename Key>
+void HostLruCache<Key>::Put(ep::Stream* stream, uint32_t n_keys, const void* keys,
+                            const void* values, uint32_t* n_evicted, void* evicted_keys,
+                            void* evicted_values) {
+  *n_evicted = 0;
+  if (n_keys == 0) { return; }
+  CHECK_LE(n_keys, max_query_length_);
+  CHECK(evicted_keys != nullptr && evicted_values != nullptr);
+  const Key* keys_ptr = static_cast<const Key*>(keys);
+  const uint8_t* values_ptr = static_cast<const uint8_t*>(values);
+  Key* evicted_keys_ptr = static_cast<Key*>(evicted_keys);
+  uint8_t* evicted_values_ptr = static_cast<uint8_t*>(evicted_values);
+  const uint32_t value_size = options_.value_size;
+  batch_.Partition(n_keys, keys_ptr);
+  std::fill(counts_.begin(), counts_.end(), 0);
+  batch_.ParallelForShards([&](uint32_t shard_id) {
+    LruShard<Key>* shard = shards_.at(shard_id).get();
+    // A shard evicts at most as many entries as its keys in the batch, so evicted entries are
+    // written from the offset of the shard and compacted later.
+    const uint32_t offset = batch_.ShardOffset(shard_id);
+    uint32_t count = 0;
+    std::lock_guard<std::mutex> lock(shard->mutex);
+    for (const uint32_t* it = batch_.ShardBegin(shard_id); it != batch_.ShardEnd(shard_id); ++it) {
+      const Key key = keys_ptr[*it];
+      const uint8_t* value = values_ptr + static_cast<uint64_t>(*it) * value_size;
+      auto entry = shard->key2slot.find(key);
+      if (entry != shard->key2slot.end()) {
+        std::memcpy(SlotValue(shard_id, entry->second), value, value_size);
+        shard->MoveToFront(entry->second);
+        continue;
+      }
+      uint32_t slot = 0;
+      if (shard->size < shard->capacity) {
+        slot = shard->size;
+        shard->size += 1;
+      } else {
+        slot = shard->LeastRecentlyUsed();
+        const Key evicted_key = shard->slot_keys[slot];
+        evicted_keys_ptr[offset + count] = evicted_key;
+        std::memcpy(evicted_values_ptr + static_cast<uint64_t>(offset + count) * value_size,
+                    SlotValue(shard_id, slot), value_size);
+        count += 1;
+        shard->key2slot.erase(evicted_key);
+        shard->Unlink(slot);
+      }
+      shard->key2slot.emplace(key, slot);
+      shard->slot_keys[slot] = key;
+      std::memcpy(SlotValue(shard_id, slot), value, value_size);
+      shard->PushFront(slot);
+    }
+    counts_[shard_id] = count;
+  });
+  *n_evicted = batch_.Compact(counts_, [&](uint32_t dst, uint32_t src, uint32_t n) {
+    std::memmove(evicted_keys_ptr + dst, evicted_keys_ptr + src, n * sizeof(Key));
+    std::memmove(evicted_values_ptr + static_cast<uint64_t>(dst) * value_size,
+                 evicted_values_ptr + static_cast<uint64_t>(src) * value_size,
+                 static_cast<uint64_t>(n) * value_size);
+  });
+}
+
+template<typename Key>
+void HostLruCache<Key>::Dump(ep::Stream* stream, uint64_t start_key_index,
+                             uint64_t end_key_index, uint32_t* n_dumped, void* keys,
+                             void* values) {
+  Key* keys_ptr = static_cast<Key*>(keys);
+  uint8_t* values_ptr = static_cast<uint8_t*>(values);
+  uint32_t count = 0;
+  for (uint64_t i = start_key_index; i < end_key_index; ++i) {
+    const uint32_t shard_id = i / shard_capacity_;
+    const uint32_t slot = i - static_cast<uint64_t>(shard_id) * shard_capacity_;
+    LruShard<Key>* shard = shards_.at(shard_id).get();
+    // Slots of a shard are allocated in order and never freed until Clear.
+    if (slot >= shard->size) { continue; }
+    keys_ptr[count] = shard->slot_keys[slot];
+    std::memcpy(values_ptr + static_cast<uint64_t>(count) * options_.value_size,
+                SlotValue(shard_id, slot), options_.value_size);
+    count += 1;
+  }
+  *n_dumped = count;
+}
+
+}  // namespace
+
+std::unique_ptr<Cache> NewHostLruCache(const CacheOptions& options) {
+  if (options.key_size == sizeof(uint32_t)) {
+    return std::unique_ptr<Cache>(new HostLruCache<uint32_t>(options));
+  } else if (options.key_size == sizeof(uint64_t)) {
+    return std::unique_ptr<Cache>(new HostLruCache<uint64_t>(options));
+  } else {
+    UNIMPLEMENTED();
+    return nullptr;
+  }
+}
+
+}  // namespace embedding
+
+}  // namespace oneflow
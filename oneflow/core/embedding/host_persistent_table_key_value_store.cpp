@@ -0,0 +1,120 @@
+/*
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+*/
+#include "oneflow/core/embedding/persistent_table_key_value_store.h"
+#include "oneflow/core/embedding/persistent_table.h"
+
+namespace oneflow {
+
+namespace embedding {
+
+namespace {
+
+class HostIteratorImpl : public KVIterator {
+ public:
+  OF_DISALLOW_COPY_AND_MOVE(HostIteratorImpl);
+  explicit HostIteratorImpl(PersistentTable::Iterator* base_iter) : base_iter_(base_iter) {}
+  ~HostIteratorImpl() override = default;
+
+  void NextN(ep::Stream* stream, uint32_t n_request, uint32_t* n_result, void* keys,
+             void* values) override {
+    base_iter_->Next(n_request, n_result, keys, values);
+  }
+
+  void Reset() override { base_iter_->Reset(); }
+
+ private:
+  PersistentTable::Iterator* base_iter_;
+};
+
+class HostKeyValueStoreImpl : public KeyValueStore {
+ public:
+  OF_DISALLOW_COPY_AND_MOVE(HostKeyValueStoreImpl);
+  explicit HostKeyValueStoreImpl(const PersistentTableKeyValueStoreOptions& options)
+      : max_query_length_(0) {
+    key_size_ = options.table_options.key_size;
+    value_size_ = options.table_options.value_size;
+    table_ = NewPersistentTable(options.table_options);
+  }
+  ~HostKeyValueStoreImpl() override = default;
+
+  uint32_t KeySize() const override { return key_size_; }
+
+  uint32_t ValueSize() const override { return value_size_; }
+
+  uint32_t MaxQueryLength() const override { return max_query_length_; }
+
+  void ReserveQueryLength(uint32_t query_length) override {
+    max_query_length_ = std::max(max_query_length_, query_length);
+  }
+
+  void Get(ep::Stream* stream, uint32_t num_keys, const void* keys, void* values,
+           uint32_t* n_missing, uint32_t* missing_indices) override {
+    std::lock_guard<std::mutex> lock(mutex_);
+    CHECK_LE(num_keys, max_query_length_);
+    if (num_keys == 0) {
+      *n_missing = 0;
+      return;
+    }
+    // Keys and values are on host, so they are passed to the table without copying.
+    table_->Get(num_keys, keys, values, n_missing, missing_indices);
+  }
+
+  void Put(ep::Stream* stream, uint32_t num_keys, const void* keys, const void* values) override {
+    std::lock_guard<std::mutex> lock(mutex_);
+    CHECK_LE(num_keys, max_query_length_);
+    if (num_keys == 0) { return; }
+    table_->Put(num_keys, keys, values);
+  }
+
+  bool SnapshotExists(const std::string& name) override { return table_->SnapshotExists(name); }
+
+  void LoadSnapshot(const std::string& name) override { LoadSnapshot(name, nullptr); }
+
+  void LoadSnapshot(const std::string& name,
+                    const std::function<void(KVIterator* iter)>& Hook) override {
+    if (Hook) {
+      table_->LoadSnapshot(name, [&](PersistentTable::Iterator* chunk_iterator) {
+        HostIteratorImpl iterator(chunk_iterator);
+        Hook(&iterator);
+      });
+    } else {
+      table_->LoadSnapshot(name);
+    }
+  }
+
+  void SaveSnapshot(const std::string& name) override { table_->SaveSnapshot(name); }
+
+ private:
+  uint32_t max_query_length_;
+  uint32_t key_size_;
+  uint32_t value_size_;
+
+  std::mutex mutex_;
+  std::unique_ptr<PersistentTable> table_;
+};
+
+}  // namespace
+
+std::unique_ptr<KeyValueStore> NewHostPersistentTableKeyValueStore(
+    const PersistentTableKeyValueStoreOptions& options) {
+  CHECK(options.table_options.key_size == sizeof(uint64_t)
+        || options.table_options.key_size == sizeof(uint32_t));
+  return std::unique_ptr<KeyValueStore>(new HostKeyValueStoreImpl(options));
+}
+
+}  // namespace embedding
+
+}  // namespace oneflow
@@ -103,6 +103,17 @@ class KeyValueStoreOptions final {
     CHECK(json_object.contains("kv_store"));
     auto kv_store = json_object["kv_store"];
 
+    device_type_ = DeviceType::kCUDA;
+    if (kv_store.contains("device_type")) {
+      CHECK(kv_store["device_type"].is_string());
+      std::string device_type = kv_store["device_type"].get<std::string>();
+      if (device_type == "cpu") {
+        device_type_ = DeviceType::kCPU;
+      } else if (device_type != "cuda") {
+        UNIMPLEMENTED() << "Unsupported kv_store device_type " << device_type;
+      }
+    }
+
     auto caches = kv_store["caches"];
     if (caches != nlohmann::detail::value_t::null && caches.size() > 0) {
       CHECK(caches.is_array());
@@ -111,6 +122,7 @@ class KeyValueStoreOptions final {
         cache_options_.at(i).key_size = key_type_size_;
         cache_options_.at(i).value_size = value_type_size_ * line_size_;
         cache_options_.at(i).value_type = value_type_;
+        cache_options_.at(i).device_type = device_type_;
         ParseCacheOptions(caches.at(i), &cache_options_.at(i));
       }
     }
@@ -153,6 +165,7 @@ class KeyValueStoreOptions final {
   int64_t ValueTypeSize() const { return value_type_size_; }
   DataType ValueType() const { return value_type_; }
   const std::string& Name() const { return name_; }
+  DeviceType GetDeviceType() const { return device_type_; }
   int64_t LineSize() const { return line_size_; }
   const std::vector<CacheOptions>& GetCachesOptions() const { return cache_options_; }
   const std::vector<std::string>& PersistentTablePaths() const { return persistent_table_paths_; }
@@ -171,6 +184,7 @@ class KeyValueStoreOptions final {
   DataType value_type_;
   std::string name_;
   int64_t line_size_;
+  DeviceType device_type_;
   std::vector<std::string> persistent_table_paths_;
   int64_t persistent_table_physical_block_size_;
   int64_t persistent_table_capacity_hint_;
@@ -24,6 +24,8 @@ namespace embedding {
 
 std::unique_ptr<Cache> NewLruCache(const CacheOptions& options);
 
+std::unique_ptr<Cache> NewHostLruCache(const CacheOptions& options);
+
 }  // namespace embedding
 
 }  // namespace oneflow
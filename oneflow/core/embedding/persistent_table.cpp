@@ -23,6 +23,10 @@ limitations under the License.
 #include "oneflow/core/embedding/posix_file.h"
 #include "oneflow/core/common/blocking_counter.h"
 #include <robin_hood.h>
+#include <algorithm>
+#include <chrono>
+#include <condition_variable>
+#include <unordered_set>
 #include <fcntl.h>
 #include <sys/mman.h>
 #include <dirent.h>
@@ -61,6 +65,8 @@ constexpr char const* kValuesDirName = "values";
 constexpr char const* kSnapshotsDirName = "snapshots";
 constexpr char const* kSnapshotListFileName = "LIST";
 constexpr size_t kParallelForStride = 256;
+constexpr uint64_t kCompactionBatchBytes = 4 * 1024 * 1024;
+constexpr int64_t kDefaultCompactionIntervalMs = 1000;
 
 template<typename T>
 T* BytesOffset(T* ptr, size_t bytes) {
@@ -146,6 +152,28 @@ class AlignedBuffer final {
   std::unique_ptr<char> ptr_;
 };
 
+class IoThrottle final {
+ public:
+  OF_DISALLOW_COPY_AND_MOVE(IoThrottle);
+  explicit IoThrottle(uint64_t bytes_per_second)
+      : bytes_per_second_(bytes_per_second), bytes_(0), start_(std::chrono::steady_clock::now()) {}
+  ~IoThrottle() = default;
+
+  void Consume(uint64_t bytes) {
+    if (bytes_per_second_ == 0) { return; }
+    bytes_ += bytes;
+    const std::chrono::duration<double> expected(static_cast<double>(bytes_)
+                                                 / static_cast<double>(bytes_per_second_));
+    std::this_thread::sleep_until(
+        start_ + std::chrono::duration_cast<std::chrono::steady_clock::duration>(expected));
+  }
+
+ private:
+  uint64_t bytes_per_second_;
+  uint64_t bytes_;
+  std::chrono::steady_clock::time_point start_;
+};
+
 template<typename Key>
 class ChunkIteratorImpl : public PersistentTable::Iterator {
  public:
@@ -359,6 +387,8 @@ class PersistentTableImpl : public PersistentTable {
                     const std::function<void(Iterator* iter)>& Hook) override;
   void SaveSnapshot(const std::string& name) override;
   Iterator* ReadSnapshot(const std::string& name) override;
+  void Compact() override;
+  PersistentTableCompactionStats GetCompactionStats() override;
 
  private:
   friend class SnapshotIteratorImpl<Key, Engine>;
@@ -370,6 +400,11 @@ class PersistentTableImpl : public PersistentTable {
   void LoadSnapshotImpl(const std::string& name);
   void SaveSnapshotImpl(const std::string& name);
   void ParallelFor(size_t total, const ForRange<Engine>& for_range);
+  void ResetNumLiveValues();
+  void ListSnapshotChunks(std::unordered_set<uint64_t>* chunks) const;
+  void CompactChunk(uint64_t chunk_id, IoThrottle* throttle);
+  void ReclaimChunk(uint64_t chunk_id);
+  void CompactionLoop();
 
   std::string root_dir_;
   std::string keys_dir_;
@@ -395,6 +430,16 @@ class PersistentTableImpl : public PersistentTable {
   PosixFile writable_key_file_;
   uint64_t writable_key_file_chunk_id_;
   PosixFileLockGuard lock_;
+
+  std::vector<uint64_t> chunk_num_live_values_;
+  PersistentTableCompactionStats compaction_stats_;
+  double compaction_live_ratio_threshold_;
+  uint64_t compaction_io_budget_;
+  std::mutex compaction_mutex_;
+  std::mutex compaction_thread_mutex_;
+  std::condition_variable compaction_cv_;
+  std::atomic<bool> compaction_shutdown_;
+  std::thread compaction_thread_;
 };
 
 template<typename Key, typename Engine>
@@ -405,7 +450,8 @@ PersistentTableImpl<Key, Engine>::PersistentTableImpl(const PersistentTableOptio
       physical_block_size_(options.physical_block_size),
       logical_block_size_(GetLogicalBlockSize(options.physical_block_size, value_size_)),
       blocks_buffer_(options.physical_block_size),
-      writable_key_file_chunk_id_(-1) {
+      writable_key_file_chunk_id_(-1),
+      compaction_shutdown_(false) {
   const uint64_t capacity_hint = ParseIntegerFromEnv(
       "ONEFLOW_ONE_EMBEDDING_PERSISTENT_TABLE_CAPACITY_HINT", options.capacity_hint);
   if (capacity_hint > 0) { row_id_mapping_.reserve(capacity_hint); }
@@ -452,10 +498,30 @@ PersistentTableImpl<Key, Engine>::PersistentTableImpl(const PersistentTableOptio
   } else {
     physical_table_size_ = 0;
   }
+  chunk_num_live_values_.resize(value_files_.size());
+  compaction_live_ratio_threshold_ =
+      ParseFloatFromEnv("ONEFLOW_ONE_EMBEDDING_PERSISTENT_TABLE_COMPACTION_LIVE_RATIO_THRESHOLD",
+                        options.compaction_live_ratio_threshold);
+  compaction_io_budget_ =
+      ParseIntegerFromEnv("ONEFLOW_ONE_EMBEDDING_PERSISTENT_TABLE_COMPACTION_IO_BUDGET_MB",
+                          options.compaction_io_budget_mb)
+      * 1024 * 1024;
+  if (ParseBooleanFromEnv("ONEFLOW_ONE_EMBEDDING_PERSISTENT_TABLE_ENABLE_COMPACTION",
+                          options.enable_compaction)) {
+    compaction_thread_ = std::thread(&PersistentTableImpl<Key, Engine>::CompactionLoop, this);
+  }
 }
 
 template<typename Key, typename Engine>
 PersistentTableImpl<Key, Engine>::~PersistentTableImpl() {
+  if (compaction_thread_.joinable()) {
+    {
+      std::lock_guard<std::mutex> lock(compaction_thread_mutex_);
+      compaction_shutdown_ = true;
+    }
+    compaction_cv_.notify_all();
+    compaction_thread_.join();
+  }
   for (uint32_t tid = 0; tid < workers_.size(); ++tid) { workers_.at(tid)->Shutdown(); }
 }
 
@@ -532,6 +598,10 @@ void PersistentTableImpl<Key, Engine>::PutBlocks(uint32_t num_keys, const void*
   const uint64_t start_block_id = start_index / num_values_per_block_;
   uint64_t written_blocks = 0;
   const uint64_t block_keys_size = num_values_per_block_ * sizeof(Key);
+  const uint64_t num_chunks =
+      (physical_table_size_ + num_values_per_chunk_ - 1) / num_values_per_chunk_;
+  if (chunk_num_live_values_.size() < num_chunks) { chunk_num_live_values_.resize(num_chunks); }
+  compaction_stats_.bytes_written += num_blocks * logical_block_size_;
   BlockingCounter bc(1);
   workers_.at(0)->Schedule([&](Engine*) {
     while (written_blocks < num_blocks) {
@@ -571,7 +641,13 @@ void PersistentTableImpl<Key, Engine>::PutBlocks(uint32_t num_keys, const void*
     bc.Decrease();
   });
   for (uint64_t i = 0; i < num_keys; ++i) {
-    row_id_mapping_[static_cast<const Key*>(keys)[i]] = start_index + i;
+    const uint64_t id = start_index + i;
+    auto it = row_id_mapping_.emplace(static_cast<const Key*>(keys)[i], id);
+    if (!it.second) {
+      chunk_num_live_values_[it.first->second / num_values_per_chunk_] -= 1;
+      it.first->second = id;
+    }
+    chunk_num_live_values_[id / num_values_per_chunk_] += 1;
   }
   bc.WaitForeverUntilCntEqualZero();
 }
@@ -632,6 +708,7 @@ void PersistentTableImpl<Key, Engine>::LoadSnapshotImpl(const std::string& name)
   const std::string snapshot_base = SnapshotDirPath(name);
   const std::string snapshot_list = SnapshotListFilePath(name);
   row_id_mapping_.clear();
+  ResetNumLiveValues();
   std::ifstream list_if(snapshot_list);
   std::string index_filename;
   while (std::getline(list_if, index_filename)) {
@@ -651,6 +728,7 @@ void PersistentTableImpl<Key, Engine>::LoadSnapshotImpl(const std::string& name)
     for (size_t i = 0; i < n_entries; ++i) {
       CHECK(row_id_mapping_.emplace(keys[indices[i] - chunk_start_index], indices[i]).second);
     }
+    chunk_num_live_values_.at(chunk_id) += n_entries;
   }
 }
 
@@ -712,6 +790,7 @@ void PersistentTableImpl<Key, Engine>::LoadSnapshot(
   const std::string snapshot_base = SnapshotDirPath(name);
   const std::string snapshot_list = SnapshotListFilePath(name);
   row_id_mapping_.clear();
+  ResetNumLiveValues();
   std::ifstream list_if(snapshot_list);
   std::string index_filename;
   while (std::getline(list_if, index_filename)) {
@@ -731,6 +810,7 @@ void PersistentTableImpl<Key, Engine>::LoadSnapshot(
     for (size_t i = 0; i < n_entries; ++i) {
       CHECK(row_id_mapping_.emplace(keys[indices[i] - chunk_start_index], indices[i]).second);
     }
+    chunk_num_live_values_.at(chunk_id) += n_entries;
     if (Hook) {
       PosixFile value_file(ValueFilePath(chunk_id), O_RDONLY, 0644);
       PosixMappedFile mapped_value(std::move(value_file), value_file.Size(), PROT_READ, mmap_flags);
@@ -774,6 +854,174 @@ void PersistentTableImpl<Key, Engine>::ParallelFor(size_t total,
   bc.WaitForeverUntilCntEqualZero();
 }
 
+template<typename Key, typename Engine>
+void PersistentTableImpl<Key, Engine>::ResetNumLiveValues() {
+  chunk_num_live_values_.assign(value_files_.size(), 0);
+}
+
+template<typename Key, typename Engine>
+void PersistentTableImpl<Key, Engine>::ListSnapshotChunks(
+    std::unordered_set<uint64_t>* chunks) const {
+  if (!PosixFile::FileExists(snapshots_dir_)) { return; }
+  DIR* dir = opendir(snapshots_dir_.c_str());
+  PCHECK(dir != nullptr);
+  struct dirent* ent = nullptr;
+  while ((ent = readdir(dir)) != nullptr) {
+    if (strcmp(ent->d_name, ".") == 0 || strcmp(ent->d_name, "..") == 0) { continue; }
+    const std::string snapshot_list = SnapshotListFilePath(ent->d_name);
+    if (!PosixFile::FileExists(snapshot_list)) { continue; }
+    std::ifstream list_if(snapshot_list);
+    std::string index_filename;
+    while (std::getline(list_if, index_filename)) {
+      chunks->insert(GetChunkId(index_filename, kIndexFileNamePrefix));
+    }
+  }
+  PCHECK(closedir(dir) == 0);
+}
+
+template<typename Key, typename Engine>
+void PersistentTableImpl<Key, Engine>::CompactChunk(uint64_t chunk_id, IoThrottle* throttle) {
+  PosixFile key_file(KeyFilePath(chunk_id), O_RDONLY, 0644);
+  PosixFile value_file(ValueFilePath(chunk_id), O_RDONLY, 0644);
+  const uint64_t num_blocks = value_file.Size() / logical_block_size_;
+  const uint64_t num_batch_blocks =
+      std::max<uint64_t>(kCompactionBatchBytes / logical_block_size_, 1);
+  const uint64_t chunk_start_index = chunk_id * num_values_per_chunk_;
+  std::vector<Key> batch_keys(num_batch_blocks * num_values_per_block_);
+  std::vector<char> batch_blocks(num_batch_blocks * logical_block_size_);
+  std::vector<uint32_t> live_indices;
+  std::vector<Key> live_keys;
+  std::vector<char> live_values;
+  for (uint64_t start_block = 0; start_block < num_blocks; start_block += num_batch_blocks) {
+    if (compaction_shutdown_) { return; }
+    const uint64_t n_blocks = std::min(num_batch_blocks, num_blocks - start_block);
+    const uint64_t n_values = n_blocks * num_values_per_block_;
+    const uint64_t start_index = chunk_start_index + start_block * num_values_per_block_;
+    const uint64_t keys_bytes = n_values * sizeof(Key);
+    PCHECK(pread(key_file.fd(), batch_keys.data(), keys_bytes,
+                 start_block * num_values_per_block_ * sizeof(Key))
+           == keys_bytes);
+    throttle->Consume(keys_bytes);
+    live_indices.clear();
+    {
+      std::lock_guard<std::recursive_mutex> lock(mutex_);
+      compaction_stats_.bytes_read += keys_bytes;
+      for (uint32_t i = 0; i < n_values; ++i) {
+        auto it = row_id_mapping_.find(batch_keys[i]);
+        if (it != row_id_mapping_.end() && it->second == start_index + i) {
+          live_indices.push_back(i);
+        }
+      }
+    }
+    if (live_indices.empty()) { continue; }
+    const uint64_t blocks_bytes = n_blocks * logical_block_size_;
+    PCHECK(pread(value_file.fd(), batch_blocks.data(), blocks_bytes,
+                 start_block * logical_block_size_)
+           == blocks_bytes);
+    throttle->Consume(blocks_bytes);
+    uint64_t bytes_rewritten = 0;
+    {
+      std::lock_guard<std::recursive_mutex> lock(mutex_);
+      compaction_stats_.bytes_read += blocks_bytes;
+      live_keys.resize(live_indices.size());
+      live_values.resize(live_indices.size() * value_size_);
+      uint32_t n_live = 0;
+      for (const uint32_t i : live_indices) {
+        // Values updated after the liveness check have already been written to a newer block.
+        auto it = row_id_mapping_.find(batch_keys[i]);
+        if (it == row_id_mapping_.end() || it->second != start_index + i) { continue; }
+        const uint64_t block_in_batch = i / num_values_per_block_;
+        const uint32_t index_in_block = i - block_in_batch * num_values_per_block_;
+        MemcpyOffset(live_values.data(), n_live * value_size_, batch_blocks.data(),
+                     block_in_batch * logical_block_size_ + index_in_block * value_size_,
+                     value_size_);
+        live_keys[n_live] = batch_keys[i];
+        n_live += 1;
+      }
+      if (n_live > 0) {
+        const uint64_t bytes_written = compaction_stats_.bytes_written;
+        Put(n_live, live_keys.data(), live_values.data());
+        bytes_rewritten = compaction_stats_.bytes_written - bytes_written;
+        compaction_stats_.bytes_rewritten += bytes_rewritten;
+      }
+    }
+    throttle->Consume(bytes_rewritten);
+  }
+}
+
+template<typename Key, typename Engine>
+void PersistentTableImpl<Key, Engine>::ReclaimChunk(uint64_t chunk_id) {
+  PosixFile& value_file = value_files_.at(chunk_id);
+  uint64_t bytes_reclaimed = value_file.Size();
+  value_file.Close();
+  PCHECK(unlink(ValueFilePath(chunk_id).c_str()) == 0);
+  const std::string key_file_path = KeyFilePath(chunk_id);
+  if (PosixFile::FileExists(key_file_path)) {
+    bytes_reclaimed += PosixFile(key_file_path, O_RDONLY, 0644).Size();
+    PCHECK(unlink(key_file_path.c_str()) == 0);
+  }
+  compaction_stats_.num_chunks_reclaimed += 1;
+  compaction_stats_.bytes_reclaimed += bytes_reclaimed;
+}
+
+template<typename Key, typename Engine>
+void PersistentTableImpl<Key, Engine>::Compact() {
+  std::lock_guard<std::mutex> compaction_lock(compaction_mutex_);
+  IoThrottle throttle(compaction_io_budget_);
+  std::vector<std::pair<uint64_t, uint64_t>> victims;
+  {
+    std::lock_guard<std::recursive_mutex> lock(mutex_);
+    compaction_stats_.num_passes += 1;
+    std::unordered_set<uint64_t> snapshot_chunks;
+    ListSnapshotChunks(&snapshot_chunks);
+    const double max_num_live_values = num_values_per_chunk_ * compaction_live_ratio_threshold_;
+    // The last chunk is still being appended to and is never compacted.
+    for (uint64_t chunk_id = 0; chunk_id + 1 < value_files_.size(); ++chunk_id) {
+      if (!value_files_.at(chunk_id).IsOpen()) { continue; }
+      if (snapshot_chunks.count(chunk_id) != 0) { continue; }
+      const uint64_t num_live_values = chunk_num_live_values_.at(chunk_id);
+      if (num_live_values == 0) {
+        ReclaimChunk(chunk_id);
+      } else if (num_live_values < max_num_live_values) {
+        victims.emplace_back(num_live_values, chunk_id);
+      }
+    }
+  }
+  std::sort(victims.begin(), victims.end());
+  for (const auto& victim : victims) {
+    if (compaction_shutdown_) { break; }
+    const uint64_t chunk_id = victim.second;
+    CompactChunk(chunk_id, &throttle);
+    std::lock_guard<std::recursive_mutex> lock(mutex_);
+    // A snapshot saved while the chunk was being compacted may still refer to it.
+    std::unordered_set<uint64_t> snapshot_chunks;
+    ListSnapshotChunks(&snapshot_chunks);
+    if (chunk_num_live_values_.at(chunk_id) == 0 && snapshot_chunks.count(chunk_id) == 0) {
+      compaction_stats_.num_chunks_compacted += 1;
+      ReclaimChunk(chunk_id);
+    }
+  }
+}
+
+template<typename Key, typename Engine>
+PersistentTableCompactionStats PersistentTableImpl<Key, Engine>::GetCompactionStats() {
+  std::lock_guard<std::recursive_mutex> lock(mutex_);
+  return compaction_stats_;
+}
+
+template<typename Key, typename Engine>
+void PersistentTableImpl<Key, Engine>::CompactionLoop() {
+  const std::chrono::milliseconds interval(
+      ParseIntegerFromEnv("ONEFLOW_ONE_EMBEDDING_PERSISTENT_TABLE_COMPACTION_INTERVAL_MS",
+                          kDefaultCompactionIntervalMs));
+  std::unique_lock<std::mutex> lock(compaction_thread_mutex_);
+  while (!compaction_cv_.wait_for(lock, interval, [&] { return compaction_shutdown_.load(); })) {
+    lock.unlock();
+    Compact();
+    lock.lock();
+  }
+}
+
 template<typename Key, typename Engine>
 class SnapshotIteratorImpl : public PersistentTable::Iterator {
  public:
@@ -29,6 +29,25 @@ struct PersistentTableOptions {
   uint64_t target_chunk_size_mb = 4 * 1024;
   uint16_t physical_block_size = 4096;
   uint64_t capacity_hint = 0;
+  bool enable_compaction = false;
+  double compaction_live_ratio_threshold = 0.5;
+  uint64_t compaction_io_budget_mb = 0;
+};
+
+struct PersistentTableCompactionStats {
+  uint64_t num_passes = 0;
+  uint64_t num_chunks_compacted = 0;
+  uint64_t num_chunks_reclaimed = 0;
+  uint64_t bytes_written = 0;
+  uint64_t bytes_rewritten = 0;
+  uint64_t bytes_read = 0;
+  uint64_t bytes_reclaimed = 0;
+
+  double WriteAmplification() const {
+    const uint64_t user_bytes_written = bytes_written - bytes_rewritten;
+    if (user_bytes_written == 0) { return 1.0; }
+    return static_cast<double>(bytes_written) / static_cast<double>(user_bytes_written);
+  }
 };
 
 class PersistentTable {
@@ -61,6 +80,8 @@ class PersistentTable {
                             const std::function<void(Iterator* iter)>& Hook) = 0;
   virtual void SaveSnapshot(const std::string& name) = 0;
   virtual Iterator* ReadSnapshot(const std::string& name) = 0;
+  virtual void Compact() = 0;
+  virtual PersistentTableCompactionStats GetCompactionStats() = 0;
 };
 
 std::unique_ptr<PersistentTable> NewPersistentTable(const PersistentTableOptions& options);
@@ -23,17 +23,21 @@ namespace oneflow {
 
 namespace embedding {
 
-#ifdef WITH_CUDA
-
 struct PersistentTableKeyValueStoreOptions {
   PersistentTableOptions table_options{};
 };
 
+#ifdef WITH_CUDA
+
 std::unique_ptr<KeyValueStore> NewPersistentTableKeyValueStore(
     const PersistentTableKeyValueStoreOptions& options);
 
 #endif  // WITH_CUDA
 
+// Keys and values of the store are host pointers.
+std::unique_ptr<KeyValueStore> NewHostPersistentTableKeyValueStore(
+    const PersistentTableKeyValueStoreOptions& options);
+
 }  // namespace embedding
 
 }  // namespace oneflow
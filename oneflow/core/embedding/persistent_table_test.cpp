@@ -0,0 +1,162 @@
+/*
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+*/
+#include "oneflow/core/embedding/persistent_table.h"
+#include "oneflow/core/embedding/posix_file.h"
+#include <gtest/gtest.h>
+#include <chrono>
+#include <thread>
+
+namespace oneflow {
+
+namespace embedding {
+
+namespace {
+
+#ifdef __linux__
+
+constexpr uint32_t kValueLength = 64;
+constexpr uint16_t kPhysicalBlockSize = 512;
+constexpr uint64_t kNumValuesPerChunk =
+    1024 * 1024 / kPhysicalBlockSize * (kPhysicalBlockSize / (kValueLength * sizeof(float)));
+
+std::string CreateTempDirectory() {
+  const char* tmp_env = getenv("TMPDIR");
+  const char* tmp_dir = tmp_env == nullptr ? "/tmp" : tmp_env;
+  std::string tpl = std::string(tmp_dir) + "/test_persistent_table_XXXXXX";
+  char* path = mkdtemp(const_cast<char*>(tpl.c_str()));
+  PCHECK(path != nullptr);
+  return std::string(path);
+}
+
+PersistentTableOptions GetTestOptions(const std::string& path) {
+  PersistentTableOptions options{};
+  options.path = path;
+  options.key_size = sizeof(uint64_t);
+  options.value_size = kValueLength * sizeof(float);
+  options.target_chunk_size_mb = 1;
+  options.physical_block_size = kPhysicalBlockSize;
+  return options;
+}
+
+float GetTestValue(uint64_t key, uint32_t version, uint32_t i) {
+  return static_cast<float>(key % 65536) + static_cast<float>(version) * 0.5f
+         + static_cast<float>(i) * 0.25f;
+}
+
+void PutKeys(PersistentTable* table, uint64_t begin, uint64_t end, uint32_t version) {
+  const uint64_t batch_size = 1024;
+  std::vector<uint64_t> keys(batch_size);
+  std::vector<float> values(batch_size * kValueLength);
+  for (uint64_t start = begin; start < end; start += batch_size) {
+    const uint32_t n = std::min(batch_size, end - start);
+    for (uint32_t i = 0; i < n; ++i) {
+      keys[i] = start + i;
+      for (uint32_t j = 0; j < kValueLength; ++j) {
+        values[i * kValueLength + j] = GetTestValue(start + i, version, j);
+      }
+    }
+    table->Put(n, keys.data(), values.data());
+  }
+}
+
+void CheckKeys(PersistentTable* table, uint64_t begin, uint64_t end, uint32_t version) {
+  const uint64_t batch_size = 1024;
+  std::vector<uint64_t> keys(batch_size);
+  std::vector<float> values(batch_size * kValueLength);
+  std::vector<uint32_t> missing_indices(batch_size);
+  for (uint64_t start = begin; start < end; start += batch_size) {
+    const uint32_t n = std::min(batch_size, end - start);
+    for (uint32_t i = 0; i < n; ++i) { keys[i] = start + i; }
+    uint32_t n_missing = 0;
+    table->Get(n, keys.data(), values.data(), &n_missing, missing_indices.data());
+    ASSERT_EQ(n_missing, 0);
+    for (uint32_t i = 0; i < n; ++i) {
+      for (uint32_t j = 0; j < kValueLength; ++j) {
+        ASSERT_EQ(values[i * kValueLength + j], GetTestValue(start + i, version, j));
+      }
+    }
+  }
+}
+
+TEST(PersistentTable, Compaction) {
+  std::string path = CreateTempDirectory();
+  PersistentTableOptions options = GetTestOptions(path);
+  std::unique_ptr<PersistentTable> table = NewPersistentTable(options);
+  const uint64_t num_keys = kNumValuesPerChunk * 4;
+  const uint64_t num_updated_keys = num_keys * 15 / 16;
+  PutKeys(table.get(), 0, num_keys, 0);
+  table->SaveSnapshot("v0");
+  PutKeys(table.get(), 0, num_updated_keys, 1);
+
+  // Every chunk written before the update is referenced by snapshot v0.
+  table->Compact();
+  PersistentTableCompactionStats stats = table->GetCompactionStats();
+  ASSERT_EQ(stats.num_chunks_reclaimed, 0);
+  ASSERT_EQ(stats.bytes_rewritten, 0);
+
+  PosixFile::RecursiveDelete(PosixFile::JoinPath(PosixFile::JoinPath(path, "snapshots"), "v0"));
+  table->Compact();
+  stats = table->GetCompactionStats();
+  ASSERT_EQ(stats.num_chunks_compacted, 1);
+  ASSERT_EQ(stats.num_chunks_reclaimed, 4);
+  ASSERT_EQ(stats.bytes_reclaimed, 4 * (1024 * 1024 + kNumValuesPerChunk * sizeof(uint64_t)));
+  ASSERT_EQ(stats.bytes_rewritten,
+            (num_keys - num_updated_keys) * kValueLength * sizeof(float));
+  ASSERT_GT(stats.WriteAmplification(), 1.0);
+  CheckKeys(table.get(), 0, num_updated_keys, 1);
+  CheckKeys(table.get(), num_updated_keys, num_keys, 0);
+
+  table->SaveSnapshot("v1");
+  table.reset();
+  table = NewPersistentTable(options);
+  table->LoadSnapshot("v1");
+  CheckKeys(table.get(), 0, num_updated_keys, 1);
+  CheckKeys(table.get(), num_updated_keys, num_keys, 0);
+  table.reset();
+  PosixFile::RecursiveDelete(path);
+}
+
+TEST(PersistentTable, BackgroundCompaction) {
+  setenv("ONEFLOW_ONE_EMBEDDING_PERSISTENT_TABLE_COMPACTION_INTERVAL_MS", "10", 1);
+  std::string path = CreateTempDirectory();
+  PersistentTableOptions options = GetTestOptions(path);
+  options.enable_compaction = true;
+  options.compaction_io_budget_mb = 64;
+  std::unique_ptr<PersistentTable> table = NewPersistentTable(options);
+  const uint64_t num_keys = kNumValuesPerChunk * 2;
+  for (uint32_t version = 0; version < 8; ++version) {
+    PutKeys(table.get(), 0, num_keys, version);
+    CheckKeys(table.get(), 0, num_keys, version);
+  }
+  const auto deadline = std::chrono::steady_clock::now() + std::chrono::seconds(60);
+  while (table->GetCompactionStats().num_chunks_reclaimed == 0
+         && std::chrono::steady_clock::now() < deadline) {
+    std::this_thread::sleep_for(std::chrono::milliseconds(10));
+  }
+  ASSERT_GT(table->GetCompactionStats().num_chunks_reclaimed, 0);
+  CheckKeys(table.get(), 0, num_keys, 7);
+  table.reset();
+  unsetenv("ONEFLOW_ONE_EMBEDDING_PERSISTENT_TABLE_COMPACTION_INTERVAL_MS");
+  PosixFile::RecursiveDelete(path);
+}
+
+#endif  // __linux__
+
+}  // namespace
+
+}  // namespace embedding
+
+}  // namespace oneflow
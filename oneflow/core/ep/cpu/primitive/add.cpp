@@ -28,19 +28,21 @@ namespace {
 
 template<typename T, size_t arity>
 void AddCpu(const T* const* srcs, T* dst, size_t count) {
+  using ComputeType = typename HostComputeType<T>::type;
   for (size_t i = 0; i < count; ++i) {
-    T sum = T(0);
-    for (size_t a = 0; a < arity; ++a) { sum += srcs[a][i]; }
-    dst[i] = sum;
+    ComputeType sum = ComputeType(0);
+    for (size_t a = 0; a < arity; ++a) { sum += static_cast<ComputeType>(srcs[a][i]); }
+    dst[i] = static_cast<T>(sum);
   }
 }
 
 template<typename T>
 void AddCpu(const T* const* srcs, size_t arity, T* dst, size_t count) {
+  using ComputeType = typename HostComputeType<T>::type;
   for (size_t i = 0; i < count; ++i) {
-    T sum = T(0);
-    for (size_t a = 0; a < arity; ++a) { sum += srcs[a][i]; }
-    dst[i] = sum;
+    ComputeType sum = ComputeType(0);
+    for (size_t a = 0; a < arity; ++a) { sum += static_cast<ComputeType>(srcs[a][i]); }
+    dst[i] = static_cast<T>(sum);
   }
 }
 
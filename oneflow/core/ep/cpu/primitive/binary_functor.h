@@ -14,6 +14,7 @@ See the License for the specific language governing permissions and
 limitations under the License.
 */
 #include "oneflow/core/ep/common/primitive/binary_functor.h"
+#include "oneflow/core/ep/common/primitive/broadcast_elementwise_binary.h"
 
 namespace oneflow {
 
@@ -164,6 +165,23 @@ SPECIALIZATION_CPU_BINARY_FUNCTOR(BinaryOp::kFmod, char);
 SPECIALIZATION_CPU_BINARY_FUNCTOR(BinaryOp::kFloorDiv, char);
 SPECIALIZATION_CPU_BINARY_FUNCTOR(BinaryOp::kFloorMod, char);
 
+// bfloat16 is computed by the float functors.
+#define SPECIALIZATION_CPU_BFLOAT16_BINARY_FUNCTOR(op)                                        \
+  template<>                                                                                  \
+  struct BinaryFunctor<DeviceType::kCPU, op, bfloat16, bfloat16> {                            \
+    OF_DEVICE_FUNC BinaryFunctor(Scalar attr0, Scalar attr1) : float_functor(attr0, attr1) {} \
+                                                                                              \
+    BinaryFunctor<DeviceType::kCPU, op, float, float> float_functor;                          \
+    OF_DEVICE_FUNC bfloat16 operator()(bfloat16 src0, bfloat16 src1) const {                  \
+      return bfloat16(float_functor(static_cast<float>(src0), static_cast<float>(src1)));     \
+    }                                                                                         \
+  };
+
+OF_PP_FOR_EACH_TUPLE(SPECIALIZATION_CPU_BFLOAT16_BINARY_FUNCTOR,
+                     BINARY_MATH_OP_SEQ BINARY_ACTIVATION_BACKWARD_OP_SEQ);
+
+#undef SPECIALIZATION_CPU_BFLOAT16_BINARY_FUNCTOR
+
 }  // namespace broadcast_elementwise_binary
 }  // namespace primitive
 }  // namespace ep
@@ -45,6 +45,11 @@ float16 GetValue<float16>(Scalar value) {
   return static_cast<float16>(GetValue<float>(value));
 }
 
+template<>
+bfloat16 GetValue<bfloat16>(Scalar value) {
+  return static_cast<bfloat16>(GetValue<float>(value));
+}
+
 template<BinaryOp binary_op, typename Src, typename Dst>
 struct BinaryLhsScalarFunctor {
   BinaryLhsScalarFunctor(Src scalar, Scalar attr0, Scalar attr1)
@@ -328,15 +333,16 @@ std::unique_ptr<BroadcastElementwiseBinary> NewBroadcastElementwiseBinary(Scalar
       new BroadcastElementwiseBinaryImpl<binary_op, Src, Dst>(attr0, attr1));
 }
 
-#define NDARRAY_BINARY_TYPE_SEQ \
-  CPU_PRIMITIVE_BOOL_TYPE_SEQ   \
-  CPU_PRIMITIVE_INT8_TYPE_SEQ   \
-  CPU_PRIMITIVE_UINT8_TYPE_SEQ  \
-  CPU_PRIMITIVE_INT32_TYPE_SEQ  \
-  CPU_PRIMITIVE_INT64_TYPE_SEQ  \
-  CPU_PRIMITIVE_FLOAT_TYPE_SEQ  \
-  CPU_PRIMITIVE_DOUBLE_TYPE_SEQ \
-  CPU_PRIMITIVE_FLOAT16_TYPE_SEQ
+#define NDARRAY_BINARY_TYPE_SEQ   \
+  CPU_PRIMITIVE_BOOL_TYPE_SEQ     \
+  CPU_PRIMITIVE_INT8_TYPE_SEQ     \
+  CPU_PRIMITIVE_UINT8_TYPE_SEQ    \
+  CPU_PRIMITIVE_INT32_TYPE_SEQ    \
+  CPU_PRIMITIVE_INT64_TYPE_SEQ    \
+  CPU_PRIMITIVE_FLOAT_TYPE_SEQ    \
+  CPU_PRIMITIVE_DOUBLE_TYPE_SEQ   \
+  CPU_PRIMITIVE_FLOAT16_TYPE_SEQ  \
+  CPU_PRIMITIVE_BFLOAT16_TYPE_SEQ
 
 #ifdef WITH_ONEDNN
 
@@ -568,7 +574,8 @@ class BroadcastElementwiseBinaryFactoryImpl : public BroadcastElementwiseBinaryF
 
                     OF_PP_SEQ_PRODUCT_FOR_EACH_TUPLE(
                         MAKE_NEW_BROADCAST_ELEMENTWISE_BINARY_ACTIVATION_GRAD_ENTRY,
-                        BINARY_ACTIVATION_BACKWARD_OP_SEQ, CPU_PRIMITIVE_FLOATING_TYPE_SEQ)};
+                        BINARY_ACTIVATION_BACKWARD_OP_SEQ,
+                        CPU_PRIMITIVE_FLOATING_AND_BFLOAT16_TYPE_SEQ)};
 
 #undef MAKE_NEW_BROADCAST_ELEMENTWISE_BINARY_COMPARASION_AND_LOGICAL_ENTRY
 #undef MAKE_NEW_BROADCAST_ELEMENTWISE_BINARY_MATH_ENTRY
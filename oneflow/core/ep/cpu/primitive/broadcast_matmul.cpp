@@ -16,7 +16,10 @@ limitations under the License.
 #include "oneflow/core/ep/include/primitive/primitive.h"
 #include "oneflow/core/ep/include/primitive/broadcast_matmul.h"
 #include "oneflow/core/ep/common/primitive/broadcast_matmul.h"
+#include "oneflow/core/ep/cpu/cpu_stream.h"
 #include "oneflow/core/common/blas.h"
+#include <memory>
+#include <vector>
 
 namespace oneflow {
 
@@ -85,6 +88,98 @@ void LaunchCblasBroadcastMatmul(Stream* /*stream*/, DataType data_type,
                              a_batch_dims, b_batch_dims, c_batch_dims, a, b, c, func);
 }
 
+#ifdef WITH_ONEDNN
+
+// Each batch is multiplied by the bfloat16 matmul of oneDNN, which accumulates in float. Alpha is
+// applied as the output scale and beta as a sum post-op on c.
+void LaunchBFloat16BroadcastMatmul(Stream* stream, BlasTransposeType transpose_a,
+                                   BlasTransposeType transpose_b, int64_t num_batch_dims,
+                                   const int64_t* broadcast_batch_dims,
+                                   const int64_t* a_batch_dims, const int64_t* b_batch_dims,
+                                   const int64_t* c_batch_dims, int64_t m, int64_t n, int64_t k,
+                                   Scalar alpha, const void* a, const void* b, Scalar beta,
+                                   void* c) {
+  const float alpha_value = alpha.Value<float>();
+  const float beta_value = beta.Value<float>();
+  stream->As<CpuStream>()->onednn_executor()->Launch([&](dnnl::engine* onednn_engine,
+                                                         dnnl::stream* onednn_stream) {
+    // a transposed matrix is the row-major matrix read with swapped strides
+    dnnl::memory::dims a_strides = {k, 1};
+    if (transpose_a == BlasTransposeType::T) { a_strides = {1, m}; }
+    dnnl::memory::dims b_strides = {n, 1};
+    if (transpose_b == BlasTransposeType::T) { b_strides = {1, k}; }
+    const auto a_md = dnnl::memory::desc({m, k}, dnnl::memory::data_type::bf16, a_strides);
+    const auto b_md = dnnl::memory::desc({k, n}, dnnl::memory::data_type::bf16, b_strides);
+    const auto c_md = dnnl::memory::desc({m, n}, dnnl::memory::data_type::bf16, {n, 1});
+    auto NewMatmul = [&](float matmul_beta) {
+      dnnl::primitive_attr attr;
+      if (alpha_value != 1) { attr.set_output_scales(0, {alpha_value}); }
+      if (matmul_beta != 0) {
+        dnnl::post_ops post_ops;
+        post_ops.append_sum(matmul_beta);
+        attr.set_post_ops(post_ops);
+      }
+      auto matmul_d = dnnl::matmul::desc(a_md, b_md, c_md);
+      return dnnl::matmul(dnnl::matmul::primitive_desc(matmul_d, attr, *onednn_engine));
+    };
+    // batches broadcast into the same c accumulate with beta 1
+    const dnnl::matmul matmul = NewMatmul(beta_value);
+    std::unique_ptr<dnnl::matmul> accumulate_matmul;
+    auto func = [&](const void* batch_a, const void* batch_b, void* batch_c, Scalar batch_beta) {
+      const dnnl::matmul* batch_matmul = &matmul;
+      if (batch_beta.Value<float>() != beta_value) {
+        if (!accumulate_matmul) { accumulate_matmul.reset(new dnnl::matmul(NewMatmul(1))); }
+        batch_matmul = accumulate_matmul.get();
+      }
+      auto a_mem = dnnl::memory(a_md, *onednn_engine, const_cast<void*>(batch_a));
+      auto b_mem = dnnl::memory(b_md, *onednn_engine, const_cast<void*>(batch_b));
+      auto c_mem = dnnl::memory(c_md, *onednn_engine, batch_c);
+      batch_matmul->execute(
+          *onednn_stream,
+          {{DNNL_ARG_SRC, a_mem}, {DNNL_ARG_WEIGHTS, b_mem}, {DNNL_ARG_DST, c_mem}});
+    };
+    ForEachMatmul<kMaxNumDims>(DataType::kBFloat16, m, n, k, beta, num_batch_dims,
+                               broadcast_batch_dims, a_batch_dims, b_batch_dims, c_batch_dims, a,
+                               b, c, func);
+  });
+}
+
+#else
+
+// There is no bfloat16 gemm in cblas, so each batch is widened to float, multiplied by sgemm with
+// float accumulation, and narrowed back to bfloat16.
+void LaunchBFloat16BroadcastMatmul(Stream* /*stream*/, BlasTransposeType transpose_a,
+                                   BlasTransposeType transpose_b, int64_t num_batch_dims,
+                                   const int64_t* broadcast_batch_dims,
+                                   const int64_t* a_batch_dims, const int64_t* b_batch_dims,
+                                   const int64_t* c_batch_dims, int64_t m, int64_t n, int64_t k,
+                                   Scalar alpha, const void* a, const void* b, Scalar beta,
+                                   void* c) {
+  const CBLAS_TRANSPOSE cblas_trans_a = GetCblasTranspose(transpose_a);
+  const CBLAS_TRANSPOSE cblas_trans_b = GetCblasTranspose(transpose_b);
+  const float alpha_value = alpha.Value<float>();
+  std::vector<float> a_buffer(m * k);
+  std::vector<float> b_buffer(k * n);
+  std::vector<float> c_buffer(m * n);
+  auto func = [&](const void* batch_a, const void* batch_b, void* batch_c, Scalar batch_beta) {
+    const float beta_value = batch_beta.Value<float>();
+    const bfloat16* a_ptr = static_cast<const bfloat16*>(batch_a);
+    const bfloat16* b_ptr = static_cast<const bfloat16*>(batch_b);
+    bfloat16* c_ptr = static_cast<bfloat16*>(batch_c);
+    std::copy(a_ptr, a_ptr + a_buffer.size(), a_buffer.begin());
+    std::copy(b_ptr, b_ptr + b_buffer.size(), b_buffer.begin());
+    if (beta_value != 0) { std::copy(c_ptr, c_ptr + c_buffer.size(), c_buffer.begin()); }
+    CblasMatmul<float>(cblas_trans_a, cblas_trans_b, m, n, k, alpha_value, a_buffer.data(),
+                       b_buffer.data(), beta_value, c_buffer.data());
+    for (size_t i = 0; i < c_buffer.size(); ++i) { c_ptr[i] = static_cast<bfloat16>(c_buffer[i]); }
+  };
+  ForEachMatmul<kMaxNumDims>(DataType::kBFloat16, m, n, k, beta, num_batch_dims,
+                             broadcast_batch_dims, a_batch_dims, b_batch_dims, c_batch_dims, a, b,
+                             c, func);
+}
+
+#endif  // WITH_ONEDNN
+
 void LaunchBroadcastMatmul(Stream* stream, DataType data_type, BlasTransposeType transpose_a,
                            BlasTransposeType transpose_b, int64_t num_batch_dims,
                            const int64_t* broadcast_batch_dims, const int64_t* a_batch_dims,
@@ -99,6 +194,10 @@ void LaunchBroadcastMatmul(Stream* stream, DataType data_type, BlasTransposeType
     LaunchCblasBroadcastMatmul<double>(stream, data_type, transpose_a, transpose_b, num_batch_dims,
                                        broadcast_batch_dims, a_batch_dims, b_batch_dims,
                                        c_batch_dims, m, n, k, alpha, a, b, beta, c);
+  } else if (data_type == DataType::kBFloat16) {
+    LaunchBFloat16BroadcastMatmul(stream, transpose_a, transpose_b, num_batch_dims,
+                                  broadcast_batch_dims, a_batch_dims, b_batch_dims, c_batch_dims, m,
+                                  n, k, alpha, a, b, beta, c);
   } else {
     UNIMPLEMENTED();
   }
@@ -114,7 +213,8 @@ class BroadcastMatmulFactoryImpl : public BroadcastMatmulFactory {
                                        BlasTransposeType transpose_b,
                                        size_t max_num_dims) override {
     if (max_num_dims > kMaxNumDims) { return nullptr; }
-    if (data_type == DataType::kFloat || data_type == DataType::kDouble) {
+    if (data_type == DataType::kFloat || data_type == DataType::kDouble
+        || data_type == DataType::kBFloat16) {
       return std::make_unique<BroadcastMatmulImpl<kMaxNumDims>>(data_type, transpose_a,
                                                                 transpose_b);
     } else {
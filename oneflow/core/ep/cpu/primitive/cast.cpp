@@ -56,7 +56,8 @@ std::unique_ptr<Cast> NewCast() {
   CPU_PRIMITIVE_UINT64_TYPE_SEQ     \
   CPU_PRIMITIVE_FLOAT_TYPE_SEQ      \
   CPU_PRIMITIVE_DOUBLE_TYPE_SEQ     \
-  CPU_PRIMITIVE_FLOAT16_TYPE_SEQ
+  CPU_PRIMITIVE_FLOAT16_TYPE_SEQ    \
+  CPU_PRIMITIVE_BFLOAT16_TYPE_SEQ
 
 class CastFactoryImpl : public CastFactory {
  public:
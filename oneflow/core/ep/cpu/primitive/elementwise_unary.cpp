@@ -85,21 +85,25 @@ class ElementwiseUnaryFactoryImpl : public ElementwiseUnaryFactory {
                           std::function<std::unique_ptr<ElementwiseUnary>(Scalar, Scalar)>>
         new_elementwise_unary_handle{
             // For All Type OP
-            OF_PP_SEQ_PRODUCT_FOR_EACH_TUPLE(MAKE_NEW_SAME_DTYPE_ELEMENTWISE_UNARY_ENTRY,
-                                             UNARY_MATH_OP_SEQ, CPU_PRIMITIVE_NATIVE_TYPE_SEQ)
+            OF_PP_SEQ_PRODUCT_FOR_EACH_TUPLE(
+                MAKE_NEW_SAME_DTYPE_ELEMENTWISE_UNARY_ENTRY, UNARY_MATH_OP_SEQ,
+                CPU_PRIMITIVE_NATIVE_TYPE_SEQ CPU_PRIMITIVE_BFLOAT16_TYPE_SEQ)
             // For Float Type OP
             OF_PP_SEQ_PRODUCT_FOR_EACH_TUPLE(MAKE_NEW_SAME_DTYPE_ELEMENTWISE_UNARY_ENTRY,
                                              UNARY_FLOATING_MATH_OP_SEQ,
-                                             CPU_PRIMITIVE_FLOATING_TYPE_SEQ)
+                                             CPU_PRIMITIVE_FLOATING_AND_BFLOAT16_TYPE_SEQ)
 
             // For Utils OP
             OF_PP_SEQ_PRODUCT_FOR_EACH_TUPLE(MAKE_NEW_DIFFERENT_DTYPE_ELEMENTWISE_UNARY_ENTRY,
-                                             UNARY_UTILS_OP_SEQ, UTIL_OPS_DATA_TYPE_SEQ,
+                                             UNARY_UTILS_OP_SEQ,
+                                             UTIL_OPS_DATA_TYPE_SEQ CPU_PRIMITIVE_BFLOAT16_TYPE_SEQ,
                                              CPU_PRIMITIVE_BOOL_TYPE_SEQ)
 
             // For Logical OP
             OF_PP_SEQ_PRODUCT_FOR_EACH_TUPLE(MAKE_NEW_DIFFERENT_DTYPE_ELEMENTWISE_UNARY_ENTRY,
-                                             UNARY_LOGICAL_OP_SEQ, CPU_PRIMITIVE_NATIVE_TYPE_SEQ,
+                                             UNARY_LOGICAL_OP_SEQ,
+                                             CPU_PRIMITIVE_NATIVE_TYPE_SEQ
+                                                 CPU_PRIMITIVE_BFLOAT16_TYPE_SEQ,
                                              CPU_PRIMITIVE_BOOL_TYPE_SEQ)};
 
 #undef MAKE_NEW_DIFFERENT_DTYPE_ELEMENTWISE_UNARY_ENTRY
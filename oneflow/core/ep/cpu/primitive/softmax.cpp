@@ -35,29 +35,31 @@ enum class Algorithm {
 
 template<Algorithm algorithm, typename T>
 void SoftmaxCpu(size_t rows, size_t cols, const T* x, T* y) {
+  using ComputeType = typename HostComputeType<T>::type;
   for (size_t i = 0; i < rows; ++i) {
     size_t row_offset = i * cols;
     const T* row_x = x + row_offset;
     T* row_y = y + row_offset;
-    const T row_max = *std::max_element(row_x, row_x + cols);
-    T row_sum = 0;
+    const ComputeType row_max = static_cast<ComputeType>(*std::max_element(row_x, row_x + cols));
+    ComputeType row_sum = 0;
     for (size_t j = 0; j < cols; ++j) {
       if (algorithm == Algorithm::kSoftmax) {
-        T exp_x = std::exp(row_x[j] - row_max);
+        ComputeType exp_x = std::exp(static_cast<ComputeType>(row_x[j]) - row_max);
         row_sum += exp_x;
-        row_y[j] = exp_x;
+        row_y[j] = static_cast<T>(exp_x);
       } else if (algorithm == Algorithm::kLogSoftmax) {
-        row_y[j] = row_x[j] - row_max;
-        row_sum += std::exp(row_y[j]);
+        ComputeType diff = static_cast<ComputeType>(row_x[j]) - row_max;
+        row_y[j] = static_cast<T>(diff);
+        row_sum += std::exp(diff);
       } else {
         UNIMPLEMENTED();
       }
     }
     for (size_t j = 0; j < cols; ++j) {
       if (algorithm == Algorithm::kSoftmax) {
-        row_y[j] /= row_sum;
+        row_y[j] = static_cast<T>(static_cast<ComputeType>(row_y[j]) / row_sum);
       } else if (algorithm == Algorithm::kLogSoftmax) {
-        row_y[j] -= std::log(row_sum);
+        row_y[j] = static_cast<T>(static_cast<ComputeType>(row_y[j]) - std::log(row_sum));
       } else {
         UNIMPLEMENTED();
       }
@@ -143,7 +145,8 @@ class GenericSoftmaxFactoryImpl : public FactoryBase {
 
     static const std::map<DataType, std::function<std::unique_ptr<SoftmaxBase>()>>
         new_softmax_handle{
-            OF_PP_FOR_EACH_TUPLE(MAKE_NEW_SOFTMAX_ENTRY, CPU_PRIMITIVE_FLOATING_TYPE_SEQ)};
+            OF_PP_FOR_EACH_TUPLE(MAKE_NEW_SOFTMAX_ENTRY,
+                                 CPU_PRIMITIVE_FLOATING_AND_BFLOAT16_TYPE_SEQ)};
 
 #undef MAKE_NEW_SOFTMAX_ENTRY
 
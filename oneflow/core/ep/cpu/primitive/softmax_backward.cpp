@@ -35,26 +35,29 @@ enum class Algorithm {
 
 template<Algorithm algorithm, typename T>
 void SoftmaxBackwardCpu(size_t rows, size_t cols, const T* y, const T* dy, T* dx) {
+  using ComputeType = typename HostComputeType<T>::type;
   for (size_t i = 0; i < rows; ++i) {
     size_t row_offset = i * cols;
     const T* row_y = y + row_offset;
     const T* row_dy = dy + row_offset;
     T* row_dx = dx + row_offset;
-    T row_sum = 0;
+    ComputeType row_sum = 0;
     for (size_t j = 0; j < cols; ++j) {
       if (algorithm == Algorithm::kSoftmax) {
-        row_sum += row_y[j] * row_dy[j];
+        row_sum += static_cast<ComputeType>(row_y[j]) * static_cast<ComputeType>(row_dy[j]);
       } else if (algorithm == Algorithm::kLogSoftmax) {
-        row_sum += row_dy[j];
+        row_sum += static_cast<ComputeType>(row_dy[j]);
       } else {
         UNIMPLEMENTED();
       }
     }
     for (size_t j = 0; j < cols; ++j) {
+      const ComputeType y_j = static_cast<ComputeType>(row_y[j]);
+      const ComputeType dy_j = static_cast<ComputeType>(row_dy[j]);
       if (algorithm == Algorithm::kSoftmax) {
-        row_dx[j] = (row_dy[j] - row_sum) * row_y[j];
+        row_dx[j] = static_cast<T>((dy_j - row_sum) * y_j);
       } else if (algorithm == Algorithm::kLogSoftmax) {
-        row_dx[j] = row_dy[j] - std::exp(row_y[j]) * row_sum;
+        row_dx[j] = static_cast<T>(dy_j - std::exp(y_j) * row_sum);
       } else {
         UNIMPLEMENTED();
       }
@@ -159,7 +162,8 @@ class GenericSoftmaxBackwardFactoryImpl : public BackwardFactoryBase {
   {type_proto, NewSoftmaxBackward<SoftmaxBackwardBase, algorithm, type_cpp>},
     static const std::map<DataType, std::function<std::unique_ptr<SoftmaxBackwardBase>()>>
         new_softmax_backward_handle{
-            OF_PP_FOR_EACH_TUPLE(MAKE_NEW_SOFTMAX_BACKWARD_ENTRY, CPU_PRIMITIVE_FLOATING_TYPE_SEQ)};
+            OF_PP_FOR_EACH_TUPLE(MAKE_NEW_SOFTMAX_BACKWARD_ENTRY,
+                                 CPU_PRIMITIVE_FLOATING_AND_BFLOAT16_TYPE_SEQ)};
 #undef MAKE_NEW_SOFTMAX_BACKWARD_ENTRY
 
 #ifdef WITH_ONEDNN
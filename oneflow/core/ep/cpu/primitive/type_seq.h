@@ -35,6 +35,7 @@ limitations under the License.
 #define CPU_PRIMITIVE_FLOAT_TYPE_SEQ OF_PP_MAKE_TUPLE_SEQ(float, DataType::kFloat)
 #define CPU_PRIMITIVE_DOUBLE_TYPE_SEQ OF_PP_MAKE_TUPLE_SEQ(double, DataType::kDouble)
 #define CPU_PRIMITIVE_FLOAT16_TYPE_SEQ OF_PP_MAKE_TUPLE_SEQ(float16, DataType::kFloat16)
+#define CPU_PRIMITIVE_BFLOAT16_TYPE_SEQ OF_PP_MAKE_TUPLE_SEQ(bfloat16, DataType::kBFloat16)
 
 #define CPU_PRIMITIVE_ONEDNN_BOOl_TYPE_SEQ \
   OF_PP_MAKE_TUPLE_SEQ(dnnl::memory::data_type::u8, DataType::kBool)
@@ -63,12 +64,18 @@ limitations under the License.
 
 #define CPU_PRIMITIVE_ALL_TYPE_SEQ \
   CPU_PRIMITIVE_NATIVE_TYPE_SEQ    \
-  CPU_PRIMITIVE_FLOAT16_TYPE_SEQ
+  CPU_PRIMITIVE_FLOAT16_TYPE_SEQ   \
+  CPU_PRIMITIVE_BFLOAT16_TYPE_SEQ
 
 #define CPU_PRIMITIVE_FLOATING_TYPE_SEQ \
   CPU_PRIMITIVE_FLOAT_TYPE_SEQ          \
   CPU_PRIMITIVE_DOUBLE_TYPE_SEQ
 
+// bfloat16 is stored in 16 bits but computed and accumulated in float.
+#define CPU_PRIMITIVE_FLOATING_AND_BFLOAT16_TYPE_SEQ \
+  CPU_PRIMITIVE_FLOATING_TYPE_SEQ                    \
+  CPU_PRIMITIVE_BFLOAT16_TYPE_SEQ
+
 #define UTIL_OPS_DATA_TYPE_SEQ \
   CPU_PRIMITIVE_INT8_TYPE_SEQ  \
   CPU_PRIMITIVE_UINT8_TYPE_SEQ \
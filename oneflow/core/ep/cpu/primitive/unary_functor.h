@@ -14,6 +14,7 @@ See the License for the specific language governing permissions and
 limitations under the License.
 */
 #include "oneflow/core/ep/common/primitive/unary_functor.h"
+#include "oneflow/core/ep/common/primitive/elementwise_unary.h"
 #include "oneflow/core/ep/cpu/primitive/type_seq.h"
 #include <cmath>
 
@@ -73,6 +74,37 @@ struct UnaryFunctor<DeviceType::kCPU, UnaryOp::kIsFinite, bool, Src> {
   OF_DEVICE_FUNC bool operator()(Src src) const { return std::isfinite(src); }
 };
 
+// bfloat16 is computed by the float functors.
+#define SPECIALIZATION_CPU_BFLOAT16_UNARY_FUNCTOR(op)                         \
+  template<>                                                                  \
+  struct UnaryFunctor<DeviceType::kCPU, op, bfloat16, bfloat16> {             \
+    UnaryFunctor(Scalar attr0, Scalar attr1) : float_functor(attr0, attr1) {} \
+                                                                              \
+    UnaryFunctor<DeviceType::kCPU, op, float, float> float_functor;           \
+    OF_DEVICE_FUNC bfloat16 operator()(bfloat16 src) const {                  \
+      return bfloat16(float_functor(static_cast<float>(src)));                \
+    }                                                                         \
+  };
+
+OF_PP_FOR_EACH_TUPLE(SPECIALIZATION_CPU_BFLOAT16_UNARY_FUNCTOR,
+                     UNARY_MATH_OP_SEQ UNARY_FLOATING_MATH_OP_SEQ);
+
+#define SPECIALIZATION_CPU_BFLOAT16_UNARY_UTILS_FUNCTOR(op)                   \
+  template<>                                                                  \
+  struct UnaryFunctor<DeviceType::kCPU, op, bool, bfloat16> {                 \
+    UnaryFunctor(Scalar attr0, Scalar attr1) : float_functor(attr0, attr1) {} \
+                                                                              \
+    UnaryFunctor<DeviceType::kCPU, op, bool, float> float_functor;            \
+    OF_DEVICE_FUNC bool operator()(bfloat16 src) const {                      \
+      return float_functor(static_cast<float>(src));                          \
+    }                                                                         \
+  };
+
+OF_PP_FOR_EACH_TUPLE(SPECIALIZATION_CPU_BFLOAT16_UNARY_UTILS_FUNCTOR, UNARY_UTILS_OP_SEQ);
+
+#undef SPECIALIZATION_CPU_BFLOAT16_UNARY_UTILS_FUNCTOR
+#undef SPECIALIZATION_CPU_BFLOAT16_UNARY_FUNCTOR
+
 }  // namespace primitive
 }  // namespace ep
 }  // namespace oneflow
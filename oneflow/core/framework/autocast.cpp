@@ -0,0 +1,149 @@
+/*
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+*/
+#include "oneflow/core/framework/autocast.h"
+#include "oneflow/core/framework/dtype.h"
+#include "oneflow/core/framework/op_expr.h"
+#include "oneflow/core/framework/tensor.h"
+#include "oneflow/core/framework/tensor_tuple.h"
+#include "oneflow/core/functional/functional.h"
+#include "oneflow/core/job/lazy_mode.h"
+#include "oneflow/core/job_rewriter/auto_mixed_precision_lists.h"
+
+namespace oneflow {
+namespace autocast {
+
+namespace {
+
+bool* GetThreadLocalAutocastEnabled() {
+  static thread_local bool g_autocast_enabled = false;
+  return &g_autocast_enabled;
+}
+
+DeviceType* GetThreadLocalAutocastDeviceType() {
+  static thread_local DeviceType g_autocast_device_type = DeviceType::kCUDA;
+  return &g_autocast_device_type;
+}
+
+DataType* GetThreadLocalAutocastDataType() {
+  static thread_local DataType g_autocast_dtype = DataType::kFloat16;
+  return &g_autocast_dtype;
+}
+
+// The same inputs as the NoCastRegistry of the auto mixed precision pass, the kernels of these
+// ops accept half `x` together with float parameters and statistics.
+bool IsNoCastInput(const std::string& op_type_name, const std::pair<std::string, int32_t>& arg) {
+  static const HashMap<std::string, HashSet<std::string>> no_cast_inputs = {
+      {"normalization", {"moving_mean", "moving_variance", "gamma", "beta"}},
+      {"normalization_add_relu", {"moving_mean", "moving_variance", "gamma", "beta"}},
+  };
+  const auto& it = no_cast_inputs.find(op_type_name);
+  return it != no_cast_inputs.end() && it->second.count(arg.first) > 0;
+}
+
+Maybe<DeviceType> GetDeviceType(const std::shared_ptr<one::Tensor>& tensor) {
+  if (tensor->is_global()) { return JUST(tensor->parallel_desc())->device_type(); }
+  return JUST(tensor->device())->enum_type();
+}
+
+}  // namespace
+
+bool AutocastMode::is_enabled() { return *GetThreadLocalAutocastEnabled(); }
+
+void AutocastMode::set_enabled(bool enabled) { *GetThreadLocalAutocastEnabled() = enabled; }
+
+DeviceType AutocastMode::device_type() { return *GetThreadLocalAutocastDeviceType(); }
+
+void AutocastMode::set_device_type(DeviceType device_type) {
+  *GetThreadLocalAutocastDeviceType() = device_type;
+}
+
+DataType AutocastMode::dtype() { return *GetThreadLocalAutocastDataType(); }
+
+void AutocastMode::set_dtype(DataType dtype) { *GetThreadLocalAutocastDataType() = dtype; }
+
+Maybe<bool> AutocastInputs(const one::OpExpr& op_expr, const one::TensorTuple& inputs,
+                           one::TensorTuple* casted_inputs) {
+  if (!AutocastMode::is_enabled() || inputs.empty()) { return false; }
+  const auto* user_op_expr = dynamic_cast<const one::UserOpExpr*>(&op_expr);
+  if (user_op_expr == nullptr) { return false; }
+  const std::string& op_type_name = user_op_expr->op_type_name();
+  const DataType lowp_dtype = AutocastMode::dtype();
+  DataType from_dtype = DataType::kInvalidDataType;
+  DataType to_dtype = DataType::kInvalidDataType;
+  if (AutoMixedPrecisionLists::WhiteList().count(op_type_name) > 0) {
+    from_dtype = DataType::kFloat;
+    to_dtype = lowp_dtype;
+  } else if (AutoMixedPrecisionLists::BlackList().count(op_type_name) > 0) {
+    from_dtype = lowp_dtype;
+    to_dtype = DataType::kFloat;
+  } else if (AutoMixedPrecisionLists::GrayList().count(op_type_name) > 0
+             || AutoMixedPrecisionLists::ClearList().count(op_type_name) > 0) {
+    // Gray and clear ops follow their inputs, they only run in low precision if any of the
+    // inputs has already been in low precision.
+    bool has_lowp_input = std::any_of(
+        inputs.begin(), inputs.end(), [&](const std::shared_ptr<one::Tensor>& tensor) {
+          return tensor->dtype()->data_type() == lowp_dtype;
+        });
+    if (!has_lowp_input) { return false; }
+    from_dtype = DataType::kFloat;
+    to_dtype = lowp_dtype;
+  } else {
+    return false;
+  }
+  for (const auto& input : inputs) {
+    if (JUST(GetDeviceType(input)) != AutocastMode::device_type()) { return false; }
+  }
+  const auto& indexed_input_pairs = user_op_expr->indexed_input_pairs();
+  const auto& to = JUST(DType::Get(to_dtype));
+  bool casted = false;
+  one::TensorTuple result(inputs.size());
+  for (int i = 0; i < inputs.size(); ++i) {
+    if (inputs[i]->dtype()->data_type() == from_dtype
+        && !IsNoCastInput(op_type_name, indexed_input_pairs[i])) {
+      result[i] = JUST(one::functional::Cast(inputs[i], to, /*pin_memory=*/false));
+      casted = true;
+    } else {
+      result[i] = inputs[i];
+    }
+  }
+  if (casted) { *casted_inputs = std::move(result); }
+  return casted;
+}
+
+Maybe<DataType> AutocastPromotedDataType(const one::TensorTuple& inputs) {
+  if (!AutocastMode::is_enabled() || LazyMode::is_enabled()) { return DataType::kInvalidDataType; }
+  const DataType lowp_dtype = AutocastMode::dtype();
+  bool has_float_input = false;
+  bool has_lowp_input = false;
+  for (const auto& input : inputs) {
+    if (JUST(GetDeviceType(input)) != AutocastMode::device_type()) {
+      return DataType::kInvalidDataType;
+    }
+    const DataType data_type = input->dtype()->data_type();
+    if (data_type == DataType::kFloat) {
+      has_float_input = true;
+    } else if (data_type == lowp_dtype) {
+      has_lowp_input = true;
+    } else {
+      return DataType::kInvalidDataType;
+    }
+  }
+  if (has_float_input && has_lowp_input) { return lowp_dtype; }
+  return DataType::kInvalidDataType;
+}
+
+}  // namespace autocast
+}  // namespace oneflow
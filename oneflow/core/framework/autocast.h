@@ -0,0 +1,78 @@
+/*
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+*/
+#ifndef ONEFLOW_CORE_FRAMEWORK_AUTOCAST_H_
+#define ONEFLOW_CORE_FRAMEWORK_AUTOCAST_H_
+
+#include "oneflow/core/common/data_type.pb.h"
+#include "oneflow/core/common/device_type.pb.h"
+#include "oneflow/core/common/maybe.h"
+
+namespace oneflow {
+namespace one {
+
+class OpExpr;
+class TensorTuple;
+
+}  // namespace one
+
+namespace autocast {
+
+struct AutocastMode {
+  static bool is_enabled();
+  static void set_enabled(bool enabled);
+  static DeviceType device_type();
+  static void set_device_type(DeviceType device_type);
+  static DataType dtype();
+  static void set_dtype(DataType dtype);
+};
+
+class AutoAutocastMode {
+ public:
+  AutoAutocastMode(bool enabled, DeviceType device_type, DataType dtype)
+      : prev_enabled_(AutocastMode::is_enabled()),
+        prev_device_type_(AutocastMode::device_type()),
+        prev_dtype_(AutocastMode::dtype()) {
+    AutocastMode::set_enabled(enabled);
+    AutocastMode::set_device_type(device_type);
+    AutocastMode::set_dtype(dtype);
+  }
+  ~AutoAutocastMode() {
+    AutocastMode::set_enabled(prev_enabled_);
+    AutocastMode::set_device_type(prev_device_type_);
+    AutocastMode::set_dtype(prev_dtype_);
+  }
+  bool prev_enabled() const { return prev_enabled_; }
+
+ private:
+  bool prev_enabled_;
+  DeviceType prev_device_type_;
+  DataType prev_dtype_;
+};
+
+// Casts the floating inputs of `op_expr` according to the auto mixed precision lists, returns
+// false and leaves `casted_inputs` untouched if no input needs to be casted.
+Maybe<bool> AutocastInputs(const one::OpExpr& op_expr, const one::TensorTuple& inputs,
+                           one::TensorTuple* casted_inputs);
+
+// The data type the functors promote `inputs` to in autocast mode. Inputs mixing float32 with the
+// autocast data type are promoted to the autocast data type rather than float32, as gray and clear
+// ops follow their low precision inputs, otherwise kInvalidDataType is returned.
+Maybe<DataType> AutocastPromotedDataType(const one::TensorTuple& inputs);
+
+}  // namespace autocast
+}  // namespace oneflow
+
+#endif  // ONEFLOW_CORE_FRAMEWORK_AUTOCAST_H_
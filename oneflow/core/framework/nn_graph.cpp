@@ -279,6 +279,36 @@ Maybe<void> NNGraph::CompileAndInitRuntime() {
 
   auto scope = std::make_unique<GlobalJobDescScope>(job_.job_conf(), job_id_);
 
+  if (is_plan_restored_) {
+    // NOTE: job_ has been completed and plan_ has been compiled and synchronized between all ranks
+    // when they were saved, from the same IDMgr counters as in this process, so only the ids they
+    // used need to be reserved, and the job id they were saved under is replaced by the job id of
+    // this graph.
+    PlanUtil::ReplaceJobId(&plan_, job_id_);
+    PlanUtil::UpdateIdMgrWithIdsUsedByPlan(plan_);
+    VLOG(1) << "Graph name: " << name_ << " skips job completion and plan compilation because "
+            << "the compiled plan has been restored.";
+  } else {
+    JUST(CompileAndSyncPlan());
+  }
+  // NOTE(chengcheng): recovery op_attr
+  PlanUtil::PopulateOpAttribute(&plan_, plan_.job_id2op_attribute_ref_table());
+
+  NewRuntimeBuffers();
+
+  JUST(GetVariableRealBlobAfterSyncPlan());
+
+  // NOTE(strint): Do memory shrink to free cached memory in eager VM before graph runtime init.
+  JUST(vm::CurrentRankSync());
+  auto* vm = JUST(SingletonMaybe<VirtualMachine>());
+  JUST(vm->ShrinkAllMem());
+
+  runtime_.reset(new Runtime(plan_, variable_op_name2eager_blob_object_));
+  runtime_inited_ = true;
+  return Maybe<void>::Ok();
+}
+
+Maybe<void> NNGraph::CompileAndSyncPlan() {
   // NOTE(chengcheng): do job compeleter for each rank.
   JUST(JobCompleter().Complete(&job_));
 
@@ -319,20 +349,6 @@ Maybe<void> NNGraph::CompileAndInitRuntime() {
       Singleton<CtrlClient>::Get()->ClearKV(plan_name);
     }
   }
-  // NOTE(chengcheng): recovery op_attr
-  PlanUtil::PopulateOpAttribute(&plan_, plan_.job_id2op_attribute_ref_table());
-
-  NewRuntimeBuffers();
-
-  JUST(GetVariableRealBlobAfterSyncPlan());
-
-  // NOTE(strint): Do memory shrink to free cached memory in eager VM before graph runtime init.
-  JUST(vm::CurrentRankSync());
-  auto* vm = JUST(SingletonMaybe<VirtualMachine>());
-  JUST(vm->ShrinkAllMem());
-
-  runtime_.reset(new Runtime(plan_, variable_op_name2eager_blob_object_));
-  runtime_inited_ = true;
   return Maybe<void>::Ok();
 }
 
@@ -39,12 +39,14 @@ class NNGraph final : public NNGraphIf {
         job_id_(job_id),
         session_ctx_(session_ctx),
         runtime_inited_(false),
-        is_closed_(false) {}
+        is_closed_(false),
+        is_plan_restored_(false) {}
   OF_DISALLOW_COPY_AND_MOVE(NNGraph);
   ~NNGraph();
 
   const std::string& job_name() const override { return name_; }
   const Job& job() const { return job_; }
+  const Plan& plan() const { return plan_; }
   int64_t job_id() const { return job_id_; }
   const std::vector<std::string>& inputs_op_names() const override;
   const std::vector<std::string>& outputs_op_names() const override;
@@ -56,6 +58,12 @@ class NNGraph final : public NNGraphIf {
 
   void restore_job(const Job& job) { job_ = job; }
   void restore_job_id(int64_t job_id) { job_id_ = job_id; }
+  // NOTE: A restored plan (e.g. from the graph compile cache) must be generated from the restored
+  // completed job, then job completion and plan compilation are skipped in CompileAndInitRuntime.
+  void restore_plan(const Plan& plan) {
+    plan_ = plan;
+    is_plan_restored_ = true;
+  }
 
   Maybe<void> RegisterAdditionalVarOpNamesAndTensorsToBeLoaded(
       const std::vector<std::string>& additional_var_names,
@@ -78,6 +86,7 @@ class NNGraph final : public NNGraphIf {
   Maybe<void> RegisterFreeEagerTensorsToVariableOpNames();
   Maybe<void> RegisterNewVariableOpInJobPass();
   Maybe<void> DeleteOutdatedVariableInVariableTensorMgr();
+  Maybe<void> CompileAndSyncPlan();
   Maybe<void> GetVariableRealBlobAfterSyncPlan();
 
   void NewRuntimeBuffers();
@@ -108,6 +117,7 @@ class NNGraph final : public NNGraphIf {
   std::unique_ptr<Runtime> runtime_;
   bool runtime_inited_;
   bool is_closed_;
+  bool is_plan_restored_;
 };
 
 Maybe<void> RunLazyNNGraph(const one::TensorTuple& inputs, const one::TensorTuple& outputs,
@@ -17,6 +17,7 @@ limitations under the License.
 
 #include "oneflow/core/autograd/autograd_engine.h"
 #include "oneflow/core/autograd/autograd_mode.h"
+#include "oneflow/core/framework/autocast.h"
 #include "oneflow/core/framework/op_interpreter/op_interpreter_util.h"
 #include "oneflow/core/framework/instructions_builder.h"
 #include "oneflow/core/framework/op_expr_grad_function.h"
@@ -85,6 +86,16 @@ Maybe<void> EagerInterpreter::ApplyImpl(const FunctionOpExpr& op_expr, const Ten
 
 Maybe<void> AutogradInterpreter::Apply(const OpExpr& op_expr, const TensorTuple& inputs,
                                        TensorTuple* outputs, const OpExprInterpContext& ctx) const {
+  // Inplace ops keep the data type of their outputs, and lazy mode inserts the casts in the auto
+  // mixed precision pass, so only the out-of-place eager ops are autocasted here.
+  if (autocast::AutocastMode::is_enabled() && !LazyMode::is_enabled()
+      && std::all_of(outputs->begin(), outputs->end(),
+                     [](const std::shared_ptr<Tensor>& tensor) { return !tensor; })) {
+    TensorTuple casted_inputs;
+    if (JUST(autocast::AutocastInputs(op_expr, inputs, &casted_inputs))) {
+      return Apply(op_expr, casted_inputs, outputs, ctx);
+    }
+  }
   bool requires_grad = false;
   if (autograd::GradMode::is_enabled() && !JUST(op_expr.IsGradDisabled())) {
     requires_grad =
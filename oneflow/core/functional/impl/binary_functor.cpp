@@ -91,11 +91,11 @@ class AddFunctor {
     if ((alpha.IsIntegral() && alpha.Value<int64_t>() == 1)
         || (alpha.IsFloatingPoint()
             && std::fabs(alpha.Value<double>() - 1.0) < std::numeric_limits<double>::epsilon())) {
-      JUST(tensor_processor.PromoteInputsToCommonDtype(true)
+      JUST(tensor_processor.PromoteInputsToCommonDtype(true, inplace)
                .AddInputs({input_tensor, other})
                .Apply());
     } else {
-      JUST(tensor_processor.PromoteInputsToCommonDtype(true)
+      JUST(tensor_processor.PromoteInputsToCommonDtype(true, inplace)
                .AddInputs({input_tensor, JUST(functional::ScalarMul(alpha, other))})
                .Apply());
     }
@@ -192,11 +192,13 @@ class InplaceMulFunctor {
                            const std::shared_ptr<one::Tensor>& y) const {
     TensorProcessor tensor_processor;
     if (y->requires_grad()) {
-      JUST(tensor_processor.PromoteInputsToCommonDtype(true)
+      JUST(tensor_processor.PromoteInputsToCommonDtype(true, /*is_inplace=*/true)
                .AddInputs({JUST(Identity(x)), y})
                .Apply());
     } else {
-      JUST(tensor_processor.PromoteInputsToCommonDtype(true).AddInputs({x, y}).Apply());
+      JUST(tensor_processor.PromoteInputsToCommonDtype(true, /*is_inplace=*/true)
+               .AddInputs({x, y})
+               .Apply());
     }
     const TensorTuple& input_vec = JUST(tensor_processor.GetInputs());
     const std::shared_ptr<one::Tensor>& x_cast = input_vec.at(0);
@@ -265,11 +267,13 @@ class InplaceDivFunctor {
                            const std::shared_ptr<one::Tensor>& y) const {
     TensorProcessor tensor_processor;
     if (y->requires_grad()) {
-      JUST(tensor_processor.PromoteInputsToCommonDtype(true)
+      JUST(tensor_processor.PromoteInputsToCommonDtype(true, /*is_inplace=*/true)
                .AddInputs({JUST(Identity(x)), y})
                .Apply());
     } else {
-      JUST(tensor_processor.PromoteInputsToCommonDtype(true).AddInputs({x, y}).Apply());
+      JUST(tensor_processor.PromoteInputsToCommonDtype(true, /*is_inplace=*/true)
+               .AddInputs({x, y})
+               .Apply());
     }
     const TensorTuple& input_vec = JUST(tensor_processor.GetInputs());
     const std::shared_ptr<one::Tensor>& x_cast = input_vec.at(0);
@@ -103,7 +103,9 @@ class InplaceableBinaryFunctor {
       tensor_x = JUST(functional::To(x, device_str));
     }
     TensorProcessor tensor_processor;
-    JUST(tensor_processor.PromoteInputsToCommonDtype(true).AddInputs({tensor_x, y}).Apply());
+    JUST(tensor_processor.PromoteInputsToCommonDtype(true, inplace)
+             .AddInputs({tensor_x, y})
+             .Apply());
     TensorTuple input_tuple = JUST(tensor_processor.GetInputs());
     if (inplace) {
       std::shared_ptr<one::Tensor>& x_cast = input_tuple.at(0);
@@ -154,6 +154,19 @@ Maybe<one::UserOpExpr> EagerCclReduce(Symbol<ParallelDesc> parallel_desc, int64_
 
 auto* CachedEagerCclReduceOpExpr = DECORATE(&EagerCclReduce, ThreadLocal);
 
+Maybe<one::UserOpExpr> EagerCclAllToAll(Symbol<ParallelDesc> parallel_desc) {
+  CHECK_OR_RETURN(
+      JUST(CheckCclKernelRegistered("eager_ccl_all_to_all", parallel_desc->device_type())))
+      << OF_KERNEL_NOT_SUPPORT_ERROR("AllToAll", parallel_desc->device_type());
+  return one::OpBuilder("eager_ccl_all_to_all", *JUST(UniqueStr("eager_ccl_all_to_all")))
+      .Input("in")
+      .Output("out")
+      .Attr<std::string>("parallel_conf", PbMessage2TxtString(parallel_desc->parallel_conf()))
+      .Build();
+}
+
+auto* CachedEagerCclAllToAllOpExpr = DECORATE(&EagerCclAllToAll, ThreadLocal);
+
 Maybe<one::UserOpExpr> RankGroupAndDeviceType2AllReduceOpExpr(Symbol<RankGroup> rank_group,
                                                               DeviceType device_type) {
   CHECK_OR_RETURN(JUST(CheckCclKernelRegistered("eager_ccl_all_reduce", device_type)))
@@ -252,6 +265,28 @@ class LocalAllReduceFunctor {
   }
 };
 
+class LocalAllToAllFunctor {
+ public:
+  LocalAllToAllFunctor() = default;
+  Maybe<Tensor> operator()(const std::shared_ptr<one::Tensor>& x) const {
+    const auto& device = JUST(x->device());
+    DeviceType device_type = device->enum_type();
+    if (device_type != DeviceType::kCPU) {
+      CHECK_EQ_OR_RETURN(device->device_id(), GlobalProcessCtx::LocalRank());
+    }
+    const auto& rank_group = JUST(RankGroupScope::CurrentRankGroup());
+    const auto& parallel_desc = JUST(RankGroup::GetDefaultParallelDesc(device_type, rank_group));
+    CHECK_GE_OR_RETURN(x->shape()->NumAxes(), 1)
+        << Error::RuntimeError() << "all_to_all expects a tensor of at least one dimension";
+    CHECK_EQ_OR_RETURN(x->shape()->At(0), parallel_desc->parallel_num())
+        << Error::RuntimeError() << "The first dimension of the input of all_to_all ("
+        << x->shape()->At(0) << ") must be equal to the number of ranks ("
+        << parallel_desc->parallel_num() << ")";
+    std::shared_ptr<OpExpr> op_expr = JUST(CachedEagerCclAllToAllOpExpr(parallel_desc));
+    return OpInterpUtil::Dispatch<Tensor>(*op_expr, {x});
+  }
+};
+
 class GlobalAllReduceFunctor {
  public:
   GlobalAllReduceFunctor() = default;
@@ -448,6 +483,7 @@ ONEFLOW_FUNCTION_LIBRARY(m) {
   m.add_functor<impl::BroadcastFunctor>("Broadcast");
   m.add_functor<impl::BroadcastTensorsFunctor>("BroadcastTensors");
   m.add_functor<impl::LocalAllReduceFunctor>("LocalAllReduce");
+  m.add_functor<impl::LocalAllToAllFunctor>("LocalAllToAll");
   m.add_functor<impl::GlobalAllReduceFunctor>("GlobalAllReduce");
   m.add_functor<impl::GlobalReduceScatterFunctor>("GlobalReduceScatter");
   m.add_functor<impl::GlobalAllGatherFunctor>("GlobalAllGather");
@@ -3792,7 +3792,6 @@ class RocAucScoreFunctor {
 class MultiTensorSgdUpdateFunctor {
  public:
   MultiTensorSgdUpdateFunctor() {
-    // This functor is just for unittest
     op_.resize(kMaxInputCount /*the maximum number of inputs*/);
     for (int n = 0; n < op_.size(); ++n) {
       op_[n] = CHECK_JUST(one::OpBuilder("multi_tensor_sgd_update")
@@ -3805,16 +3804,17 @@ class MultiTensorSgdUpdateFunctor {
 
   Maybe<void> operator()(const TensorTuple& model, const TensorTuple& model_diff,
                          const std::shared_ptr<one::Tensor>& learning_rate, const double& scale,
-                         const float& weight_decay) const {
+                         const float& weight_decay, const float& l2) const {
     MutableAttrMap attrs;
     JUST(attrs.SetAttr<double>("scale", scale));
     JUST(attrs.SetAttr<float>("weight_decay", weight_decay));
+    JUST(attrs.SetAttr<float>("l2", l2));
     const int64_t weight_size = model.size();
     for (int i = 0; i < weight_size; i += kMaxInputCount) {
       size_t size = (i + kMaxInputCount) < weight_size ? kMaxInputCount : weight_size - i;
       TensorTuple input(2 * size + 1);
       std::copy(model.begin() + i, model.begin() + i + size, input.begin());
-      std::copy(model_diff.begin() + i, model_diff.begin() + size, input.begin() + size);
+      std::copy(model_diff.begin() + i, model_diff.begin() + i + size, input.begin() + size);
       input[2 * size] = learning_rate;
       JUST(OpInterpUtil::Dispatch<TensorTuple>(*op_[size - 1], input, attrs));
     }
@@ -3828,7 +3828,6 @@ class MultiTensorSgdUpdateFunctor {
 class MultiTensorAdamUpdateFunctor {
  public:
   MultiTensorAdamUpdateFunctor() {
-    // This functor is just for unittest
     op_.resize(kMaxInputCount /*the maximum number of inputs*/);
     for (int n = 0; n < op_.size(); ++n) {
       op_[n] = CHECK_JUST(one::OpBuilder("multi_tensor_adam_update")
@@ -3846,10 +3845,208 @@ class MultiTensorAdamUpdateFunctor {
                          const std::shared_ptr<one::Tensor>& learning_rate, const float& beta1,
                          const float& beta2, const float& bias_correction1_val,
                          const float& bias_correction2_val, const bool& do_bias_correction,
-                         const double& scale, const float& weight_decay) const {
+                         const double& scale, const float& weight_decay, const float& epsilon,
+                         const float& l2) const {
+    MutableAttrMap attrs;
+    JUST(attrs.SetAttr<double>("scale", scale));
+    JUST(attrs.SetAttr<float>("weight_decay", weight_decay));
+    JUST(attrs.SetAttr<float>("epsilon", epsilon));
+    JUST(attrs.SetAttr<float>("l2", l2));
+    JUST(attrs.SetAttr<float>("beta1", beta1));
+    JUST(attrs.SetAttr<float>("beta2", beta2));
+    JUST(attrs.SetAttr<float>("bias_correction1_val", bias_correction1_val));
+    JUST(attrs.SetAttr<float>("bias_correction2_val", bias_correction2_val));
+    JUST(attrs.SetAttr<bool>("do_bias_correction", do_bias_correction));
+
+    const int64_t weight_size = model.size();
+
+    for (int i = 0; i < weight_size; i += kMaxInputCount) {
+      size_t size = (i + kMaxInputCount) < weight_size ? kMaxInputCount : weight_size - i;
+      TensorTuple input(4 * size + 1);
+      std::copy(model.begin() + i, model.begin() + i + size, input.begin());
+      std::copy(model_diff.begin() + i, model_diff.begin() + i + size, input.begin() + size);
+      std::copy(m.begin() + i, m.begin() + i + size, input.begin() + 2 * size);
+      std::copy(v.begin() + i, v.begin() + i + size, input.begin() + 3 * size);
+      input[4 * size] = learning_rate;
+      JUST(OpInterpUtil::Dispatch<TensorTuple>(*op_[size - 1], input, attrs));
+    }
+    return Maybe<void>::Ok();
+  }
+
+ private:
+  std::vector<std::shared_ptr<OpExpr>> op_;
+};
+
+class MultiTensorMomentumUpdateFunctor {
+ public:
+  MultiTensorMomentumUpdateFunctor() {
+    op_.resize(kMaxInputCount /*the maximum number of inputs*/);
+    for (int n = 0; n < op_.size(); ++n) {
+      op_[n] = CHECK_JUST(one::OpBuilder("multi_tensor_momentum_update")
+                              .Input("model", n + 1)
+                              .Input("model_diff", n + 1)
+                              .Input("momentum", n + 1)
+                              .Input("learning_rate")
+                              .Build());
+    }
+  }
+
+  Maybe<void> operator()(const TensorTuple& model, const TensorTuple& model_diff,
+                         const TensorTuple& momentum,
+                         const std::shared_ptr<one::Tensor>& learning_rate, const float& beta,
+                         const float& dampening, const bool& nesterov, const bool& maximize,
+                         const double& scale, const float& weight_decay, const float& l2) const {
+    MutableAttrMap attrs;
+    JUST(attrs.SetAttr<double>("scale", scale));
+    JUST(attrs.SetAttr<float>("weight_decay", weight_decay));
+    JUST(attrs.SetAttr<float>("l2", l2));
+    JUST(attrs.SetAttr<float>("beta", beta));
+    JUST(attrs.SetAttr<float>("dampening", dampening));
+    JUST(attrs.SetAttr<bool>("nesterov", nesterov));
+    JUST(attrs.SetAttr<bool>("maximize", maximize));
+
+    const int64_t weight_size = model.size();
+
+    for (int i = 0; i < weight_size; i += kMaxInputCount) {
+      size_t size = (i + kMaxInputCount) < weight_size ? kMaxInputCount : weight_size - i;
+      TensorTuple input(3 * size + 1);
+      std::copy(model.begin() + i, model.begin() + i + size, input.begin());
+      std::copy(model_diff.begin() + i, model_diff.begin() + i + size, input.begin() + size);
+      std::copy(momentum.begin() + i, momentum.begin() + i + size, input.begin() + 2 * size);
+      input[3 * size] = learning_rate;
+      JUST(OpInterpUtil::Dispatch<TensorTuple>(*op_[size - 1], input, attrs));
+    }
+    return Maybe<void>::Ok();
+  }
+
+ private:
+  std::vector<std::shared_ptr<OpExpr>> op_;
+};
+
+class MultiTensorAmsgradUpdateFunctor {
+ public:
+  MultiTensorAmsgradUpdateFunctor() {
+    op_.resize(kMaxInputCount /*the maximum number of inputs*/);
+    for (int n = 0; n < op_.size(); ++n) {
+      op_[n] = CHECK_JUST(one::OpBuilder("multi_tensor_amsgrad_update")
+                              .Input("model", n + 1)
+                              .Input("model_diff", n + 1)
+                              .Input("m", n + 1)
+                              .Input("v", n + 1)
+                              .Input("max_v", n + 1)
+                              .Input("learning_rate")
+                              .Build());
+    }
+  }
+
+  Maybe<void> operator()(const TensorTuple& model, const TensorTuple& model_diff,
+                         const TensorTuple& m, const TensorTuple& v, const TensorTuple& max_v,
+                         const std::shared_ptr<one::Tensor>& learning_rate, const float& beta1,
+                         const float& beta2, const float& bias_correction1_val,
+                         const float& bias_correction2_val, const double& scale,
+                         const float& weight_decay, const float& epsilon, const float& l2) const {
+    MutableAttrMap attrs;
+    JUST(attrs.SetAttr<double>("scale", scale));
+    JUST(attrs.SetAttr<float>("weight_decay", weight_decay));
+    JUST(attrs.SetAttr<float>("epsilon", epsilon));
+    JUST(attrs.SetAttr<float>("l2", l2));
+    JUST(attrs.SetAttr<float>("beta1", beta1));
+    JUST(attrs.SetAttr<float>("beta2", beta2));
+    JUST(attrs.SetAttr<float>("bias_correction1_val", bias_correction1_val));
+    JUST(attrs.SetAttr<float>("bias_correction2_val", bias_correction2_val));
+
+    const int64_t weight_size = model.size();
+
+    for (int i = 0; i < weight_size; i += kMaxInputCount) {
+      size_t size = (i + kMaxInputCount) < weight_size ? kMaxInputCount : weight_size - i;
+      TensorTuple input(5 * size + 1);
+      std::copy(model.begin() + i, model.begin() + i + size, input.begin());
+      std::copy(model_diff.begin() + i, model_diff.begin() + i + size, input.begin() + size);
+      std::copy(m.begin() + i, m.begin() + i + size, input.begin() + 2 * size);
+      std::copy(v.begin() + i, v.begin() + i + size, input.begin() + 3 * size);
+      std::copy(max_v.begin() + i, max_v.begin() + i + size, input.begin() + 4 * size);
+      input[5 * size] = learning_rate;
+      JUST(OpInterpUtil::Dispatch<TensorTuple>(*op_[size - 1], input, attrs));
+    }
+    return Maybe<void>::Ok();
+  }
+
+ private:
+  std::vector<std::shared_ptr<OpExpr>> op_;
+};
+
+class MultiTensorRmspropUpdateFunctor {
+ public:
+  MultiTensorRmspropUpdateFunctor() {
+    op_.resize(kMaxInputCount /*the maximum number of inputs*/);
+    for (int n = 0; n < op_.size(); ++n) {
+      op_[n] = CHECK_JUST(one::OpBuilder("multi_tensor_rmsprop_update")
+                              .Input("model", n + 1)
+                              .Input("model_diff", n + 1)
+                              .Input("mean_square", n + 1)
+                              .Input("learning_rate")
+                              .Build());
+    }
+  }
+
+  Maybe<void> operator()(const TensorTuple& model, const TensorTuple& model_diff,
+                         const TensorTuple& mean_square,
+                         const std::shared_ptr<one::Tensor>& learning_rate,
+                         const float& decay_rate, const double& scale, const float& weight_decay,
+                         const float& epsilon, const float& l2) const {
+    MutableAttrMap attrs;
+    JUST(attrs.SetAttr<double>("scale", scale));
+    JUST(attrs.SetAttr<float>("weight_decay", weight_decay));
+    JUST(attrs.SetAttr<float>("epsilon", epsilon));
+    JUST(attrs.SetAttr<float>("l2", l2));
+    JUST(attrs.SetAttr<float>("decay_rate", decay_rate));
+
+    const int64_t weight_size = model.size();
+
+    for (int i = 0; i < weight_size; i += kMaxInputCount) {
+      size_t size = (i + kMaxInputCount) < weight_size ? kMaxInputCount : weight_size - i;
+      TensorTuple input(3 * size + 1);
+      std::copy(model.begin() + i, model.begin() + i + size, input.begin());
+      std::copy(model_diff.begin() + i, model_diff.begin() + i + size, input.begin() + size);
+      std::copy(mean_square.begin() + i, mean_square.begin() + i + size,
+                input.begin() + 2 * size);
+      input[3 * size] = learning_rate;
+      JUST(OpInterpUtil::Dispatch<TensorTuple>(*op_[size - 1], input, attrs));
+    }
+    return Maybe<void>::Ok();
+  }
+
+ private:
+  std::vector<std::shared_ptr<OpExpr>> op_;
+};
+
+class MultiTensorLambUpdateFunctor {
+ public:
+  MultiTensorLambUpdateFunctor() {
+    op_.resize(kMaxInputCount /*the maximum number of inputs*/);
+    for (int n = 0; n < op_.size(); ++n) {
+      op_[n] = CHECK_JUST(one::OpBuilder("multi_tensor_lamb_update")
+                              .Input("model", n + 1)
+                              .Input("model_diff", n + 1)
+                              .Input("m", n + 1)
+                              .Input("v", n + 1)
+                              .Input("learning_rate")
+                              .Build());
+    }
+  }
+
+  Maybe<void> operator()(const TensorTuple& model, const TensorTuple& model_diff,
+                         const TensorTuple& m, const TensorTuple& v,
+                         const std::shared_ptr<one::Tensor>& learning_rate, const float& beta1,
+                         const float& beta2, const float& bias_correction1_val,
+                         const float& bias_correction2_val, const bool& do_bias_correction,
+                         const double& scale, const float& weight_decay, const float& epsilon,
+                         const float& l2) const {
     MutableAttrMap attrs;
     JUST(attrs.SetAttr<double>("scale", scale));
     JUST(attrs.SetAttr<float>("weight_decay", weight_decay));
+    JUST(attrs.SetAttr<float>("epsilon", epsilon));
+    JUST(attrs.SetAttr<float>("l2", l2));
     JUST(attrs.SetAttr<float>("beta1", beta1));
     JUST(attrs.SetAttr<float>("beta2", beta2));
     JUST(attrs.SetAttr<float>("bias_correction1_val", bias_correction1_val));
@@ -3875,6 +4072,182 @@ class MultiTensorAdamUpdateFunctor {
   std::vector<std::shared_ptr<OpExpr>> op_;
 };
 
+class MultiTensorScaleByTensorFunctor {
+ public:
+  MultiTensorScaleByTensorFunctor() {
+    op_.resize(kMaxInputCount /*the maximum number of inputs*/);
+    for (int n = 0; n < op_.size(); ++n) {
+      op_[n] = CHECK_JUST(one::OpBuilder("multi_tensor_scale_by_tensor")
+                              .Input("x", n + 1)
+                              .Input("scale")
+                              .Build());
+    }
+  }
+
+  Maybe<void> operator()(const TensorTuple& x, const std::shared_ptr<one::Tensor>& scale) const {
+    const int64_t x_size = x.size();
+    for (int i = 0; i < x_size; i += kMaxInputCount) {
+      size_t size = (i + kMaxInputCount) < x_size ? kMaxInputCount : x_size - i;
+      TensorTuple input(size + 1);
+      std::copy(x.begin() + i, x.begin() + i + size, input.begin());
+      input[size] = scale;
+      JUST(OpInterpUtil::Dispatch<TensorTuple>(*op_[size - 1], input));
+    }
+    return Maybe<void>::Ok();
+  }
+
+ private:
+  std::vector<std::shared_ptr<OpExpr>> op_;
+};
+
+class MultiReduceSumPowAbsFunctor {
+ public:
+  MultiReduceSumPowAbsFunctor() {
+    op_.resize(kMaxInputCount /*the maximum number of inputs*/);
+    for (int n = 0; n < op_.size(); ++n) {
+      op_[n] = CHECK_JUST(
+          one::OpBuilder("multi_reduce_sum_pow_abs").Input("x", n + 1).Output("y").Build());
+    }
+  }
+
+  Maybe<Tensor> operator()(const TensorTuple& x, const float& p) const {
+    CHECK_GT_OR_RETURN(x.size(), 0) << Error::RuntimeError() << "expected at least one tensor";
+    MutableAttrMap attrs;
+    JUST(attrs.SetAttr<float>("p", p));
+    const int64_t x_size = x.size();
+    std::shared_ptr<Tensor> y;
+    for (int i = 0; i < x_size; i += kMaxInputCount) {
+      size_t size = (i + kMaxInputCount) < x_size ? kMaxInputCount : x_size - i;
+      TensorTuple input(size);
+      std::copy(x.begin() + i, x.begin() + i + size, input.begin());
+      const auto& partial_y = JUST(OpInterpUtil::Dispatch<Tensor>(*op_[size - 1], input, attrs));
+      y = y ? JUST(functional::Add(y, partial_y, /*alpha=*/1, /*inplace=*/false)) : partial_y;
+    }
+    return y;
+  }
+
+ private:
+  std::vector<std::shared_ptr<OpExpr>> op_;
+};
+
+class MultiReduceXimumAbsFunctor {
+ public:
+  MultiReduceXimumAbsFunctor(const std::string& op_type_name, bool max_or_min)
+      : max_or_min_(max_or_min) {
+    op_.resize(kMaxInputCount /*the maximum number of inputs*/);
+    local_op_.resize(kMaxInputCount /*the maximum number of inputs*/);
+    for (int n = 0; n < op_.size(); ++n) {
+      op_[n] = CHECK_JUST(one::OpBuilder(op_type_name).Input("x", n + 1).Output("y").Build());
+      local_op_[n] = CHECK_JUST(
+          one::OpBuilder("local_" + op_type_name).Input("x", n + 1).Output("y").Build());
+    }
+  }
+
+  Maybe<Tensor> operator()(const TensorTuple& x) const {
+    CHECK_GT_OR_RETURN(x.size(), 0) << Error::RuntimeError() << "expected at least one tensor";
+    // The ximum of split tensors can not be reduced as partial sum, like the clip_by_global_norm
+    // job pass does, reduce each split locally and then reduce the gathered results.
+    bool has_split = false;
+    if (x.at(0)->is_global()) {
+      const auto& nd_sbp = JUST(x.at(0)->nd_sbp());
+      for (int i = 0; i < nd_sbp->sbp_parallel_size(); ++i) {
+        if (nd_sbp->sbp_parallel(i).has_split_parallel()) { has_split = true; }
+      }
+    }
+    const int64_t x_size = x.size();
+    std::shared_ptr<Tensor> y;
+    for (int i = 0; i < x_size; i += kMaxInputCount) {
+      size_t size = (i + kMaxInputCount) < x_size ? kMaxInputCount : x_size - i;
+      TensorTuple input(size);
+      std::copy(x.begin() + i, x.begin() + i + size, input.begin());
+      std::shared_ptr<Tensor> partial_y;
+      if (has_split) {
+        partial_y = JUST(OpInterpUtil::Dispatch<Tensor>(*local_op_[size - 1], input));
+        partial_y = max_or_min_ ? JUST(functional::ReduceMax(partial_y, {0}, false))
+                                : JUST(functional::ReduceMin(partial_y, {0}, false));
+      } else {
+        partial_y = JUST(OpInterpUtil::Dispatch<Tensor>(*op_[size - 1], input));
+      }
+      if (!y) {
+        y = partial_y;
+      } else {
+        y = max_or_min_ ? JUST(functional::Maximum(y, partial_y))
+                        : JUST(functional::Minimum(y, partial_y));
+      }
+    }
+    return y;
+  }
+
+ private:
+  bool max_or_min_;
+  std::vector<std::shared_ptr<OpExpr>> op_;
+  std::vector<std::shared_ptr<OpExpr>> local_op_;
+};
+
+class MultiReduceMaxAbsFunctor : public MultiReduceXimumAbsFunctor {
+ public:
+  MultiReduceMaxAbsFunctor() : MultiReduceXimumAbsFunctor("multi_reduce_max_abs", true) {}
+};
+
+class MultiReduceMinAbsFunctor : public MultiReduceXimumAbsFunctor {
+ public:
+  MultiReduceMinAbsFunctor() : MultiReduceXimumAbsFunctor("multi_reduce_min_abs", false) {}
+};
+
+class MultiCountNotFiniteFunctor {
+ public:
+  MultiCountNotFiniteFunctor() {
+    op_.resize(kMaxInputCount /*the maximum number of inputs*/);
+    for (int n = 0; n < op_.size(); ++n) {
+      op_[n] = CHECK_JUST(
+          one::OpBuilder("multi_count_not_finite").Input("x", n + 1).Output("y").Build());
+    }
+  }
+
+  Maybe<Tensor> operator()(const TensorTuple& x) const {
+    CHECK_GT_OR_RETURN(x.size(), 0) << Error::RuntimeError() << "expected at least one tensor";
+    const int64_t x_size = x.size();
+    std::shared_ptr<Tensor> y;
+    for (int i = 0; i < x_size; i += kMaxInputCount) {
+      size_t size = (i + kMaxInputCount) < x_size ? kMaxInputCount : x_size - i;
+      TensorTuple input(size);
+      std::copy(x.begin() + i, x.begin() + i + size, input.begin());
+      const auto& partial_y = JUST(OpInterpUtil::Dispatch<Tensor>(*op_[size - 1], input));
+      y = y ? JUST(functional::Add(y, partial_y, /*alpha=*/1, /*inplace=*/false)) : partial_y;
+    }
+    return y;
+  }
+
+ private:
+  std::vector<std::shared_ptr<OpExpr>> op_;
+};
+
+class DynamicLossScaleScheduleFunctor {
+ public:
+  DynamicLossScaleScheduleFunctor() {
+    op_ = CHECK_JUST(one::OpBuilder("dynamic_loss_scale_schedule")
+                         .Input("count_not_finite")
+                         .Input("loss_scale")
+                         .Input("good_step_counter")
+                         .Build());
+  }
+
+  Maybe<void> operator()(const std::shared_ptr<one::Tensor>& count_not_finite,
+                         const std::shared_ptr<one::Tensor>& loss_scale,
+                         const std::shared_ptr<one::Tensor>& good_step_counter,
+                         const int64_t& increment_period, const float& multiplier) const {
+    MutableAttrMap attrs;
+    JUST(attrs.SetAttr<int64_t>("increment_period", increment_period));
+    JUST(attrs.SetAttr<float>("multiplier", multiplier));
+    JUST(OpInterpUtil::Dispatch<TensorTuple>(
+        *op_, {count_not_finite, loss_scale, good_step_counter}, attrs));
+    return Maybe<void>::Ok();
+  }
+
+ private:
+  std::shared_ptr<OpExpr> op_;
+};
+
 class MatrixVectorProductFunctor {
  public:
   MatrixVectorProductFunctor() {
@@ -4006,6 +4379,16 @@ ONEFLOW_FUNCTION_LIBRARY(m) {
   m.add_functor<impl::RocAucScoreFunctor>("RocAucScore");
   m.add_functor<impl::MultiTensorSgdUpdateFunctor>("MultiTensorSgdUpdate");
   m.add_functor<impl::MultiTensorAdamUpdateFunctor>("MultiTensorAdamUpdate");
+  m.add_functor<impl::MultiTensorMomentumUpdateFunctor>("MultiTensorMomentumUpdate");
+  m.add_functor<impl::MultiTensorAmsgradUpdateFunctor>("MultiTensorAmsgradUpdate");
+  m.add_functor<impl::MultiTensorRmspropUpdateFunctor>("MultiTensorRmspropUpdate");
+  m.add_functor<impl::MultiTensorLambUpdateFunctor>("MultiTensorLambUpdate");
+  m.add_functor<impl::MultiTensorScaleByTensorFunctor>("MultiTensorScaleByTensor");
+  m.add_functor<impl::MultiReduceSumPowAbsFunctor>("MultiReduceSumPowAbs");
+  m.add_functor<impl::MultiReduceMaxAbsFunctor>("MultiReduceMaxAbs");
+  m.add_functor<impl::MultiReduceMinAbsFunctor>("MultiReduceMinAbs");
+  m.add_functor<impl::MultiCountNotFiniteFunctor>("MultiCountNotFinite");
+  m.add_functor<impl::DynamicLossScaleScheduleFunctor>("DynamicLossScaleSchedule");
 }
 
 }  // namespace functional
@@ -16,6 +16,7 @@ limitations under the License.
 #include "oneflow/core/functional/tensor_processor.h"
 #include "oneflow/core/common/symbol.h"
 #include "oneflow/core/common/throw.h"
+#include "oneflow/core/framework/autocast.h"
 #include "oneflow/core/framework/dtype.h"
 #include "oneflow/core/functional/functional.h"
 #include "oneflow/core/job/lazy_mode.h"
@@ -79,11 +80,25 @@ TensorProcessor& TensorProcessor::PromoteInputsToCommonDtype(bool is_promote) {
   return *this;
 }
 
+TensorProcessor& TensorProcessor::PromoteInputsToCommonDtype(bool is_promote, bool is_inplace) {
+  promote_inputs_to_common_dtype_ = is_promote;
+  is_inplace_ = is_inplace;
+  return *this;
+}
+
 Maybe<void> TensorProcessor::Apply() {
   if (promote_inputs_to_common_dtype_) {
     bool has_different_input_dtype = CheckHasDifferentInputDType(tensor_tuple_);
     if (has_different_input_dtype) {
       common_dtype_ = ComputeCommonDType(tensor_tuple_);
+      // NOTE: in autocast mode the inputs are promoted before the op reaches the interpreter,
+      // which would otherwise see float32 inputs only and never run gray and clear ops in low
+      // precision.
+      const DataType autocast_dtype = JUST(autocast::AutocastPromotedDataType(tensor_tuple_));
+      if (autocast_dtype != DataType::kInvalidDataType) {
+        common_dtype_ =
+            is_inplace_ ? tensor_tuple_.at(0)->dtype() : JUST(DType::Get(autocast_dtype));
+      }
       JUST(CastToSameType(tensor_tuple_, common_dtype_));
     }
   } else {
@@ -27,12 +27,17 @@ namespace functional {
 class TensorProcessor final {
  public:
   TensorProcessor()
-      : common_dtype_(DType::InvalidDataType()), promote_inputs_to_common_dtype_(false){};
+      : common_dtype_(DType::InvalidDataType()),
+        promote_inputs_to_common_dtype_(false),
+        is_inplace_(false){};
   TensorProcessor& AddInputs(const TensorTuple& init_list);
   TensorProcessor& AddInputs(const TensorTuple& init_list, Symbol<DType> tensor_lowest_dtype);
 
   Maybe<void> Apply();
   TensorProcessor& PromoteInputsToCommonDtype(bool is_promote);
+  // The first input is also the output of an inplace op, so the inputs are promoted to its data
+  // type in autocast mode.
+  TensorProcessor& PromoteInputsToCommonDtype(bool is_promote, bool is_inplace);
   Maybe<TensorTuple&> GetInputs() { return tensor_tuple_; };
 
  private:
@@ -41,6 +46,7 @@ class TensorProcessor final {
   std::vector<Symbol<DType>> inputs_lowest_dtype_vec_;
 
   bool promote_inputs_to_common_dtype_;
+  bool is_inplace_;
 };
 
 class TensorLayoutProcessor final {
@@ -29,6 +29,11 @@ class TaskIdGenerator final {
   ~TaskIdGenerator() = default;
 
   TaskId Generate(const StreamId& stream_id);
+  void TryUpdateGenerator(const TaskId& used_task_id);
+  bool IsGenerated(const TaskId& task_id) const;
+  const HashMap<StreamId, task_index_t>& stream_id2task_index_counter() const {
+    return stream_id2task_index_counter_;
+  }
 
  private:
   HashMap<StreamId, task_index_t> stream_id2task_index_counter_;
@@ -39,6 +44,16 @@ inline TaskId TaskIdGenerator::Generate(const StreamId& stream_id) {
   return TaskId{stream_id, task_index};
 }
 
+inline void TaskIdGenerator::TryUpdateGenerator(const TaskId& used_task_id) {
+  task_index_t& counter = stream_id2task_index_counter_[used_task_id.stream_id()];
+  counter = std::max(counter, static_cast<task_index_t>(used_task_id.task_index() + 1));
+}
+
+inline bool TaskIdGenerator::IsGenerated(const TaskId& task_id) const {
+  const auto it = stream_id2task_index_counter_.find(task_id.stream_id());
+  return it != stream_id2task_index_counter_.end() && task_id.task_index() < it->second;
+}
+
 }  // namespace oneflow
 
 #endif  // ONEFLOW_CORE_GRAPH_TASK_ID_GENERATOR_H_
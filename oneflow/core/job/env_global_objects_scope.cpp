@@ -176,8 +176,8 @@ Maybe<void> EnvGlobalObjectsScope::Init(const EnvProto& env_proto) {
 #ifdef WITH_CUDA
   Singleton<EagerNcclCommMgr>::New();
   Singleton<CudnnConvAlgoCache>::New();
-  Singleton<embedding::EmbeddingManager>::New();
 #endif
+  Singleton<embedding::EmbeddingManager>::New();
   Singleton<vm::VirtualMachineScope>::New(Singleton<ResourceDesc, ForSession>::Get()->resource());
   if (!Singleton<ResourceDesc, ForSession>::Get()->enable_dry_run()) {
 #ifdef __linux__
@@ -225,8 +225,8 @@ EnvGlobalObjectsScope::~EnvGlobalObjectsScope() {
 #endif  // __linux__
   }
   Singleton<vm::VirtualMachineScope>::Delete();
-#ifdef WITH_CUDA
   Singleton<embedding::EmbeddingManager>::Delete();
+#ifdef WITH_CUDA
   Singleton<CudnnConvAlgoCache>::Delete();
   Singleton<EagerNcclCommMgr>::Delete();
 #endif
@@ -14,6 +14,7 @@ See the License for the specific language governing permissions and
 limitations under the License.
 */
 #include "oneflow/core/job/id_manager.h"
+#include <sstream>
 
 namespace oneflow {
 
@@ -23,4 +24,19 @@ IDMgr::IDMgr() {
   chunk_id_count_ = 0;
 }
 
+std::string IDMgr::DumpState() const {
+  std::vector<std::pair<int64_t, int64_t>> stream_id2task_index_counter;
+  for (const auto& pair : task_id_gen_.stream_id2task_index_counter()) {
+    stream_id2task_index_counter.emplace_back(EncodeStreamIdToInt64(pair.first), pair.second);
+  }
+  std::sort(stream_id2task_index_counter.begin(), stream_id2task_index_counter.end());
+  std::ostringstream state;
+  state << "regst_desc:" << regst_desc_id_count_ << ";mem_block:" << mem_block_id_count_
+        << ";chunk:" << chunk_id_count_ << ";task:";
+  for (const auto& pair : stream_id2task_index_counter) {
+    state << pair.first << "=" << pair.second << ",";
+  }
+  return state.str();
+}
+
 }  // namespace oneflow
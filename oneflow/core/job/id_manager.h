@@ -33,6 +33,25 @@ class IDMgr final {
   int64_t NewMemBlockId() { return mem_block_id_count_++; }
   int64_t NewChunkId() { return chunk_id_count_++; }
 
+  // Make sure ids generated later never collide with ids already used, e.g. by a plan restored
+  // from the compile cache instead of being compiled in this process.
+  void TryUpdateRegstDescIdCount(int64_t used_id) {
+    regst_desc_id_count_ = std::max(regst_desc_id_count_, used_id + 1);
+  }
+  void TryUpdateMemBlockIdCount(int64_t used_id) {
+    mem_block_id_count_ = std::max(mem_block_id_count_, used_id + 1);
+  }
+  void TryUpdateChunkIdCount(int64_t used_id) {
+    chunk_id_count_ = std::max(chunk_id_count_, used_id + 1);
+  }
+  bool IsRegstDescIdGenerated(int64_t id) const { return id < regst_desc_id_count_; }
+  bool IsMemBlockIdGenerated(int64_t id) const { return id < mem_block_id_count_; }
+  bool IsChunkIdGenerated(int64_t id) const { return id < chunk_id_count_; }
+
+  // All the id counters, a plan compiled when the counters had the same values uses no id
+  // generated in this process so far.
+  std::string DumpState() const;
+
   TaskIdGenerator* GetTaskIdGenerator() { return &task_id_gen_; }
 
  private:
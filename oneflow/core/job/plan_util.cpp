@@ -19,6 +19,7 @@ limitations under the License.
 #include "oneflow/core/control/global_process_ctx.h"
 #include "oneflow/core/job/plan_util.h"
 #include "oneflow/core/job/global_for.h"
+#include "oneflow/core/job/id_manager.h"
 #include "oneflow/core/graph/plan_task_graph.h"
 #include "oneflow/core/graph/boxing/collective_boxing_util.h"
 #include "oneflow/core/memory/chunk_manager.h"
@@ -1215,6 +1216,70 @@ void PlanUtil::PopulateOpAttribute(
   }
 }
 
+/*static*/ void PlanUtil::UpdateIdMgrWithIdsUsedByPlan(const Plan& plan) {
+  IDMgr* id_mgr = Singleton<IDMgr>::Get();
+  auto ForEachIdUsedByPlan = [&](const std::function<void(const TaskId&)>& DoEachTaskId,
+                                 const std::function<void(int64_t)>& DoEachRegstDescId,
+                                 const std::function<void(int64_t)>& DoEachMemBlockId,
+                                 const std::function<void(int64_t)>& DoEachChunkId) {
+    for (const auto& task : plan.task()) {
+      DoEachTaskId(DecodeTaskIdFromInt64(task.task_id()));
+      for (const auto& pair : task.produced_regst_desc()) {
+        const RegstDescProto& regst_desc = pair.second;
+        DoEachRegstDescId(regst_desc.regst_desc_id());
+        DoEachMemBlockId(regst_desc.mem_block_id());
+        if (regst_desc.separated_header_mem_block_id() != -1) {
+          DoEachMemBlockId(regst_desc.separated_header_mem_block_id());
+        }
+      }
+    }
+    for (const auto& pair : plan.ctrl_regst_desc_info().ctrl_regst_desc_id2producer_task_id()) {
+      DoEachRegstDescId(pair.first);
+    }
+    for (const auto& mem_block : plan.block_chunk_list().mem_block()) {
+      DoEachMemBlockId(mem_block.mem_block_id());
+    }
+    for (const auto& chunk : plan.block_chunk_list().chunk()) { DoEachChunkId(chunk.chunk_id()); }
+  };
+  // NOTE: the compile cache key holds the id counters, so a restored plan was compiled from the
+  // same counters and never uses an id generated in this process, check it before reserving.
+  const std::string collision_msg =
+      "the plan restored from the compile cache uses an id already generated in this process";
+  ForEachIdUsedByPlan(
+      [&](const TaskId& id) {
+        CHECK(!id_mgr->GetTaskIdGenerator()->IsGenerated(id)) << collision_msg;
+      },
+      [&](int64_t id) { CHECK(!id_mgr->IsRegstDescIdGenerated(id)) << collision_msg; },
+      [&](int64_t id) { CHECK(!id_mgr->IsMemBlockIdGenerated(id)) << collision_msg; },
+      [&](int64_t id) { CHECK(!id_mgr->IsChunkIdGenerated(id)) << collision_msg; });
+  ForEachIdUsedByPlan(
+      [&](const TaskId& id) { id_mgr->GetTaskIdGenerator()->TryUpdateGenerator(id); },
+      [&](int64_t id) { id_mgr->TryUpdateRegstDescIdCount(id); },
+      [&](int64_t id) { id_mgr->TryUpdateMemBlockIdCount(id); },
+      [&](int64_t id) { id_mgr->TryUpdateChunkIdCount(id); });
+}
+
+/*static*/ void PlanUtil::ReplaceJobId(Plan* plan, int64_t job_id) {
+  // NOTE: the plan of a nn.Graph holds exactly one job, so every job id in it is replaced.
+  auto ReplaceMapKey = [job_id](auto* job_id2value) {
+    CHECK_LE(job_id2value->size(), 1);
+    if (job_id2value->empty() || job_id2value->begin()->first == job_id) { return; }
+    auto value = job_id2value->begin()->second;
+    job_id2value->clear();
+    (*job_id2value)[job_id] = value;
+  };
+  ReplaceMapKey(plan->mutable_job_confs()->mutable_job_id2job_conf());
+  ReplaceMapKey(plan->mutable_collective_boxing_plan()->mutable_job_id2request_set());
+  ReplaceMapKey(plan->mutable_job_id2op_attribute_ref_table());
+  for (auto& task : *plan->mutable_task()) { task.set_job_id(job_id); }
+  for (auto& mem_block : *plan->mutable_block_chunk_list()->mutable_mem_block()) {
+    for (int i = 0; i < mem_block.job_id_size(); ++i) { mem_block.set_job_id(i, job_id); }
+  }
+  for (auto& chunk : *plan->mutable_block_chunk_list()->mutable_chunk()) {
+    for (int i = 0; i < chunk.job_id_size(); ++i) { chunk.set_job_id(i, job_id); }
+  }
+}
+
 /*static*/ StreamId PlanUtil::GetStreamId(const TaskProto& task) {
   return DecodeStreamIdFromInt64(task.thrd_id());
 }
@@ -47,6 +47,10 @@ struct PlanUtil {
   static void PopulateOpAttribute(
       Plan* plan,
       const PbMap<int64_t, ::oneflow::OpAttributeRefTable>& job_id2op_attribute_ref_table);
+  // NOTE: for plans restored from the graph compile cache rather than generated in this process.
+  static void UpdateIdMgrWithIdsUsedByPlan(const Plan& plan);
+  // NOTE: a restored plan may be compiled under another job id, it is moved to job_id here.
+  static void ReplaceJobId(Plan* plan, int64_t job_id);
   static StreamId GetStreamId(const TaskProto& task);
   static int64_t GetDeviceIndex(const TaskProto& task);
 };
@@ -517,11 +517,13 @@ void ScaleGrad(JobPassCtx* ctx, const OpGraph& op_graph, JobBuilder* job_builder
   }
 }
 
-bool IsSupportFusedUpdatePut(const bool is_full_cache, const bool enable_auto_mixed_precision,
-                             const bool is_sgd, const std::string& down_scale_by_lbn,
-                             const std::string& skip_if_lbn, const float l1, const float l2,
-                             const float weight_decay) {
+bool IsSupportFusedUpdatePut(const DeviceType device_type, const bool is_full_cache,
+                             const bool enable_auto_mixed_precision, const bool is_sgd,
+                             const std::string& down_scale_by_lbn, const std::string& skip_if_lbn,
+                             const float l1, const float l2, const float weight_decay) {
   if (!ParseBooleanFromEnv("ONEFLOW_ONE_EMBEDDING_FUSE_UPDATE_PUT", true)) { return false; }
+  // fused_sgd_embedding_update_put only has a cuda kernel.
+  if (device_type != DeviceType::kCUDA) { return false; }
   if (!is_full_cache) { return false; }
   if (!enable_auto_mixed_precision) { return false; }
   if (!is_sgd) { return false; }
@@ -556,7 +558,8 @@ void BuildEmbeddingUpdate(
             has_clip_grad, embedding_grad_lbn, new_embedding_grad_lbn, &update_skip_if_lbn,
             &fuse_to_update_down_scale_by_lbn, &fuse_to_update_scale);
 
-  if (IsSupportFusedUpdatePut(is_full_cache, ctx->job_desc().enable_auto_mixed_precision(),
+  if (IsSupportFusedUpdatePut(ParallelDesc(embedding_parallel_conf).device_type(), is_full_cache,
+                              ctx->job_desc().enable_auto_mixed_precision(),
                               optimizer_conf.has_naive_conf(), fuse_to_update_down_scale_by_lbn,
                               update_skip_if_lbn, l1, l2,
                               optimizer_conf.weight_decay_conf().weight_decay_rate())) {
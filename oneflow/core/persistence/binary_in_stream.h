@@ -34,6 +34,10 @@ class BinaryInStream {
   virtual void set_cur_file_pos(uint64_t val) = 0;
   virtual bool IsEof() const = 0;
 
+  // Hint that the stream is about to be read from its current position, streams supporting
+  // readahead start fetching data in the background.
+  virtual void StartReadahead() {}
+
  protected:
   BinaryInStream() = default;
 };
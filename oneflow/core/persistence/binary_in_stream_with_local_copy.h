@@ -35,6 +35,7 @@ class BinaryInStreamWithLocalCopy final : public BinaryInStream {
   uint64_t cur_file_pos() const override { return in_stream_->cur_file_pos(); }
   void set_cur_file_pos(uint64_t val) override { in_stream_->set_cur_file_pos(val); }
   bool IsEof() const override { return in_stream_->IsEof(); }
+  void StartReadahead() override { in_stream_->StartReadahead(); }
 
  private:
   int32_t ReadAndWriteToLocal(char* s, size_t n);
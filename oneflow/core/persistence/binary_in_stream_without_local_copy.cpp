@@ -14,24 +14,95 @@ See the License for the specific language governing permissions and
 limitations under the License.
 */
 #include "oneflow/core/persistence/binary_in_stream_without_local_copy.h"
+#include "oneflow/core/persistence/readahead.h"
+#include "oneflow/core/thread/thread_pool.h"
 #include "oneflow/core/job/job_desc.h"
 #include <cstring>
 
 namespace oneflow {
 
+namespace {
+
+constexpr size_t kMaxReadaheadChunkSize = 1 << 20;
+
+}  // namespace
+
 int32_t BinaryInStreamWithoutLocalCopy::Read(char* s, size_t n) {
   if (IsEof()) return -1;
   CHECK_LE(cur_file_pos_ + n, file_size_);
-  file_->Read(cur_file_pos_, n, s);
-  cur_file_pos_ += n;
+  PersistentReadStats::Get()->bytes_read += n;
+  if (max_prefetched_chunks_ == 0) {
+    file_->Read(cur_file_pos_, n, s);
+    cur_file_pos_ += n;
+    return 0;
+  }
+  while (n > 0) {
+    if (!cur_chunk_ || cur_file_pos_ == cur_chunk_begin_ + cur_chunk_->size()) { NextChunk(); }
+    const uint64_t offset_in_chunk = cur_file_pos_ - cur_chunk_begin_;
+    const size_t copy_size = std::min<uint64_t>(n, cur_chunk_->size() - offset_in_chunk);
+    std::memcpy(s, cur_chunk_->data() + offset_in_chunk, copy_size);
+    s += copy_size;
+    n -= copy_size;
+    cur_file_pos_ += copy_size;
+  }
   return 0;
 }
 
 BinaryInStreamWithoutLocalCopy::BinaryInStreamWithoutLocalCopy(fs::FileSystem* fs,
                                                                const std::string& file_path)
-    : cur_file_pos_(0) {
-  fs->NewRandomAccessFile(file_path, &file_);
+    : cur_file_pos_(0), next_prefetch_pos_(0), cur_chunk_begin_(0) {
+  std::unique_ptr<fs::RandomAccessFile> file;
+  fs->NewRandomAccessFile(file_path, &file);
+  file_.reset(file.release());
   file_size_ = fs->GetFileSize(file_path);
+  const size_t readahead_bytes = ReadaheadBytes();
+  chunk_size_ = std::min(readahead_bytes, kMaxReadaheadChunkSize);
+  max_prefetched_chunks_ =
+      chunk_size_ == 0 ? 0 : RoundUp(readahead_bytes, chunk_size_) / chunk_size_;
+}
+
+void BinaryInStreamWithoutLocalCopy::set_cur_file_pos(uint64_t val) {
+  cur_file_pos_ = val;
+  if (cur_chunk_ && (val < cur_chunk_begin_ || val >= cur_chunk_begin_ + cur_chunk_->size())) {
+    cur_chunk_.reset();
+  }
+}
+
+void BinaryInStreamWithoutLocalCopy::StartReadahead() {
+  if (max_prefetched_chunks_ == 0 || cur_chunk_ || !prefetched_.empty()) { return; }
+  next_prefetch_pos_ = cur_file_pos_;
+  Prefetch();
+}
+
+void BinaryInStreamWithoutLocalCopy::NextChunk() {
+  cur_chunk_.reset();
+  if (prefetched_.empty() || prefetched_.front().first != cur_file_pos_) {
+    // the stream has been seeked, drop chunks read ahead for the old position
+    prefetched_.clear();
+    next_prefetch_pos_ = cur_file_pos_;
+  }
+  Prefetch();
+  cur_chunk_begin_ = prefetched_.front().first;
+  cur_chunk_ = GetPrefetched(&prefetched_.front().second);
+  prefetched_.pop_front();
+  Prefetch();
+}
+
+void BinaryInStreamWithoutLocalCopy::Prefetch() {
+  while (next_prefetch_pos_ < file_size_ && prefetched_.size() < max_prefetched_chunks_) {
+    const uint64_t pos = next_prefetch_pos_;
+    const size_t size = std::min<uint64_t>(chunk_size_, file_size_ - pos);
+    auto promise = std::make_shared<std::promise<Chunk>>();
+    prefetched_.emplace_back(pos, promise->get_future());
+    next_prefetch_pos_ += size;
+    // the work holds the file, so it is safe to destroy the stream with pending works
+    std::shared_ptr<fs::RandomAccessFile> file = file_;
+    ReadaheadThreadPool()->AddWork([promise, file, pos, size]() {
+      auto chunk = std::make_shared<std::vector<char>>(size);
+      file->Read(pos, size, chunk->data());
+      promise->set_value(std::move(chunk));
+    });
+  }
 }
 
 }  // namespace oneflow
@@ -16,11 +16,16 @@ limitations under the License.
 #ifndef ONEFLOW_CORE_PERSISTENCE_BINARY_IN_STREAM_WITHOUT_LOCAL_COPY_H_
 #define ONEFLOW_CORE_PERSISTENCE_BINARY_IN_STREAM_WITHOUT_LOCAL_COPY_H_
 
+#include <deque>
+#include <future>
+
 #include "oneflow/core/persistence/file_system.h"
 #include "oneflow/core/persistence/binary_in_stream.h"
 
 namespace oneflow {
 
+// Keeps ReadaheadBytes() of the file following the current position in flight, which are read
+// by ReadaheadThreadPool() in chunks.
 class BinaryInStreamWithoutLocalCopy final : public BinaryInStream {
  public:
   OF_DISALLOW_COPY_AND_MOVE(BinaryInStreamWithoutLocalCopy);
@@ -32,13 +37,27 @@ class BinaryInStreamWithoutLocalCopy final : public BinaryInStream {
 
   uint64_t file_size() const override { return file_size_; }
   uint64_t cur_file_pos() const override { return cur_file_pos_; }
-  void set_cur_file_pos(uint64_t val) override { cur_file_pos_ = val; }
+  void set_cur_file_pos(uint64_t val) override;
   bool IsEof() const override { return cur_file_pos_ == file_size_; }
+  void StartReadahead() override;
 
  private:
-  std::unique_ptr<fs::RandomAccessFile> file_;
+  using Chunk = std::shared_ptr<std::vector<char>>;
+
+  void NextChunk();
+  void Prefetch();
+
+  std::shared_ptr<fs::RandomAccessFile> file_;
   uint64_t file_size_;
   uint64_t cur_file_pos_;
+
+  size_t chunk_size_;
+  size_t max_prefetched_chunks_;
+  // begin and data of the chunks read ahead, which are contiguous and end at next_prefetch_pos_
+  std::deque<std::pair<uint64_t, std::future<Chunk>>> prefetched_;
+  uint64_t next_prefetch_pos_;
+  Chunk cur_chunk_;
+  uint64_t cur_chunk_begin_;
 };
 
 }  // namespace oneflow
@@ -0,0 +1,153 @@
+/*
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+*/
+#include "oneflow/core/persistence/block_compressed_in_stream.h"
+#include "oneflow/core/common/env_var/env_var.h"
+#include "oneflow/core/persistence/readahead.h"
+#include "oneflow/core/thread/thread_pool.h"
+#include <lz4.h>
+#include <cstring>
+
+namespace oneflow {
+
+namespace {
+
+constexpr size_t kTrailerSize = 2 * sizeof(int64_t) + kBlockCompressedFileMagicSize;
+
+ThreadPool* DecompressThreadPool() {
+  static ThreadPool pool(
+      std::max<int64_t>(EnvInteger<ONEFLOW_DATA_DECOMPRESS_THREAD_NUM>(), 1));
+  return &pool;
+}
+
+}  // namespace
+
+bool IsBlockCompressedFile(fs::FileSystem* fs, const std::string& file_path) {
+  const uint64_t size = fs->GetFileSize(file_path);
+  if (size < kTrailerSize) { return false; }
+  std::unique_ptr<fs::RandomAccessFile> file;
+  fs->NewRandomAccessFile(file_path, &file);
+  char magic[kBlockCompressedFileMagicSize];
+  file->Read(size - kBlockCompressedFileMagicSize, kBlockCompressedFileMagicSize, magic);
+  return std::memcmp(magic, kBlockCompressedFileMagic, kBlockCompressedFileMagicSize) == 0;
+}
+
+BlockCompressedBinaryInStream::BlockCompressedBinaryInStream(fs::FileSystem* fs,
+                                                             const std::string& file_path)
+    : cur_file_pos_(0), cur_block_id_(0), next_prefetch_block_id_(0) {
+  static_assert(sizeof(Block) == 3 * sizeof(int64_t), "");
+  std::unique_ptr<fs::RandomAccessFile> file;
+  fs->NewRandomAccessFile(file_path, &file);
+  file_.reset(file.release());
+  const uint64_t compressed_file_size = fs->GetFileSize(file_path);
+  CHECK_GE(compressed_file_size, kTrailerSize);
+  int64_t trailer[2];
+  file_->Read(compressed_file_size - kTrailerSize, sizeof(trailer),
+              reinterpret_cast<char*>(trailer));
+  const int64_t num_blocks = trailer[0];
+  file_size_ = trailer[1];
+  CHECK_GE(num_blocks, 0);
+  const uint64_t index_size = num_blocks * sizeof(Block);
+  CHECK_LE(index_size + kTrailerSize, compressed_file_size) << file_path << " is corrupted";
+  blocks_.resize(num_blocks);
+  if (num_blocks > 0) {
+    file_->Read(compressed_file_size - kTrailerSize - index_size, index_size,
+                reinterpret_cast<char*>(blocks_.data()));
+  }
+  block_begins_.push_back(0);
+  for (const auto& block : blocks_) {
+    CHECK_GT(block.uncompressed_size, 0);
+    block_begins_.push_back(block_begins_.back() + block.uncompressed_size);
+  }
+  CHECK_EQ(block_begins_.back(), file_size_) << file_path << " is corrupted";
+}
+
+int32_t BlockCompressedBinaryInStream::Read(char* s, size_t n) {
+  if (IsEof()) { return -1; }
+  CHECK_LE(cur_file_pos_ + n, file_size_);
+  PersistentReadStats::Get()->bytes_read += n;
+  while (n > 0) {
+    if (cur_file_pos_ == block_begins_.at(cur_block_id_ + 1)) {
+      cur_block_id_ += 1;
+      cur_block_.reset();
+    }
+    if (!cur_block_) { NextBlock(); }
+    const uint64_t offset_in_block = cur_file_pos_ - block_begins_.at(cur_block_id_);
+    const size_t copy_size = std::min<uint64_t>(n, cur_block_->size() - offset_in_block);
+    std::memcpy(s, cur_block_->data() + offset_in_block, copy_size);
+    s += copy_size;
+    n -= copy_size;
+    cur_file_pos_ += copy_size;
+  }
+  return 0;
+}
+
+void BlockCompressedBinaryInStream::set_cur_file_pos(uint64_t val) {
+  CHECK_LE(val, file_size_);
+  cur_file_pos_ = val;
+  int64_t block_id =
+      std::upper_bound(block_begins_.cbegin(), block_begins_.cend(), val) - block_begins_.cbegin()
+      - 1;
+  block_id = std::max<int64_t>(std::min<int64_t>(block_id, blocks_.size() - 1), 0);
+  if (block_id != cur_block_id_) {
+    cur_block_id_ = block_id;
+    cur_block_.reset();
+  }
+}
+
+void BlockCompressedBinaryInStream::StartReadahead() {
+  if (cur_block_ || !prefetched_.empty()) { return; }
+  next_prefetch_block_id_ = cur_block_id_;
+  Prefetch();
+}
+
+void BlockCompressedBinaryInStream::NextBlock() {
+  const int64_t first_prefetched_block_id = next_prefetch_block_id_ - prefetched_.size();
+  if (prefetched_.empty() || first_prefetched_block_id != cur_block_id_) {
+    // the stream has been seeked, drop blocks prefetched for the old position
+    prefetched_.clear();
+    next_prefetch_block_id_ = cur_block_id_;
+  }
+  Prefetch();
+  cur_block_ = GetPrefetched(&prefetched_.front());
+  prefetched_.pop_front();
+  Prefetch();
+}
+
+void BlockCompressedBinaryInStream::Prefetch() {
+  ThreadPool* pool = DecompressThreadPool();
+  const size_t max_prefetched = 2 * pool->thread_num();
+  while (next_prefetch_block_id_ < static_cast<int64_t>(blocks_.size())
+         && prefetched_.size() < max_prefetched) {
+    auto promise = std::make_shared<std::promise<std::shared_ptr<std::vector<char>>>>();
+    prefetched_.emplace_back(promise->get_future());
+    const Block block = blocks_.at(next_prefetch_block_id_);
+    next_prefetch_block_id_ += 1;
+    // the work holds the file, so it is safe to destroy the stream with pending works
+    std::shared_ptr<fs::RandomAccessFile> file = file_;
+    pool->AddWork([promise, block, file]() {
+      std::vector<char> compressed(block.compressed_size);
+      file->Read(block.compressed_offset, block.compressed_size, compressed.data());
+      auto uncompressed = std::make_shared<std::vector<char>>(block.uncompressed_size);
+      const int size = LZ4_decompress_safe(compressed.data(), uncompressed->data(),
+                                           block.compressed_size, block.uncompressed_size);
+      CHECK_EQ(size, block.uncompressed_size) << "corrupted block at offset "
+                                              << block.compressed_offset;
+      promise->set_value(std::move(uncompressed));
+    });
+  }
+}
+
+}  // namespace oneflow
@@ -0,0 +1,81 @@
+/*
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+*/
+#ifndef ONEFLOW_CORE_PERSISTENCE_BLOCK_COMPRESSED_IN_STREAM_H_
+#define ONEFLOW_CORE_PERSISTENCE_BLOCK_COMPRESSED_IN_STREAM_H_
+
+#include <deque>
+#include <future>
+
+#include "oneflow/core/persistence/file_system.h"
+#include "oneflow/core/persistence/binary_in_stream.h"
+
+namespace oneflow {
+
+// Layout of a block-compressed file, all integers are little endian int64:
+//   block 0 | block 1 | ... | index | number of blocks | uncompressed size | magic "OFBLKLZ4"
+// Every block is an LZ4 block compressing a contiguous range of the original file, the index
+// holds (offset in the compressed file, compressed size, uncompressed size) of every block.
+// Such files are written by `python3 -m oneflow.utils.data.block_compress`.
+constexpr char kBlockCompressedFileMagic[] = "OFBLKLZ4";
+constexpr size_t kBlockCompressedFileMagicSize = 8;
+
+bool IsBlockCompressedFile(fs::FileSystem* fs, const std::string& file_path);
+
+// Presents the uncompressed content of a block-compressed file. Blocks following the current
+// one are decompressed ahead of time by a thread pool shared by all such streams, whose size is
+// set by env ONEFLOW_DATA_DECOMPRESS_THREAD_NUM.
+class BlockCompressedBinaryInStream final : public BinaryInStream {
+ public:
+  OF_DISALLOW_COPY_AND_MOVE(BlockCompressedBinaryInStream);
+  BlockCompressedBinaryInStream() = delete;
+  ~BlockCompressedBinaryInStream() override = default;
+
+  BlockCompressedBinaryInStream(fs::FileSystem* fs, const std::string& file_path);
+  int32_t Read(char* s, size_t n) override;
+
+  uint64_t file_size() const override { return file_size_; }
+  uint64_t cur_file_pos() const override { return cur_file_pos_; }
+  void set_cur_file_pos(uint64_t val) override;
+  bool IsEof() const override { return cur_file_pos_ == file_size_; }
+  void StartReadahead() override;
+
+ private:
+  struct Block {
+    int64_t compressed_offset;
+    int64_t compressed_size;
+    int64_t uncompressed_size;
+  };
+
+  void Prefetch();
+  void NextBlock();
+
+  std::shared_ptr<fs::RandomAccessFile> file_;
+  std::vector<Block> blocks_;
+  // uncompressed offset of every block, with the file size at last
+  std::vector<uint64_t> block_begins_;
+  uint64_t file_size_;
+  uint64_t cur_file_pos_;
+
+  // decompressed blocks in [cur_block_id_, next_prefetch_block_id_)
+  std::deque<std::future<std::shared_ptr<std::vector<char>>>> prefetched_;
+  std::shared_ptr<std::vector<char>> cur_block_;
+  int64_t cur_block_id_;
+  int64_t next_prefetch_block_id_;
+};
+
+}  // namespace oneflow
+
+#endif  // ONEFLOW_CORE_PERSISTENCE_BLOCK_COMPRESSED_IN_STREAM_H_
@@ -16,6 +16,7 @@ limitations under the License.
 #include "oneflow/core/persistence/persistent_in_stream.h"
 #include "oneflow/core/persistence/binary_in_stream_with_local_copy.h"
 #include "oneflow/core/persistence/binary_in_stream_without_local_copy.h"
+#include "oneflow/core/persistence/block_compressed_in_stream.h"
 #include "oneflow/core/job/job_set.pb.h"
 #include <cstring>
 #include "oneflow/core/common/constant.h"
@@ -54,7 +55,9 @@ PersistentInStream::PersistentInStream(int64_t session_id, fs::FileSystem* fs,
   if (with_local_copy) { CHECK_EQ(offset, 0); }
   std::vector<std::shared_ptr<BinaryInStream>> streams;
   for (auto& file_path : file_paths) {
-    if (with_local_copy) {
+    if (IsBlockCompressedFile(fs, file_path)) {
+      streams.emplace_back(new BlockCompressedBinaryInStream(fs, file_path));
+    } else if (with_local_copy) {
       streams.emplace_back(new BinaryInStreamWithLocalCopy(fs, file_path));
     } else {
       streams.emplace_back(new BinaryInStreamWithoutLocalCopy(fs, file_path));
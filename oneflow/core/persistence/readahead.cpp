@@ -0,0 +1,45 @@
+/*
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+*/
+#include "oneflow/core/persistence/readahead.h"
+#include "oneflow/core/common/env_var/env_var.h"
+#include "oneflow/core/thread/thread_pool.h"
+
+namespace oneflow {
+
+PersistentReadStats* PersistentReadStats::Get() {
+  static PersistentReadStats stats;
+  return &stats;
+}
+
+void PersistentReadStats::Reset() {
+  bytes_read = 0;
+  stall_count = 0;
+  stall_ns = 0;
+}
+
+size_t ReadaheadBytes() {
+  static const size_t readahead_bytes =
+      std::max<int64_t>(EnvInteger<ONEFLOW_PERSISTENT_IN_STREAM_READAHEAD_MB>(), 0) << 20;
+  return readahead_bytes;
+}
+
+ThreadPool* ReadaheadThreadPool() {
+  static ThreadPool pool(
+      std::max<int64_t>(EnvInteger<ONEFLOW_PERSISTENT_IN_STREAM_READAHEAD_THREAD_NUM>(), 1));
+  return &pool;
+}
+
+}  // namespace oneflow
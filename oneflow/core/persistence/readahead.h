@@ -0,0 +1,62 @@
+/*
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+*/
+#ifndef ONEFLOW_CORE_PERSISTENCE_READAHEAD_H_
+#define ONEFLOW_CORE_PERSISTENCE_READAHEAD_H_
+
+#include <chrono>
+#include <future>
+#include "oneflow/core/common/util.h"
+
+namespace oneflow {
+
+class ThreadPool;
+
+// Process-wide counters of the reads through BinaryInStream readahead, a stall is a read which
+// has to wait for data not prefetched yet.
+struct PersistentReadStats final {
+  std::atomic<int64_t> bytes_read{0};
+  std::atomic<int64_t> stall_count{0};
+  std::atomic<int64_t> stall_ns{0};
+
+  static PersistentReadStats* Get();
+  void Reset();
+};
+
+// Bytes a stream keeps in flight ahead of its position, set by env
+// ONEFLOW_PERSISTENT_IN_STREAM_READAHEAD_MB, 0 disables readahead.
+size_t ReadaheadBytes();
+
+// Threads issuing the readahead reads, the number is set by env
+// ONEFLOW_PERSISTENT_IN_STREAM_READAHEAD_THREAD_NUM.
+ThreadPool* ReadaheadThreadPool();
+
+// Wait for a prefetched chunk and account the waiting time as a stall.
+template<typename T>
+T GetPrefetched(std::future<T>* future) {
+  auto* stats = PersistentReadStats::Get();
+  if (future->wait_for(std::chrono::seconds(0)) != std::future_status::ready) {
+    const auto start = std::chrono::steady_clock::now();
+    future->wait();
+    const auto stall = std::chrono::steady_clock::now() - start;
+    stats->stall_count += 1;
+    stats->stall_ns += std::chrono::duration_cast<std::chrono::nanoseconds>(stall).count();
+  }
+  return future->get();
+}
+
+}  // namespace oneflow
+
+#endif  // ONEFLOW_CORE_PERSISTENCE_READAHEAD_H_
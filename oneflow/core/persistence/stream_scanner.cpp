@@ -16,6 +16,7 @@ limitations under the License.
 #include "oneflow/core/persistence/stream_scanner.h"
 #include "oneflow/core/persistence/binary_in_stream_without_local_copy.h"
 #include "oneflow/core/persistence/binary_in_stream_with_local_copy.h"
+#include "oneflow/core/persistence/readahead.h"
 
 namespace oneflow {
 
@@ -32,6 +33,8 @@ StreamScanner::StreamScanner(fs::FileSystem* fs,
   }
   CHECK_LE(whole_file_offset_, whole_file_size_);
   whole_file_pos_ = whole_file_offset_;
+  // start fetching before the first read
+  if (whole_file_offset_ < whole_file_size_) { streams_[cur_stream_id_]->StartReadahead(); }
 }
 
 void StreamScanner::AddStream(fs::FileSystem* fs, const std::shared_ptr<BinaryInStream>& stream,
@@ -60,10 +63,20 @@ uint64_t StreamScanner::UpdateBuffer(std::vector<char>* buffer) {
                                                  - streams_[cur_stream_id_]->cur_file_pos());
   if (n == 0) { return 0; }
   streams_[cur_stream_id_]->Read(buffer->data(), n);
+  ReadaheadNextStream();
   AddNForCurFilePos(n);
   return n;
 }
 
+void StreamScanner::ReadaheadNextStream() {
+  const auto& stream = streams_[cur_stream_id_];
+  if (stream->file_size() - stream->cur_file_pos() > ReadaheadBytes()) { return; }
+  const int32_t next_stream_id = NextStreamId();
+  if (next_stream_id < stream_num_ && next_stream_id != cur_stream_id_) {
+    streams_[next_stream_id]->StartReadahead();
+  }
+}
+
 void AcyclicStreamScanner::AddNForCurFilePos(uint64_t n) {
   whole_file_pos_ += n;
   if (streams_[cur_stream_id_]->IsEof()) { ++cur_stream_id_; }
@@ -35,6 +35,8 @@ class StreamScanner {
 
  protected:
   virtual void AddNForCurFilePos(uint64_t n) = 0;
+  // id of the stream read after the current one, stream_num_ if there is none
+  virtual int32_t NextStreamId() const = 0;
 
   std::vector<std::shared_ptr<BinaryInStream>> streams_;
   uint64_t whole_file_size_;
@@ -45,6 +47,7 @@ class StreamScanner {
 
  private:
   void AddStream(fs::FileSystem* fs, const std::shared_ptr<BinaryInStream>& stream, int64_t idx);
+  void ReadaheadNextStream();
 };
 
 class CyclicStreamScanner final : public StreamScanner {
@@ -56,6 +59,7 @@ class CyclicStreamScanner final : public StreamScanner {
 
  protected:
   void AddNForCurFilePos(uint64_t n) override;
+  int32_t NextStreamId() const override { return (cur_stream_id_ + 1) % stream_num_; }
 };
 
 class AcyclicStreamScanner final : public StreamScanner {
@@ -67,6 +71,7 @@ class AcyclicStreamScanner final : public StreamScanner {
 
  protected:
   void AddNForCurFilePos(uint64_t n) override;
+  int32_t NextStreamId() const override { return cur_stream_id_ + 1; }
 };
 
 }  // namespace oneflow
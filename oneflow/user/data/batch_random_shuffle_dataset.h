@@ -31,11 +31,16 @@ class BatchRandomShuffleDataset final : public Dataset<LoadTarget> {
   using BatchType = typename Base::BatchType;
 
   BatchRandomShuffleDataset(user_op::KernelInitContext* ctx,
-                            std::unique_ptr<Dataset<LoadTarget>>&& data_set)
+                            std::unique_ptr<Dataset<LoadTarget>>&& data_set, int64_t shard_id = 0)
       : loader_(std::move(data_set)) {
     // random
     seed_ = ctx->Attr<int64_t>("seed");
-    if (seed_ == -1) { seed_ = NewRandomSeed(); }
+    if (seed_ == -1) {
+      seed_ = NewRandomSeed();
+    } else {
+      // different shards of one reader shuffle differently but reproducibly
+      seed_ += shard_id;
+    }
     std::seed_seq seq({seed_});
     rand_engine_ = std::default_random_engine(seq);
 
@@ -32,16 +32,17 @@ class DataReader {
   using SampleType = LoadTarget;
   using BatchType = std::vector<SampleType>;
 
-  DataReader(user_op::KernelInitContext* ctx)
-      : is_closed_(false), batch_buffer_(kDataReaderBatchBufferSize) {}
+  DataReader(user_op::KernelInitContext* ctx) : is_closed_(false) {}
 
   virtual ~DataReader() {
     Close();
-    if (load_thrd_.joinable()) { load_thrd_.join(); }
+    for (auto& thrd : load_thrds_) {
+      if (thrd.joinable()) { thrd.join(); }
+    }
   }
 
   void Read(user_op::KernelComputeContext* ctx) {
-    CHECK(load_thrd_.joinable()) << "You should call StartLoadThread before read data";
+    CHECK(!load_thrds_.empty()) << "You should call StartLoadThread before read data";
     auto batch = FetchBatchData();
     parser_->Parse(batch, ctx);
   }
@@ -49,36 +50,76 @@ class DataReader {
   void Close() {
     if (!is_closed_.load()) {
       is_closed_.store(true);
-      batch_buffer_.Close();
+      for (auto& buffer : batch_buffers_) { buffer->Close(); }
     }
   }
 
  protected:
+  // Every loader in loaders_ (or the single loader_) gets its own load thread and batch buffer.
+  // Batches are fetched from the buffers in a fixed weighted round-robin order, so the order of
+  // batches only depends on the loaders themselves but not on the thread scheduling.
+  //
+  // Loader i is fetched from loader_weights_[i] times out of every sum(loader_weights_) batches,
+  // which are equal when loader_weights_ is left empty. Readers set the weights to the sizes of
+  // the shards, so that small shards are not oversampled: while the reader goes through the
+  // data of the rank once, every loader goes through its shard about once. Each loader wraps
+  // around its shard on its own, so the epoch boundaries of the loaders are not aligned, and a
+  // batch may hold the last samples of one epoch of a shard and the first of the next one.
   void StartLoadThread() {
-    if (load_thrd_.joinable()) { return; }
-    load_thrd_ = std::thread([this] {
-      while (!is_closed_.load() && LoadBatch()) {}
-    });
+    if (!load_thrds_.empty()) { return; }
+    if (loader_) { loaders_.emplace_back(std::move(loader_)); }
+    CHECK(!loaders_.empty());
+    if (loader_weights_.empty()) { loader_weights_.resize(loaders_.size(), 1); }
+    CHECK_EQ(loader_weights_.size(), loaders_.size());
+    for (auto& weight : loader_weights_) { weight = std::max<int64_t>(weight, 1); }
+    fetch_credits_.resize(loaders_.size(), 0);
+    for (size_t i = 0; i < loaders_.size(); ++i) {
+      batch_buffers_.emplace_back(new Buffer<BatchType>(kDataReaderBatchBufferSize));
+    }
+    for (size_t i = 0; i < loaders_.size(); ++i) {
+      load_thrds_.emplace_back([this, i] {
+        while (!is_closed_.load() && LoadBatch(i)) {}
+      });
+    }
   }
 
   std::unique_ptr<Dataset<LoadTarget>> loader_;
+  std::vector<std::unique_ptr<Dataset<LoadTarget>>> loaders_;
+  // optional, one per loader in loaders_
+  std::vector<int64_t> loader_weights_;
   std::unique_ptr<Parser<LoadTarget>> parser_;
 
  private:
+  // Smooth weighted round-robin: every fetch credits each loader with its weight and takes the
+  // batch from the loader with the most credit, which then pays the total weight back.
+  size_t NextBufferIndex() {
+    int64_t total_weight = 0;
+    size_t idx = 0;
+    for (size_t i = 0; i < fetch_credits_.size(); ++i) {
+      fetch_credits_[i] += loader_weights_[i];
+      total_weight += loader_weights_[i];
+      if (fetch_credits_[i] > fetch_credits_[idx]) { idx = i; }
+    }
+    fetch_credits_[idx] -= total_weight;
+    return idx;
+  }
+
   BatchType FetchBatchData() {
     BatchType batch;
-    CHECK_EQ(batch_buffer_.Pull(&batch), BufferStatus::kBufferStatusSuccess);
+    CHECK_EQ(batch_buffers_.at(NextBufferIndex())->Pull(&batch),
+             BufferStatus::kBufferStatusSuccess);
     return batch;
   }
 
-  bool LoadBatch() {
-    BatchType batch = loader_->Next();
-    return batch_buffer_.Push(std::move(batch)) == BufferStatus::kBufferStatusSuccess;
+  bool LoadBatch(size_t idx) {
+    BatchType batch = loaders_.at(idx)->Next();
+    return batch_buffers_.at(idx)->Push(std::move(batch)) == BufferStatus::kBufferStatusSuccess;
   }
 
   std::atomic<bool> is_closed_;
-  Buffer<BatchType> batch_buffer_;
-  std::thread load_thrd_;
+  std::vector<std::unique_ptr<Buffer<BatchType>>> batch_buffers_;
+  std::vector<std::thread> load_thrds_;
+  std::vector<int64_t> fetch_credits_;
 };
 
 }  // namespace data
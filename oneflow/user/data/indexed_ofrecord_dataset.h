@@ -0,0 +1,168 @@
+/*
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+*/
+#ifndef ONEFLOW_USER_DATA_INDEXED_OFRECORD_DATASET_H_
+#define ONEFLOW_USER_DATA_INDEXED_OFRECORD_DATASET_H_
+
+#include "oneflow/user/data/dataset.h"
+#include "oneflow/user/data/distributed_util.h"
+#include "oneflow/user/data/ofrecord_dataset.h"
+#include "oneflow/core/framework/op_kernel.h"
+#include "oneflow/core/persistence/block_compressed_in_stream.h"
+#include "oneflow/core/persistence/file_system.h"
+#include "oneflow/core/persistence/persistent_in_stream.h"
+
+#include <numeric>
+#include <random>
+
+namespace oneflow {
+namespace data {
+
+// Layout of the sidecar index "<part file>.idx", all integers are little endian int64:
+//   magic "OFRIDX01" | size of the part file | number of records | offset of every record
+// The index is built by `python3 -m oneflow.utils.data.ofrecord_index`.
+static constexpr char kOFRecordIndexMagic[] = "OFRIDX01";
+static constexpr size_t kOFRecordIndexMagicSize = 8;
+static constexpr char kOFRecordIndexSuffix[] = ".idx";
+
+// Reads records of all part files in a global order which is a permutation of all records
+// (identity if not random_shuffle) regenerated every epoch from seed and epoch. Position p of
+// an epoch on a rank is the record at p * world_size + rank of the order, the tail of
+// total % world_size records is dropped, so every rank reads the same number of records.
+class IndexedOFRecordDataset final : public Dataset<TensorBuffer> {
+ public:
+  using Base = Dataset<TensorBuffer>;
+  using SampleType = typename Base::SampleType;
+  using BatchType = typename Base::BatchType;
+
+  OF_DISALLOW_COPY_AND_MOVE(IndexedOFRecordDataset);
+
+  explicit IndexedOFRecordDataset(user_op::KernelInitContext* ctx) {
+    random_shuffle_ = ctx->Attr<bool>("random_shuffle");
+    // every rank has to generate the same order, so a random seed is not allowed here
+    seed_ = ctx->Attr<int64_t>("seed");
+    if (seed_ == -1) { seed_ = kOneflowDatasetSeed; }
+    CHECK_JUST(InitDataSourceDistributedInfo(ctx, world_size_, rank_));
+
+    const std::vector<std::string> data_file_paths = OFRecordDataset::GetDataFilePaths(ctx);
+    record_begin_.push_back(0);
+    for (const auto& data_file_path : data_file_paths) {
+      LoadIndex(data_file_path);
+      files_.emplace_back();
+      DataFS()->NewRandomAccessFile(data_file_path, &files_.back());
+    }
+    const int64_t num_records = record_begin_.back();
+    num_records_per_epoch_ = num_records / world_size_;
+    CHECK_GT(num_records_per_epoch_, 0)
+        << "Too few records (" << num_records << ") to be split across " << world_size_
+        << " ranks";
+
+    epoch_ = ctx->Attr<int64_t>("start_epoch");
+    position_ = ctx->Attr<int64_t>("start_position");
+    CHECK_GE(epoch_, 0);
+    CHECK_GE(position_, 0);
+    epoch_ += position_ / num_records_per_epoch_;
+    position_ %= num_records_per_epoch_;
+    GenerateOrder();
+  }
+  ~IndexedOFRecordDataset() = default;
+
+  BatchType Next() override {
+    if (position_ == num_records_per_epoch_) {
+      epoch_ += 1;
+      position_ = 0;
+      GenerateOrder();
+    }
+    const int64_t record_id = order_.at(position_ * world_size_ + rank_);
+    position_ += 1;
+    BatchType batch;
+    batch.push_back(TensorBuffer());
+    ReadRecord(record_id, batch.back());
+    return batch;
+  }
+
+ private:
+  void LoadIndex(const std::string& data_file_path) {
+    CHECK(!IsBlockCompressedFile(DataFS(), data_file_path))
+        << "Indexed reading of block-compressed part file " << data_file_path
+        << " is not supported";
+    const std::string index_path = data_file_path + kOFRecordIndexSuffix;
+    CHECK(DataFS()->FileExists(index_path))
+        << "OFRecord index " << index_path
+        << " is not found, build it with `python3 -m oneflow.utils.data.ofrecord_index`";
+    PersistentInStream in_stream(DataFS(), index_path);
+    char magic[kOFRecordIndexMagicSize];
+    int64_t data_file_size = 0;
+    int64_t num_records = 0;
+    CHECK_EQ(in_stream.ReadFully(magic, kOFRecordIndexMagicSize), 0);
+    CHECK(std::equal(magic, magic + kOFRecordIndexMagicSize, kOFRecordIndexMagic))
+        << index_path << " is not an OFRecord index";
+    CHECK_EQ(in_stream.ReadFully(reinterpret_cast<char*>(&data_file_size), sizeof(int64_t)), 0);
+    CHECK_EQ(in_stream.ReadFully(reinterpret_cast<char*>(&num_records), sizeof(int64_t)), 0);
+    CHECK_EQ(data_file_size, DataFS()->GetFileSize(data_file_path))
+        << index_path
+        << " is stale, rebuild it with `python3 -m oneflow.utils.data.ofrecord_index`";
+    const size_t begin = offsets_.size();
+    offsets_.resize(begin + num_records);
+    CHECK_EQ(in_stream.ReadFully(reinterpret_cast<char*>(offsets_.data() + begin),
+                                 num_records * sizeof(int64_t)),
+             0);
+    file_sizes_.push_back(data_file_size);
+    record_begin_.push_back(record_begin_.back() + num_records);
+  }
+
+  void GenerateOrder() {
+    order_.resize(record_begin_.back());
+    std::iota(order_.begin(), order_.end(), 0);
+    if (random_shuffle_) {
+      std::mt19937_64 g(seed_ + epoch_);
+      std::shuffle(order_.begin(), order_.end(), g);
+    }
+  }
+
+  void ReadRecord(int64_t record_id, TensorBuffer& tensor) {
+    const size_t file_id =
+        std::upper_bound(record_begin_.cbegin(), record_begin_.cend(), record_id)
+        - record_begin_.cbegin() - 1;
+    const int64_t offset = offsets_.at(record_id);
+    const int64_t end = record_id + 1 < record_begin_.at(file_id + 1) ? offsets_.at(record_id + 1)
+                                                                      : file_sizes_.at(file_id);
+    const int64_t record_size = end - offset - static_cast<int64_t>(sizeof(int64_t));
+    CHECK_GT(record_size, 0);
+    tensor.Resize(Shape({record_size}), DataType::kChar);
+    files_.at(file_id)->Read(offset + sizeof(int64_t), record_size, tensor.mut_data<char>());
+  }
+
+  bool random_shuffle_;
+  int64_t seed_;
+  size_t world_size_ = 1;
+  int64_t rank_ = 0;
+
+  std::vector<std::unique_ptr<fs::RandomAccessFile>> files_;
+  std::vector<int64_t> file_sizes_;
+  // records of the i-th file are [record_begin_[i], record_begin_[i + 1])
+  std::vector<int64_t> record_begin_;
+  std::vector<int64_t> offsets_;
+
+  int64_t num_records_per_epoch_;
+  int64_t epoch_;
+  int64_t position_;
+  std::vector<int64_t> order_;
+};
+
+}  // namespace data
+}  // namespace oneflow
+
+#endif  // ONEFLOW_USER_DATA_INDEXED_OFRECORD_DATASET_H_
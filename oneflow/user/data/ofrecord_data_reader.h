@@ -18,6 +18,7 @@ limitations under the License.
 
 #include "oneflow/user/data/data_reader.h"
 #include "oneflow/user/data/ofrecord_dataset.h"
+#include "oneflow/user/data/indexed_ofrecord_dataset.h"
 #include "oneflow/user/data/ofrecord_parser.h"
 #include "oneflow/user/data/random_shuffle_dataset.h"
 #include "oneflow/user/data/batch_dataset.h"
@@ -29,26 +30,51 @@ class OFRecordDataReader final : public DataReader<TensorBuffer> {
  public:
   OFRecordDataReader(user_op::KernelInitContext* ctx) : DataReader<TensorBuffer>(ctx) {
     batch_size_ = ctx->TensorDesc4ArgNameAndIndex("out", 0)->shape().elem_cnt();
-    if (auto* pool = TensorBufferPool::TryGet()) { pool->IncreasePoolSizeByBase(batch_size_); }
-    loader_.reset(new OFRecordDataset(ctx));
-    if (ctx->Attr<bool>("random_shuffle")) {
-      loader_.reset(new RandomShuffleDataset<TensorBuffer>(ctx, std::move(loader_)));
+    if (ctx->Attr<bool>("indexed")) {
+      // the indexed dataset shuffles globally by itself and keeps its cursor in one loader
+      num_loaders_ = 1;
+    } else {
+      // every loader reads a disjoint shard of the local part files in its own thread
+      num_loaders_ = std::max(std::min(ctx->Attr<int32_t>("num_loader_threads"),
+                                       OFRecordDataset::NumLocalParts(ctx)),
+                              1);
+    }
+    if (auto* pool = TensorBufferPool::TryGet()) {
+      pool->IncreasePoolSizeByBase(batch_size_ * num_loaders_);
+    }
+    if (ctx->Attr<bool>("indexed")) {
+      std::unique_ptr<Dataset<TensorBuffer>> loader(new IndexedOFRecordDataset(ctx));
+      loaders_.emplace_back(new BatchDataset<TensorBuffer>(batch_size_, std::move(loader)));
+    } else {
+      for (int32_t i = 0; i < num_loaders_; ++i) {
+        auto* dataset = new OFRecordDataset(ctx, i, num_loaders_);
+        loader_weights_.emplace_back(dataset->ShardBytes());
+        std::unique_ptr<Dataset<TensorBuffer>> loader(dataset);
+        if (ctx->Attr<bool>("random_shuffle")) {
+          loader.reset(new RandomShuffleDataset<TensorBuffer>(ctx, std::move(loader), i));
+        }
+        loader.reset(new BatchDataset<TensorBuffer>(batch_size_, std::move(loader)));
+        loaders_.emplace_back(std::move(loader));
+      }
     }
-    loader_.reset(new BatchDataset<TensorBuffer>(batch_size_, std::move(loader_)));
     parser_.reset(new OFRecordParser());
     StartLoadThread();
   }
 
   ~OFRecordDataReader() override {
-    if (auto* pool = TensorBufferPool::TryGet()) { pool->DecreasePoolSizeByBase(batch_size_); }
+    if (auto* pool = TensorBufferPool::TryGet()) {
+      pool->DecreasePoolSizeByBase(batch_size_ * num_loaders_);
+    }
   }
 
  protected:
-  using DataReader<TensorBuffer>::loader_;
+  using DataReader<TensorBuffer>::loaders_;
+  using DataReader<TensorBuffer>::loader_weights_;
   using DataReader<TensorBuffer>::parser_;
 
  private:
   size_t batch_size_;
+  int32_t num_loaders_;
 };
 
 }  // namespace data
@@ -36,24 +36,75 @@ class OFRecordDataset final : public Dataset<TensorBuffer> {
 
   OF_DISALLOW_COPY_AND_MOVE(OFRecordDataset);
 
-  OFRecordDataset(user_op::KernelInitContext* ctx) {
+  OFRecordDataset(user_op::KernelInitContext* ctx) : OFRecordDataset(ctx, 0, 1) {}
+
+  // The part files of this rank are further split into num_shards disjoint shards, so that
+  // several loaders of one data reader could read different files concurrently.
+  OFRecordDataset(user_op::KernelInitContext* ctx, int32_t shard_id, int32_t num_shards) {
     current_epoch_ = 0;
     shuffle_after_epoch_ = ctx->Attr<bool>("shuffle_after_epoch");
 
     // in stream
     data_part_num_ = ctx->Attr<int32_t>("data_part_num");
-    std::string data_dir = ctx->Attr<std::string>("data_dir");
-    std::string part_name_prefix = ctx->Attr<std::string>("part_name_prefix");
-    int32_t part_name_suffix_length = ctx->Attr<int32_t>("part_name_suffix_length");
+    data_file_paths_ = GetDataFilePaths(ctx);
+
+    GetParallelIdAndNum(ctx, &parallel_id_, &parallel_num_);
+    CHECK_LE(parallel_num_, data_part_num_);
+    BalancedSplitter bs(data_part_num_, parallel_num_);
+    const Range rank_range = bs.At(parallel_id_);
+    CHECK_GE(shard_id, 0);
+    CHECK_LT(shard_id, num_shards);
+    CHECK_LE(num_shards, rank_range.size());
+    const Range shard_range = BalancedSplitter(rank_range.size(), num_shards).At(shard_id);
+    range_ = Range(rank_range.begin() + shard_range.begin(),
+                   rank_range.begin() + shard_range.end());
+    std::vector<std::string> local_file_paths = GetLocalFilePaths();
+    shard_bytes_ = 0;
+    for (const auto& path : local_file_paths) { shard_bytes_ += DataFS()->GetFileSize(path); }
+    in_stream_.reset(
+        new PersistentInStream(DataFS(), local_file_paths, !shuffle_after_epoch_, false));
+  }
+  ~OFRecordDataset() = default;
 
-    for (int i = 0; i < data_part_num_; ++i) {
+  // Total size of the part files of this shard, used to weight the loaders of a data reader.
+  int64_t ShardBytes() const { return shard_bytes_; }
+
+  static std::vector<std::string> GetDataFilePaths(user_op::KernelInitContext* ctx) {
+    const int32_t data_part_num = ctx->Attr<int32_t>("data_part_num");
+    const std::string& data_dir = ctx->Attr<std::string>("data_dir");
+    const std::string& part_name_prefix = ctx->Attr<std::string>("part_name_prefix");
+    const int32_t part_name_suffix_length = ctx->Attr<int32_t>("part_name_suffix_length");
+    std::vector<std::string> data_file_paths;
+    for (int i = 0; i < data_part_num; ++i) {
       std::string num = std::to_string(i);
       int32_t zero_count =
           std::max(part_name_suffix_length - static_cast<int32_t>(num.length()), 0);
-      data_file_paths_.emplace_back(
+      data_file_paths.emplace_back(
           JoinPath(data_dir, part_name_prefix + std::string(zero_count, '0') + num));
     }
+    return data_file_paths;
+  }
 
+  // Number of part files read by this rank, which is the upper bound of num_shards.
+  static int32_t NumLocalParts(user_op::KernelInitContext* ctx) {
+    const int32_t data_part_num = ctx->Attr<int32_t>("data_part_num");
+    int32_t parallel_id = 0;
+    int32_t parallel_num = 1;
+    GetParallelIdAndNum(ctx, &parallel_id, &parallel_num);
+    CHECK_LE(parallel_num, data_part_num);
+    return BalancedSplitter(data_part_num, parallel_num).At(parallel_id).size();
+  }
+
+  BatchType Next() override {
+    BatchType batch;
+    batch.push_back(TensorBuffer());
+    ReadSample(batch.back());
+    return batch;
+  }
+
+ private:
+  static void GetParallelIdAndNum(user_op::KernelInitContext* ctx, int32_t* parallel_id,
+                                  int32_t* parallel_num) {
     bool is_local = false;
     // NOTE(zwx): OFRecordDataset is used by OFRecordDataReader and
     // OFRecordImageClassificationDataReader both, the latter has no attr nd_sbp,
@@ -67,29 +118,14 @@ class OFRecordDataset final : public Dataset<TensorBuffer> {
       if (nd_sbp_str_vec.empty()) { is_local = true; }
     }
     if (is_local) {
-      parallel_id_ = GlobalProcessCtx::Rank();
-      parallel_num_ = GlobalProcessCtx::WorldSize();
+      *parallel_id = GlobalProcessCtx::Rank();
+      *parallel_num = GlobalProcessCtx::WorldSize();
     } else {
-      parallel_id_ = ctx->parallel_ctx().parallel_id();
-      parallel_num_ = ctx->parallel_ctx().parallel_num();
+      *parallel_id = ctx->parallel_ctx().parallel_id();
+      *parallel_num = ctx->parallel_ctx().parallel_num();
     }
-    CHECK_LE(parallel_num_, data_part_num_);
-    BalancedSplitter bs(data_part_num_, parallel_num_);
-    range_ = bs.At(parallel_id_);
-    std::vector<std::string> local_file_paths = GetLocalFilePaths();
-    in_stream_.reset(
-        new PersistentInStream(DataFS(), local_file_paths, !shuffle_after_epoch_, false));
   }
-  ~OFRecordDataset() = default;
 
-  BatchType Next() override {
-    BatchType batch;
-    batch.push_back(TensorBuffer());
-    ReadSample(batch.back());
-    return batch;
-  }
-
- private:
   void ReadSample(TensorBuffer& tensor) {
     int64_t OFRecord_size = -1;
     char* size_ptr = reinterpret_cast<char*>(&OFRecord_size);
@@ -126,6 +162,7 @@ class OFRecordDataset final : public Dataset<TensorBuffer> {
   int32_t parallel_id_;
   int32_t parallel_num_;
   Range range_;
+  int64_t shard_bytes_;
   std::vector<std::string> data_file_paths_;
   std::unique_ptr<PersistentInStream> in_stream_;
 };
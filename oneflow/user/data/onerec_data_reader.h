@@ -30,37 +30,55 @@ class OneRecDataReader final : public DataReader<TensorBuffer> {
  public:
   OneRecDataReader(user_op::KernelInitContext* ctx) : DataReader<TensorBuffer>(ctx) {
     batch_size_ = ctx->TensorDesc4ArgNameAndIndex("out", 0)->shape().elem_cnt();
-    if (auto* pool = TensorBufferPool::TryGet()) { pool->IncreasePoolSizeByBase(batch_size_); }
+    // every loader reads a disjoint shard of the local files in its own thread
+    num_loaders_ = std::max(
+        std::min(ctx->Attr<int32_t>("num_loader_threads"), OneRecDataset::NumLocalFiles(ctx)), 1);
+    if (auto* pool = TensorBufferPool::TryGet()) {
+      pool->IncreasePoolSizeByBase(batch_size_ * num_loaders_);
+    }
     const auto random_shuffle = ctx->Attr<bool>("random_shuffle");
     parser_.reset(new OneRecParser());
-    if (random_shuffle) {
-      const auto mode = ctx->Attr<std::string>("shuffle_mode");
-      if (mode == "batch") {
-        loader_.reset(new OneRecDataset(ctx, batch_size_));
-        loader_.reset(new BatchRandomShuffleDataset<TensorBuffer>(ctx, std::move(loader_)));
-      } else if (mode == "instance") {
-        loader_.reset(new OneRecDataset(ctx, 1));
-        loader_.reset(new RandomShuffleDataset<TensorBuffer>(ctx, std::move(loader_)));
-        loader_.reset(new BatchDataset<TensorBuffer>(batch_size_, std::move(loader_)));
+    for (int32_t i = 0; i < num_loaders_; ++i) {
+      std::unique_ptr<Dataset<TensorBuffer>> loader;
+      OneRecDataset* dataset = nullptr;
+      if (random_shuffle) {
+        const auto mode = ctx->Attr<std::string>("shuffle_mode");
+        if (mode == "batch") {
+          dataset = new OneRecDataset(ctx, batch_size_, i, num_loaders_);
+          loader.reset(dataset);
+          loader.reset(new BatchRandomShuffleDataset<TensorBuffer>(ctx, std::move(loader), i));
+        } else if (mode == "instance") {
+          dataset = new OneRecDataset(ctx, 1, i, num_loaders_);
+          loader.reset(dataset);
+          loader.reset(new RandomShuffleDataset<TensorBuffer>(ctx, std::move(loader), i));
+          loader.reset(new BatchDataset<TensorBuffer>(batch_size_, std::move(loader)));
+        } else {
+          UNIMPLEMENTED();
+        }
       } else {
-        UNIMPLEMENTED();
+        dataset = new OneRecDataset(ctx, batch_size_, i, num_loaders_);
+        loader.reset(dataset);
       }
-    } else {
-      loader_.reset(new OneRecDataset(ctx, batch_size_));
+      loader_weights_.emplace_back(dataset->ShardBytes());
+      loaders_.emplace_back(std::move(loader));
     }
     StartLoadThread();
   }
 
   ~OneRecDataReader() override {
-    if (auto* pool = TensorBufferPool::TryGet()) { pool->DecreasePoolSizeByBase(batch_size_); }
+    if (auto* pool = TensorBufferPool::TryGet()) {
+      pool->DecreasePoolSizeByBase(batch_size_ * num_loaders_);
+    }
   }
 
  protected:
-  using DataReader<TensorBuffer>::loader_;
+  using DataReader<TensorBuffer>::loaders_;
+  using DataReader<TensorBuffer>::loader_weights_;
   using DataReader<TensorBuffer>::parser_;
 
  private:
   size_t batch_size_;
+  int32_t num_loaders_;
 };
 
 }  // namespace data
@@ -80,7 +80,12 @@ class OneRecDataset final : public Dataset<TensorBuffer> {
 
   OF_DISALLOW_COPY_AND_MOVE(OneRecDataset);
 
-  OneRecDataset(user_op::KernelInitContext* ctx, int32_t batch_size) : batch_size_(batch_size) {
+  OneRecDataset(user_op::KernelInitContext* ctx, int32_t batch_size)
+      : OneRecDataset(ctx, batch_size, 0, 1) {}
+
+  OneRecDataset(user_op::KernelInitContext* ctx, int32_t batch_size, int32_t shard_id,
+                int32_t num_shards)
+      : batch_size_(batch_size) {
     current_epoch_ = 0;
     shuffle_after_epoch_ = ctx->Attr<bool>("shuffle_after_epoch");
     data_file_paths_ = ctx->Attr<std::vector<std::string>>("files");
@@ -90,13 +95,33 @@ class OneRecDataset final : public Dataset<TensorBuffer> {
     parallel_id_ = rank;
     parallel_num_ = world_size;
     BalancedSplitter bs(data_file_paths_.size(), parallel_num_);
-    range_ = bs.At(parallel_id_);
+    const Range rank_range = bs.At(parallel_id_);
+    CHECK_GE(shard_id, 0);
+    CHECK_LT(shard_id, num_shards);
+    CHECK_LE(num_shards, rank_range.size());
+    const Range shard_range = BalancedSplitter(rank_range.size(), num_shards).At(shard_id);
+    range_ = Range(rank_range.begin() + shard_range.begin(),
+                   rank_range.begin() + shard_range.end());
     ResetInstream();
+    shard_bytes_ = 0;
+    for (const auto& path : GetLocalFilePaths()) { shard_bytes_ += DataFS()->GetFileSize(path); }
     hash_state_ = LZ4_XXH64_createState();
   }
 
   ~OneRecDataset() { CHECK_NE(LZ4_XXH64_freeState(hash_state_), XXH_ERROR); }
 
+  // Total size of the files of this shard, used to weight the loaders of a data reader.
+  int64_t ShardBytes() const { return shard_bytes_; }
+
+  // Number of files read by this rank, which is the upper bound of num_shards.
+  static int32_t NumLocalFiles(user_op::KernelInitContext* ctx) {
+    const size_t num_files = ctx->Attr<std::vector<std::string>>("files").size();
+    size_t world_size = 1;
+    int64_t rank = 0;
+    CHECK_JUST(InitDataSourceDistributedInfo(ctx, world_size, rank));
+    return BalancedSplitter(num_files, world_size).At(rank).size();
+  }
+
   BatchType Next() override {
     BatchType batch;
     batch.reserve(batch_size_);
@@ -166,6 +191,7 @@ class OneRecDataset final : public Dataset<TensorBuffer> {
   int32_t parallel_id_;
   int32_t parallel_num_;
   Range range_;
+  int64_t shard_bytes_;
   std::vector<std::string> data_file_paths_;
   std::unique_ptr<PersistentInStream> in_stream_;
   XXH64_state_t* hash_state_;
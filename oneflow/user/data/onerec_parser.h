@@ -37,16 +37,16 @@ class OneRecParser final : public Parser<TensorBuffer> {
   void Parse(BatchType& batch_data, user_op::KernelComputeContext* ctx) override {
     user_op::Tensor* out_tensor = ctx->Tensor4ArgNameAndIndex("out", 0);
     const bool verify_example = ctx->Attr<bool>("verify_example");
-    FOR_RANGE(size_t, i, 0, batch_data.size()) {
+    TensorBuffer* out = out_tensor->mut_dptr<TensorBuffer>();
+    MultiThreadLoop(batch_data.size(), [&](size_t i) {
       auto& sample = batch_data[i];
       if (verify_example) {
         flatbuffers::Verifier verifier(reinterpret_cast<const uint8_t*>(sample.data()),
                                        static_cast<size_t>(sample.elem_cnt()));
         CHECK(onerec::example::VerifyExampleBuffer(verifier));
       }
-      TensorBuffer* out = out_tensor->mut_dptr<TensorBuffer>() + i;
-      out->Swap(sample);
-    }
+      out[i].Swap(sample);
+    });
   }
 };
 
@@ -120,10 +120,17 @@ struct AllReduceImpl final {
 
 #define MAKE_ALL_REDUCE_ENTRY(func_name, T, reduce_type) func_name<T, reduce_type>::Call
 
+#define ALL_REDUCE_DATA_TYPE_SEQ \
+  POD_DATA_TYPE_SEQ            \
+  FLOAT16_DATA_TYPE_SEQ        \
+  BFLOAT16_DATA_TYPE_SEQ
+
 DEFINE_STATIC_SWITCH_FUNC(Maybe<void>, AllReduceImpl, MAKE_ALL_REDUCE_ENTRY,  // NOLINT
-                          MAKE_DATA_TYPE_CTRV_SEQ(POD_DATA_TYPE_SEQ),         // NOLINT
+                          MAKE_DATA_TYPE_CTRV_SEQ(ALL_REDUCE_DATA_TYPE_SEQ),  // NOLINT
                           REDUCE_TYPE_CTRV_SEQ);                              // NOLINT
 
+#undef ALL_REDUCE_DATA_TYPE_SEQ
+
 #undef MAKE_ALL_REDUCE_ENTRY
 
 }  // namespace
@@ -0,0 +1,98 @@
+/*
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+*/
+#include "oneflow/core/common/data_type.h"
+#include "oneflow/core/job/parallel_desc.h"
+#include "oneflow/core/job/rank_group.h"
+#include "oneflow/core/framework/transport_util.h"
+#include "oneflow/user/kernels/collective_communication/cpu/cpu_communication_context.h"
+#include "oneflow/user/kernels/collective_communication/include/all_to_all.h"
+
+namespace oneflow {
+
+namespace ccl {
+
+namespace {
+
+Maybe<void> AllToAllImpl(const void* in, void* out, size_t elem_cnt, DataType dtype,
+                         Symbol<ParallelDesc> parallel_desc) {
+  CHECK_OR_RETURN(in != out) << "in-place all_to_all is not supported";
+  int64_t parallel_num = parallel_desc->parallel_num();
+  const char* char_in = reinterpret_cast<const char*>(in);
+  char* char_out = reinterpret_cast<char*>(out);
+  size_t chunk_size = elem_cnt * GetSizeOfDataType(dtype);
+  const auto& opt_parallel_id = JUST(GetParallelId4CurrentProcessCtx(parallel_desc));
+  CHECK_OR_RETURN(opt_parallel_id->has_value()) << kOfBugIssueUploadPrompt;
+  int64_t parallel_id = JUST(*opt_parallel_id);
+  std::memcpy(&char_out[parallel_id * chunk_size], &char_in[parallel_id * chunk_size], chunk_size);
+  if (parallel_num == 1 || chunk_size == 0) { return Maybe<void>::Ok(); }
+  TransportToken transport_token = JUST(TransportToken::NewTransportToken(kTransportTokenTypeData));
+  // In the i-th step, every rank sends to the i-th next rank and receives from the i-th previous
+  // rank, so that each pair of ranks exchanges exactly one chunk in each direction.
+  for (int64_t i = 1; i < parallel_num; ++i) {
+    int64_t send_part_id = (parallel_id + i) % parallel_num;
+    const void* send_ptr = &char_in[send_part_id * chunk_size];
+    int64_t recv_part_id = (parallel_id - i + parallel_num) % parallel_num;
+    void* recv_ptr = &char_out[recv_part_id * chunk_size];
+    NaiveAsyncTransportCtx ctx(
+        transport_token,
+        [&](void** buffer, std::size_t* size, std::function<void()>* Cb) -> Maybe<void> {
+          *buffer = const_cast<void*>(send_ptr);
+          *size = chunk_size;
+          *Cb = [] {};
+          return Maybe<void>::Ok();
+        },
+        [&](void** buffer, std::size_t* size, std::function<void()>* Cb) -> Maybe<void> {
+          *buffer = recv_ptr;
+          *size = chunk_size;
+          *Cb = [] {};
+          return Maybe<void>::Ok();
+        });
+    JUST(TransportUtil::SendDataToRank(JUST(parallel_desc->MachineId4ParallelId(send_part_id)),
+                                       transport_token, &ctx));
+    JUST(TransportUtil::ReceiveDataFromRank(
+        JUST(parallel_desc->MachineId4ParallelId(recv_part_id)), transport_token, &ctx));
+    JUST(ctx.WaitDone());
+  }
+  return Maybe<void>::Ok();
+}
+
+}  // namespace
+
+class CpuAllToAll final : public AllToAll {
+ public:
+  OF_DISALLOW_COPY_AND_MOVE(CpuAllToAll);
+  CpuAllToAll() : datatype_(kInvalidDataType) {}
+  ~CpuAllToAll() = default;
+
+  void Init(DataType datatype) override { this->datatype_ = datatype; }
+
+  void Launch(ep::Stream* stream, const void* in, void* out, size_t elem_cnt,
+              const std::shared_ptr<CommunicationContext>& communication_ctx) const override {
+    const auto& cpu_communication_ctx =
+        std::dynamic_pointer_cast<CpuCommunicationContext>(communication_ctx);
+    CHECK(cpu_communication_ctx);
+    CHECK_JUST(AllToAllImpl(in, out, elem_cnt, datatype_, cpu_communication_ctx->parallel_desc()));
+  }
+
+ private:
+  DataType datatype_;
+};
+
+REGISTER_COLLECTIVE_COMMUNICATION(DeviceType::kCPU, AllToAll, CpuAllToAll);
+
+}  // namespace ccl
+
+}  // namespace oneflow
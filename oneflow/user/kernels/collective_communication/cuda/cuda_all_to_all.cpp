@@ -0,0 +1,72 @@
+/*
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+*/
+#ifdef WITH_CUDA
+#include "oneflow/core/common/data_type.h"
+#include "oneflow/user/kernels/collective_communication/include/all_to_all.h"
+#include "oneflow/user/kernels/collective_communication/cuda/cuda_communication_context.h"
+#include "oneflow/core/device/nccl_util.h"
+
+namespace oneflow {
+
+namespace ccl {
+
+class CudaAllToAll final : public AllToAll {
+ public:
+  OF_DISALLOW_COPY_AND_MOVE(CudaAllToAll);
+  CudaAllToAll() : nccl_datatype_(), size_of_dtype_(0) {}
+  ~CudaAllToAll() = default;
+
+  void Init(DataType datatype) override {
+    this->nccl_datatype_ = GetNcclDataType(datatype);
+    this->size_of_dtype_ = GetSizeOfDataType(datatype);
+  }
+
+  void Launch(ep::Stream* stream, const void* in, void* out, size_t elem_cnt,
+              const std::shared_ptr<CommunicationContext>& communication_ctx) const override {
+#if HAS_NCCL_SEND_RECV
+    const auto& cuda_communication_ctx =
+        std::dynamic_pointer_cast<CudaCommunicationContext>(communication_ctx);
+    CHECK(cuda_communication_ctx) << kOfBugIssueUploadPrompt;
+    ncclComm_t comm = cuda_communication_ctx->nccl_comm();
+    cudaStream_t cuda_stream = stream->As<ep::CudaStream>()->cuda_stream();
+    int num_ranks = 0;
+    OF_NCCL_CHECK(ncclCommCount(comm, &num_ranks));
+    const size_t chunk_size = elem_cnt * size_of_dtype_;
+    OF_NCCL_CHECK(ncclGroupStart());
+    for (int peer = 0; peer < num_ranks; ++peer) {
+      OF_NCCL_CHECK(ncclSend(reinterpret_cast<const char*>(in) + peer * chunk_size, elem_cnt,
+                             nccl_datatype_, peer, comm, cuda_stream));
+      OF_NCCL_CHECK(ncclRecv(reinterpret_cast<char*>(out) + peer * chunk_size, elem_cnt,
+                             nccl_datatype_, peer, comm, cuda_stream));
+    }
+    OF_NCCL_CHECK(ncclGroupEnd());
+#else
+    UNIMPLEMENTED() << "GPU all_to_all is only supported when nccl version >= 2.7";
+#endif  // HAS_NCCL_SEND_RECV
+  }
+
+ private:
+  ncclDataType_t nccl_datatype_;
+  size_t size_of_dtype_;
+};
+
+REGISTER_COLLECTIVE_COMMUNICATION(DeviceType::kCUDA, AllToAll, CudaAllToAll);
+
+}  // namespace ccl
+
+}  // namespace oneflow
+
+#endif  // WITH_CUDA
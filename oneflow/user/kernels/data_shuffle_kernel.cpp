@@ -0,0 +1,324 @@
+/*
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+*/
+#include "oneflow/core/framework/framework.h"
+#include "oneflow/core/ep/cpu/cpu_stream.h"
+#include "oneflow/core/embedding/embedding_manager.h"
+
+namespace oneflow {
+
+namespace {
+
+class DataShuffleKernelState final : public user_op::OpKernelState {
+ public:
+  explicit DataShuffleKernelState(user_op::KernelInitContext* ctx) {
+    CHECK_EQ(ctx->parallel_ctx().parallel_num(), 1)
+        << "one_embedding on cpu only supports a single rank";
+    const std::string& embedding_name = ctx->Attr<std::string>("embedding_name");
+    const int64_t parallel_id = ctx->parallel_ctx().parallel_id();
+    embedding_state_ = Singleton<embedding::EmbeddingManager>::Get()->GetEmbeddingState(
+        embedding_name, parallel_id);
+  }
+  ~DataShuffleKernelState() override = default;
+
+  embedding::EmbeddingState* EmbeddingState() { return embedding_state_; }
+
+ private:
+  embedding::EmbeddingState* embedding_state_;
+};
+
+template<typename K, typename V, typename IDX>
+IDX UniqueKeysAndValues(int64_t num_keys, const K* keys, const V* values, int32_t num_tables,
+                        K* unique_keys, V* unique_values, IDX* inverse_indices) {
+  // Keys keep the order of their first occurrence, values follow their first key.
+  HashMap<K, IDX> key_to_index;
+  key_to_index.reserve(num_keys);
+  IDX num_unique = 0;
+  for (int64_t i = 0; i < num_keys; ++i) {
+    auto it = key_to_index.emplace(keys[i], num_unique);
+    if (it.second) {
+      unique_keys[num_unique] = keys[i];
+      if (values != nullptr) {
+        unique_values[num_unique] = values[i];
+      } else if (num_tables > 1) {
+        unique_values[num_unique] = static_cast<V>(i % num_tables);
+      } else {
+        unique_values[num_unique] = 0;
+      }
+      num_unique += 1;
+    }
+    inverse_indices[i] = it.first->second;
+  }
+  return num_unique;
+}
+
+template<typename K, typename U, typename IDX>
+class IdShuffleKernel final : public user_op::OpKernel {
+ public:
+  IdShuffleKernel() : current_iter_(0){};
+  ~IdShuffleKernel() override = default;
+
+  std::shared_ptr<user_op::OpKernelState> CreateOpKernelState(
+      user_op::KernelInitContext* ctx) const override {
+    return std::make_shared<DataShuffleKernelState>(ctx);
+  }
+
+ private:
+  using user_op::OpKernel::Compute;
+  void Compute(user_op::KernelComputeContext* ctx, user_op::OpKernelState* state,
+               const user_op::OpKernelCache*) const override {
+    auto* kernel_state = dynamic_cast<DataShuffleKernelState*>(state);
+    CHECK(kernel_state != nullptr);
+    const user_op::Tensor* ids = ctx->Tensor4ArgNameAndIndex("ids", 0);
+    user_op::Tensor* num_unique_matrix = ctx->Tensor4ArgNameAndIndex("num_unique_matrix", 0);
+    user_op::Tensor* inverse_unique_partition_indices =
+        ctx->Tensor4ArgNameAndIndex("inverse_unique_partition_indices", 0);
+    user_op::Tensor* cur_rank_num_unique = ctx->Tensor4ArgNameAndIndex("cur_rank_num_unique", 0);
+    user_op::Tensor* cur_rank_unique_ids = ctx->Tensor4ArgNameAndIndex("cur_rank_unique_ids", 0);
+    user_op::Tensor* cur_rank_unique_table_ids =
+        ctx->Tensor4ArgNameAndIndex("cur_rank_unique_table_ids", 0);
+    user_op::Tensor* cur_rank_inverse_indices =
+        ctx->Tensor4ArgNameAndIndex("cur_rank_inverse_indices", 0);
+    const int32_t num_tables = ctx->Attr<int32_t>("num_tables");
+    const bool has_table_ids = ctx->has_input("table_ids", 0);
+    const int64_t num_ids = ids->shape_view().elem_cnt();
+    const U* table_ids_ptr = nullptr;
+    if (has_table_ids) {
+      const user_op::Tensor* table_ids = ctx->Tensor4ArgNameAndIndex("table_ids", 0);
+      table_ids_ptr = table_ids->dptr<U>();
+    }
+    // With a single rank every unique id stays on the current rank, so the second unique pass
+    // of the cuda kernel reduces to an identity mapping.
+    const IDX num_unique = UniqueKeysAndValues<K, U, IDX>(
+        num_ids, ids->dptr<K>(), table_ids_ptr, num_tables, cur_rank_unique_ids->mut_dptr<K>(),
+        cur_rank_unique_table_ids->mut_dptr<U>(),
+        inverse_unique_partition_indices->mut_dptr<IDX>());
+    IDX* cur_rank_inverse_indices_ptr = cur_rank_inverse_indices->mut_dptr<IDX>();
+    for (IDX i = 0; i < num_unique; ++i) { cur_rank_inverse_indices_ptr[i] = i; }
+    *num_unique_matrix->mut_dptr<IDX>() = num_unique;
+    *cur_rank_num_unique->mut_dptr<IDX>() = num_unique;
+    embedding::EmbeddingState* embedding_state = kernel_state->EmbeddingState();
+    std::vector<uint32_t> num_unique_matrix_vec(1, static_cast<uint32_t>(num_unique));
+    embedding_state->SetIdNumUniqueMatrix(num_unique_matrix_vec, current_iter_);
+    embedding_state->SetIdFinalNumUnique(static_cast<uint32_t>(num_unique), current_iter_);
+    current_iter_++;
+  }
+  bool AlwaysComputeWhenAllOutputsEmpty() const override { return false; }
+  mutable int64_t current_iter_;
+};
+
+#define ID_DATA_TYPE_SEQ                            \
+  OF_PP_MAKE_TUPLE_SEQ(uint32_t, DataType::kUInt32) \
+  OF_PP_MAKE_TUPLE_SEQ(uint64_t, DataType::kUInt64) \
+  OF_PP_MAKE_TUPLE_SEQ(int32_t, DataType::kInt32)   \
+  OF_PP_MAKE_TUPLE_SEQ(int64_t, DataType::kInt64)
+
+#define TABLE_ID_DATA_TYPE_SEQ                      \
+  OF_PP_MAKE_TUPLE_SEQ(uint8_t, DataType::kUInt8)   \
+  OF_PP_MAKE_TUPLE_SEQ(uint32_t, DataType::kUInt32) \
+  OF_PP_MAKE_TUPLE_SEQ(uint64_t, DataType::kUInt64) \
+  OF_PP_MAKE_TUPLE_SEQ(int8_t, DataType::kInt8)     \
+  OF_PP_MAKE_TUPLE_SEQ(int32_t, DataType::kInt32)   \
+  OF_PP_MAKE_TUPLE_SEQ(int64_t, DataType::kInt64)
+
+#define IDX_DATA_TYPE_SEQ                           \
+  OF_PP_MAKE_TUPLE_SEQ(uint32_t, DataType::kUInt32) \
+  OF_PP_MAKE_TUPLE_SEQ(int32_t, DataType::kInt32)
+
+#define REGISTER_CPU_ID_SHUFFLE_KERNEL(k_dtype_pair, table_id_dtype_pair, idx_dtype_pair)        \
+  REGISTER_USER_KERNEL("id_shuffle")                                                             \
+      .SetCreateFn<                                                                              \
+          IdShuffleKernel<OF_PP_PAIR_FIRST(k_dtype_pair), OF_PP_PAIR_FIRST(table_id_dtype_pair), \
+                          OF_PP_PAIR_FIRST(idx_dtype_pair)>>()                                   \
+      .SetIsMatchedHob(                                                                          \
+          (user_op::HobDeviceType() == DeviceType::kCPU)                                         \
+          && (user_op::HobDataType("ids", 0) == OF_PP_PAIR_SECOND(k_dtype_pair))                 \
+          && (user_op::HobDataType("cur_rank_unique_table_ids", 0)                               \
+              == OF_PP_PAIR_SECOND(table_id_dtype_pair))                                         \
+          && (user_op::HobDataType("num_unique_matrix", 0) == OF_PP_PAIR_SECOND(idx_dtype_pair)));
+
+OF_PP_SEQ_PRODUCT_FOR_EACH_TUPLE(REGISTER_CPU_ID_SHUFFLE_KERNEL, ID_DATA_TYPE_SEQ,
+                                 TABLE_ID_DATA_TYPE_SEQ, IDX_DATA_TYPE_SEQ)
+
+template<typename T, typename IDX>
+class EmbeddingShuffleKernel final : public user_op::OpKernel {
+ public:
+  EmbeddingShuffleKernel() : current_iter_(0) {}
+  ~EmbeddingShuffleKernel() override = default;
+
+  std::shared_ptr<user_op::OpKernelState> CreateOpKernelState(
+      user_op::KernelInitContext* ctx) const override {
+    return std::make_shared<DataShuffleKernelState>(ctx);
+  }
+
+ private:
+  using user_op::OpKernel::Compute;
+  void Compute(user_op::KernelComputeContext* ctx, user_op::OpKernelState* state,
+               const user_op::OpKernelCache*) const override {
+    auto* kernel_state = dynamic_cast<DataShuffleKernelState*>(state);
+    CHECK(kernel_state != nullptr);
+    embedding::EmbeddingState* embedding_state = kernel_state->EmbeddingState();
+    embedding_state->OnEmbeddingShuffleStart(ctx, current_iter_);
+    const user_op::Tensor* cur_rank_inverse_indices =
+        ctx->Tensor4ArgNameAndIndex("cur_rank_inverse_indices", 0);
+    const user_op::Tensor* inverse_unique_partition_indices =
+        ctx->Tensor4ArgNameAndIndex("inverse_unique_partition_indices", 0);
+    user_op::Tensor* embeddings = ctx->Tensor4ArgNameAndIndex("embeddings", 0);
+    const int64_t embedding_size = ctx->Attr<int64_t>("embedding_size");
+    const int64_t num_ids = inverse_unique_partition_indices->shape_view().elem_cnt();
+    const IDX* cur_rank_inverse_indices_ptr = cur_rank_inverse_indices->dptr<IDX>();
+    const IDX* inverse_unique_partition_indices_ptr =
+        inverse_unique_partition_indices->dptr<IDX>();
+    const T* cur_rank_embeddings_ptr = reinterpret_cast<const T*>(
+        embedding_state->EmbeddingShuffleCurRankEmbeddings(current_iter_));
+    T* embeddings_ptr = embeddings->mut_dptr<T>();
+    ctx->stream()->As<ep::CpuStream>()->ParallelFor(0, num_ids, [&](int64_t begin, int64_t end) {
+      for (int64_t i = begin; i < end; ++i) {
+        const IDX row = cur_rank_inverse_indices_ptr[inverse_unique_partition_indices_ptr[i]];
+        std::copy(cur_rank_embeddings_ptr + row * embedding_size,
+                  cur_rank_embeddings_ptr + (row + 1) * embedding_size,
+                  embeddings_ptr + i * embedding_size);
+      }
+    });
+    embedding_state->OnEmbeddingShuffleEnd(ctx, current_iter_);
+    current_iter_++;
+  }
+  bool AlwaysComputeWhenAllOutputsEmpty() const override { return false; }
+  mutable int64_t current_iter_;
+};
+
+#define REGISTER_CPU_EMBEDDING_SHUFFLE_KERNEL(t_dtype_pair, idx_dtype_pair)                       \
+  REGISTER_USER_KERNEL("embedding_shuffle")                                                       \
+      .SetCreateFn<EmbeddingShuffleKernel<OF_PP_PAIR_FIRST(t_dtype_pair),                         \
+                                          OF_PP_PAIR_FIRST(idx_dtype_pair)>>()                    \
+      .SetIsMatchedHob(                                                                           \
+          (user_op::HobDeviceType() == DeviceType::kCPU)                                          \
+          && (user_op::HobDataType("cur_rank_embeddings", 0) == OF_PP_PAIR_SECOND(t_dtype_pair))  \
+          && (user_op::HobAttr<bool>("skip_last_gather") == false)                                \
+          && (user_op::HobDataType("num_unique_matrix", 0) == OF_PP_PAIR_SECOND(idx_dtype_pair)));
+
+OF_PP_SEQ_PRODUCT_FOR_EACH_TUPLE(REGISTER_CPU_EMBEDDING_SHUFFLE_KERNEL, FLOATING_DATA_TYPE_SEQ,
+                                 IDX_DATA_TYPE_SEQ)
+
+template<typename T, typename IDX>
+class EmbeddingGradientShuffleKernel final : public user_op::OpKernel {
+ public:
+  EmbeddingGradientShuffleKernel() : current_iter_(0){};
+  ~EmbeddingGradientShuffleKernel() override = default;
+
+  std::shared_ptr<user_op::OpKernelState> CreateOpKernelState(
+      user_op::KernelInitContext* ctx) const override {
+    return std::make_shared<DataShuffleKernelState>(ctx);
+  }
+
+ private:
+  using user_op::OpKernel::Compute;
+  void Compute(user_op::KernelComputeContext* ctx, user_op::OpKernelState* state,
+               const user_op::OpKernelCache*) const override {
+    auto* kernel_state = dynamic_cast<DataShuffleKernelState*>(state);
+    CHECK(kernel_state != nullptr);
+    const user_op::Tensor* embedding_grad = ctx->Tensor4ArgNameAndIndex("embedding_grad", 0);
+    const user_op::Tensor* cur_rank_inverse_indices =
+        ctx->Tensor4ArgNameAndIndex("cur_rank_inverse_indices", 0);
+    const user_op::Tensor* inverse_unique_partition_indices =
+        ctx->Tensor4ArgNameAndIndex("inverse_unique_partition_indices", 0);
+    user_op::Tensor* cur_rank_unique_embedding_grad =
+        ctx->Tensor4ArgNameAndIndex("cur_rank_unique_embedding_grad", 0);
+    const int64_t embedding_size = ctx->Attr<int64_t>("embedding_size");
+    const bool only_zero_valid_grad = ctx->Attr<bool>("only_zero_valid_grad");
+    const int64_t num_ids = inverse_unique_partition_indices->shape_view().elem_cnt();
+    embedding::EmbeddingState* embedding_state = kernel_state->EmbeddingState();
+    const uint32_t num_unique = embedding_state->GetIdNumUnique(current_iter_);
+    T* grad_ptr = cur_rank_unique_embedding_grad->mut_dptr<T>();
+    const int64_t zero_elem_cnt = only_zero_valid_grad
+                                      ? num_unique * embedding_size
+                                      : cur_rank_unique_embedding_grad->shape_view().elem_cnt();
+    std::fill(grad_ptr, grad_ptr + zero_elem_cnt, static_cast<T>(0));
+    const IDX* cur_rank_inverse_indices_ptr = cur_rank_inverse_indices->dptr<IDX>();
+    const IDX* inverse_unique_partition_indices_ptr =
+        inverse_unique_partition_indices->dptr<IDX>();
+    const T* embedding_grad_ptr = embedding_grad->dptr<T>();
+    // Rows of duplicated ids accumulate into the same unique row, so this loop stays serial.
+    for (int64_t i = 0; i < num_ids; ++i) {
+      const IDX row = cur_rank_inverse_indices_ptr[inverse_unique_partition_indices_ptr[i]];
+      T* out = grad_ptr + row * embedding_size;
+      const T* in = embedding_grad_ptr + i * embedding_size;
+      for (int64_t j = 0; j < embedding_size; ++j) { out[j] += in[j]; }
+    }
+    current_iter_++;
+  }
+  bool AlwaysComputeWhenAllOutputsEmpty() const override { return false; }
+  mutable int64_t current_iter_;
+};
+
+#define REGISTER_CPU_EMBEDDING_GRADIENT_SHUFFLE_KERNEL(t_dtype_pair, idx_dtype_pair)              \
+  REGISTER_USER_KERNEL("embedding_gradient_shuffle")                                              \
+      .SetCreateFn<EmbeddingGradientShuffleKernel<OF_PP_PAIR_FIRST(t_dtype_pair),                 \
+                                                  OF_PP_PAIR_FIRST(idx_dtype_pair)>>()            \
+      .SetIsMatchedHob(                                                                           \
+          (user_op::HobDeviceType() == DeviceType::kCPU)                                          \
+          && (user_op::HobDataType("embedding_grad", 0) == OF_PP_PAIR_SECOND(t_dtype_pair))       \
+          && (user_op::HobAttr<bool>("skip_first_scatter") == false)                              \
+          && (user_op::HobDataType("num_unique_matrix", 0) == OF_PP_PAIR_SECOND(idx_dtype_pair)));
+
+OF_PP_SEQ_PRODUCT_FOR_EACH_TUPLE(REGISTER_CPU_EMBEDDING_GRADIENT_SHUFFLE_KERNEL,
+                                 FLOATING_DATA_TYPE_SEQ, IDX_DATA_TYPE_SEQ)
+
+template<typename K, typename V, typename IDX>
+class UniqueKeyValuePairKernel final : public user_op::OpKernel {
+ public:
+  UniqueKeyValuePairKernel() = default;
+  ~UniqueKeyValuePairKernel() override = default;
+
+ private:
+  using user_op::OpKernel::Compute;
+
+  void Compute(user_op::KernelComputeContext* ctx) const override {
+    const user_op::Tensor* keys = ctx->Tensor4ArgNameAndIndex("keys", 0);
+    user_op::Tensor* num_unique = ctx->Tensor4ArgNameAndIndex("num_unique", 0);
+    user_op::Tensor* unique_keys = ctx->Tensor4ArgNameAndIndex("unique_keys", 0);
+    user_op::Tensor* unique_values = ctx->Tensor4ArgNameAndIndex("unique_values", 0);
+    user_op::Tensor* inverse_indices = ctx->Tensor4ArgNameAndIndex("inverse_indices", 0);
+    const int32_t num_tables = ctx->Attr<int32_t>("num_tables");
+    const bool has_values = ctx->has_input("values", 0);
+    const V* values_ptr = nullptr;
+    if (has_values) {
+      const user_op::Tensor* values = ctx->Tensor4ArgNameAndIndex("values", 0);
+      values_ptr = values->dptr<V>();
+    }
+    *num_unique->mut_dptr<IDX>() = UniqueKeysAndValues<K, V, IDX>(
+        keys->shape_view().elem_cnt(), keys->dptr<K>(), values_ptr, num_tables,
+        unique_keys->mut_dptr<K>(), unique_values->mut_dptr<V>(), inverse_indices->mut_dptr<IDX>());
+  }
+  bool AlwaysComputeWhenAllOutputsEmpty() const override { return false; }
+};
+
+#define REGISTER_CPU_UNIQUE_KEY_VALUE_PAIR_KERNEL(k_dtype_pair, value_dtype_pair, idx_dtype_pair) \
+  REGISTER_USER_KERNEL("unique_key_value_pair")                                                   \
+      .SetCreateFn<UniqueKeyValuePairKernel<OF_PP_PAIR_FIRST(k_dtype_pair),                       \
+                                            OF_PP_PAIR_FIRST(value_dtype_pair),                   \
+                                            OF_PP_PAIR_FIRST(idx_dtype_pair)>>()                  \
+      .SetIsMatchedHob(                                                                           \
+          (user_op::HobDeviceType() == DeviceType::kCPU)                                          \
+          && (user_op::HobDataType("keys", 0) == OF_PP_PAIR_SECOND(k_dtype_pair))                 \
+          && (user_op::HobDataType("inverse_indices", 0) == OF_PP_PAIR_SECOND(idx_dtype_pair))    \
+          && (user_op::HobDataType("unique_values", 0) == OF_PP_PAIR_SECOND(value_dtype_pair)));
+
+OF_PP_SEQ_PRODUCT_FOR_EACH_TUPLE(REGISTER_CPU_UNIQUE_KEY_VALUE_PAIR_KERNEL, ID_DATA_TYPE_SEQ,
+                                 ID_DATA_TYPE_SEQ, IDX_DATA_TYPE_SEQ)
+
+}  // namespace
+
+}  // namespace oneflow
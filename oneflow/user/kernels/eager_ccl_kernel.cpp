@@ -18,6 +18,7 @@ limitations under the License.
 #include "oneflow/user/kernels/collective_communication/include/all_reduce.h"
 #include "oneflow/user/kernels/collective_communication/include/reduce_scatter.h"
 #include "oneflow/user/kernels/collective_communication/include/all_gather.h"
+#include "oneflow/user/kernels/collective_communication/include/all_to_all.h"
 #include "oneflow/user/kernels/collective_communication/include/reduce.h"
 #include "oneflow/user/kernels/collective_communication/include/broadcast.h"
 #include "oneflow/core/framework/framework.h"
@@ -53,6 +54,15 @@ auto AllGatherCollectiveCommunicationExists() {
                           });
 }
 
+auto AllToAllCollectiveCommunicationExists() {
+  return hob::make_custom("AllToAllCollectiveCommunicationExists",
+                          [=](const user_op::KernelRegContext& ctx) {
+                            DeviceType device_type = ctx.device_type();
+                            return ccl::IsCommunicationContextRegistered(device_type)
+                                   && ccl::IsAllToAllRegistered(device_type);
+                          });
+}
+
 auto ReduceCollectiveCommunicationExists() {
   return hob::make_custom("ReduceCollectiveCommunicationExists",
                           [=](const user_op::KernelRegContext& ctx) {
@@ -206,6 +216,41 @@ REGISTER_USER_KERNEL("eager_ccl_all_gather")
     .SetCreateFn<EagerCclAllGatherKernel>()
     .SetIsMatchedHob(AllGatherCollectiveCommunicationExists());
 
+class EagerCclAllToAllKernel final : public user_op::OpKernel {
+ public:
+  EagerCclAllToAllKernel() = default;
+  ~EagerCclAllToAllKernel() override = default;
+
+  void InitOpKernelCacheWithFlags(
+      user_op::KernelCacheContext* ctx, int8_t flag,
+      std::shared_ptr<user_op::OpKernelCache>* cache_ptr) const override {
+    InitEagerCclOpKernelCache(ctx, cache_ptr);
+  }
+
+ private:
+  using user_op::OpKernel::Compute;
+  void Compute(user_op::KernelComputeContext* ctx, user_op::OpKernelState*,
+               const user_op::OpKernelCache* cache) const override {
+    auto* kernel_cache = dynamic_cast<const EagerCclOpKernelCache*>(cache);
+    CHECK(kernel_cache != nullptr);
+    const user_op::Tensor* in = ctx->Tensor4ArgNameAndIndex("in", 0);
+    user_op::Tensor* out = ctx->Tensor4ArgNameAndIndex("out", 0);
+    CHECK_EQ(in->shape_view(), out->shape_view()) << kOfBugIssueUploadPrompt;
+    CHECK_EQ(in->data_type(), out->data_type()) << kOfBugIssueUploadPrompt;
+    const int64_t num_chunks = in->shape_view().At(0);
+    CHECK_GT(num_chunks, 0);
+    std::unique_ptr<ccl::AllToAll> all_to_all =
+        ccl::NewCollectiveCommunication<ccl::AllToAll>(ctx->device_type(), in->data_type());
+    all_to_all->Launch(ctx->stream(), in->dptr(), out->mut_dptr(),
+                       in->shape_view().elem_cnt() / num_chunks, kernel_cache->communication_ctx());
+  };
+  bool AlwaysComputeWhenAllOutputsEmpty() const override { return false; }
+};
+
+REGISTER_USER_KERNEL("eager_ccl_all_to_all")
+    .SetCreateFn<EagerCclAllToAllKernel>()
+    .SetIsMatchedHob(AllToAllCollectiveCommunicationExists());
+
 class EagerCclReduceKernel final : public user_op::OpKernel {
  public:
   EagerCclReduceKernel() = default;
@@ -0,0 +1,113 @@
+/*
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+*/
+#include "oneflow/core/framework/framework.h"
+#include "oneflow/core/ep/include/primitive/matmul.h"
+#include "oneflow/core/ep/cpu/cpu_stream.h"
+
+namespace oneflow {
+
+namespace {
+
+// Each ParallelFor task processes about this many elements.
+constexpr int64_t kParallelGrainElemCnt = 32768;
+
+template<typename Context>
+std::unique_ptr<ep::primitive::Matmul> NewMatmulPrimitive(Context* ctx) {
+  const DataType data_type = ctx->TensorDesc4ArgNameAndIndex("x", 0)->data_type();
+  return ep::primitive::NewPrimitive<ep::primitive::MatmulFactory>(
+      ctx->device_type(), data_type, ep::primitive::BlasTransposeType::N,
+      ep::primitive::BlasTransposeType::T);
+}
+
+auto MatmulPrimitiveExists() {
+  return hob::make_custom("MatmulPrimitiveExists", [](const user_op::KernelRegContext& ctx) {
+    return NewMatmulPrimitive(&ctx).operator bool();
+  });
+}
+
+template<typename T>
+class FusedCrossFeatureInteractionCpuKernel final : public user_op::OpKernel {
+ public:
+  FusedCrossFeatureInteractionCpuKernel() = default;
+  ~FusedCrossFeatureInteractionCpuKernel() override = default;
+  bool AlwaysComputeWhenAllOutputsEmpty() const override { return false; }
+
+ private:
+  using user_op::OpKernel::Compute;
+  void Compute(user_op::KernelComputeContext* ctx) const override {
+    // See fused_cross_feature_interaction.cu for the v1 ("vector") and v2 ("matrix") formulas,
+    // the bias add, x0 multiply and residual add are fused into one pass over each row.
+    const user_op::Tensor* x = ctx->Tensor4ArgNameAndIndex("x", 0);
+    const user_op::Tensor* weight = ctx->Tensor4ArgNameAndIndex("weight", 0);
+    const user_op::Tensor* x0 = ctx->Tensor4ArgNameAndIndex("x0", 0);
+    const user_op::Tensor* bias = ctx->Tensor4ArgNameAndIndex("bias", 0);
+    user_op::Tensor* out = ctx->Tensor4ArgNameAndIndex("out", 0);
+    user_op::Tensor* matmul_result = ctx->Tensor4ArgNameAndIndex("matmul_result", 0);
+    const bool is_vector_mode = ctx->Attr<std::string>("interaction_mode") == "vector";
+
+    CHECK_EQ(out->shape_view().NumAxes(), 2);
+    const int64_t rows = x->shape_view().At(0);
+    const int64_t in_size = x->shape_view().At(1);
+    const int64_t matmul_cols = weight->shape_view().At(0);
+    const int64_t cols = out->shape_view().At(1);
+    auto matmul = NewMatmulPrimitive(ctx);
+    CHECK(matmul);
+    matmul->Launch(ctx->stream(), rows, matmul_cols, in_size, 1.0, x->dptr(), weight->dptr(), 0.0,
+                   matmul_result->mut_dptr());
+
+    const T* matmul_result_ptr = matmul_result->dptr<T>();
+    const T* x_ptr = x->dptr<T>();
+    const T* x0_ptr = x0->dptr<T>();
+    const T* bias_ptr = bias->dptr<T>();
+    T* out_ptr = out->mut_dptr<T>();
+    ctx->stream()->As<ep::CpuStream>()->ParallelFor(
+        0, rows,
+        [&](int64_t begin, int64_t end) {
+          for (int64_t row = begin; row < end; ++row) {
+            const int64_t row_offset = row * cols;
+            const T* row_x = x_ptr + row_offset;
+            const T* row_x0 = x0_ptr + row_offset;
+            T* row_out = out_ptr + row_offset;
+            if (is_vector_mode) {
+              const T scale = matmul_result_ptr[row];
+              for (int64_t col = 0; col < cols; ++col) {
+                row_out[col] = row_x0[col] * scale + bias_ptr[col] + row_x[col];
+              }
+            } else {
+              const T* row_matmul_result = matmul_result_ptr + row_offset;
+              for (int64_t col = 0; col < cols; ++col) {
+                row_out[col] = (row_matmul_result[col] + bias_ptr[col]) * row_x0[col] + row_x[col];
+              }
+            }
+          }
+        },
+        std::max<int64_t>(kParallelGrainElemCnt / std::max<int64_t>(cols, 1), 1));
+  }
+};
+
+#define REGISTER_FUSED_CROSS_FEATURE_INTERACTION_CPU_KERNEL(dtype)                    \
+  REGISTER_USER_KERNEL("fused_cross_feature_interaction")                             \
+      .SetCreateFn<FusedCrossFeatureInteractionCpuKernel<dtype>>()                    \
+      .SetIsMatchedHob((user_op::HobDeviceType() == DeviceType::kCPU)                 \
+                       && (user_op::HobDataType("x", 0) == GetDataType<dtype>::value) \
+                       && MatmulPrimitiveExists());
+
+REGISTER_FUSED_CROSS_FEATURE_INTERACTION_CPU_KERNEL(float)
+REGISTER_FUSED_CROSS_FEATURE_INTERACTION_CPU_KERNEL(double)
+
+}  // namespace
+
+}  // namespace oneflow
@@ -0,0 +1,224 @@
+/*
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+*/
+#include "oneflow/core/framework/framework.h"
+#include "oneflow/core/ep/include/primitive/matmul.h"
+#include "oneflow/core/ep/cpu/cpu_stream.h"
+
+namespace oneflow {
+
+namespace {
+
+// Each ParallelFor task processes about this many elements.
+constexpr int64_t kParallelGrainElemCnt = 32768;
+
+int64_t GetGrainSize(int64_t elem_cnt_per_index) {
+  return std::max<int64_t>(kParallelGrainElemCnt / std::max<int64_t>(elem_cnt_per_index, 1), 1);
+}
+
+template<typename Context>
+std::unique_ptr<ep::primitive::Matmul> NewMatmulPrimitive(Context* ctx, bool transpose_a) {
+  const DataType data_type = ctx->TensorDesc4ArgNameAndIndex("dy", 0)->data_type();
+  return ep::primitive::NewPrimitive<ep::primitive::MatmulFactory>(
+      ctx->device_type(), data_type,
+      transpose_a ? ep::primitive::BlasTransposeType::T : ep::primitive::BlasTransposeType::N,
+      ep::primitive::BlasTransposeType::N);
+}
+
+auto MatmulPrimitivesExist() {
+  return hob::make_custom("MatmulPrimitivesExist", [](const user_op::KernelRegContext& ctx) {
+    return NewMatmulPrimitive(&ctx, /*transpose_a=*/false).operator bool()
+           && NewMatmulPrimitive(&ctx, /*transpose_a=*/true).operator bool();
+  });
+}
+
+template<typename T>
+void ColumnSum(ep::CpuStream* stream, int64_t rows, int64_t cols, const T* in, T* out) {
+  stream->ParallelFor(
+      0, cols,
+      [&](int64_t begin, int64_t end) {
+        std::fill(out + begin, out + end, static_cast<T>(0));
+        for (int64_t row = 0; row < rows; ++row) {
+          const T* row_in = in + row * cols;
+          for (int64_t col = begin; col < end; ++col) { out[col] += row_in[col]; }
+        }
+      },
+      GetGrainSize(rows));
+}
+
+template<typename T>
+class FusedCrossFeatureInteractionV1GradCpuKernel final : public user_op::OpKernel {
+ public:
+  FusedCrossFeatureInteractionV1GradCpuKernel() = default;
+  ~FusedCrossFeatureInteractionV1GradCpuKernel() override = default;
+  bool AlwaysComputeWhenAllOutputsEmpty() const override { return false; }
+
+ private:
+  using user_op::OpKernel::Compute;
+  void Compute(user_op::KernelComputeContext* ctx) const override {
+    const user_op::Tensor* dy = ctx->Tensor4ArgNameAndIndex("dy", 0);
+    const user_op::Tensor* weight = ctx->Tensor4ArgNameAndIndex("weight", 0);
+    const user_op::Tensor* x0 = ctx->Tensor4ArgNameAndIndex("x0", 0);
+    const user_op::Tensor* x = ctx->Tensor4ArgNameAndIndex("x", 0);
+    const user_op::Tensor* matmul_result = ctx->Tensor4ArgNameAndIndex("matmul_result", 0);
+    user_op::Tensor* dx0 = ctx->Tensor4ArgNameAndIndex("dx0", 0);
+    user_op::Tensor* dw = ctx->Tensor4ArgNameAndIndex("dw", 0);
+    user_op::Tensor* dx = ctx->Tensor4ArgNameAndIndex("dx", 0);
+    user_op::Tensor* dbias = ctx->Tensor4ArgNameAndIndex("dbias", 0);
+    user_op::Tensor* tmp_buffer = ctx->Tensor4ArgNameAndIndex("tmp_buffer", 0);
+    auto* cpu_stream = ctx->stream()->As<ep::CpuStream>();
+
+    const int64_t batch_size = dy->shape_view().At(0);
+    const int64_t hidden_size = dy->shape_view().At(1);
+    const T* dy_ptr = dy->dptr<T>();
+    const T* weight_ptr = weight->dptr<T>();
+    const T* x0_ptr = x0->dptr<T>();
+    const T* matmul_result_ptr = matmul_result->dptr<T>();
+    T* dx0_ptr = dx0->mut_dptr<T>();
+    T* dx_ptr = dx->mut_dptr<T>();
+    T* dmatmul_result0 = tmp_buffer->mut_dptr<T>();
+
+    // dmatmul_result0 = reduce_sum(dy * x0, axis=1), dx = dmatmul_result0 matmul weight + dy and
+    // dx0 = dy broadcast_mul matmul_result0 are computed in one pass over each row.
+    cpu_stream->ParallelFor(
+        0, batch_size,
+        [&](int64_t begin, int64_t end) {
+          for (int64_t row = begin; row < end; ++row) {
+            const int64_t row_offset = row * hidden_size;
+            const T* row_dy = dy_ptr + row_offset;
+            const T* row_x0 = x0_ptr + row_offset;
+            T* row_dx = dx_ptr + row_offset;
+            T* row_dx0 = dx0_ptr + row_offset;
+            T dot = 0;
+            for (int64_t col = 0; col < hidden_size; ++col) { dot += row_dy[col] * row_x0[col]; }
+            dmatmul_result0[row] = dot;
+            const T scale = matmul_result_ptr[row];
+            for (int64_t col = 0; col < hidden_size; ++col) {
+              row_dx[col] = dot * weight_ptr[col] + row_dy[col];
+              row_dx0[col] = row_dy[col] * scale;
+            }
+          }
+        },
+        GetGrainSize(hidden_size));
+
+    // dw = dmatmul_result0^T matmul x.
+    auto weight_grad_matmul = NewMatmulPrimitive(ctx, /*transpose_a=*/true);
+    CHECK(weight_grad_matmul);
+    weight_grad_matmul->Launch(ctx->stream(), 1, hidden_size, batch_size, 1.0, dmatmul_result0,
+                               x->dptr(), 0.0, dw->mut_dptr());
+
+    // dbias = reduce_sum(dy, axis=0).
+    ColumnSum<T>(cpu_stream, batch_size, hidden_size, dy_ptr, dbias->mut_dptr<T>());
+  }
+};
+
+template<typename T>
+class FusedCrossFeatureInteractionV2GradCpuKernel final : public user_op::OpKernel {
+ public:
+  FusedCrossFeatureInteractionV2GradCpuKernel() = default;
+  ~FusedCrossFeatureInteractionV2GradCpuKernel() override = default;
+  bool AlwaysComputeWhenAllOutputsEmpty() const override { return false; }
+
+ private:
+  using user_op::OpKernel::Compute;
+  void Compute(user_op::KernelComputeContext* ctx) const override {
+    const user_op::Tensor* dy = ctx->Tensor4ArgNameAndIndex("dy", 0);
+    const user_op::Tensor* weight = ctx->Tensor4ArgNameAndIndex("weight", 0);
+    const user_op::Tensor* bias = ctx->Tensor4ArgNameAndIndex("bias", 0);
+    const user_op::Tensor* x0 = ctx->Tensor4ArgNameAndIndex("x0", 0);
+    const user_op::Tensor* x = ctx->Tensor4ArgNameAndIndex("x", 0);
+    const user_op::Tensor* matmul_result = ctx->Tensor4ArgNameAndIndex("matmul_result", 0);
+    user_op::Tensor* dx0 = ctx->Tensor4ArgNameAndIndex("dx0", 0);
+    user_op::Tensor* dw = ctx->Tensor4ArgNameAndIndex("dw", 0);
+    user_op::Tensor* dx = ctx->Tensor4ArgNameAndIndex("dx", 0);
+    user_op::Tensor* dbias = ctx->Tensor4ArgNameAndIndex("dbias", 0);
+    user_op::Tensor* tmp_buffer = ctx->Tensor4ArgNameAndIndex("tmp_buffer", 0);
+    auto* cpu_stream = ctx->stream()->As<ep::CpuStream>();
+
+    const int64_t batch_size = dy->shape_view().At(0);
+    const int64_t in_size = weight->shape_view().At(1);
+    const int64_t hidden_size = weight->shape_view().At(0);
+    const T* dy_ptr = dy->dptr<T>();
+    const T* bias_ptr = bias->dptr<T>();
+    const T* x0_ptr = x0->dptr<T>();
+    const T* matmul_result_ptr = matmul_result->dptr<T>();
+    T* dx0_ptr = dx0->mut_dptr<T>();
+    T* dx_ptr = dx->mut_dptr<T>();
+    T* dmatmul_result0 = tmp_buffer->mut_dptr<T>();
+
+    // dx0 = (matmul_result0 + bias) * dy and dmatmul_result0 = dy * x0 in one pass, dx starts as
+    // dy so the matmul below can accumulate into it.
+    cpu_stream->ParallelFor(
+        0, batch_size,
+        [&](int64_t begin, int64_t end) {
+          for (int64_t row = begin; row < end; ++row) {
+            const int64_t row_offset = row * hidden_size;
+            const T* row_dy = dy_ptr + row_offset;
+            const T* row_x0 = x0_ptr + row_offset;
+            const T* row_matmul_result = matmul_result_ptr + row_offset;
+            T* row_dx0 = dx0_ptr + row_offset;
+            T* row_dmatmul_result0 = dmatmul_result0 + row_offset;
+            for (int64_t col = 0; col < hidden_size; ++col) {
+              row_dx0[col] = (row_matmul_result[col] + bias_ptr[col]) * row_dy[col];
+              row_dmatmul_result0[col] = row_dy[col] * row_x0[col];
+            }
+          }
+        },
+        GetGrainSize(hidden_size));
+    std::copy(dy_ptr, dy_ptr + dy->shape_view().elem_cnt(), dx_ptr);
+
+    // dx += dmatmul_result0 matmul weight.
+    auto matmul = NewMatmulPrimitive(ctx, /*transpose_a=*/false);
+    CHECK(matmul);
+    matmul->Launch(ctx->stream(), batch_size, in_size, hidden_size, 1.0, dmatmul_result0,
+                   weight->dptr(), 1.0, dx_ptr);
+
+    // dw = dmatmul_result0^T matmul x.
+    auto weight_grad_matmul = NewMatmulPrimitive(ctx, /*transpose_a=*/true);
+    CHECK(weight_grad_matmul);
+    weight_grad_matmul->Launch(ctx->stream(), hidden_size, in_size, batch_size, 1.0,
+                               dmatmul_result0, x->dptr(), 0.0, dw->mut_dptr());
+
+    // dbias = reduce_sum(dmatmul_result0, axis=0).
+    ColumnSum<T>(cpu_stream, batch_size, hidden_size, dmatmul_result0, dbias->mut_dptr<T>());
+  }
+};
+
+}  // namespace
+
+#define REGISTER_FUSED_CROSS_FEATURE_INTERACTION_GRAD_CPU_KERNEL(dtype)                \
+  REGISTER_USER_KERNEL("fused_cross_feature_interaction_v1_grad")                      \
+      .SetCreateFn<FusedCrossFeatureInteractionV1GradCpuKernel<dtype>>()               \
+      .SetIsMatchedHob((user_op::HobDeviceType() == DeviceType::kCPU)                  \
+                       && (user_op::HobDataType("dy", 0) == GetDataType<dtype>::value) \
+                       && MatmulPrimitivesExist())                                     \
+      .SetInferTmpSizeFn([](user_op::InferContext* ctx) {                              \
+        const int64_t batch_size = ctx->InputTensorDesc("dy", 0).shape().At(0);        \
+        return GetCudaAlignedSize(batch_size * sizeof(dtype));                         \
+      });                                                                              \
+  REGISTER_USER_KERNEL("fused_cross_feature_interaction_v2_grad")                      \
+      .SetCreateFn<FusedCrossFeatureInteractionV2GradCpuKernel<dtype>>()               \
+      .SetIsMatchedHob((user_op::HobDeviceType() == DeviceType::kCPU)                  \
+                       && (user_op::HobDataType("dy", 0) == GetDataType<dtype>::value) \
+                       && MatmulPrimitivesExist())                                     \
+      .SetInferTmpSizeFn([](user_op::InferContext* ctx) {                              \
+        const int64_t dy_elem_cnt = ctx->InputTensorDesc("dy", 0).shape().elem_cnt();  \
+        return GetCudaAlignedSize(dy_elem_cnt * sizeof(dtype));                        \
+      });
+
+REGISTER_FUSED_CROSS_FEATURE_INTERACTION_GRAD_CPU_KERNEL(float)
+REGISTER_FUSED_CROSS_FEATURE_INTERACTION_GRAD_CPU_KERNEL(double)
+
+}  // namespace oneflow
@@ -0,0 +1,306 @@
+/*
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+*/
+#include "oneflow/core/framework/framework.h"
+#include "oneflow/core/ep/cpu/cpu_stream.h"
+
+namespace oneflow {
+
+namespace {
+
+constexpr int kDotNumLanes = 8;
+
+// Independent partial sums let the compiler vectorize the reduction without -ffast-math.
+template<typename T>
+T Dot(const T* a, const T* b, int64_t n) {
+  T partial_sum[kDotNumLanes] = {0};
+  int64_t i = 0;
+  for (; i + kDotNumLanes <= n; i += kDotNumLanes) {
+    for (int j = 0; j < kDotNumLanes; ++j) { partial_sum[j] += a[i + j] * b[i + j]; }
+  }
+  T sum = 0;
+  for (int j = 0; j < kDotNumLanes; ++j) { sum += partial_sum[j]; }
+  for (; i < n; ++i) { sum += a[i] * b[i]; }
+  return sum;
+}
+
+template<typename T>
+void Axpy(T alpha, const T* x, T* y, int64_t n) {
+  for (int64_t i = 0; i < n; ++i) { y[i] += alpha * x[i]; }
+}
+
+template<typename T>
+struct FeatureParam {
+  std::vector<const T*> in;
+  std::vector<T*> in_grad;
+  std::vector<int64_t> in_feature_dim;
+  int64_t features_concated_dim = 0;
+};
+
+template<typename T>
+FeatureParam<T> GetFeatureParam(user_op::KernelComputeContext* ctx, bool with_grad) {
+  FeatureParam<T> param;
+  for (int32_t i = 0; i < ctx->input_size("features"); ++i) {
+    const user_op::Tensor* feature = ctx->Tensor4ArgNameAndIndex("features", i);
+    param.in.push_back(feature->dptr<T>());
+    param.in_feature_dim.push_back(feature->shape_view().At(1));
+    param.features_concated_dim += feature->shape_view().At(1);
+    if (with_grad) {
+      param.in_grad.push_back(ctx->Tensor4ArgNameAndIndex("features_grad", i)->mut_dptr<T>());
+    }
+  }
+  return param;
+}
+
+// Collects the rows of the concatenated (features_concated_dim, vector_size) matrix of one
+// instance, so the features never need to be copied into a concatenated buffer.
+template<typename RowT>
+void GetInstanceRows(const std::vector<RowT*>& in, const std::vector<int64_t>& in_feature_dim,
+                     int64_t batch_idx, int64_t vector_size, std::vector<RowT*>* rows) {
+  rows->clear();
+  for (size_t i = 0; i < in.size(); ++i) {
+    RowT* batch_in = in[i] + batch_idx * in_feature_dim[i] * vector_size;
+    for (int64_t j = 0; j < in_feature_dim[i]; ++j) { rows->push_back(batch_in + j * vector_size); }
+  }
+}
+
+template<typename T>
+class FusedDotFeatureInteractionCpuKernel final : public user_op::OpKernel {
+ public:
+  FusedDotFeatureInteractionCpuKernel() = default;
+  ~FusedDotFeatureInteractionCpuKernel() override = default;
+
+ private:
+  using user_op::OpKernel::Compute;
+  void Compute(user_op::KernelComputeContext* ctx) const override {
+    CHECK(!ctx->has_input("sparse_feature", 0)) << "sparse_feature is not supported. ";
+    user_op::Tensor* out = ctx->Tensor4ArgNameAndIndex("out", 0);
+    const FeatureParam<T> param = GetFeatureParam<T>(ctx, /*with_grad=*/false);
+    const int64_t batch_size = out->shape_view().At(0);
+    const int64_t out_dim = out->shape_view().At(1);
+    const int64_t vector_size = ctx->TensorDesc4ArgNameAndIndex("features", 0)->shape().At(2);
+    const int64_t offset = ctx->Attr<bool>("self_interaction") ? 1 : 0;
+    const int64_t output_padding = ctx->Attr<int32_t>("output_padding");
+    const int64_t num_rows = param.features_concated_dim;
+    const int64_t interaction_dim = num_rows * (num_rows - 1 + 2 * offset) / 2;
+    const T* output_concat = nullptr;
+    int64_t output_concat_dim = 0;
+    if (ctx->has_input("output_concat", 0)) {
+      const user_op::Tensor* output_concat_tensor = ctx->Tensor4ArgNameAndIndex("output_concat", 0);
+      output_concat = output_concat_tensor->dptr<T>();
+      output_concat_dim = output_concat_tensor->shape_view().At(1);
+    }
+    CHECK_EQ(out_dim, output_concat_dim + interaction_dim + output_padding);
+    T* out_ptr = out->mut_dptr<T>();
+    ctx->stream()->As<ep::CpuStream>()->ParallelFor(
+        0, batch_size,
+        [&](int64_t begin, int64_t end) {
+          std::vector<const T*> rows;
+          for (int64_t batch_idx = begin; batch_idx < end; ++batch_idx) {
+            T* batch_out = out_ptr + batch_idx * out_dim;
+            if (output_concat != nullptr) {
+              std::copy(output_concat + batch_idx * output_concat_dim,
+                        output_concat + (batch_idx + 1) * output_concat_dim, batch_out);
+            }
+            GetInstanceRows(param.in, param.in_feature_dim, batch_idx, vector_size, &rows);
+            // The lower triangle of rows * rows^T in row-major order, the diagonal is included
+            // when self_interaction.
+            T* interaction_out = batch_out + output_concat_dim;
+            for (int64_t row = 0; row < num_rows; ++row) {
+              for (int64_t col = 0; col < row + offset; ++col) {
+                *interaction_out++ = Dot(rows[row], rows[col], vector_size);
+              }
+            }
+            std::fill(interaction_out, interaction_out + output_padding, static_cast<T>(0));
+          }
+        },
+        1);
+  }
+  bool AlwaysComputeWhenAllOutputsEmpty() const override { return false; }
+};
+
+template<typename T>
+class FusedDotFeatureInteractionGradCpuKernel final : public user_op::OpKernel {
+ public:
+  FusedDotFeatureInteractionGradCpuKernel() = default;
+  ~FusedDotFeatureInteractionGradCpuKernel() override = default;
+
+ private:
+  using user_op::OpKernel::Compute;
+  void Compute(user_op::KernelComputeContext* ctx) const override {
+    CHECK(!ctx->has_input("sparse_feature", 0)) << "sparse_feature is not supported. ";
+    const user_op::Tensor* dy = ctx->Tensor4ArgNameAndIndex("dy", 0);
+    const FeatureParam<T> param = GetFeatureParam<T>(ctx, /*with_grad=*/true);
+    const int64_t batch_size = dy->shape_view().At(0);
+    const int64_t out_dim = dy->shape_view().At(1);
+    const int64_t vector_size = ctx->TensorDesc4ArgNameAndIndex("features", 0)->shape().At(2);
+    const int64_t offset = ctx->Attr<bool>("self_interaction") ? 1 : 0;
+    const int64_t num_rows = param.features_concated_dim;
+    T* output_concat_grad = nullptr;
+    int64_t output_concat_dim = 0;
+    if (ctx->has_output("output_concat_grad", 0)) {
+      user_op::Tensor* output_concat_grad_tensor =
+          ctx->Tensor4ArgNameAndIndex("output_concat_grad", 0);
+      output_concat_grad = output_concat_grad_tensor->mut_dptr<T>();
+      output_concat_dim = output_concat_grad_tensor->shape_view().At(1);
+    }
+    const T* dy_ptr = dy->dptr<T>();
+    ctx->stream()->As<ep::CpuStream>()->ParallelFor(
+        0, batch_size,
+        [&](int64_t begin, int64_t end) {
+          std::vector<const T*> rows;
+          std::vector<T*> grad_rows;
+          for (int64_t batch_idx = begin; batch_idx < end; ++batch_idx) {
+            const T* batch_dy = dy_ptr + batch_idx * out_dim;
+            if (output_concat_grad != nullptr) {
+              std::copy(batch_dy, batch_dy + output_concat_dim,
+                        output_concat_grad + batch_idx * output_concat_dim);
+            }
+            GetInstanceRows(param.in, param.in_feature_dim, batch_idx, vector_size, &rows);
+            GetInstanceRows(param.in_grad, param.in_feature_dim, batch_idx, vector_size,
+                            &grad_rows);
+            for (T* grad_row : grad_rows) {
+              std::fill(grad_row, grad_row + vector_size, static_cast<T>(0));
+            }
+            // d(rows[row] . rows[col]) flows to both rows, and twice to the row on the diagonal.
+            const T* interaction_dy = batch_dy + output_concat_dim;
+            for (int64_t row = 0; row < num_rows; ++row) {
+              for (int64_t col = 0; col < row + offset; ++col) {
+                const T grad = *interaction_dy++;
+                if (col == row) {
+                  Axpy(grad * static_cast<T>(2), rows[row], grad_rows[row], vector_size);
+                } else {
+                  Axpy(grad, rows[col], grad_rows[row], vector_size);
+                  Axpy(grad, rows[row], grad_rows[col], vector_size);
+                }
+              }
+            }
+          }
+        },
+        1);
+  }
+  bool AlwaysComputeWhenAllOutputsEmpty() const override { return false; }
+};
+
+template<typename T>
+class FusedDotFeatureInteractionPoolingSumCpuKernel final : public user_op::OpKernel {
+ public:
+  FusedDotFeatureInteractionPoolingSumCpuKernel() = default;
+  ~FusedDotFeatureInteractionPoolingSumCpuKernel() override = default;
+
+ private:
+  using user_op::OpKernel::Compute;
+  void Compute(user_op::KernelComputeContext* ctx) const override {
+    CHECK(!ctx->has_input("sparse_feature", 0)) << "pooling sum, sparse_feature is not supported. ";
+    user_op::Tensor* out = ctx->Tensor4ArgNameAndIndex("out", 0);
+    const FeatureParam<T> param = GetFeatureParam<T>(ctx, /*with_grad=*/false);
+    const int64_t batch_size = out->shape_view().At(0);
+    const int64_t vector_size = out->shape_view().At(1);
+    T* out_ptr = out->mut_dptr<T>();
+    ctx->stream()->As<ep::CpuStream>()->ParallelFor(
+        0, batch_size,
+        [&](int64_t begin, int64_t end) {
+          std::vector<const T*> rows;
+          std::vector<T> square_sum(vector_size);
+          for (int64_t batch_idx = begin; batch_idx < end; ++batch_idx) {
+            T* sum = out_ptr + batch_idx * vector_size;
+            std::fill(sum, sum + vector_size, static_cast<T>(0));
+            std::fill(square_sum.begin(), square_sum.end(), static_cast<T>(0));
+            GetInstanceRows(param.in, param.in_feature_dim, batch_idx, vector_size, &rows);
+            for (const T* row : rows) {
+              for (int64_t i = 0; i < vector_size; ++i) {
+                sum[i] += row[i];
+                square_sum[i] += row[i] * row[i];
+              }
+            }
+            for (int64_t i = 0; i < vector_size; ++i) {
+              sum[i] = (sum[i] * sum[i] - square_sum[i]) * static_cast<T>(0.5);
+            }
+          }
+        },
+        1);
+  }
+  bool AlwaysComputeWhenAllOutputsEmpty() const override { return false; }
+};
+
+template<typename T>
+class FusedDotFeatureInteractionPoolingSumGradCpuKernel final : public user_op::OpKernel {
+ public:
+  FusedDotFeatureInteractionPoolingSumGradCpuKernel() = default;
+  ~FusedDotFeatureInteractionPoolingSumGradCpuKernel() override = default;
+
+ private:
+  using user_op::OpKernel::Compute;
+  void Compute(user_op::KernelComputeContext* ctx) const override {
+    const user_op::Tensor* dy = ctx->Tensor4ArgNameAndIndex("dy", 0);
+    const FeatureParam<T> param = GetFeatureParam<T>(ctx, /*with_grad=*/true);
+    const int64_t batch_size = dy->shape_view().At(0);
+    const int64_t vector_size = dy->shape_view().At(1);
+    const T* dy_ptr = dy->dptr<T>();
+    ctx->stream()->As<ep::CpuStream>()->ParallelFor(
+        0, batch_size,
+        [&](int64_t begin, int64_t end) {
+          std::vector<const T*> rows;
+          std::vector<T*> grad_rows;
+          std::vector<T> sum(vector_size);
+          for (int64_t batch_idx = begin; batch_idx < end; ++batch_idx) {
+            const T* batch_dy = dy_ptr + batch_idx * vector_size;
+            GetInstanceRows(param.in, param.in_feature_dim, batch_idx, vector_size, &rows);
+            GetInstanceRows(param.in_grad, param.in_feature_dim, batch_idx, vector_size,
+                            &grad_rows);
+            std::fill(sum.begin(), sum.end(), static_cast<T>(0));
+            for (const T* row : rows) {
+              for (int64_t i = 0; i < vector_size; ++i) { sum[i] += row[i]; }
+            }
+            for (size_t j = 0; j < rows.size(); ++j) {
+              for (int64_t i = 0; i < vector_size; ++i) {
+                grad_rows[j][i] = batch_dy[i] * (sum[i] - rows[j][i]);
+              }
+            }
+          }
+        },
+        1);
+  }
+  bool AlwaysComputeWhenAllOutputsEmpty() const override { return false; }
+};
+
+}  // namespace
+
+#define REGISTER_FUSED_DOT_FEATURE_INTERACTION_CPU_KERNEL(dtype)                        \
+  REGISTER_USER_KERNEL("fused_dot_feature_interaction")                                 \
+      .SetCreateFn<FusedDotFeatureInteractionCpuKernel<dtype>>()                        \
+      .SetIsMatchedHob((user_op::HobDeviceType() == DeviceType::kCPU)                   \
+                       && (user_op::HobDataType("out", 0) == GetDataType<dtype>::value) \
+                       && (user_op::HobAttr<std::string>("pooling") == "none"));        \
+  REGISTER_USER_KERNEL("fused_dot_feature_interaction")                                 \
+      .SetCreateFn<FusedDotFeatureInteractionPoolingSumCpuKernel<dtype>>()              \
+      .SetIsMatchedHob((user_op::HobDeviceType() == DeviceType::kCPU)                   \
+                       && (user_op::HobDataType("out", 0) == GetDataType<dtype>::value) \
+                       && (user_op::HobAttr<std::string>("pooling") == "sum"));         \
+  REGISTER_USER_KERNEL("fused_dot_feature_interaction_grad")                            \
+      .SetCreateFn<FusedDotFeatureInteractionGradCpuKernel<dtype>>()                    \
+      .SetIsMatchedHob((user_op::HobDeviceType() == DeviceType::kCPU)                   \
+                       && (user_op::HobDataType("dy", 0) == GetDataType<dtype>::value)  \
+                       && (user_op::HobAttr<std::string>("pooling") == "none"));        \
+  REGISTER_USER_KERNEL("fused_dot_feature_interaction_grad")                            \
+      .SetCreateFn<FusedDotFeatureInteractionPoolingSumGradCpuKernel<dtype>>()          \
+      .SetIsMatchedHob((user_op::HobDeviceType() == DeviceType::kCPU)                   \
+                       && (user_op::HobDataType("dy", 0) == GetDataType<dtype>::value)  \
+                       && (user_op::HobAttr<std::string>("pooling") == "sum"));
+
+REGISTER_FUSED_DOT_FEATURE_INTERACTION_CPU_KERNEL(float)
+REGISTER_FUSED_DOT_FEATURE_INTERACTION_CPU_KERNEL(double)
+
+}  // namespace oneflow
@@ -91,6 +91,9 @@ class MultiTensorSGDUpdateKernel final : public user_op::OpKernel,
                        && (user_op::HobDataType("model", 0) == GetDataType<dtype>::value) \
                        && (user_op::HobDataType("model_diff", 0) == GetDataType<gtype>::value));
 
+REGISTER_MULTI_TENSOR_UPDATE_SGD_UPDATE_KERNEL(DeviceType::kCPU, float, float);
+REGISTER_MULTI_TENSOR_UPDATE_SGD_UPDATE_KERNEL(DeviceType::kCPU, double, double);
+
 #ifdef WITH_CUDA
 REGISTER_MULTI_TENSOR_UPDATE_SGD_UPDATE_KERNEL(DeviceType::kCUDA, float, float16);
 REGISTER_MULTI_TENSOR_UPDATE_SGD_UPDATE_KERNEL(DeviceType::kCUDA, float, float);
@@ -200,12 +203,447 @@ class MultiTensorAdamUpdateKernel final : public user_op::OpKernel,
                        && (user_op::HobDataType("model", 0) == GetDataType<dtype>::value) \
                        && (user_op::HobDataType("model_diff", 0) == GetDataType<gtype>::value));
 
+REGISTER_MULTI_TENSOR_UPDATE_ADAM_UPDATE_KERNEL(DeviceType::kCPU, float, float);
+REGISTER_MULTI_TENSOR_UPDATE_ADAM_UPDATE_KERNEL(DeviceType::kCPU, double, double);
+
 #ifdef WITH_CUDA
 REGISTER_MULTI_TENSOR_UPDATE_ADAM_UPDATE_KERNEL(DeviceType::kCUDA, float, float16);
 REGISTER_MULTI_TENSOR_UPDATE_ADAM_UPDATE_KERNEL(DeviceType::kCUDA, float, float);
 REGISTER_MULTI_TENSOR_UPDATE_ADAM_UPDATE_KERNEL(DeviceType::kCUDA, double, double);
 #endif
 
+template<DeviceType device_type, typename T, typename G>
+class MultiTensorMomentumUpdateKernel final : public user_op::OpKernel,
+                                              public user_op::CudaGraphSupport {
+ public:
+  MultiTensorMomentumUpdateKernel() = default;
+  ~MultiTensorMomentumUpdateKernel() override = default;
+
+ private:
+  using user_op::OpKernel::Compute;
+  void Compute(user_op::KernelComputeContext* ctx) const override {
+    const int64_t n_tensor = ctx->input_size("model");
+    const double scale = ctx->Attr<double>("scale");
+    const float l1 = ctx->Attr<float>("l1");
+    const float l2 = ctx->Attr<float>("l2");
+    const float beta = ctx->Attr<float>("beta");
+    const float dampening = ctx->Attr<float>("dampening");
+    const bool nesterov = ctx->Attr<bool>("nesterov");
+    const bool maximize = ctx->Attr<bool>("maximize");
+    const float weight_decay = ctx->Attr<float>("weight_decay");
+
+    const float* learning_rate_ptr = nullptr;
+    const float learning_rate_val = ctx->Attr<float>("learning_rate_val");
+    if (ctx->has_input("learning_rate", 0)) {
+      const user_op::Tensor* learning_rate = ctx->Tensor4ArgNameAndIndex("learning_rate", 0);
+      learning_rate_ptr = learning_rate->dptr<float>();
+    }
+    const T* scale_by_ptr = nullptr;
+    if (ctx->has_input("scale_by_tensor", 0)) {
+      const user_op::Tensor* scale_by_tensor = ctx->Tensor4ArgNameAndIndex("scale_by_tensor", 0);
+      CHECK_EQ(scale_by_tensor->data_type(), ctx->Tensor4ArgNameAndIndex("model", 0)->data_type());
+      CHECK_EQ(scale_by_tensor->shape_view().elem_cnt(), 1);
+      scale_by_ptr = scale_by_tensor->dptr<T>();
+    }
+    const int64_t* skip_if_ptr = nullptr;
+    if (ctx->has_input("skip_if", 0)) {
+      const user_op::Tensor* skip_if = ctx->Tensor4ArgNameAndIndex("skip_if", 0);
+      CHECK_EQ(skip_if->shape_view().elem_cnt(), 1);
+      skip_if_ptr = skip_if->dptr<int64_t>();
+    }
+
+    TensorTupleParams<3> tensor_tuple_params{};
+    int32_t count = 0;
+    int32_t total_elem_cnt = 0;
+    for (int tensor_idx = 0; tensor_idx < n_tensor; tensor_idx++) {
+      tensor_tuple_params.ptr[0][count] =
+          (ctx->Tensor4ArgNameAndIndex("model", tensor_idx))->mut_dptr();
+      tensor_tuple_params.ptr[1][count] =
+          (ctx->Tensor4ArgNameAndIndex("model_diff", tensor_idx))->mut_dptr();
+      tensor_tuple_params.ptr[2][count] =
+          (ctx->Tensor4ArgNameAndIndex("momentum", tensor_idx))->mut_dptr();
+      const int64_t tensor_elem_cnt =
+          ctx->Tensor4ArgNameAndIndex("model", tensor_idx)->shape_view().elem_cnt();
+      tensor_tuple_params.sizes[count] = tensor_elem_cnt;
+
+      count += 1;
+      total_elem_cnt += tensor_elem_cnt;
+      if (count == kMaxTuples || tensor_idx == n_tensor - 1) {
+        MultiTensorMomentumUpdateKernelUtil<device_type, T, G>::Update(
+            ctx->stream(), total_elem_cnt, count, static_cast<T>(scale), l1, l2, beta, dampening,
+            nesterov, maximize, weight_decay, learning_rate_val, learning_rate_ptr, scale_by_ptr,
+            skip_if_ptr, tensor_tuple_params);
+        count = 0;
+        total_elem_cnt = 0;
+      }
+    }
+  }
+  bool AlwaysComputeWhenAllOutputsEmpty() const override { return true; }
+};
+
+#define REGISTER_MULTI_TENSOR_UPDATE_MOMENTUM_UPDATE_KERNEL(device, dtype, gtype)         \
+  REGISTER_USER_KERNEL("multi_tensor_momentum_update")                                    \
+      .SetCreateFn<MultiTensorMomentumUpdateKernel<device, dtype, gtype>>()               \
+      .SetIsMatchedHob((user_op::HobDeviceType() == device)                               \
+                       && (user_op::HobDataType("model", 0) == GetDataType<dtype>::value) \
+                       && (user_op::HobDataType("model_diff", 0) == GetDataType<gtype>::value));
+
+REGISTER_MULTI_TENSOR_UPDATE_MOMENTUM_UPDATE_KERNEL(DeviceType::kCPU, float, float);
+REGISTER_MULTI_TENSOR_UPDATE_MOMENTUM_UPDATE_KERNEL(DeviceType::kCPU, double, double);
+
+#ifdef WITH_CUDA
+REGISTER_MULTI_TENSOR_UPDATE_MOMENTUM_UPDATE_KERNEL(DeviceType::kCUDA, float, float);
+REGISTER_MULTI_TENSOR_UPDATE_MOMENTUM_UPDATE_KERNEL(DeviceType::kCUDA, double, double);
+#endif
+
+template<DeviceType device_type, typename T, typename G>
+class MultiTensorAmsgradUpdateKernel final : public user_op::OpKernel,
+                                             public user_op::CudaGraphSupport {
+ public:
+  MultiTensorAmsgradUpdateKernel() = default;
+  ~MultiTensorAmsgradUpdateKernel() override = default;
+
+ private:
+  using user_op::OpKernel::Compute;
+  void Compute(user_op::KernelComputeContext* ctx) const override {
+    const int64_t n_tensor = ctx->input_size("model");
+    const double scale = ctx->Attr<double>("scale");
+    const float l1 = ctx->Attr<float>("l1");
+    const float l2 = ctx->Attr<float>("l2");
+    const float beta1 = ctx->Attr<float>("beta1");
+    const float beta2 = ctx->Attr<float>("beta2");
+    const float epsilon = ctx->Attr<float>("epsilon");
+    const float weight_decay = ctx->Attr<float>("weight_decay");
+
+    const float* learning_rate_ptr = nullptr;
+    const float learning_rate_val = ctx->Attr<float>("learning_rate_val");
+    if (ctx->has_input("learning_rate", 0)) {
+      const user_op::Tensor* learning_rate = ctx->Tensor4ArgNameAndIndex("learning_rate", 0);
+      learning_rate_ptr = learning_rate->dptr<float>();
+    }
+    const float bias_correction1_val = ctx->Attr<float>("bias_correction1_val");
+    const float* bias_correction1_ptr = nullptr;
+    if (ctx->has_input("bias_correction1", 0)) {
+      const user_op::Tensor* bias_correction1 = ctx->Tensor4ArgNameAndIndex("bias_correction1", 0);
+      CHECK_EQ(bias_correction1->shape_view().elem_cnt(), 1);
+      bias_correction1_ptr = bias_correction1->dptr<float>();
+    }
+    const float bias_correction2_val = ctx->Attr<float>("bias_correction2_val");
+    const float* bias_correction2_ptr = nullptr;
+    if (ctx->has_input("bias_correction2", 0)) {
+      const user_op::Tensor* bias_correction2 = ctx->Tensor4ArgNameAndIndex("bias_correction2", 0);
+      CHECK_EQ(bias_correction2->shape_view().elem_cnt(), 1);
+      bias_correction2_ptr = bias_correction2->dptr<float>();
+    }
+    const T* scale_by_ptr = nullptr;
+    if (ctx->has_input("scale_by_tensor", 0)) {
+      const user_op::Tensor* scale_by_tensor = ctx->Tensor4ArgNameAndIndex("scale_by_tensor", 0);
+      CHECK_EQ(scale_by_tensor->data_type(), ctx->Tensor4ArgNameAndIndex("model", 0)->data_type());
+      CHECK_EQ(scale_by_tensor->shape_view().elem_cnt(), 1);
+      scale_by_ptr = scale_by_tensor->dptr<T>();
+    }
+    const int64_t* skip_if_ptr = nullptr;
+    if (ctx->has_input("skip_if", 0)) {
+      const user_op::Tensor* skip_if = ctx->Tensor4ArgNameAndIndex("skip_if", 0);
+      CHECK_EQ(skip_if->shape_view().elem_cnt(), 1);
+      skip_if_ptr = skip_if->dptr<int64_t>();
+    }
+
+    TensorTupleParams<5> tensor_tuple_params{};
+    int32_t count = 0;
+    int32_t total_elem_cnt = 0;
+    for (int tensor_idx = 0; tensor_idx < n_tensor; tensor_idx++) {
+      tensor_tuple_params.ptr[0][count] =
+          (ctx->Tensor4ArgNameAndIndex("model", tensor_idx))->mut_dptr();
+      tensor_tuple_params.ptr[1][count] =
+          (ctx->Tensor4ArgNameAndIndex("model_diff", tensor_idx))->mut_dptr();
+      tensor_tuple_params.ptr[2][count] =
+          (ctx->Tensor4ArgNameAndIndex("m", tensor_idx))->mut_dptr();
+      tensor_tuple_params.ptr[3][count] =
+          (ctx->Tensor4ArgNameAndIndex("v", tensor_idx))->mut_dptr();
+      tensor_tuple_params.ptr[4][count] =
+          (ctx->Tensor4ArgNameAndIndex("max_v", tensor_idx))->mut_dptr();
+      const int64_t tensor_elem_cnt =
+          ctx->Tensor4ArgNameAndIndex("model", tensor_idx)->shape_view().elem_cnt();
+      tensor_tuple_params.sizes[count] = tensor_elem_cnt;
+
+      count += 1;
+      total_elem_cnt += tensor_elem_cnt;
+      if (count == kMaxTuples || tensor_idx == n_tensor - 1) {
+        MultiTensorAmsgradUpdateKernelUtil<device_type, T, G>::Update(
+            ctx->stream(), total_elem_cnt, count, static_cast<T>(scale), l1, l2, beta1, beta2,
+            epsilon, weight_decay, learning_rate_val, bias_correction1_val, bias_correction2_val,
+            learning_rate_ptr, scale_by_ptr, skip_if_ptr, bias_correction1_ptr,
+            bias_correction2_ptr, tensor_tuple_params);
+        count = 0;
+        total_elem_cnt = 0;
+      }
+    }
+  }
+  bool AlwaysComputeWhenAllOutputsEmpty() const override { return true; }
+};
+
+#define REGISTER_MULTI_TENSOR_UPDATE_AMSGRAD_UPDATE_KERNEL(device, dtype, gtype)          \
+  REGISTER_USER_KERNEL("multi_tensor_amsgrad_update")                                     \
+      .SetCreateFn<MultiTensorAmsgradUpdateKernel<device, dtype, gtype>>()                \
+      .SetIsMatchedHob((user_op::HobDeviceType() == device)                               \
+                       && (user_op::HobDataType("model", 0) == GetDataType<dtype>::value) \
+                       && (user_op::HobDataType("model_diff", 0) == GetDataType<gtype>::value));
+
+REGISTER_MULTI_TENSOR_UPDATE_AMSGRAD_UPDATE_KERNEL(DeviceType::kCPU, float, float);
+REGISTER_MULTI_TENSOR_UPDATE_AMSGRAD_UPDATE_KERNEL(DeviceType::kCPU, double, double);
+
+#ifdef WITH_CUDA
+REGISTER_MULTI_TENSOR_UPDATE_AMSGRAD_UPDATE_KERNEL(DeviceType::kCUDA, float, float);
+REGISTER_MULTI_TENSOR_UPDATE_AMSGRAD_UPDATE_KERNEL(DeviceType::kCUDA, double, double);
+#endif
+
+template<DeviceType device_type, typename T, typename G>
+class MultiTensorRmspropUpdateKernel final : public user_op::OpKernel,
+                                             public user_op::CudaGraphSupport {
+ public:
+  MultiTensorRmspropUpdateKernel() = default;
+  ~MultiTensorRmspropUpdateKernel() override = default;
+
+ private:
+  using user_op::OpKernel::Compute;
+  void Compute(user_op::KernelComputeContext* ctx) const override {
+    const int64_t n_tensor = ctx->input_size("model");
+    const double scale = ctx->Attr<double>("scale");
+    const float l1 = ctx->Attr<float>("l1");
+    const float l2 = ctx->Attr<float>("l2");
+    const float epsilon = ctx->Attr<float>("epsilon");
+    const float weight_decay = ctx->Attr<float>("weight_decay");
+    const float decay_rate = ctx->Attr<float>("decay_rate");
+
+    const float* learning_rate_ptr = nullptr;
+    const float learning_rate_val = ctx->Attr<float>("learning_rate_val");
+    if (ctx->has_input("learning_rate", 0)) {
+      const user_op::Tensor* learning_rate = ctx->Tensor4ArgNameAndIndex("learning_rate", 0);
+      learning_rate_ptr = learning_rate->dptr<float>();
+    }
+    const T* scale_by_ptr = nullptr;
+    if (ctx->has_input("scale_by_tensor", 0)) {
+      const user_op::Tensor* scale_by_tensor = ctx->Tensor4ArgNameAndIndex("scale_by_tensor", 0);
+      CHECK_EQ(scale_by_tensor->data_type(), ctx->Tensor4ArgNameAndIndex("model", 0)->data_type());
+      CHECK_EQ(scale_by_tensor->shape_view().elem_cnt(), 1);
+      scale_by_ptr = scale_by_tensor->dptr<T>();
+    }
+    const int64_t* skip_if_ptr = nullptr;
+    if (ctx->has_input("skip_if", 0)) {
+      const user_op::Tensor* skip_if = ctx->Tensor4ArgNameAndIndex("skip_if", 0);
+      CHECK_EQ(skip_if->shape_view().elem_cnt(), 1);
+      skip_if_ptr = skip_if->dptr<int64_t>();
+    }
+
+    TensorTupleParams<3> tensor_tuple_params{};
+    int32_t count = 0;
+    int32_t total_elem_cnt = 0;
+    for (int tensor_idx = 0; tensor_idx < n_tensor; tensor_idx++) {
+      tensor_tuple_params.ptr[0][count] =
+          (ctx->Tensor4ArgNameAndIndex("model", tensor_idx))->mut_dptr();
+      tensor_tuple_params.ptr[1][count] =
+          (ctx->Tensor4ArgNameAndIndex("model_diff", tensor_idx))->mut_dptr();
+      tensor_tuple_params.ptr[2][count] =
+          (ctx->Tensor4ArgNameAndIndex("mean_square", tensor_idx))->mut_dptr();
+      const int64_t tensor_elem_cnt =
+          ctx->Tensor4ArgNameAndIndex("model", tensor_idx)->shape_view().elem_cnt();
+      tensor_tuple_params.sizes[count] = tensor_elem_cnt;
+
+      count += 1;
+      total_elem_cnt += tensor_elem_cnt;
+      if (count == kMaxTuples || tensor_idx == n_tensor - 1) {
+        MultiTensorRmspropUpdateKernelUtil<device_type, T, G>::Update(
+            ctx->stream(), total_elem_cnt, count, static_cast<T>(scale), l1, l2, epsilon,
+            weight_decay, decay_rate, learning_rate_val, learning_rate_ptr, scale_by_ptr,
+            skip_if_ptr, tensor_tuple_params);
+        count = 0;
+        total_elem_cnt = 0;
+      }
+    }
+  }
+  bool AlwaysComputeWhenAllOutputsEmpty() const override { return true; }
+};
+
+#define REGISTER_MULTI_TENSOR_UPDATE_RMSPROP_UPDATE_KERNEL(device, dtype, gtype)          \
+  REGISTER_USER_KERNEL("multi_tensor_rmsprop_update")                                     \
+      .SetCreateFn<MultiTensorRmspropUpdateKernel<device, dtype, gtype>>()                \
+      .SetIsMatchedHob((user_op::HobDeviceType() == device)                               \
+                       && (user_op::HobDataType("model", 0) == GetDataType<dtype>::value) \
+                       && (user_op::HobDataType("model_diff", 0) == GetDataType<gtype>::value));
+
+REGISTER_MULTI_TENSOR_UPDATE_RMSPROP_UPDATE_KERNEL(DeviceType::kCPU, float, float);
+REGISTER_MULTI_TENSOR_UPDATE_RMSPROP_UPDATE_KERNEL(DeviceType::kCPU, double, double);
+
+#ifdef WITH_CUDA
+REGISTER_MULTI_TENSOR_UPDATE_RMSPROP_UPDATE_KERNEL(DeviceType::kCUDA, float, float);
+REGISTER_MULTI_TENSOR_UPDATE_RMSPROP_UPDATE_KERNEL(DeviceType::kCUDA, double, double);
+#endif
+
+template<typename T>
+class MultiTensorLambTmpBufferManager final {
+ public:
+  OF_DISALLOW_COPY_AND_MOVE(MultiTensorLambTmpBufferManager);
+  MultiTensorLambTmpBufferManager(void* ptr, const int64_t elem_cnt, const int64_t n_tensor)
+      : ptr_(ptr) {
+    const size_t adam_diff_bytes = GetCudaAlignedSize(elem_cnt * sizeof(T));
+    const size_t norm_buffer_bytes = GetCudaAlignedSize(2 * n_tensor * sizeof(T));
+    adam_diff_offset_ = 0;
+    norm_buffer_offset_ = adam_diff_offset_ + adam_diff_bytes;
+    total_buffer_size_ = adam_diff_bytes + norm_buffer_bytes;
+  }
+  ~MultiTensorLambTmpBufferManager() = default;
+
+  size_t GetTotalBufferSize() const { return total_buffer_size_; }
+
+  T* AdamDiffPtr() const {
+    CHECK(ptr_ != nullptr);
+    return reinterpret_cast<T*>(reinterpret_cast<char*>(ptr_) + adam_diff_offset_);
+  }
+  T* NormBufferPtr() const {
+    CHECK(ptr_ != nullptr);
+    return reinterpret_cast<T*>(reinterpret_cast<char*>(ptr_) + norm_buffer_offset_);
+  }
+
+ private:
+  size_t adam_diff_offset_;
+  size_t norm_buffer_offset_;
+  size_t total_buffer_size_;
+  void* ptr_;
+};
+
+int64_t GetMultiTensorElemCnt(user_op::InferContext* ctx) {
+  int64_t elem_cnt = 0;
+  for (int64_t i = 0; i < ctx->input_size("model"); ++i) {
+    elem_cnt += ctx->InputTensorDesc("model", i).shape().elem_cnt();
+  }
+  return elem_cnt;
+}
+
+template<DeviceType device_type, typename T, typename G>
+class MultiTensorLambUpdateKernel final : public user_op::OpKernel,
+                                          public user_op::CudaGraphSupport {
+ public:
+  MultiTensorLambUpdateKernel() = default;
+  ~MultiTensorLambUpdateKernel() override = default;
+
+ private:
+  using user_op::OpKernel::Compute;
+  void Compute(user_op::KernelComputeContext* ctx) const override {
+    const int64_t n_tensor = ctx->input_size("model");
+    const double scale = ctx->Attr<double>("scale");
+    const float l1 = ctx->Attr<float>("l1");
+    const float l2 = ctx->Attr<float>("l2");
+    const float beta1 = ctx->Attr<float>("beta1");
+    const float beta2 = ctx->Attr<float>("beta2");
+    const float epsilon = ctx->Attr<float>("epsilon");
+    const float weight_decay = ctx->Attr<float>("weight_decay");
+    const bool do_bias_correction = ctx->Attr<bool>("do_bias_correction");
+
+    const float* learning_rate_ptr = nullptr;
+    const float learning_rate_val = ctx->Attr<float>("learning_rate_val");
+    if (ctx->has_input("learning_rate", 0)) {
+      const user_op::Tensor* learning_rate = ctx->Tensor4ArgNameAndIndex("learning_rate", 0);
+      learning_rate_ptr = learning_rate->dptr<float>();
+    }
+    const float bias_correction1_val = ctx->Attr<float>("bias_correction1_val");
+    const float* bias_correction1_ptr = nullptr;
+    if (ctx->has_input("bias_correction1", 0)) {
+      const user_op::Tensor* bias_correction1 = ctx->Tensor4ArgNameAndIndex("bias_correction1", 0);
+      CHECK_EQ(bias_correction1->shape_view().elem_cnt(), 1);
+      bias_correction1_ptr = bias_correction1->dptr<float>();
+    }
+    const float bias_correction2_val = ctx->Attr<float>("bias_correction2_val");
+    const float* bias_correction2_ptr = nullptr;
+    if (ctx->has_input("bias_correction2", 0)) {
+      const user_op::Tensor* bias_correction2 = ctx->Tensor4ArgNameAndIndex("bias_correction2", 0);
+      CHECK_EQ(bias_correction2->shape_view().elem_cnt(), 1);
+      bias_correction2_ptr = bias_correction2->dptr<float>();
+    }
+    const T* scale_by_ptr = nullptr;
+    if (ctx->has_input("scale_by_tensor", 0)) {
+      const user_op::Tensor* scale_by_tensor = ctx->Tensor4ArgNameAndIndex("scale_by_tensor", 0);
+      CHECK_EQ(scale_by_tensor->data_type(), ctx->Tensor4ArgNameAndIndex("model", 0)->data_type());
+      CHECK_EQ(scale_by_tensor->shape_view().elem_cnt(), 1);
+      scale_by_ptr = scale_by_tensor->dptr<T>();
+    }
+    const int64_t* skip_if_ptr = nullptr;
+    if (ctx->has_input("skip_if", 0)) {
+      const user_op::Tensor* skip_if = ctx->Tensor4ArgNameAndIndex("skip_if", 0);
+      CHECK_EQ(skip_if->shape_view().elem_cnt(), 1);
+      skip_if_ptr = skip_if->dptr<int64_t>();
+    }
+
+    user_op::Tensor* tmp_buffer = ctx->Tensor4ArgNameAndIndex("tmp_buffer", 0);
+    int64_t model_elem_cnt = 0;
+    for (int64_t i = 0; i < n_tensor; ++i) {
+      model_elem_cnt += ctx->Tensor4ArgNameAndIndex("model", i)->shape_view().elem_cnt();
+    }
+    MultiTensorLambTmpBufferManager<T> tbm(tmp_buffer->mut_dptr(), model_elem_cnt, n_tensor);
+    T* adam_diff_ptr = tbm.AdamDiffPtr();
+    T* norm_buffer_ptr = tbm.NormBufferPtr();
+    int64_t adam_diff_offset = 0;
+
+    TensorTupleParams<5> tensor_tuple_params{};
+    int32_t count = 0;
+    int32_t total_elem_cnt = 0;
+    for (int tensor_idx = 0; tensor_idx < n_tensor; tensor_idx++) {
+      tensor_tuple_params.ptr[0][count] =
+          (ctx->Tensor4ArgNameAndIndex("model", tensor_idx))->mut_dptr();
+      tensor_tuple_params.ptr[1][count] =
+          (ctx->Tensor4ArgNameAndIndex("model_diff", tensor_idx))->mut_dptr();
+      tensor_tuple_params.ptr[2][count] =
+          (ctx->Tensor4ArgNameAndIndex("m", tensor_idx))->mut_dptr();
+      tensor_tuple_params.ptr[3][count] =
+          (ctx->Tensor4ArgNameAndIndex("v", tensor_idx))->mut_dptr();
+      tensor_tuple_params.ptr[4][count] = adam_diff_ptr + adam_diff_offset;
+      const int64_t tensor_elem_cnt =
+          ctx->Tensor4ArgNameAndIndex("model", tensor_idx)->shape_view().elem_cnt();
+      tensor_tuple_params.sizes[count] = tensor_elem_cnt;
+
+      count += 1;
+      total_elem_cnt += tensor_elem_cnt;
+      adam_diff_offset += tensor_elem_cnt;
+      if (count == kMaxTuples || tensor_idx == n_tensor - 1) {
+        MultiTensorLambUpdateKernelUtil<device_type, T, G>::Update(
+            ctx->stream(), total_elem_cnt, count, static_cast<T>(scale), l1, l2, beta1, beta2,
+            epsilon, weight_decay, do_bias_correction, learning_rate_val, bias_correction1_val,
+            bias_correction2_val, learning_rate_ptr, scale_by_ptr, skip_if_ptr,
+            bias_correction1_ptr, bias_correction2_ptr, tensor_tuple_params,
+            norm_buffer_ptr + 2 * (tensor_idx + 1 - count));
+        count = 0;
+        total_elem_cnt = 0;
+      }
+    }
+  }
+  bool AlwaysComputeWhenAllOutputsEmpty() const override { return true; }
+};
+
+template<typename T>
+user_op::InferTmpSizeFn MultiTensorLambGenInferTmpSizeFn() {
+  return [](user_op::InferContext* ctx) {
+    MultiTensorLambTmpBufferManager<T> tbm(nullptr, GetMultiTensorElemCnt(ctx),
+                                           ctx->input_size("model"));
+    return tbm.GetTotalBufferSize();
+  };
+}
+
+#define REGISTER_MULTI_TENSOR_UPDATE_LAMB_UPDATE_KERNEL(device, dtype, gtype)                   \
+  REGISTER_USER_KERNEL("multi_tensor_lamb_update")                                              \
+      .SetCreateFn<MultiTensorLambUpdateKernel<device, dtype, gtype>>()                         \
+      .SetIsMatchedHob((user_op::HobDeviceType() == device)                                     \
+                       && (user_op::HobDataType("model", 0) == GetDataType<dtype>::value)       \
+                       && (user_op::HobDataType("model_diff", 0) == GetDataType<gtype>::value)) \
+      .SetInferTmpSizeFn(MultiTensorLambGenInferTmpSizeFn<dtype>());
+
+REGISTER_MULTI_TENSOR_UPDATE_LAMB_UPDATE_KERNEL(DeviceType::kCPU, float, float);
+REGISTER_MULTI_TENSOR_UPDATE_LAMB_UPDATE_KERNEL(DeviceType::kCPU, double, double);
+
+#ifdef WITH_CUDA
+REGISTER_MULTI_TENSOR_UPDATE_LAMB_UPDATE_KERNEL(DeviceType::kCUDA, float, float);
+REGISTER_MULTI_TENSOR_UPDATE_LAMB_UPDATE_KERNEL(DeviceType::kCUDA, double, double);
+#endif
+
 template<DeviceType device_type, typename T, typename G>
 class MultiTensorSGDUpdateWithCastKernel final : public user_op::OpKernel,
                                                  public user_op::CudaGraphSupport {
@@ -395,6 +833,55 @@ REGISTER_MULTI_TENSOR_UPDATE_ADAM_UPDATE_WITH_CAST_KERNEL(DeviceType::kCUDA, flo
 REGISTER_MULTI_TENSOR_UPDATE_ADAM_UPDATE_WITH_CAST_KERNEL(DeviceType::kCUDA, float, float16);
 #endif
 
+template<DeviceType device_type, typename T>
+class MultiTensorScaleByTensorKernel final : public user_op::OpKernel,
+                                             public user_op::CudaGraphSupport {
+ public:
+  MultiTensorScaleByTensorKernel() = default;
+  ~MultiTensorScaleByTensorKernel() override = default;
+
+ private:
+  using user_op::OpKernel::Compute;
+  void Compute(user_op::KernelComputeContext* ctx) const override {
+    const int64_t n_tensor = ctx->input_size("x");
+    const T* scale_ptr = ctx->Tensor4ArgNameAndIndex("scale", 0)->dptr<T>();
+
+    TensorTupleParams<1> tensor_tuple_params{};
+    int32_t count = 0;
+    int64_t total_elem_cnt = 0;
+    for (int tensor_idx = 0; tensor_idx < n_tensor; tensor_idx++) {
+      user_op::Tensor* x = ctx->Tensor4ArgNameAndIndex("x", tensor_idx);
+      const int64_t tensor_elem_cnt = x->shape_view().elem_cnt();
+      if (tensor_elem_cnt != 0) {
+        tensor_tuple_params.ptr[0][count] = x->mut_dptr();
+        tensor_tuple_params.sizes[count] = tensor_elem_cnt;
+        count += 1;
+        total_elem_cnt += tensor_elem_cnt;
+      }
+      if (count > 0 && (count == kMaxTuples || tensor_idx == n_tensor - 1)) {
+        MultiTensorScaleByTensorKernelUtil<device_type, T>::Scale(
+            ctx->stream(), total_elem_cnt, count, scale_ptr, tensor_tuple_params);
+        count = 0;
+        total_elem_cnt = 0;
+      }
+    }
+  }
+  bool AlwaysComputeWhenAllOutputsEmpty() const override { return true; }
+};
+
+#define REGISTER_MULTI_TENSOR_SCALE_BY_TENSOR_KERNEL(device, dtype)                     \
+  REGISTER_USER_KERNEL("multi_tensor_scale_by_tensor")                                  \
+      .SetCreateFn<MultiTensorScaleByTensorKernel<device, dtype>>()                     \
+      .SetIsMatchedHob((user_op::HobDeviceType() == device)                             \
+                       && (user_op::HobDataType("x", 0) == GetDataType<dtype>::value));
+
+REGISTER_MULTI_TENSOR_SCALE_BY_TENSOR_KERNEL(DeviceType::kCPU, float);
+REGISTER_MULTI_TENSOR_SCALE_BY_TENSOR_KERNEL(DeviceType::kCPU, double);
+#ifdef WITH_CUDA
+REGISTER_MULTI_TENSOR_SCALE_BY_TENSOR_KERNEL(DeviceType::kCUDA, float);
+REGISTER_MULTI_TENSOR_SCALE_BY_TENSOR_KERNEL(DeviceType::kCUDA, double);
+#endif
+
 }  // namespace
 
 }  // namespace oneflow
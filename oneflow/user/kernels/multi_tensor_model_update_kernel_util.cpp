@@ -0,0 +1,269 @@
+/*
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+*/
+#include "oneflow/core/framework/framework.h"
+#include "oneflow/user/kernels/model_update_kernel_util.h"
+#include "oneflow/user/kernels/multi_tensor_model_update_kernel_util.h"
+
+namespace oneflow {
+
+template<typename T, typename G>
+struct MultiTensorSGDUpdateKernelUtil<DeviceType::kCPU, T, G> {
+  static void Update(ep::Stream* stream, const int64_t elem_cnt, const int64_t n_tensor, T scale,
+                     float l1, float l2, float weight_decay, float learning_rate_val,
+                     const float* learning_rate, const T* scale_by_ptr, const int64_t* skip_if,
+                     TensorTupleParams<2> tensor_tuple_params);
+};
+
+template<typename T, typename G>
+void MultiTensorSGDUpdateKernelUtil<DeviceType::kCPU, T, G>::Update(
+    ep::Stream* stream, const int64_t elem_cnt, const int64_t n_tensor, T scale, float l1, float l2,
+    float weight_decay, float learning_rate_val, const float* learning_rate, const T* scale_by_ptr,
+    const int64_t* skip_if, TensorTupleParams<2> tensor_tuple_params) {
+  if (skip_if != nullptr && *skip_if != 0) { return; }
+  if (learning_rate != nullptr) { learning_rate_val = *learning_rate; }
+  if (scale_by_ptr != nullptr) { scale *= *scale_by_ptr; }
+  for (int64_t tensor_idx = 0; tensor_idx < n_tensor; ++tensor_idx) {
+    T* model = static_cast<T*>(tensor_tuple_params.ptr[0][tensor_idx]);
+    const G* model_diff = static_cast<const G*>(tensor_tuple_params.ptr[1][tensor_idx]);
+    FOR_RANGE(int64_t, i, 0, tensor_tuple_params.sizes[tensor_idx]) {
+      SGDUpdateFunctor<T, G>()(model_diff + i, model + i, scale, l1, l2, weight_decay,
+                               learning_rate_val);
+    }
+  }
+}
+
+template struct MultiTensorSGDUpdateKernelUtil<DeviceType::kCPU, float, float>;
+template struct MultiTensorSGDUpdateKernelUtil<DeviceType::kCPU, double, double>;
+
+template<typename T, typename G>
+struct MultiTensorAdamUpdateKernelUtil<DeviceType::kCPU, T, G> {
+  static void Update(ep::Stream* stream, const int64_t elem_cnt, const int64_t n_tensor, T scale,
+                     float l1, float l2, float beta1, float beta2, float epsilon,
+                     float weight_decay, bool amsgrad, bool do_bias_correction,
+                     float learning_rate_val, float bias_correction1_val,
+                     float bias_correction2_val, const float* learning_rate, const T* scale_by_ptr,
+                     const int64_t* skip_if, const float* bias_correction1,
+                     const float* bias_correction2, TensorTupleParams<4> tensor_tuple_params);
+};
+
+template<typename T, typename G>
+void MultiTensorAdamUpdateKernelUtil<DeviceType::kCPU, T, G>::Update(
+    ep::Stream* stream, const int64_t elem_cnt, const int64_t n_tensor, T scale, float l1, float l2,
+    float beta1, float beta2, float epsilon, float weight_decay, bool amsgrad,
+    bool do_bias_correction, float learning_rate_val, float bias_correction1_val,
+    float bias_correction2_val, const float* learning_rate, const T* scale_by_ptr,
+    const int64_t* skip_if, const float* bias_correction1, const float* bias_correction2,
+    TensorTupleParams<4> tensor_tuple_params) {
+  if (skip_if != nullptr && *skip_if != 0) { return; }
+  if (learning_rate != nullptr) { learning_rate_val = *learning_rate; }
+  if (scale_by_ptr != nullptr) { scale *= *scale_by_ptr; }
+  if (bias_correction1 != nullptr) { bias_correction1_val = *bias_correction1; }
+  if (bias_correction2 != nullptr) { bias_correction2_val = *bias_correction2; }
+  for (int64_t tensor_idx = 0; tensor_idx < n_tensor; ++tensor_idx) {
+    T* model = static_cast<T*>(tensor_tuple_params.ptr[0][tensor_idx]);
+    const G* model_diff = static_cast<const G*>(tensor_tuple_params.ptr[1][tensor_idx]);
+    T* m = static_cast<T*>(tensor_tuple_params.ptr[2][tensor_idx]);
+    T* v = static_cast<T*>(tensor_tuple_params.ptr[3][tensor_idx]);
+    FOR_RANGE(int64_t, i, 0, tensor_tuple_params.sizes[tensor_idx]) {
+      // amsgrad is rejected by the kernel, so max_v is never touched.
+      AdamUpdateFunctor<T, G>()(model_diff + i, model + i, m + i, v + i, /*max_v=*/nullptr, scale,
+                                l1, l2, beta1, beta2, epsilon, weight_decay, /*amsgrad=*/false,
+                                bias_correction1_val, bias_correction2_val, learning_rate_val);
+    }
+  }
+}
+
+template struct MultiTensorAdamUpdateKernelUtil<DeviceType::kCPU, float, float>;
+template struct MultiTensorAdamUpdateKernelUtil<DeviceType::kCPU, double, double>;
+
+template<typename T, typename G>
+struct MultiTensorMomentumUpdateKernelUtil<DeviceType::kCPU, T, G> {
+  static void Update(ep::Stream* stream, const int64_t elem_cnt, const int64_t n_tensor, T scale,
+                     float l1, float l2, float beta, float dampening, bool nesterov, bool maximize,
+                     float weight_decay, float learning_rate_val, const float* learning_rate,
+                     const T* scale_by_ptr, const int64_t* skip_if,
+                     TensorTupleParams<3> tensor_tuple_params);
+};
+
+template<typename T, typename G>
+void MultiTensorMomentumUpdateKernelUtil<DeviceType::kCPU, T, G>::Update(
+    ep::Stream* stream, const int64_t elem_cnt, const int64_t n_tensor, T scale, float l1, float l2,
+    float beta, float dampening, bool nesterov, bool maximize, float weight_decay,
+    float learning_rate_val, const float* learning_rate, const T* scale_by_ptr,
+    const int64_t* skip_if, TensorTupleParams<3> tensor_tuple_params) {
+  if (skip_if != nullptr && *skip_if != 0) { return; }
+  if (learning_rate != nullptr) { learning_rate_val = *learning_rate; }
+  if (scale_by_ptr != nullptr) { scale *= *scale_by_ptr; }
+  for (int64_t tensor_idx = 0; tensor_idx < n_tensor; ++tensor_idx) {
+    T* model = static_cast<T*>(tensor_tuple_params.ptr[0][tensor_idx]);
+    const G* model_diff = static_cast<const G*>(tensor_tuple_params.ptr[1][tensor_idx]);
+    T* momentum = static_cast<T*>(tensor_tuple_params.ptr[2][tensor_idx]);
+    FOR_RANGE(int64_t, i, 0, tensor_tuple_params.sizes[tensor_idx]) {
+      MomentumUpdateFunctor<T, G>()(model_diff + i, model + i, momentum + i, scale, l1, l2, beta,
+                                    dampening, nesterov, maximize, weight_decay,
+                                    learning_rate_val);
+    }
+  }
+}
+
+template struct MultiTensorMomentumUpdateKernelUtil<DeviceType::kCPU, float, float>;
+template struct MultiTensorMomentumUpdateKernelUtil<DeviceType::kCPU, double, double>;
+
+template<typename T, typename G>
+struct MultiTensorAmsgradUpdateKernelUtil<DeviceType::kCPU, T, G> {
+  static void Update(ep::Stream* stream, const int64_t elem_cnt, const int64_t n_tensor, T scale,
+                     float l1, float l2, float beta1, float beta2, float epsilon,
+                     float weight_decay, float learning_rate_val, float bias_correction1_val,
+                     float bias_correction2_val, const float* learning_rate, const T* scale_by_ptr,
+                     const int64_t* skip_if, const float* bias_correction1,
+                     const float* bias_correction2, TensorTupleParams<5> tensor_tuple_params);
+};
+
+template<typename T, typename G>
+void MultiTensorAmsgradUpdateKernelUtil<DeviceType::kCPU, T, G>::Update(
+    ep::Stream* stream, const int64_t elem_cnt, const int64_t n_tensor, T scale, float l1, float l2,
+    float beta1, float beta2, float epsilon, float weight_decay, float learning_rate_val,
+    float bias_correction1_val, float bias_correction2_val, const float* learning_rate,
+    const T* scale_by_ptr, const int64_t* skip_if, const float* bias_correction1,
+    const float* bias_correction2, TensorTupleParams<5> tensor_tuple_params) {
+  if (skip_if != nullptr && *skip_if != 0) { return; }
+  if (learning_rate != nullptr) { learning_rate_val = *learning_rate; }
+  if (scale_by_ptr != nullptr) { scale *= *scale_by_ptr; }
+  if (bias_correction1 != nullptr) { bias_correction1_val = *bias_correction1; }
+  if (bias_correction2 != nullptr) { bias_correction2_val = *bias_correction2; }
+  for (int64_t tensor_idx = 0; tensor_idx < n_tensor; ++tensor_idx) {
+    T* model = static_cast<T*>(tensor_tuple_params.ptr[0][tensor_idx]);
+    const G* model_diff = static_cast<const G*>(tensor_tuple_params.ptr[1][tensor_idx]);
+    T* m = static_cast<T*>(tensor_tuple_params.ptr[2][tensor_idx]);
+    T* v = static_cast<T*>(tensor_tuple_params.ptr[3][tensor_idx]);
+    T* max_v = static_cast<T*>(tensor_tuple_params.ptr[4][tensor_idx]);
+    FOR_RANGE(int64_t, i, 0, tensor_tuple_params.sizes[tensor_idx]) {
+      AdamUpdateFunctor<T, G>()(model_diff + i, model + i, m + i, v + i, max_v + i, scale, l1, l2,
+                                beta1, beta2, epsilon, weight_decay, /*amsgrad=*/true,
+                                bias_correction1_val, bias_correction2_val, learning_rate_val);
+    }
+  }
+}
+
+template struct MultiTensorAmsgradUpdateKernelUtil<DeviceType::kCPU, float, float>;
+template struct MultiTensorAmsgradUpdateKernelUtil<DeviceType::kCPU, double, double>;
+
+template<typename T, typename G>
+struct MultiTensorRmspropUpdateKernelUtil<DeviceType::kCPU, T, G> {
+  static void Update(ep::Stream* stream, const int64_t elem_cnt, const int64_t n_tensor, T scale,
+                     float l1, float l2, float epsilon, float weight_decay, float decay_rate,
+                     float learning_rate_val, const float* learning_rate, const T* scale_by_ptr,
+                     const int64_t* skip_if, TensorTupleParams<3> tensor_tuple_params);
+};
+
+template<typename T, typename G>
+void MultiTensorRmspropUpdateKernelUtil<DeviceType::kCPU, T, G>::Update(
+    ep::Stream* stream, const int64_t elem_cnt, const int64_t n_tensor, T scale, float l1, float l2,
+    float epsilon, float weight_decay, float decay_rate, float learning_rate_val,
+    const float* learning_rate, const T* scale_by_ptr, const int64_t* skip_if,
+    TensorTupleParams<3> tensor_tuple_params) {
+  if (skip_if != nullptr && *skip_if != 0) { return; }
+  if (learning_rate != nullptr) { learning_rate_val = *learning_rate; }
+  if (scale_by_ptr != nullptr) { scale *= *scale_by_ptr; }
+  for (int64_t tensor_idx = 0; tensor_idx < n_tensor; ++tensor_idx) {
+    T* model = static_cast<T*>(tensor_tuple_params.ptr[0][tensor_idx]);
+    const G* model_diff = static_cast<const G*>(tensor_tuple_params.ptr[1][tensor_idx]);
+    T* mean_square = static_cast<T*>(tensor_tuple_params.ptr[2][tensor_idx]);
+    const int64_t n = tensor_tuple_params.sizes[tensor_idx];
+    FOR_RANGE(int64_t, i, 0, n) {
+      RmsPropUpdateFunctor<T, G, false>()(model_diff + i, model + i, n, scale, l1, l2,
+                                          mean_square + i, /*mean_gradient=*/nullptr, epsilon,
+                                          weight_decay, decay_rate, learning_rate_val);
+    }
+  }
+}
+
+template struct MultiTensorRmspropUpdateKernelUtil<DeviceType::kCPU, float, float>;
+template struct MultiTensorRmspropUpdateKernelUtil<DeviceType::kCPU, double, double>;
+
+template<typename T, typename G>
+struct MultiTensorLambUpdateKernelUtil<DeviceType::kCPU, T, G> {
+  static void Update(ep::Stream* stream, const int64_t elem_cnt, const int64_t n_tensor, T scale,
+                     float l1, float l2, float beta1, float beta2, float epsilon,
+                     float weight_decay, bool do_bias_correction, float learning_rate_val,
+                     float bias_correction1_val, float bias_correction2_val,
+                     const float* learning_rate, const T* scale_by_ptr, const int64_t* skip_if,
+                     const float* bias_correction1, const float* bias_correction2,
+                     TensorTupleParams<5> tensor_tuple_params, T* norm_buffer);
+};
+
+template<typename T, typename G>
+void MultiTensorLambUpdateKernelUtil<DeviceType::kCPU, T, G>::Update(
+    ep::Stream* stream, const int64_t elem_cnt, const int64_t n_tensor, T scale, float l1, float l2,
+    float beta1, float beta2, float epsilon, float weight_decay, bool do_bias_correction,
+    float learning_rate_val, float bias_correction1_val, float bias_correction2_val,
+    const float* learning_rate, const T* scale_by_ptr, const int64_t* skip_if,
+    const float* bias_correction1, const float* bias_correction2,
+    TensorTupleParams<5> tensor_tuple_params, T* norm_buffer) {
+  if (skip_if != nullptr && *skip_if != 0) { return; }
+  if (learning_rate != nullptr) { learning_rate_val = *learning_rate; }
+  if (scale_by_ptr != nullptr) { scale *= *scale_by_ptr; }
+  if (bias_correction1 != nullptr) { bias_correction1_val = *bias_correction1; }
+  if (bias_correction2 != nullptr) { bias_correction2_val = *bias_correction2; }
+  for (int64_t tensor_idx = 0; tensor_idx < n_tensor; ++tensor_idx) {
+    T* model = static_cast<T*>(tensor_tuple_params.ptr[0][tensor_idx]);
+    const G* model_diff = static_cast<const G*>(tensor_tuple_params.ptr[1][tensor_idx]);
+    T* m = static_cast<T*>(tensor_tuple_params.ptr[2][tensor_idx]);
+    T* v = static_cast<T*>(tensor_tuple_params.ptr[3][tensor_idx]);
+    T* adam_diff = static_cast<T*>(tensor_tuple_params.ptr[4][tensor_idx]);
+    T* w_norm_2 = norm_buffer + 2 * tensor_idx;
+    T* g_norm_2 = norm_buffer + 2 * tensor_idx + 1;
+    *w_norm_2 = 0;
+    *g_norm_2 = 0;
+    const int64_t n = tensor_tuple_params.sizes[tensor_idx];
+    FOR_RANGE(int64_t, i, 0, n) {
+      LambGradFunctor<T, G>()(model_diff + i, adam_diff + i, model + i, m + i, v + i, scale, l1,
+                              l2, beta1, beta2, epsilon, do_bias_correction, bias_correction1_val,
+                              bias_correction2_val);
+      *w_norm_2 += model[i] * model[i];
+      *g_norm_2 += adam_diff[i] * adam_diff[i];
+    }
+    const float lr = LambLRFunctor<T>()(learning_rate_val, w_norm_2, g_norm_2);
+    FOR_RANGE(int64_t, i, 0, n) {
+      LambUpdateFunctor<T>()(lr, weight_decay, adam_diff + i, model + i);
+    }
+  }
+}
+
+template struct MultiTensorLambUpdateKernelUtil<DeviceType::kCPU, float, float>;
+template struct MultiTensorLambUpdateKernelUtil<DeviceType::kCPU, double, double>;
+
+template<typename T>
+struct MultiTensorScaleByTensorKernelUtil<DeviceType::kCPU, T> {
+  static void Scale(ep::Stream* stream, const int64_t elem_cnt, const int64_t n_tensor,
+                    const T* scale, TensorTupleParams<1> tensor_tuple_params);
+};
+
+template<typename T>
+void MultiTensorScaleByTensorKernelUtil<DeviceType::kCPU, T>::Scale(
+    ep::Stream* stream, const int64_t elem_cnt, const int64_t n_tensor, const T* scale,
+    TensorTupleParams<1> tensor_tuple_params) {
+  const T scale_val = *scale;
+  for (int64_t tensor_idx = 0; tensor_idx < n_tensor; ++tensor_idx) {
+    T* x = static_cast<T*>(tensor_tuple_params.ptr[0][tensor_idx]);
+    FOR_RANGE(int64_t, i, 0, tensor_tuple_params.sizes[tensor_idx]) { x[i] *= scale_val; }
+  }
+}
+
+template struct MultiTensorScaleByTensorKernelUtil<DeviceType::kCPU, float>;
+template struct MultiTensorScaleByTensorKernelUtil<DeviceType::kCPU, double>;
+
+}  // namespace oneflow
@@ -17,6 +17,8 @@ limitations under the License.
 #include "oneflow/user/kernels/model_update_kernel_util.h"
 #include "oneflow/user/kernels/multi_tensor_model_update_kernel_util.h"
 #include "oneflow/core/ep/cuda/cuda_stream.h"
+#include "oneflow/core/cuda/atomic.cuh"
+#include <cub/cub.cuh>
 
 namespace oneflow {
 
@@ -384,4 +386,367 @@ void MultiTensorAdamUpdateWithCastKernelUtil<DeviceType::kCUDA, T, float16>::Upd
 template struct MultiTensorAdamUpdateWithCastKernelUtil<DeviceType::kCUDA, float, float>;
 template struct MultiTensorAdamUpdateWithCastKernelUtil<DeviceType::kCUDA, float, float16>;
 
+template<int N>
+unsigned int ComputeGridSizeAndBlockOffset(ep::Stream* stream, const int64_t elem_cnt,
+                                           const int64_t n_tensor,
+                                           TensorTupleParams<N>* tensor_tuple_params) {
+  const unsigned int grid_size =
+      ComputeGridSize(stream->As<ep::CudaStream>(), kBlockSize, elem_cnt);
+  for (int i = 0; i < n_tensor; i++) {
+    const int64_t tensor_elem_cnt = tensor_tuple_params->sizes[i];
+    tensor_tuple_params->block_offset[i] =
+        ((tensor_elem_cnt + kBlockSize * kUnrollSize - 1) / (kBlockSize * kUnrollSize)) % grid_size;
+  }
+  return grid_size;
+}
+
+template<typename T, typename G>
+__global__ void MultiTensorMomentumUpdateGpu(int64_t num_tensor, T scale, float l1, float l2,
+                                             float beta, float dampening, bool nesterov,
+                                             bool maximize, float weight_decay,
+                                             float learning_rate_val, const float* learning_rate,
+                                             const T* scale_by_ptr, const int64_t* skip_if,
+                                             TensorTupleParams<3> tensor_tuple_params) {
+  if (skip_if != nullptr && *skip_if != 0) { return; }
+  if (learning_rate != nullptr) { learning_rate_val = *learning_rate; }
+  if (scale_by_ptr != nullptr) { scale *= *scale_by_ptr; }
+  int64_t v_block_id = blockIdx.x;
+  for (int64_t tensor_idx = 0; tensor_idx < num_tensor; tensor_idx++) {
+    const int64_t tensor_elem_cnt = tensor_tuple_params.sizes[tensor_idx];
+    T* model_ptr = (T*)tensor_tuple_params.ptr[0][tensor_idx];
+    const G* model_diff_ptr = (const G*)tensor_tuple_params.ptr[1][tensor_idx];
+    T* momentum_ptr = (T*)tensor_tuple_params.ptr[2][tensor_idx];
+    for (int64_t i = v_block_id * blockDim.x * kUnrollSize + threadIdx.x; i < tensor_elem_cnt;
+         i += blockDim.x * gridDim.x * kUnrollSize) {
+#pragma unroll
+      for (int32_t ilp = 0; ilp < kUnrollSize; ilp++) {
+        int64_t actual_idx = i + ilp * blockDim.x;
+        if (actual_idx < tensor_elem_cnt) {
+          MomentumUpdateFunctor<T, G>()(model_diff_ptr + actual_idx, model_ptr + actual_idx,
+                                        momentum_ptr + actual_idx, scale, l1, l2, beta, dampening,
+                                        nesterov, maximize, weight_decay, learning_rate_val);
+        }
+      }
+    }
+    v_block_id -= tensor_tuple_params.block_offset[tensor_idx];
+    if (v_block_id < 0) { v_block_id += gridDim.x; }
+  }
+}
+
+template<typename T, typename G>
+struct MultiTensorMomentumUpdateKernelUtil<DeviceType::kCUDA, T, G> {
+  static void Update(ep::Stream* stream, const int64_t elem_cnt, const int64_t n_tensor, T scale,
+                     float l1, float l2, float beta, float dampening, bool nesterov, bool maximize,
+                     float weight_decay, float learning_rate_val, const float* learning_rate,
+                     const T* scale_by_ptr, const int64_t* skip_if,
+                     TensorTupleParams<3> tensor_tuple_params);
+};
+
+template<typename T, typename G>
+void MultiTensorMomentumUpdateKernelUtil<DeviceType::kCUDA, T, G>::Update(
+    ep::Stream* stream, const int64_t elem_cnt, const int64_t n_tensor, T scale, float l1, float l2,
+    float beta, float dampening, bool nesterov, bool maximize, float weight_decay,
+    float learning_rate_val, const float* learning_rate, const T* scale_by_ptr,
+    const int64_t* skip_if, TensorTupleParams<3> tensor_tuple_params) {
+  const unsigned int grid_size =
+      ComputeGridSizeAndBlockOffset(stream, elem_cnt, n_tensor, &tensor_tuple_params);
+  MultiTensorMomentumUpdateGpu<T, G>
+      <<<grid_size, kBlockSize, 0, stream->As<ep::CudaStream>()->cuda_stream()>>>(
+          n_tensor, scale, l1, l2, beta, dampening, nesterov, maximize, weight_decay,
+          learning_rate_val, learning_rate, scale_by_ptr, skip_if, tensor_tuple_params);
+}
+
+template struct MultiTensorMomentumUpdateKernelUtil<DeviceType::kCUDA, float, float>;
+template struct MultiTensorMomentumUpdateKernelUtil<DeviceType::kCUDA, double, double>;
+
+template<typename T, typename G>
+__global__ void MultiTensorAmsgradUpdateGpu(
+    int64_t num_tensor, T scale, float l1, float l2, float beta1, float beta2, float epsilon,
+    float weight_decay, float learning_rate_val, float bias_correction1_val,
+    float bias_correction2_val, const float* learning_rate, const T* scale_by_ptr,
+    const int64_t* skip_if, const float* bias_correction1_ptr, const float* bias_correction2_ptr,
+    TensorTupleParams<5> tensor_tuple_params) {
+  if (skip_if != nullptr && *skip_if != 0) { return; }
+  if (learning_rate != nullptr) { learning_rate_val = *learning_rate; }
+  if (scale_by_ptr != nullptr) { scale *= *scale_by_ptr; }
+  if (bias_correction1_ptr != nullptr) { bias_correction1_val = *bias_correction1_ptr; }
+  if (bias_correction2_ptr != nullptr) { bias_correction2_val = *bias_correction2_ptr; }
+  int64_t v_block_id = blockIdx.x;
+  for (int64_t tensor_idx = 0; tensor_idx < num_tensor; tensor_idx++) {
+    const int64_t tensor_elem_cnt = tensor_tuple_params.sizes[tensor_idx];
+    T* model_ptr = (T*)tensor_tuple_params.ptr[0][tensor_idx];
+    const G* model_diff_ptr = (const G*)tensor_tuple_params.ptr[1][tensor_idx];
+    T* m_ptr = (T*)tensor_tuple_params.ptr[2][tensor_idx];
+    T* v_ptr = (T*)tensor_tuple_params.ptr[3][tensor_idx];
+    T* max_v_ptr = (T*)tensor_tuple_params.ptr[4][tensor_idx];
+    for (int64_t i = v_block_id * blockDim.x * kUnrollSize + threadIdx.x; i < tensor_elem_cnt;
+         i += blockDim.x * gridDim.x * kUnrollSize) {
+#pragma unroll
+      for (int32_t ilp = 0; ilp < kUnrollSize; ilp++) {
+        int64_t actual_idx = i + ilp * blockDim.x;
+        if (actual_idx < tensor_elem_cnt) {
+          AdamUpdateFunctor<T, G>()(model_diff_ptr + actual_idx, model_ptr + actual_idx,
+                                    m_ptr + actual_idx, v_ptr + actual_idx,
+                                    max_v_ptr + actual_idx, scale, l1, l2, beta1, beta2, epsilon,
+                                    weight_decay, /*amsgrad=*/true, bias_correction1_val,
+                                    bias_correction2_val, learning_rate_val);
+        }
+      }
+    }
+    v_block_id -= tensor_tuple_params.block_offset[tensor_idx];
+    if (v_block_id < 0) { v_block_id += gridDim.x; }
+  }
+}
+
+template<typename T, typename G>
+struct MultiTensorAmsgradUpdateKernelUtil<DeviceType::kCUDA, T, G> {
+  static void Update(ep::Stream* stream, const int64_t elem_cnt, const int64_t n_tensor, T scale,
+                     float l1, float l2, float beta1, float beta2, float epsilon,
+                     float weight_decay, float learning_rate_val, float bias_correction1_val,
+                     float bias_correction2_val, const float* learning_rate, const T* scale_by_ptr,
+                     const int64_t* skip_if, const float* bias_correction1,
+                     const float* bias_correction2, TensorTupleParams<5> tensor_tuple_params);
+};
+
+template<typename T, typename G>
+void MultiTensorAmsgradUpdateKernelUtil<DeviceType::kCUDA, T, G>::Update(
+    ep::Stream* stream, const int64_t elem_cnt, const int64_t n_tensor, T scale, float l1, float l2,
+    float beta1, float beta2, float epsilon, float weight_decay, float learning_rate_val,
+    float bias_correction1_val, float bias_correction2_val, const float* learning_rate,
+    const T* scale_by_ptr, const int64_t* skip_if, const float* bias_correction1,
+    const float* bias_correction2, TensorTupleParams<5> tensor_tuple_params) {
+  const unsigned int grid_size =
+      ComputeGridSizeAndBlockOffset(stream, elem_cnt, n_tensor, &tensor_tuple_params);
+  MultiTensorAmsgradUpdateGpu<T, G>
+      <<<grid_size, kBlockSize, 0, stream->As<ep::CudaStream>()->cuda_stream()>>>(
+          n_tensor, scale, l1, l2, beta1, beta2, epsilon, weight_decay, learning_rate_val,
+          bias_correction1_val, bias_correction2_val, learning_rate, scale_by_ptr, skip_if,
+          bias_correction1, bias_correction2, tensor_tuple_params);
+}
+
+template struct MultiTensorAmsgradUpdateKernelUtil<DeviceType::kCUDA, float, float>;
+template struct MultiTensorAmsgradUpdateKernelUtil<DeviceType::kCUDA, double, double>;
+
+template<typename T, typename G>
+__global__ void MultiTensorRmspropUpdateGpu(int64_t num_tensor, T scale, float l1, float l2,
+                                            float epsilon, float weight_decay, float decay_rate,
+                                            float learning_rate_val, const float* learning_rate,
+                                            const T* scale_by_ptr, const int64_t* skip_if,
+                                            TensorTupleParams<3> tensor_tuple_params) {
+  if (skip_if != nullptr && *skip_if != 0) { return; }
+  if (learning_rate != nullptr) { learning_rate_val = *learning_rate; }
+  if (scale_by_ptr != nullptr) { scale *= *scale_by_ptr; }
+  int64_t v_block_id = blockIdx.x;
+  for (int64_t tensor_idx = 0; tensor_idx < num_tensor; tensor_idx++) {
+    const int64_t tensor_elem_cnt = tensor_tuple_params.sizes[tensor_idx];
+    T* model_ptr = (T*)tensor_tuple_params.ptr[0][tensor_idx];
+    const G* model_diff_ptr = (const G*)tensor_tuple_params.ptr[1][tensor_idx];
+    T* mean_square_ptr = (T*)tensor_tuple_params.ptr[2][tensor_idx];
+    for (int64_t i = v_block_id * blockDim.x * kUnrollSize + threadIdx.x; i < tensor_elem_cnt;
+         i += blockDim.x * gridDim.x * kUnrollSize) {
+#pragma unroll
+      for (int32_t ilp = 0; ilp < kUnrollSize; ilp++) {
+        int64_t actual_idx = i + ilp * blockDim.x;
+        if (actual_idx < tensor_elem_cnt) {
+          RmsPropUpdateFunctor<T, G, false>()(
+              model_diff_ptr + actual_idx, model_ptr + actual_idx, tensor_elem_cnt, scale, l1, l2,
+              mean_square_ptr + actual_idx, /*mean_gradient=*/nullptr, epsilon, weight_decay,
+              decay_rate, learning_rate_val);
+        }
+      }
+    }
+    v_block_id -= tensor_tuple_params.block_offset[tensor_idx];
+    if (v_block_id < 0) { v_block_id += gridDim.x; }
+  }
+}
+
+template<typename T, typename G>
+struct MultiTensorRmspropUpdateKernelUtil<DeviceType::kCUDA, T, G> {
+  static void Update(ep::Stream* stream, const int64_t elem_cnt, const int64_t n_tensor, T scale,
+                     float l1, float l2, float epsilon, float weight_decay, float decay_rate,
+                     float learning_rate_val, const float* learning_rate, const T* scale_by_ptr,
+                     const int64_t* skip_if, TensorTupleParams<3> tensor_tuple_params);
+};
+
+template<typename T, typename G>
+void MultiTensorRmspropUpdateKernelUtil<DeviceType::kCUDA, T, G>::Update(
+    ep::Stream* stream, const int64_t elem_cnt, const int64_t n_tensor, T scale, float l1, float l2,
+    float epsilon, float weight_decay, float decay_rate, float learning_rate_val,
+    const float* learning_rate, const T* scale_by_ptr, const int64_t* skip_if,
+    TensorTupleParams<3> tensor_tuple_params) {
+  const unsigned int grid_size =
+      ComputeGridSizeAndBlockOffset(stream, elem_cnt, n_tensor, &tensor_tuple_params);
+  MultiTensorRmspropUpdateGpu<T, G>
+      <<<grid_size, kBlockSize, 0, stream->As<ep::CudaStream>()->cuda_stream()>>>(
+          n_tensor, scale, l1, l2, epsilon, weight_decay, decay_rate, learning_rate_val,
+          learning_rate, scale_by_ptr, skip_if, tensor_tuple_params);
+}
+
+template struct MultiTensorRmspropUpdateKernelUtil<DeviceType::kCUDA, float, float>;
+template struct MultiTensorRmspropUpdateKernelUtil<DeviceType::kCUDA, double, double>;
+
+// Computes the adam diff of every model, and accumulates the squared norms of each model and of
+// its adam diff into norm_buffer.
+template<typename T, typename G>
+__global__ void MultiTensorLambGradGpu(int64_t num_tensor, T scale, float l1, float l2,
+                                       float beta1, float beta2, float epsilon,
+                                       bool do_bias_correction, float bias_correction1_val,
+                                       float bias_correction2_val, const T* scale_by_ptr,
+                                       const int64_t* skip_if, const float* bias_correction1_ptr,
+                                       const float* bias_correction2_ptr,
+                                       TensorTupleParams<5> tensor_tuple_params, T* norm_buffer) {
+  if (skip_if != nullptr && *skip_if != 0) { return; }
+  if (scale_by_ptr != nullptr) { scale *= *scale_by_ptr; }
+  if (bias_correction1_ptr != nullptr) { bias_correction1_val = *bias_correction1_ptr; }
+  if (bias_correction2_ptr != nullptr) { bias_correction2_val = *bias_correction2_ptr; }
+  typedef cub::BlockReduce<T, kBlockSize> BlockReduce;
+  __shared__ typename BlockReduce::TempStorage w_temp_storage;
+  __shared__ typename BlockReduce::TempStorage g_temp_storage;
+  int64_t v_block_id = blockIdx.x;
+  for (int64_t tensor_idx = 0; tensor_idx < num_tensor; tensor_idx++) {
+    const int64_t tensor_elem_cnt = tensor_tuple_params.sizes[tensor_idx];
+    T* model_ptr = (T*)tensor_tuple_params.ptr[0][tensor_idx];
+    const G* model_diff_ptr = (const G*)tensor_tuple_params.ptr[1][tensor_idx];
+    T* m_ptr = (T*)tensor_tuple_params.ptr[2][tensor_idx];
+    T* v_ptr = (T*)tensor_tuple_params.ptr[3][tensor_idx];
+    T* adam_diff_ptr = (T*)tensor_tuple_params.ptr[4][tensor_idx];
+    T w_sum = 0;
+    T g_sum = 0;
+    for (int64_t i = v_block_id * blockDim.x * kUnrollSize + threadIdx.x; i < tensor_elem_cnt;
+         i += blockDim.x * gridDim.x * kUnrollSize) {
+#pragma unroll
+      for (int32_t ilp = 0; ilp < kUnrollSize; ilp++) {
+        int64_t actual_idx = i + ilp * blockDim.x;
+        if (actual_idx < tensor_elem_cnt) {
+          LambGradFunctor<T, G>()(model_diff_ptr + actual_idx, adam_diff_ptr + actual_idx,
+                                  model_ptr + actual_idx, m_ptr + actual_idx, v_ptr + actual_idx,
+                                  scale, l1, l2, beta1, beta2, epsilon, do_bias_correction,
+                                  bias_correction1_val, bias_correction2_val);
+          const T model_val = model_ptr[actual_idx];
+          const T adam_diff_val = adam_diff_ptr[actual_idx];
+          w_sum += model_val * model_val;
+          g_sum += adam_diff_val * adam_diff_val;
+        }
+      }
+    }
+    const T block_w_sum = BlockReduce(w_temp_storage).Sum(w_sum);
+    const T block_g_sum = BlockReduce(g_temp_storage).Sum(g_sum);
+    if (threadIdx.x == 0) {
+      cuda::atomic::Add(norm_buffer + 2 * tensor_idx, block_w_sum);
+      cuda::atomic::Add(norm_buffer + 2 * tensor_idx + 1, block_g_sum);
+    }
+    // the temp storage is reused by the next tensor
+    __syncthreads();
+    v_block_id -= tensor_tuple_params.block_offset[tensor_idx];
+    if (v_block_id < 0) { v_block_id += gridDim.x; }
+  }
+}
+
+template<typename T>
+__global__ void MultiTensorLambUpdateGpu(int64_t num_tensor, float weight_decay,
+                                         float learning_rate_val, const float* learning_rate,
+                                         const int64_t* skip_if, const T* norm_buffer,
+                                         TensorTupleParams<5> tensor_tuple_params) {
+  if (skip_if != nullptr && *skip_if != 0) { return; }
+  if (learning_rate != nullptr) { learning_rate_val = *learning_rate; }
+  int64_t v_block_id = blockIdx.x;
+  for (int64_t tensor_idx = 0; tensor_idx < num_tensor; tensor_idx++) {
+    const int64_t tensor_elem_cnt = tensor_tuple_params.sizes[tensor_idx];
+    T* model_ptr = (T*)tensor_tuple_params.ptr[0][tensor_idx];
+    const T* adam_diff_ptr = (const T*)tensor_tuple_params.ptr[4][tensor_idx];
+    const float lr = LambLRFunctor<T>()(learning_rate_val, norm_buffer + 2 * tensor_idx,
+                                        norm_buffer + 2 * tensor_idx + 1);
+    for (int64_t i = v_block_id * blockDim.x * kUnrollSize + threadIdx.x; i < tensor_elem_cnt;
+         i += blockDim.x * gridDim.x * kUnrollSize) {
+#pragma unroll
+      for (int32_t ilp = 0; ilp < kUnrollSize; ilp++) {
+        int64_t actual_idx = i + ilp * blockDim.x;
+        if (actual_idx < tensor_elem_cnt) {
+          LambUpdateFunctor<T>()(lr, weight_decay, adam_diff_ptr + actual_idx,
+                                 model_ptr + actual_idx);
+        }
+      }
+    }
+    v_block_id -= tensor_tuple_params.block_offset[tensor_idx];
+    if (v_block_id < 0) { v_block_id += gridDim.x; }
+  }
+}
+
+template<typename T, typename G>
+struct MultiTensorLambUpdateKernelUtil<DeviceType::kCUDA, T, G> {
+  static void Update(ep::Stream* stream, const int64_t elem_cnt, const int64_t n_tensor, T scale,
+                     float l1, float l2, float beta1, float beta2, float epsilon,
+                     float weight_decay, bool do_bias_correction, float learning_rate_val,
+                     float bias_correction1_val, float bias_correction2_val,
+                     const float* learning_rate, const T* scale_by_ptr, const int64_t* skip_if,
+                     const float* bias_correction1, const float* bias_correction2,
+                     TensorTupleParams<5> tensor_tuple_params, T* norm_buffer);
+};
+
+template<typename T, typename G>
+void MultiTensorLambUpdateKernelUtil<DeviceType::kCUDA, T, G>::Update(
+    ep::Stream* stream, const int64_t elem_cnt, const int64_t n_tensor, T scale, float l1, float l2,
+    float beta1, float beta2, float epsilon, float weight_decay, bool do_bias_correction,
+    float learning_rate_val, float bias_correction1_val, float bias_correction2_val,
+    const float* learning_rate, const T* scale_by_ptr, const int64_t* skip_if,
+    const float* bias_correction1, const float* bias_correction2,
+    TensorTupleParams<5> tensor_tuple_params, T* norm_buffer) {
+  const unsigned int grid_size =
+      ComputeGridSizeAndBlockOffset(stream, elem_cnt, n_tensor, &tensor_tuple_params);
+  Memset<DeviceType::kCUDA>(stream, norm_buffer, 0, 2 * n_tensor * sizeof(T));
+  MultiTensorLambGradGpu<T, G>
+      <<<grid_size, kBlockSize, 0, stream->As<ep::CudaStream>()->cuda_stream()>>>(
+          n_tensor, scale, l1, l2, beta1, beta2, epsilon, do_bias_correction,
+          bias_correction1_val, bias_correction2_val, scale_by_ptr, skip_if, bias_correction1,
+          bias_correction2, tensor_tuple_params, norm_buffer);
+  MultiTensorLambUpdateGpu<T>
+      <<<grid_size, kBlockSize, 0, stream->As<ep::CudaStream>()->cuda_stream()>>>(
+          n_tensor, weight_decay, learning_rate_val, learning_rate, skip_if, norm_buffer,
+          tensor_tuple_params);
+}
+
+template struct MultiTensorLambUpdateKernelUtil<DeviceType::kCUDA, float, float>;
+template struct MultiTensorLambUpdateKernelUtil<DeviceType::kCUDA, double, double>;
+
+template<typename T>
+__global__ void MultiTensorScaleByTensorGpu(int64_t num_tensor, const T* scale,
+                                            TensorTupleParams<1> tensor_tuple_params) {
+  const T scale_val = *scale;
+  int64_t v_block_id = blockIdx.x;
+  for (int64_t tensor_idx = 0; tensor_idx < num_tensor; tensor_idx++) {
+    const int64_t tensor_elem_cnt = tensor_tuple_params.sizes[tensor_idx];
+    T* x_ptr = (T*)tensor_tuple_params.ptr[0][tensor_idx];
+    for (int64_t i = v_block_id * blockDim.x + threadIdx.x; i < tensor_elem_cnt;
+         i += blockDim.x * gridDim.x) {
+      x_ptr[i] *= scale_val;
+    }
+    v_block_id -= tensor_tuple_params.block_offset[tensor_idx];
+    if (v_block_id < 0) { v_block_id += gridDim.x; }
+  }
+}
+
+template<typename T>
+struct MultiTensorScaleByTensorKernelUtil<DeviceType::kCUDA, T> {
+  static void Scale(ep::Stream* stream, const int64_t elem_cnt, const int64_t n_tensor,
+                    const T* scale, TensorTupleParams<1> tensor_tuple_params);
+};
+
+template<typename T>
+void MultiTensorScaleByTensorKernelUtil<DeviceType::kCUDA, T>::Scale(
+    ep::Stream* stream, const int64_t elem_cnt, const int64_t n_tensor, const T* scale,
+    TensorTupleParams<1> tensor_tuple_params) {
+  const unsigned int grid_size =
+      ComputeGridSize(stream->As<ep::CudaStream>(), kBlockSize, elem_cnt);
+  for (int i = 0; i < n_tensor; i++) {
+    tensor_tuple_params.block_offset[i] =
+        ((tensor_tuple_params.sizes[i] + kBlockSize - 1) / kBlockSize) % grid_size;
+  }
+  MultiTensorScaleByTensorGpu<T>
+      <<<grid_size, kBlockSize, 0, stream->As<ep::CudaStream>()->cuda_stream()>>>(
+          n_tensor, scale, tensor_tuple_params);
+}
+
+template struct MultiTensorScaleByTensorKernelUtil<DeviceType::kCUDA, float>;
+template struct MultiTensorScaleByTensorKernelUtil<DeviceType::kCUDA, double>;
+
 }  // namespace oneflow
@@ -69,6 +69,52 @@ struct MultiTensorAdamUpdateWithCastKernelUtil {
                      const float* bias_correction2, TensorTupleParams<5> tensor_tuple_params);
 };
 
+template<DeviceType device_type, typename T, typename G>
+struct MultiTensorMomentumUpdateKernelUtil {
+  static void Update(ep::Stream* stream, const int64_t elem_cnt, const int64_t n_tensor, T scale,
+                     float l1, float l2, float beta, float dampening, bool nesterov, bool maximize,
+                     float weight_decay, float learning_rate_val, const float* learning_rate,
+                     const T* scale_by_ptr, const int64_t* skip_if,
+                     TensorTupleParams<3> tensor_tuple_params);
+};
+
+template<DeviceType device_type, typename T, typename G>
+struct MultiTensorAmsgradUpdateKernelUtil {
+  static void Update(ep::Stream* stream, const int64_t elem_cnt, const int64_t n_tensor, T scale,
+                     float l1, float l2, float beta1, float beta2, float epsilon,
+                     float weight_decay, float learning_rate_val, float bias_correction1_val,
+                     float bias_correction2_val, const float* learning_rate, const T* scale_by_ptr,
+                     const int64_t* skip_if, const float* bias_correction1,
+                     const float* bias_correction2, TensorTupleParams<5> tensor_tuple_params);
+};
+
+template<DeviceType device_type, typename T, typename G>
+struct MultiTensorRmspropUpdateKernelUtil {
+  static void Update(ep::Stream* stream, const int64_t elem_cnt, const int64_t n_tensor, T scale,
+                     float l1, float l2, float epsilon, float weight_decay, float decay_rate,
+                     float learning_rate_val, const float* learning_rate, const T* scale_by_ptr,
+                     const int64_t* skip_if, TensorTupleParams<3> tensor_tuple_params);
+};
+
+// The tensors of the tuple are model, model_diff, m, v and a buffer for the adam diff of each
+// model. norm_buffer holds the squared norms of the model and of the adam diff of each model.
+template<DeviceType device_type, typename T, typename G>
+struct MultiTensorLambUpdateKernelUtil {
+  static void Update(ep::Stream* stream, const int64_t elem_cnt, const int64_t n_tensor, T scale,
+                     float l1, float l2, float beta1, float beta2, float epsilon,
+                     float weight_decay, bool do_bias_correction, float learning_rate_val,
+                     float bias_correction1_val, float bias_correction2_val,
+                     const float* learning_rate, const T* scale_by_ptr, const int64_t* skip_if,
+                     const float* bias_correction1, const float* bias_correction2,
+                     TensorTupleParams<5> tensor_tuple_params, T* norm_buffer);
+};
+
+template<DeviceType device_type, typename T>
+struct MultiTensorScaleByTensorKernelUtil {
+  static void Scale(ep::Stream* stream, const int64_t elem_cnt, const int64_t n_tensor,
+                    const T* scale, TensorTupleParams<1> tensor_tuple_params);
+};
+
 }  // namespace oneflow
 
 #endif
@@ -0,0 +1,420 @@
+/*
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+*/
+#include "oneflow/core/framework/framework.h"
+#include "oneflow/core/embedding/key_value_store.h"
+#include "oneflow/core/embedding/embedding_manager.h"
+#include "oneflow/user/kernels/one_embedding_initializer_util.h"
+#include "oneflow/core/framework/random_generator_impl.h"
+#include "oneflow/core/ep/include/primitive/cast.h"
+
+namespace oneflow {
+
+namespace {
+
+using embedding::EmbeddingInitializer;
+using embedding::InitializerType;
+
+template<typename T>
+class EmbeddingKernelState final : public user_op::OpKernelState {
+ public:
+  explicit EmbeddingKernelState(user_op::KernelInitContext* ctx)
+      : generator_(CHECK_JUST(one::MakeGenerator(DeviceType::kCPU))) {
+    const std::string& embedding_name = ctx->Attr<std::string>("embedding_name");
+    const int64_t parallel_id = ctx->parallel_ctx().parallel_id();
+    key_value_store_ = Singleton<embedding::EmbeddingManager>::Get()->GetKeyValueStore(
+        embedding_name, parallel_id);
+    uint32_t max_query_length =
+        ctx->TensorDesc4ArgNameAndIndex("unique_ids", 0)->shape().elem_cnt();
+    key_value_store_->ReserveQueryLength(max_query_length);
+    embedding_state_ = Singleton<embedding::EmbeddingManager>::Get()->GetEmbeddingState(
+        embedding_name, parallel_id);
+
+    const int64_t embedding_size = ctx->Attr<int64_t>("embedding_size");
+    const int64_t line_size = ctx->Attr<int64_t>("line_size");
+    const std::string& state_initializer = ctx->Attr<std::string>("state_initializer");
+    embedding::ParseInitializers(line_size, embedding_size, state_initializer,
+                                 ctx->Attr<std::string>("embedding_tables"), &initializer_param_,
+                                 &initializer_index_);
+    missing_indices_.resize(max_query_length);
+    values_.resize(max_query_length * line_size);
+  }
+  ~EmbeddingKernelState() override = default;
+
+  embedding::KeyValueStore* KeyValueStore() { return key_value_store_; }
+
+  embedding::EmbeddingState* EmbeddingState() { return embedding_state_; }
+
+  one::Generator* generator() { return generator_.get(); }
+
+  const int8_t* InitializerIndex() { return initializer_index_.data(); }
+  const EmbeddingInitializer* Initializers() { return initializer_param_.data(); }
+
+  uint32_t* MissingIndices() { return missing_indices_.data(); }
+  T* Values() { return values_.data(); }
+
+ private:
+  std::shared_ptr<one::Generator> generator_;
+  embedding::KeyValueStore* key_value_store_;
+  embedding::EmbeddingState* embedding_state_;
+
+  std::vector<EmbeddingInitializer> initializer_param_;
+  std::vector<int8_t> initializer_index_;
+  std::vector<uint32_t> missing_indices_;
+  std::vector<T> values_;
+};
+
+class EmbeddingPutKernelState final : public user_op::OpKernelState {
+ public:
+  explicit EmbeddingPutKernelState(user_op::KernelInitContext* ctx) {
+    const std::string& embedding_name = ctx->Attr<std::string>("embedding_name");
+    const int64_t parallel_id = ctx->parallel_ctx().parallel_id();
+    key_value_store_ = Singleton<embedding::EmbeddingManager>::Get()->GetKeyValueStore(
+        embedding_name, parallel_id);
+    uint32_t max_query_length =
+        ctx->TensorDesc4ArgNameAndIndex("unique_ids", 0)->shape().elem_cnt();
+    key_value_store_->ReserveQueryLength(max_query_length);
+    embedding_state_ = Singleton<embedding::EmbeddingManager>::Get()->GetEmbeddingState(
+        embedding_name, parallel_id);
+  }
+  ~EmbeddingPutKernelState() override = default;
+
+  embedding::KeyValueStore* KeyValueStore() { return key_value_store_; }
+  embedding::EmbeddingState* EmbeddingState() { return embedding_state_; }
+
+ private:
+  embedding::KeyValueStore* key_value_store_;
+  embedding::EmbeddingState* embedding_state_;
+};
+
+class IdShuffleCopyOutKernelState final : public user_op::OpKernelState {
+ public:
+  explicit IdShuffleCopyOutKernelState(user_op::KernelInitContext* ctx) {
+    const std::string& embedding_name = ctx->Attr<std::string>("embedding_name");
+    const int64_t parallel_id = ctx->parallel_ctx().parallel_id();
+    embedding_state_ = Singleton<embedding::EmbeddingManager>::Get()->GetEmbeddingState(
+        embedding_name, parallel_id);
+  }
+  ~IdShuffleCopyOutKernelState() override = default;
+
+  embedding::EmbeddingState* EmbeddingState() { return embedding_state_; }
+
+ private:
+  embedding::EmbeddingState* embedding_state_;
+};
+
+template<typename T, typename U>
+void InitMissingValues(std::mt19937& engine, uint32_t num_missing, const int64_t line_size,
+                       const EmbeddingInitializer* initializer_param,
+                       const int8_t* initializer_index, const U* table_ids,
+                       const uint32_t* missing_indices, T* values) {
+  std::uniform_real_distribution<float> uniform(0, 1);
+  std::normal_distribution<float> normal(0, 1);
+  for (uint32_t row = 0; row < num_missing; ++row) {
+    const uint32_t index = missing_indices[row];
+    const int32_t table_idx = table_ids[index];
+    for (int64_t col = 0; col < line_size; ++col) {
+      const int32_t initializer_idx = initializer_index[table_idx * line_size + col];
+      const EmbeddingInitializer& initializer = initializer_param[initializer_idx];
+      T value;
+      if (initializer.type == InitializerType::kUniform) {
+        const float low = initializer.uniform_param.low;
+        const float high = initializer.uniform_param.high;
+        value = uniform(engine) * (high - low) + low;
+      } else if (initializer.type == InitializerType::kNormal) {
+        const float mean = initializer.normal_param.mean;
+        const float std = initializer.normal_param.std;
+        value = normal(engine) * std + mean;
+      } else if (initializer.type == InitializerType::kConstant) {
+        value = initializer.constant_param.value;
+      } else {
+        UNIMPLEMENTED() << "Unsupported initializer type";
+      }
+      values[index * line_size + col] = value;
+    }
+  }
+}
+
+template<typename T, typename U>
+void LookupAndInitMissing(ep::Stream* stream, EmbeddingKernelState<T>* kernel_state,
+                          uint32_t num_unique, const int64_t line_size, const bool is_prefetch,
+                          const void* unique_ids, const void* table_ids, void* store_values) {
+  const auto& generator = kernel_state->generator();
+  CHECK_NOTNULL(generator);
+  const auto& cpu_generator = CHECK_JUST(generator->template Get<one::CPUGeneratorImpl>());
+  embedding::KeyValueStore* store = kernel_state->KeyValueStore();
+  uint32_t* missing_indices = kernel_state->MissingIndices();
+  uint32_t num_missing = 0;
+  store->Get(stream, num_unique, unique_ids, store_values, &num_missing, missing_indices);
+  if (num_missing > 0) {
+    InitMissingValues<T, U>(cpu_generator->engine(), num_missing, line_size,
+                            kernel_state->Initializers(), kernel_state->InitializerIndex(),
+                            reinterpret_cast<const U*>(table_ids), missing_indices,
+                            reinterpret_cast<T*>(store_values));
+  }
+  if (is_prefetch) { store->Put(stream, num_unique, unique_ids, store_values); }
+}
+
+template<typename T>
+void CopyValuesToEmbeddings(ep::Stream* stream, int64_t num_unique, const int64_t embedding_size,
+                            const int64_t value_size, const DataType value_dtype,
+                            const DataType embedding_dtype, const T* values, void* embeddings) {
+  if (value_dtype == embedding_dtype) {
+    T* embeddings_ptr = reinterpret_cast<T*>(embeddings);
+    for (int64_t row = 0; row < num_unique; ++row) {
+      std::copy(values + row * value_size, values + row * value_size + embedding_size,
+                embeddings_ptr + row * embedding_size);
+    }
+  } else {
+    std::unique_ptr<ep::primitive::Cast> cast_primitive =
+        ep::primitive::NewPrimitive<ep::primitive::CastFactory>(DeviceType::kCPU, value_dtype,
+                                                                embedding_dtype);
+    CHECK(cast_primitive);
+    const size_t embedding_row_bytes = embedding_size * GetSizeOfDataType(embedding_dtype);
+    for (int64_t row = 0; row < num_unique; ++row) {
+      cast_primitive->Launch(stream, values + row * value_size,
+                             reinterpret_cast<char*>(embeddings) + row * embedding_row_bytes,
+                             embedding_size);
+    }
+  }
+}
+
+template<typename T, typename U, typename IDX>
+class EmbeddingPrefetchKernel final : public user_op::OpKernel {
+ public:
+  EmbeddingPrefetchKernel() : current_iter_(0){};
+  ~EmbeddingPrefetchKernel() override = default;
+
+  std::shared_ptr<user_op::OpKernelState> CreateOpKernelState(
+      user_op::KernelInitContext* ctx) const override {
+    return std::make_shared<EmbeddingKernelState<T>>(ctx);
+  }
+
+ private:
+  using user_op::OpKernel::Compute;
+  void Compute(user_op::KernelComputeContext* ctx, user_op::OpKernelState* state,
+               const user_op::OpKernelCache*) const override {
+    auto* kernel_state = dynamic_cast<EmbeddingKernelState<T>*>(state);
+    CHECK(kernel_state != nullptr);
+    embedding::EmbeddingState* embedding_state = kernel_state->EmbeddingState();
+    uint32_t num_unique = embedding_state->GetIdNumUnique(current_iter_);
+    const user_op::Tensor* unique_ids = ctx->Tensor4ArgNameAndIndex("unique_ids", 0);
+    const user_op::Tensor* table_ids = ctx->Tensor4ArgNameAndIndex("table_ids", 0);
+    const int64_t line_size = ctx->Attr<int64_t>("line_size");
+    LookupAndInitMissing<T, U>(ctx->stream(), kernel_state, num_unique, line_size, true,
+                               unique_ids->dptr(), table_ids->dptr(), kernel_state->Values());
+    current_iter_++;
+  }
+  bool AlwaysComputeWhenAllOutputsEmpty() const override { return false; }
+  mutable int64_t current_iter_;
+};
+
+#define EMBEDDING_DATA_TYPE_SEQ OF_PP_MAKE_TUPLE_SEQ(float, DataType::kFloat)
+
+#define TABLE_ID_DATA_TYPE_SEQ                      \
+  OF_PP_MAKE_TUPLE_SEQ(uint8_t, DataType::kUInt8)   \
+  OF_PP_MAKE_TUPLE_SEQ(uint32_t, DataType::kUInt32) \
+  OF_PP_MAKE_TUPLE_SEQ(uint64_t, DataType::kUInt64) \
+  OF_PP_MAKE_TUPLE_SEQ(int8_t, DataType::kInt8)     \
+  OF_PP_MAKE_TUPLE_SEQ(int32_t, DataType::kInt32)   \
+  OF_PP_MAKE_TUPLE_SEQ(int64_t, DataType::kInt64)
+
+#define IDX_DATA_TYPE_SEQ                           \
+  OF_PP_MAKE_TUPLE_SEQ(uint32_t, DataType::kUInt32) \
+  OF_PP_MAKE_TUPLE_SEQ(int32_t, DataType::kInt32)
+
+#define REGISTER_CPU_EMBEDDING_PREFETCH_KERNEL(t_dtype_pair, table_dtype_pair, idx_dtype_pair) \
+  REGISTER_USER_KERNEL("embedding_prefetch")                                                   \
+      .SetCreateFn<EmbeddingPrefetchKernel<OF_PP_PAIR_FIRST(t_dtype_pair),                     \
+                                           OF_PP_PAIR_FIRST(table_dtype_pair),                 \
+                                           OF_PP_PAIR_FIRST(idx_dtype_pair)>>()                \
+      .SetIsMatchedHob(                                                                        \
+          (user_op::HobDeviceType() == DeviceType::kCPU)                                       \
+          && (user_op::HobDataType("table_ids", 0) == OF_PP_PAIR_SECOND(table_dtype_pair))     \
+          && (user_op::HobDataType("num_unique_ids", 0) == OF_PP_PAIR_SECOND(idx_dtype_pair)));
+
+OF_PP_SEQ_PRODUCT_FOR_EACH_TUPLE(REGISTER_CPU_EMBEDDING_PREFETCH_KERNEL, EMBEDDING_DATA_TYPE_SEQ,
+                                 TABLE_ID_DATA_TYPE_SEQ, IDX_DATA_TYPE_SEQ)
+
+template<typename T, typename U, typename IDX>
+class EmbeddingLookupKernel final : public user_op::OpKernel {
+ public:
+  EmbeddingLookupKernel() : current_iter_(0){};
+  ~EmbeddingLookupKernel() override = default;
+
+  std::shared_ptr<user_op::OpKernelState> CreateOpKernelState(
+      user_op::KernelInitContext* ctx) const override {
+    return std::make_shared<EmbeddingKernelState<T>>(ctx);
+  }
+
+ private:
+  using user_op::OpKernel::Compute;
+  void Compute(user_op::KernelComputeContext* ctx, user_op::OpKernelState* state,
+               const user_op::OpKernelCache*) const override {
+    auto* kernel_state = dynamic_cast<EmbeddingKernelState<T>*>(state);
+    CHECK(kernel_state != nullptr);
+    embedding::EmbeddingState* embedding_state = kernel_state->EmbeddingState();
+    embedding_state->OnEmbeddingLookupStart(ctx, current_iter_);
+    const user_op::Tensor* unique_ids = ctx->Tensor4ArgNameAndIndex("unique_ids", 0);
+    const user_op::Tensor* table_ids = ctx->Tensor4ArgNameAndIndex("table_ids", 0);
+    user_op::Tensor* unique_values = ctx->Tensor4ArgNameAndIndex("unique_values", 0);
+    const int64_t embedding_size = ctx->Attr<int64_t>("embedding_size");
+    const int64_t line_size = ctx->Attr<int64_t>("line_size");
+    uint32_t num_unique = embedding_state->GetIdNumUnique(current_iter_);
+    void* values_ptr = embedding_state->LookupUniqueValues(current_iter_);
+    LookupAndInitMissing<T, U>(ctx->stream(), kernel_state, num_unique, line_size, false,
+                               unique_ids->dptr(), table_ids->dptr(), values_ptr);
+    if (ctx->has_output("embeddings", 0)) {
+      void* embeddings_ptr = embedding_state->LookupEmbeddings(current_iter_);
+      user_op::Tensor* embeddings = ctx->Tensor4ArgNameAndIndex("embeddings", 0);
+      CopyValuesToEmbeddings<T>(ctx->stream(), num_unique, embedding_size, line_size,
+                                unique_values->data_type(), embeddings->data_type(),
+                                reinterpret_cast<T*>(values_ptr), embeddings_ptr);
+    }
+    embedding_state->OnEmbeddingLookupEnd(ctx, current_iter_);
+    current_iter_++;
+  }
+  bool AlwaysComputeWhenAllOutputsEmpty() const override { return false; }
+  mutable int64_t current_iter_;
+};
+
+#define REGISTER_CPU_EMBEDDING_LOOKUP_KERNEL(t_dtype_pair, table_dtype_pair, idx_dtype_pair)   \
+  REGISTER_USER_KERNEL("embedding_lookup")                                                     \
+      .SetCreateFn<EmbeddingLookupKernel<OF_PP_PAIR_FIRST(t_dtype_pair),                       \
+                                         OF_PP_PAIR_FIRST(table_dtype_pair),                   \
+                                         OF_PP_PAIR_FIRST(idx_dtype_pair)>>()                  \
+      .SetIsMatchedHob(                                                                        \
+          (user_op::HobDeviceType() == DeviceType::kCPU)                                       \
+          && (user_op::HobDataType("unique_values", 0) == OF_PP_PAIR_SECOND(t_dtype_pair))     \
+          && (user_op::HobDataType("table_ids", 0) == OF_PP_PAIR_SECOND(table_dtype_pair))     \
+          && (user_op::HobDataType("num_unique_ids", 0) == OF_PP_PAIR_SECOND(idx_dtype_pair)));
+
+OF_PP_SEQ_PRODUCT_FOR_EACH_TUPLE(REGISTER_CPU_EMBEDDING_LOOKUP_KERNEL, EMBEDDING_DATA_TYPE_SEQ,
+                                 TABLE_ID_DATA_TYPE_SEQ, IDX_DATA_TYPE_SEQ)
+
+template<typename IDX>
+class EmbeddingPutKernel final : public user_op::OpKernel {
+ public:
+  EmbeddingPutKernel() : current_iter_(0){};
+  ~EmbeddingPutKernel() override = default;
+
+  std::shared_ptr<user_op::OpKernelState> CreateOpKernelState(
+      user_op::KernelInitContext* ctx) const override {
+    return std::make_shared<EmbeddingPutKernelState>(ctx);
+  }
+
+ private:
+  using user_op::OpKernel::Compute;
+  void Compute(user_op::KernelComputeContext* ctx, user_op::OpKernelState* state,
+               const user_op::OpKernelCache*) const override {
+    auto* kernel_state = dynamic_cast<EmbeddingPutKernelState*>(state);
+    CHECK(kernel_state != nullptr);
+    embedding::KeyValueStore* store = kernel_state->KeyValueStore();
+    embedding::EmbeddingState* embedding_state = kernel_state->EmbeddingState();
+    embedding_state->OnEmbeddingPutStart(ctx, current_iter_);
+    const user_op::Tensor* unique_ids = ctx->Tensor4ArgNameAndIndex("unique_ids", 0);
+    uint32_t num_unique = embedding_state->GetIdNumUnique(current_iter_);
+    store->Put(ctx->stream(), num_unique, unique_ids->dptr(),
+               embedding_state->EmbeddingPutUniqueEmbeddings(current_iter_));
+    embedding_state->OnEmbeddingPutEnd(ctx, current_iter_);
+    current_iter_++;
+  }
+  bool AlwaysComputeWhenAllOutputsEmpty() const override { return false; }
+  mutable int64_t current_iter_;
+};
+
+#define REGISTER_CPU_EMBEDDING_PUT_KERNEL(dtype, typeproto)           \
+  REGISTER_USER_KERNEL("embedding_put")                               \
+      .SetCreateFn<EmbeddingPutKernel<dtype>>()                       \
+      .SetIsMatchedHob((user_op::HobDeviceType() == DeviceType::kCPU) \
+                       && (user_op::HobDataType("num_unique_ids", 0) == typeproto));
+
+OF_PP_FOR_EACH_TUPLE(REGISTER_CPU_EMBEDDING_PUT_KERNEL, IDX_DATA_TYPE_SEQ)
+
+template<typename K, typename U, typename IDX>
+class IdShuffleCopyOutKernel final : public user_op::OpKernel {
+ public:
+  IdShuffleCopyOutKernel() : current_iter_(0){};
+  ~IdShuffleCopyOutKernel() override = default;
+
+  std::shared_ptr<user_op::OpKernelState> CreateOpKernelState(
+      user_op::KernelInitContext* ctx) const override {
+    return std::make_shared<IdShuffleCopyOutKernelState>(ctx);
+  }
+
+ private:
+  using user_op::OpKernel::Compute;
+  void Compute(user_op::KernelComputeContext* ctx, user_op::OpKernelState* state,
+               const user_op::OpKernelCache*) const override {
+    auto* kernel_state = dynamic_cast<IdShuffleCopyOutKernelState*>(state);
+    CHECK(kernel_state != nullptr);
+    const int64_t parallel_num = ctx->parallel_ctx().parallel_num();
+    const int64_t parallel_id = ctx->parallel_ctx().parallel_id();
+    embedding::EmbeddingState* embedding_state = kernel_state->EmbeddingState();
+    const uint32_t num_unique = embedding_state->GetIdNumUnique(current_iter_);
+    const std::vector<uint32_t>& num_unique_matrix_vec =
+        embedding_state->GetIdNumUniqueMatrix(current_iter_);
+    uint32_t cur_rank_num_ids = 0;
+    for (int64_t i = 0; i < parallel_num; ++i) {
+      cur_rank_num_ids += num_unique_matrix_vec.at(i * parallel_num + parallel_id);
+    }
+    const int64_t num_ids =
+        ctx->Tensor4ArgNameAndIndex("inverse_unique_partition_indices", 0)->shape_view().elem_cnt();
+    CopyOut<K>(ctx, "cur_rank_unique_ids", num_unique);
+    CopyOut<U>(ctx, "cur_rank_unique_table_ids", num_unique);
+    CopyOut<IDX>(ctx, "cur_rank_inverse_indices", cur_rank_num_ids);
+    CopyOut<IDX>(ctx, "inverse_unique_partition_indices", num_ids);
+    CopyOut<IDX>(ctx, "num_unique_matrix", parallel_num * parallel_num);
+    CopyOut<IDX>(ctx, "cur_rank_num_unique", 1);
+    current_iter_++;
+  }
+
+  template<typename T>
+  void CopyOut(user_op::KernelComputeContext* ctx, const std::string& name,
+               int64_t elem_cnt) const {
+    const T* in = ctx->Tensor4ArgNameAndIndex(name, 0)->dptr<T>();
+    T* out = ctx->Tensor4ArgNameAndIndex("out_" + name, 0)->mut_dptr<T>();
+    std::copy(in, in + elem_cnt, out);
+  }
+
+  bool AlwaysComputeWhenAllOutputsEmpty() const override { return false; }
+  mutable int64_t current_iter_;
+};
+
+#define ID_DATA_TYPE_SEQ                            \
+  OF_PP_MAKE_TUPLE_SEQ(uint32_t, DataType::kUInt32) \
+  OF_PP_MAKE_TUPLE_SEQ(uint64_t, DataType::kUInt64) \
+  OF_PP_MAKE_TUPLE_SEQ(int32_t, DataType::kInt32)   \
+  OF_PP_MAKE_TUPLE_SEQ(int64_t, DataType::kInt64)
+
+#define REGISTER_CPU_ID_SHUFFLE_COPY_OUT_KERNEL(k_dtype_pair, table_id_dtype_pair,               \
+                                                idx_dtype_pair)                                  \
+  REGISTER_USER_KERNEL("id_shuffle_copy_out")                                                    \
+      .SetCreateFn<IdShuffleCopyOutKernel<OF_PP_PAIR_FIRST(k_dtype_pair),                        \
+                                          OF_PP_PAIR_FIRST(table_id_dtype_pair),                 \
+                                          OF_PP_PAIR_FIRST(idx_dtype_pair)>>()                   \
+      .SetIsMatchedHob(                                                                          \
+          (user_op::HobDeviceType() == DeviceType::kCPU)                                         \
+          && (user_op::HobDataType("cur_rank_unique_ids", 0) == OF_PP_PAIR_SECOND(k_dtype_pair)) \
+          && (user_op::HobDataType("cur_rank_unique_table_ids", 0)                               \
+              == OF_PP_PAIR_SECOND(table_id_dtype_pair))                                         \
+          && (user_op::HobDataType("num_unique_matrix", 0) == OF_PP_PAIR_SECOND(idx_dtype_pair)));
+
+OF_PP_SEQ_PRODUCT_FOR_EACH_TUPLE(REGISTER_CPU_ID_SHUFFLE_COPY_OUT_KERNEL, ID_DATA_TYPE_SEQ,
+                                 TABLE_ID_DATA_TYPE_SEQ, IDX_DATA_TYPE_SEQ)
+
+}  // namespace
+
+}  // namespace oneflow
@@ -0,0 +1,382 @@
+/*
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+*/
+#include "oneflow/core/framework/framework.h"
+#include "oneflow/core/ep/cpu/cpu_stream.h"
+#include "oneflow/user/kernels/model_update_kernel_util.h"
+#include "oneflow/core/embedding/embedding_manager.h"
+
+namespace oneflow {
+
+namespace {
+
+class EmbeddingUpdateKernelState final : public user_op::OpKernelState {
+ public:
+  explicit EmbeddingUpdateKernelState(user_op::KernelInitContext* ctx) {
+    const std::string& embedding_name = ctx->Attr<std::string>("embedding_name");
+    const int64_t parallel_id = ctx->parallel_ctx().parallel_id();
+    embedding_state_ = Singleton<embedding::EmbeddingManager>::Get()->GetEmbeddingState(
+        embedding_name, parallel_id);
+  }
+  ~EmbeddingUpdateKernelState() override = default;
+
+  embedding::EmbeddingState* EmbeddingState() { return embedding_state_; }
+
+ private:
+  embedding::EmbeddingState* embedding_state_;
+};
+
+template<typename T>
+T GetScale(user_op::KernelComputeContext* ctx) {
+  const user_op::Tensor* embedding_grad = ctx->Tensor4ArgNameAndIndex("embedding_grad", 0);
+  T scale = static_cast<T>(ctx->Attr<double>("scale"));
+  if (ctx->has_input("scale_by_tensor", 0)) {
+    const user_op::Tensor* scale_by_tensor = ctx->Tensor4ArgNameAndIndex("scale_by_tensor", 0);
+    CHECK_EQ(scale_by_tensor->data_type(), embedding_grad->data_type());
+    CHECK_EQ(scale_by_tensor->shape_view().elem_cnt(), 1);
+    scale *= *scale_by_tensor->dptr<T>();
+  }
+  if (ctx->has_input("down_scale_by_tensor", 0)) {
+    const user_op::Tensor* down_scale_by_tensor =
+        ctx->Tensor4ArgNameAndIndex("down_scale_by_tensor", 0);
+    CHECK_EQ(down_scale_by_tensor->data_type(), embedding_grad->data_type());
+    CHECK_EQ(down_scale_by_tensor->shape_view().elem_cnt(), 1);
+    scale /= *down_scale_by_tensor->dptr<T>();
+  }
+  return scale;
+}
+
+bool SkipUpdate(user_op::KernelComputeContext* ctx) {
+  if (!ctx->has_input("skip_if", 0)) { return false; }
+  const user_op::Tensor* skip_if = ctx->Tensor4ArgNameAndIndex("skip_if", 0);
+  CHECK_EQ(skip_if->shape_view().elem_cnt(), 1);
+  return *skip_if->dptr<int64_t>() != 0;
+}
+
+// Copies the unique lines to the updated buffer and applies `update` to every element of the
+// embedding part, the optimizer states of an element follow it at strides of embedding_size.
+template<typename T, typename G, typename F>
+void UpdateUniqueEmbeddings(user_op::KernelComputeContext* ctx,
+                            embedding::EmbeddingState* embedding_state, int64_t iter,
+                            const F& update) {
+  const user_op::Tensor* embedding_grad = ctx->Tensor4ArgNameAndIndex("embedding_grad", 0);
+  CHECK_EQ(embedding_grad->shape_view().NumAxes(), 2);
+  const int64_t line_size = ctx->Attr<int64_t>("line_size");
+  const int64_t embedding_size = ctx->Attr<int64_t>("embedding_size");
+  embedding_state->OnEmbeddingUpdateStart(ctx, iter);
+  const T* unique_embeddings_ptr =
+      reinterpret_cast<const T*>(embedding_state->EmbeddingUpdateUniqueEmbeddings(iter));
+  T* updated_unique_embeddings_ptr =
+      reinterpret_cast<T*>(embedding_state->EmbeddingUpdateUpdatedUniqueEmbeddings(iter));
+  const uint32_t num_unique = embedding_state->GetIdNumUnique(iter);
+  std::copy(unique_embeddings_ptr, unique_embeddings_ptr + num_unique * line_size,
+            updated_unique_embeddings_ptr);
+  if (!SkipUpdate(ctx)) {
+    const G* embedding_grad_ptr = embedding_grad->dptr<G>();
+    ctx->stream()->As<ep::CpuStream>()->ParallelFor(
+        0, num_unique, [&](int64_t begin, int64_t end) {
+          for (int64_t row = begin; row < end; ++row) {
+            for (int64_t col = 0; col < embedding_size; ++col) {
+              update(embedding_grad_ptr + row * embedding_size + col,
+                     updated_unique_embeddings_ptr + row * line_size + col, embedding_size);
+            }
+          }
+        });
+  }
+  embedding_state->OnEmbeddingUpdateEnd(ctx, iter);
+}
+
+template<typename T, typename G, typename IDX>
+class SgdEmbeddingUpdateKernel final : public user_op::OpKernel {
+ public:
+  SgdEmbeddingUpdateKernel() : current_iter_(0){};
+  ~SgdEmbeddingUpdateKernel() override = default;
+
+  std::shared_ptr<user_op::OpKernelState> CreateOpKernelState(
+      user_op::KernelInitContext* ctx) const override {
+    return std::make_shared<EmbeddingUpdateKernelState>(ctx);
+  }
+
+ private:
+  using user_op::OpKernel::Compute;
+  void Compute(user_op::KernelComputeContext* ctx, user_op::OpKernelState* state,
+               const user_op::OpKernelCache*) const override {
+    auto* kernel_state = dynamic_cast<EmbeddingUpdateKernelState*>(state);
+    CHECK(kernel_state != nullptr);
+    CHECK_EQ(ctx->Attr<int64_t>("line_size"), ctx->Attr<int64_t>("embedding_size"));
+    const float l1 = ctx->Attr<float>("l1");
+    const float l2 = ctx->Attr<float>("l2");
+    const auto weight_decay = ctx->Attr<float>("weight_decay");
+    const float learning_rate = *ctx->Tensor4ArgNameAndIndex("learning_rate", 0)->dptr<float>();
+    const T scale = GetScale<T>(ctx);
+    UpdateUniqueEmbeddings<T, G>(
+        ctx, kernel_state->EmbeddingState(), current_iter_,
+        [&](const G* model_diff, T* model, int64_t embedding_size) {
+          SGDUpdateFunctor<T, G>()(model_diff, model, scale, l1, l2, weight_decay, learning_rate);
+        });
+    current_iter_++;
+  }
+  bool AlwaysComputeWhenAllOutputsEmpty() const override { return false; }
+  mutable int64_t current_iter_;
+};
+
+#define IDX_DATA_TYPE_SEQ                           \
+  OF_PP_MAKE_TUPLE_SEQ(uint32_t, DataType::kUInt32) \
+  OF_PP_MAKE_TUPLE_SEQ(int32_t, DataType::kInt32)
+
+#define REGISTER_CPU_SGD_EMBEDDING_UPDATE_KERNEL(t_dtype_pair, g_type_pair, idx_dtype_pair)       \
+  REGISTER_USER_KERNEL("sgd_embedding_update")                                                    \
+      .SetCreateFn<                                                                               \
+          SgdEmbeddingUpdateKernel<OF_PP_PAIR_FIRST(t_dtype_pair), OF_PP_PAIR_FIRST(g_type_pair), \
+                                   OF_PP_PAIR_FIRST(idx_dtype_pair)>>()                           \
+      .SetIsMatchedHob(                                                                           \
+          (user_op::HobDeviceType() == DeviceType::kCPU)                                          \
+          && (user_op::HobDataType("num_unique_ids", 0) == OF_PP_PAIR_SECOND(idx_dtype_pair))     \
+          && (user_op::HobDataType("embedding_grad", 0) == OF_PP_PAIR_SECOND(g_type_pair))        \
+          && (user_op::HobDataType("unique_embeddings", 0) == OF_PP_PAIR_SECOND(t_dtype_pair)));
+
+OF_PP_SEQ_PRODUCT_FOR_EACH_TUPLE(REGISTER_CPU_SGD_EMBEDDING_UPDATE_KERNEL, FLOATING_DATA_TYPE_SEQ,
+                                 FLOATING_DATA_TYPE_SEQ, IDX_DATA_TYPE_SEQ)
+
+template<typename T, typename G, typename IDX>
+class MomentumEmbeddingUpdateKernel final : public user_op::OpKernel {
+ public:
+  MomentumEmbeddingUpdateKernel() : current_iter_(0){};
+  ~MomentumEmbeddingUpdateKernel() override = default;
+
+  std::shared_ptr<user_op::OpKernelState> CreateOpKernelState(
+      user_op::KernelInitContext* ctx) const override {
+    return std::make_shared<EmbeddingUpdateKernelState>(ctx);
+  }
+
+ private:
+  using user_op::OpKernel::Compute;
+  void Compute(user_op::KernelComputeContext* ctx, user_op::OpKernelState* state,
+               const user_op::OpKernelCache*) const override {
+    auto* kernel_state = dynamic_cast<EmbeddingUpdateKernelState*>(state);
+    CHECK(kernel_state != nullptr);
+    CHECK_EQ(ctx->Attr<int64_t>("line_size"), ctx->Attr<int64_t>("embedding_size") * 2);
+    const float l1 = ctx->Attr<float>("l1");
+    const float l2 = ctx->Attr<float>("l2");
+    const auto weight_decay = ctx->Attr<float>("weight_decay");
+    const auto beta = ctx->Attr<float>("beta");
+    // Same as the cuda kernel, dampening, nesterov and maximize are not supported yet.
+    const float dampening = 0.0;
+    const bool nesterov = false;
+    const bool maximize = false;
+    const float learning_rate = *ctx->Tensor4ArgNameAndIndex("learning_rate", 0)->dptr<float>();
+    const T scale = GetScale<T>(ctx);
+    UpdateUniqueEmbeddings<T, G>(
+        ctx, kernel_state->EmbeddingState(), current_iter_,
+        [&](const G* model_diff, T* model, int64_t embedding_size) {
+          MomentumUpdateFunctor<T, G>()(model_diff, model, model + embedding_size, scale, l1, l2,
+                                        beta, dampening, nesterov, maximize, weight_decay,
+                                        learning_rate);
+        });
+    current_iter_++;
+  }
+  bool AlwaysComputeWhenAllOutputsEmpty() const override { return false; }
+  mutable int64_t current_iter_;
+};
+
+#define REGISTER_CPU_MOMENTUM_EMBEDDING_UPDATE_KERNEL(t_dtype_pair, g_type_pair, idx_dtype_pair) \
+  REGISTER_USER_KERNEL("momentum_embedding_update")                                              \
+      .SetCreateFn<MomentumEmbeddingUpdateKernel<OF_PP_PAIR_FIRST(t_dtype_pair),                 \
+                                                 OF_PP_PAIR_FIRST(g_type_pair),                  \
+                                                 OF_PP_PAIR_FIRST(idx_dtype_pair)>>()            \
+      .SetIsMatchedHob(                                                                          \
+          (user_op::HobDeviceType() == DeviceType::kCPU)                                         \
+          && (user_op::HobDataType("num_unique_ids", 0) == OF_PP_PAIR_SECOND(idx_dtype_pair))    \
+          && (user_op::HobDataType("embedding_grad", 0) == OF_PP_PAIR_SECOND(g_type_pair))       \
+          && (user_op::HobDataType("unique_embeddings", 0) == OF_PP_PAIR_SECOND(t_dtype_pair)));
+
+OF_PP_SEQ_PRODUCT_FOR_EACH_TUPLE(REGISTER_CPU_MOMENTUM_EMBEDDING_UPDATE_KERNEL,
+                                 FLOATING_DATA_TYPE_SEQ, FLOATING_DATA_TYPE_SEQ, IDX_DATA_TYPE_SEQ)
+
+template<typename T, typename G, typename IDX>
+class AdamEmbeddingUpdateKernel final : public user_op::OpKernel {
+ public:
+  AdamEmbeddingUpdateKernel() : current_iter_(0){};
+  ~AdamEmbeddingUpdateKernel() override = default;
+
+  std::shared_ptr<user_op::OpKernelState> CreateOpKernelState(
+      user_op::KernelInitContext* ctx) const override {
+    return std::make_shared<EmbeddingUpdateKernelState>(ctx);
+  }
+
+ private:
+  using user_op::OpKernel::Compute;
+  void Compute(user_op::KernelComputeContext* ctx, user_op::OpKernelState* state,
+               const user_op::OpKernelCache*) const override {
+    auto* kernel_state = dynamic_cast<EmbeddingUpdateKernelState*>(state);
+    CHECK(kernel_state != nullptr);
+    CHECK_EQ(ctx->Attr<int64_t>("line_size"), ctx->Attr<int64_t>("embedding_size") * 3);
+    const float l1 = ctx->Attr<float>("l1");
+    const float l2 = ctx->Attr<float>("l2");
+    const auto weight_decay = ctx->Attr<float>("weight_decay");
+    const auto beta1 = ctx->Attr<float>("beta1");
+    const auto beta2 = ctx->Attr<float>("beta2");
+    const auto epsilon = ctx->Attr<float>("epsilon");
+    float bias_correction1 = 1.0;
+    if (ctx->has_input("bias_correction1", 0)) {
+      bias_correction1 = *ctx->Tensor4ArgNameAndIndex("bias_correction1", 0)->dptr<float>();
+    }
+    float bias_correction2 = 1.0;
+    if (ctx->has_input("bias_correction2", 0)) {
+      bias_correction2 = *ctx->Tensor4ArgNameAndIndex("bias_correction2", 0)->dptr<float>();
+    }
+    const float learning_rate = *ctx->Tensor4ArgNameAndIndex("learning_rate", 0)->dptr<float>();
+    const T scale = GetScale<T>(ctx);
+    UpdateUniqueEmbeddings<T, G>(
+        ctx, kernel_state->EmbeddingState(), current_iter_,
+        [&](const G* model_diff, T* model, int64_t embedding_size) {
+          AdamUpdateFunctor<T, G>()(model_diff, model, model + embedding_size,
+                                    model + 2 * embedding_size, nullptr, scale, l1, l2, beta1,
+                                    beta2, epsilon, weight_decay, false, bias_correction1,
+                                    bias_correction2, learning_rate);
+        });
+    current_iter_++;
+  }
+  bool AlwaysComputeWhenAllOutputsEmpty() const override { return false; }
+  mutable int64_t current_iter_;
+};
+
+#define REGISTER_CPU_ADAM_EMBEDDING_UPDATE_KERNEL(t_dtype_pair, g_type_pair, idx_dtype_pair)       \
+  REGISTER_USER_KERNEL("adam_embedding_update")                                                    \
+      .SetCreateFn<                                                                                \
+          AdamEmbeddingUpdateKernel<OF_PP_PAIR_FIRST(t_dtype_pair), OF_PP_PAIR_FIRST(g_type_pair), \
+                                    OF_PP_PAIR_FIRST(idx_dtype_pair)>>()                           \
+      .SetIsMatchedHob(                                                                            \
+          (user_op::HobDeviceType() == DeviceType::kCPU)                                           \
+          && (user_op::HobDataType("num_unique_ids", 0) == OF_PP_PAIR_SECOND(idx_dtype_pair))      \
+          && (user_op::HobDataType("embedding_grad", 0) == OF_PP_PAIR_SECOND(g_type_pair))         \
+          && (user_op::HobDataType("unique_embeddings", 0) == OF_PP_PAIR_SECOND(t_dtype_pair)));
+
+OF_PP_SEQ_PRODUCT_FOR_EACH_TUPLE(REGISTER_CPU_ADAM_EMBEDDING_UPDATE_KERNEL, FLOATING_DATA_TYPE_SEQ,
+                                 FLOATING_DATA_TYPE_SEQ, IDX_DATA_TYPE_SEQ)
+
+template<typename T, typename G, typename IDX>
+class AdagradEmbeddingUpdateKernel final : public user_op::OpKernel {
+ public:
+  AdagradEmbeddingUpdateKernel() : current_iter_(0){};
+  ~AdagradEmbeddingUpdateKernel() override = default;
+
+  std::shared_ptr<user_op::OpKernelState> CreateOpKernelState(
+      user_op::KernelInitContext* ctx) const override {
+    return std::make_shared<EmbeddingUpdateKernelState>(ctx);
+  }
+
+ private:
+  using user_op::OpKernel::Compute;
+  void Compute(user_op::KernelComputeContext* ctx, user_op::OpKernelState* state,
+               const user_op::OpKernelCache*) const override {
+    auto* kernel_state = dynamic_cast<EmbeddingUpdateKernelState*>(state);
+    CHECK(kernel_state != nullptr);
+    CHECK_EQ(ctx->Attr<int64_t>("line_size"), ctx->Attr<int64_t>("embedding_size") * 2);
+    const float l1 = ctx->Attr<float>("l1");
+    const float l2 = ctx->Attr<float>("l2");
+    const auto weight_decay = ctx->Attr<float>("weight_decay");
+    const auto lr_decay = ctx->Attr<float>("lr_decay");
+    const auto epsilon = ctx->Attr<float>("epsilon");
+    const int64_t train_step = *ctx->Tensor4ArgNameAndIndex("train_step", 0)->dptr<int64_t>() + 1;
+    float learning_rate = *ctx->Tensor4ArgNameAndIndex("learning_rate", 0)->dptr<float>();
+    learning_rate = learning_rate / (1 + (train_step - 1) * lr_decay);
+    const T scale = GetScale<T>(ctx);
+    UpdateUniqueEmbeddings<T, G>(
+        ctx, kernel_state->EmbeddingState(), current_iter_,
+        [&](const G* model_diff, T* model, int64_t embedding_size) {
+          AdagradUpdateFunctor<T, G>()(model_diff, model, model + embedding_size, scale, l1, l2,
+                                       epsilon, weight_decay, learning_rate);
+        });
+    current_iter_++;
+  }
+  bool AlwaysComputeWhenAllOutputsEmpty() const override { return false; }
+  mutable int64_t current_iter_;
+};
+
+#define REGISTER_CPU_ADAGRAD_EMBEDDING_UPDATE_KERNEL(t_dtype_pair, g_type_pair, idx_dtype_pair) \
+  REGISTER_USER_KERNEL("adagrad_embedding_update")                                              \
+      .SetCreateFn<AdagradEmbeddingUpdateKernel<OF_PP_PAIR_FIRST(t_dtype_pair),                 \
+                                                OF_PP_PAIR_FIRST(g_type_pair),                  \
+                                                OF_PP_PAIR_FIRST(idx_dtype_pair)>>()            \
+      .SetIsMatchedHob(                                                                         \
+          (user_op::HobDeviceType() == DeviceType::kCPU)                                        \
+          && (user_op::HobDataType("num_unique_ids", 0) == OF_PP_PAIR_SECOND(idx_dtype_pair))   \
+          && (user_op::HobDataType("embedding_grad", 0) == OF_PP_PAIR_SECOND(g_type_pair))      \
+          && (user_op::HobDataType("unique_embeddings", 0) == OF_PP_PAIR_SECOND(t_dtype_pair)));
+
+OF_PP_SEQ_PRODUCT_FOR_EACH_TUPLE(REGISTER_CPU_ADAGRAD_EMBEDDING_UPDATE_KERNEL,
+                                 FLOATING_DATA_TYPE_SEQ, FLOATING_DATA_TYPE_SEQ, IDX_DATA_TYPE_SEQ)
+
+template<typename T, typename G, typename IDX>
+class FtrlEmbeddingUpdateKernel final : public user_op::OpKernel {
+ public:
+  FtrlEmbeddingUpdateKernel() : current_iter_(0){};
+  ~FtrlEmbeddingUpdateKernel() override = default;
+
+  std::shared_ptr<user_op::OpKernelState> CreateOpKernelState(
+      user_op::KernelInitContext* ctx) const override {
+    return std::make_shared<EmbeddingUpdateKernelState>(ctx);
+  }
+
+ private:
+  using user_op::OpKernel::Compute;
+  void Compute(user_op::KernelComputeContext* ctx, user_op::OpKernelState* state,
+               const user_op::OpKernelCache*) const override {
+    auto* kernel_state = dynamic_cast<EmbeddingUpdateKernelState*>(state);
+    CHECK(kernel_state != nullptr);
+    CHECK_EQ(ctx->Attr<int64_t>("line_size"), ctx->Attr<int64_t>("embedding_size") * 3)
+        << "The line_size should be equal to 3 x embedding_size. ";
+    const float l1 = 0.0;
+    const float l2 = 0.0;
+    const float weight_decay = ctx->Attr<float>("weight_decay");
+    CHECK_EQ(weight_decay, static_cast<float>(0.0))
+        << "Currently not support for setting weight decay. ";
+    const float lr_power = ctx->Attr<float>("lr_power");
+    const float lambda1 = ctx->Attr<float>("lambda1");
+    const float lambda2 = ctx->Attr<float>("lambda2");
+    const float beta = ctx->Attr<float>("beta");
+    const float learning_rate = *ctx->Tensor4ArgNameAndIndex("learning_rate", 0)->dptr<float>();
+    const T scale = GetScale<T>(ctx);
+    UpdateUniqueEmbeddings<T, G>(
+        ctx, kernel_state->EmbeddingState(), current_iter_,
+        [&](const G* model_diff, T* model, int64_t embedding_size) {
+          FtrlUpdateFunctor<T, G>()(model_diff, model, model + embedding_size,
+                                    model + 2 * embedding_size, scale, l1, l2, lr_power, lambda1,
+                                    lambda2, beta, weight_decay, learning_rate);
+        });
+    current_iter_++;
+  }
+  bool AlwaysComputeWhenAllOutputsEmpty() const override { return false; }
+  mutable int64_t current_iter_;
+};
+
+#define REGISTER_CPU_FTRL_EMBEDDING_UPDATE_KERNEL(t_dtype_pair, g_type_pair, idx_dtype_pair)       \
+  REGISTER_USER_KERNEL("ftrl_embedding_update")                                                    \
+      .SetCreateFn<                                                                                \
+          FtrlEmbeddingUpdateKernel<OF_PP_PAIR_FIRST(t_dtype_pair), OF_PP_PAIR_FIRST(g_type_pair), \
+                                    OF_PP_PAIR_FIRST(idx_dtype_pair)>>()                           \
+      .SetIsMatchedHob(                                                                            \
+          (user_op::HobDeviceType() == DeviceType::kCPU)                                           \
+          && (user_op::HobDataType("num_unique_ids", 0) == OF_PP_PAIR_SECOND(idx_dtype_pair))      \
+          && (user_op::HobDataType("embedding_grad", 0) == OF_PP_PAIR_SECOND(g_type_pair))         \
+          && (user_op::HobDataType("unique_embeddings", 0) == OF_PP_PAIR_SECOND(t_dtype_pair)));
+
+OF_PP_SEQ_PRODUCT_FOR_EACH_TUPLE(REGISTER_CPU_FTRL_EMBEDDING_UPDATE_KERNEL, FLOATING_DATA_TYPE_SEQ,
+                                 FLOATING_DATA_TYPE_SEQ, IDX_DATA_TYPE_SEQ)
+
+}  // namespace
+
+}  // namespace oneflow
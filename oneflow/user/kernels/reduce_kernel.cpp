@@ -182,6 +182,118 @@ REGISTER_REDUCE_SUM_KERNELS_BY_DEVICE(DeviceType::kCUDA)
 #endif
 REGISTER_REDUCE_SUM_KERNELS(DeviceType::kCPU, float)
 
+// bfloat16 is reduced on CPU in a single pass over the input into float accumulators of the
+// output size, which are narrowed to bfloat16 at the end, so the accumulation is always done in
+// float.
+template<template<typename> class BinaryFunc>
+void ReduceBFloat16ToFloat(const ShapeView& in_shape, const Shape& reduced_shape,
+                           const bfloat16* in, float* out, int64_t out_elem_cnt) {
+  // merge the adjacent dims which are all reduced or all kept, dims of size 1 are dropped
+  std::vector<int64_t> dims;
+  std::vector<bool> is_reduced;
+  for (int64_t i = 0; i < in_shape.NumAxes(); ++i) {
+    if (in_shape.At(i) == 1) { continue; }
+    const bool reduced = reduced_shape.At(i) == 1;
+    if (!dims.empty() && is_reduced.back() == reduced) {
+      dims.back() *= in_shape.At(i);
+    } else {
+      dims.emplace_back(in_shape.At(i));
+      is_reduced.emplace_back(reduced);
+    }
+  }
+  if (dims.empty()) {
+    dims.emplace_back(1);
+    is_reduced.emplace_back(false);
+  }
+  const int64_t num_dims = dims.size();
+  std::vector<int64_t> out_strides(num_dims, 0);
+  int64_t out_stride = 1;
+  for (int64_t i = num_dims - 1; i >= 0; --i) {
+    if (!is_reduced[i]) {
+      out_strides[i] = out_stride;
+      out_stride *= dims[i];
+    }
+  }
+  std::fill(out, out + out_elem_cnt, UnitOfBinaryFunc<float, BinaryFunc>::Val());
+  // the innermost dim is a contiguous run of the input, the outer dims are walked as a counter
+  const int64_t inner_size = dims.back();
+  const int64_t num_rows = in_shape.elem_cnt() / inner_size;
+  std::vector<int64_t> index(num_dims - 1, 0);
+  int64_t out_offset = 0;
+  for (int64_t row = 0; row < num_rows; ++row) {
+    const bfloat16* row_in = in + row * inner_size;
+    if (is_reduced.back()) {
+      float acc = out[out_offset];
+      for (int64_t j = 0; j < inner_size; ++j) {
+        acc = BinaryFunc<float>::Invoke(acc, static_cast<float>(row_in[j]));
+      }
+      out[out_offset] = acc;
+    } else {
+      float* row_out = out + out_offset;
+      for (int64_t j = 0; j < inner_size; ++j) {
+        row_out[j] = BinaryFunc<float>::Invoke(row_out[j], static_cast<float>(row_in[j]));
+      }
+    }
+    for (int64_t i = num_dims - 2; i >= 0; --i) {
+      out_offset += out_strides[i];
+      if (++index[i] < dims[i]) { break; }
+      out_offset -= out_strides[i] * dims[i];
+      index[i] = 0;
+    }
+  }
+}
+
+template<template<typename> class BinaryFunc>
+class ReduceBFloat16CpuKernel final : public user_op::OpKernel {
+ public:
+  ReduceBFloat16CpuKernel() = default;
+  ~ReduceBFloat16CpuKernel() = default;
+
+ private:
+  void Compute(user_op::KernelComputeContext* ctx) const override {
+    const user_op::Tensor* input_tensor = ctx->Tensor4ArgNameAndIndex("input_tensor", 0);
+    user_op::Tensor* output_tensor = ctx->Tensor4ArgNameAndIndex("output_tensor", 0);
+    user_op::Tensor* tmp_buffer = ctx->Tensor4ArgNameAndIndex("tmp_buffer", 0);
+    const auto& axis = ctx->Attr<std::vector<int32_t>>("axis");
+    const ShapeView& in_shape = input_tensor->shape_view();
+    const int64_t out_elem_cnt = output_tensor->shape_view().elem_cnt();
+    if (in_shape.elem_cnt() == 0) {
+      if (out_elem_cnt != 0) {
+        std::unique_ptr<ep::primitive::Fill> fill = NewFillPrimitive(ctx);
+        CHECK(fill);
+        fill->Launch(ctx->stream(), output_tensor->mut_dptr(), Scalar(0), out_elem_cnt);
+      }
+      return;
+    }
+    const Shape& reduced_shape = CreateReducedShape(in_shape, {axis.begin(), axis.end()});
+    CHECK_LE(out_elem_cnt * sizeof(float), tmp_buffer->shape_view().elem_cnt());
+    float* out_tmp_buffer = tmp_buffer->mut_dptr<float>();
+    ReduceBFloat16ToFloat<BinaryFunc>(in_shape, reduced_shape, input_tensor->dptr<bfloat16>(),
+                                      out_tmp_buffer, out_elem_cnt);
+    auto f2b = ep::primitive::NewPrimitive<ep::primitive::CastFactory>(
+        DeviceType::kCPU, DataType::kFloat, DataType::kBFloat16);
+    CHECK(f2b);
+    f2b->Launch(ctx->stream(), out_tmp_buffer, output_tensor->mut_dptr(), out_elem_cnt);
+  }
+  bool AlwaysComputeWhenAllOutputsEmpty() const override { return false; }
+};
+
+#define REGISTER_REDUCE_BFLOAT16_CPU_KERNEL(op_name, binary_func)                           \
+  REGISTER_USER_KERNEL(op_name)                                                             \
+      .SetCreateFn<ReduceBFloat16CpuKernel<binary_func>>()                                  \
+      .SetIsMatchedHob((user_op::HobDeviceType() == DeviceType::kCPU)                       \
+                       && (user_op::HobDataType("output_tensor", 0) == DataType::kBFloat16) \
+                       && FillPrimitiveExists())                                            \
+      .SetInferTmpSizeFn([](user_op::InferContext* ctx) {                                   \
+        const Shape& out_shape = ctx->OutputTensorDesc("output_tensor", 0).shape();         \
+        return GetCudaAlignedSize(out_shape.elem_cnt() * sizeof(float));                    \
+      });
+
+REGISTER_REDUCE_BFLOAT16_CPU_KERNEL("reduce_sum", BinaryFuncSum)
+REGISTER_REDUCE_BFLOAT16_CPU_KERNEL("reduce_prod", BinaryFuncProd)
+REGISTER_REDUCE_BFLOAT16_CPU_KERNEL("reduce_min", BinaryFuncMin)
+REGISTER_REDUCE_BFLOAT16_CPU_KERNEL("reduce_max", BinaryFuncMax)
+
 #define REGISTER_REDUCE_LOGICAL_KERNELS(device)                                    \
   REGISTER_REDUCE_LOGICAL_XPU_KERNEL("reduce_any", BinaryFuncAny, device, bool)    \
   REGISTER_REDUCE_LOGICAL_XPU_KERNEL("reduce_all", BinaryFuncAll, device, bool)    \
@@ -48,6 +48,32 @@ namespace oneflow {
   return DeviceAndStreamInferFn<&IsAsyncLaunched>(ctx);
 }
 
+/* static */ Maybe<void> EagerCclAllToAllOp::InferLogicalTensorDesc(user_op::InferContext* ctx) {
+  const Shape& in_shape = ctx->InputShape("in", 0);
+  CHECK_GE_OR_RETURN(in_shape.NumAxes(), 1)
+      << "the input of all_to_all should have one chunk per rank in the first dimension";
+  *ctx->MutOutputShape("out", 0) = in_shape;
+  return Maybe<void>::Ok();
+}
+
+/*static*/ Maybe<void> EagerCclAllToAllOp::InferPhysicalTensorDesc(user_op::InferContext* ctx) {
+  return InferLogicalTensorDesc(ctx);
+}
+
+/* static */ Maybe<void> EagerCclAllToAllOp::GetSbp(user_op::SbpContext* ctx) {
+  UNIMPLEMENTED_THEN_RETURN() << "global tensor are not supported";
+}
+
+/* static */ Maybe<void> EagerCclAllToAllOp::InferDataType(user_op::InferContext* ctx) {
+  *ctx->MutOutputDType("out", 0) = ctx->InputDType("in", 0);
+  return Maybe<void>::Ok();
+}
+
+/* static */ Maybe<Symbol<Stream>> EagerCclAllToAllOp::InferDeviceAndStream(
+    user_op::DeviceAndStreamInferContext* ctx) {
+  return DeviceAndStreamInferFn<&SyncLaunched>(ctx);
+}
+
 /* static */ Maybe<void> EagerCclBroadcastOp::InferLogicalTensorDesc(user_op::InferContext* ctx) {
   size_t size = ctx->input_size("in");
   const std::vector<Shape>& shape_list = ctx->Attr<std::vector<Shape>>("shape_list");
@@ -225,6 +225,64 @@ Maybe<void> AdamWithCastInputArgModifyFn(const user_op::GetInputArgModifier& Get
   return Maybe<void>::Ok();
 }
 
+// The multi-tensor ops below update each model with the state tensors named in
+// `state_names`, every one of which has the shape and data type of the model.
+Maybe<void> InferStatefulUpdateTensorDesc(user_op::InferContext* ctx,
+                                          const std::vector<std::string>& state_names) {
+  const int64_t weight_size = ctx->input_size("model");
+  for (const auto& name : state_names) {
+    CHECK_EQ_OR_RETURN(ctx->input_size(name), weight_size)
+        << "The number of " << name << " should be equal to the number of models. ";
+  }
+  for (int i = 0; i < weight_size; i++) {
+    const user_op::TensorDesc& model = ctx->InputTensorDesc("model", i);
+    const user_op::TensorDesc& model_diff = ctx->InputTensorDesc("model_diff", i);
+    CHECK_EQ_OR_RETURN(model_diff.shape(), model.shape())
+        << "Model Diff shape should be equal to Model shape. ";
+    for (const auto& name : state_names) {
+      JUST(CheckShapeLike(&ctx->InputTensorDesc(name, i), &model));
+    }
+  }
+  JUST(CheckLearningRateShape(ctx));
+  if (ctx->has_input("scale_by_tensor", 0)) {
+    const auto& scale_by_tensor = ctx->InputTensorDesc("scale_by_tensor", 0);
+    JUST(CheckScalarShape(&scale_by_tensor));
+  }
+  return Maybe<void>::Ok();
+}
+
+Maybe<void> InferStatefulUpdateDataType(user_op::InferContext* ctx,
+                                        const std::vector<std::string>& state_names) {
+  JUST(CheckLearningRateDataType(ctx));
+  const user_op::TensorDesc& first_model_desc = ctx->InputTensorDesc("model", 0);
+  const int64_t input_size = ctx->input_size("model");
+  for (int64_t i = 0; i < input_size; i++) {
+    const user_op::TensorDesc& model = ctx->InputTensorDesc("model", i);
+    CHECK_EQ_OR_RETURN(model.data_type(), first_model_desc.data_type())
+        << "Model DataType should be equal. ";
+    for (const auto& name : state_names) {
+      JUST(CheckDataTypeLike(&ctx->InputTensorDesc(name, i), &model));
+    }
+  }
+  if (ctx->has_input("scale_by_tensor", 0)) {
+    const auto& scale_by_tensor = ctx->InputTensorDesc("scale_by_tensor", 0);
+    JUST(CheckScalarDataType(&scale_by_tensor, first_model_desc.data_type()));
+  }
+  return Maybe<void>::Ok();
+}
+
+Maybe<void> StatefulUpdateInputArgModifyFn(
+    const user_op::GetInputArgModifier& GetInputArgModifierFn,
+    const user_op::UserOpConfWrapper& conf, const std::vector<std::string>& state_names) {
+  for (int64_t i = 0; i < conf.input_size("model"); i++) {
+    JUST(SetInputArgModifierMutable(GetInputArgModifierFn, "model", i));
+    for (const auto& name : state_names) {
+      JUST(SetInputArgModifierMutable(GetInputArgModifierFn, name, i));
+    }
+  }
+  return Maybe<void>::Ok();
+}
+
 }  // namespace
 
 /* static */ Maybe<void> MultiTensorSgdUpdateOp::InferLogicalTensorDesc(
@@ -323,4 +381,146 @@ Maybe<void> AdamWithCastInputArgModifyFn(const user_op::GetInputArgModifier& Get
   return InferAdamUpdateDataType(ctx);
 }
 
+/* static */ Maybe<void> MultiTensorMomentumUpdateOp::InferLogicalTensorDesc(
+    user_op::InferContext* ctx) {
+  return InferStatefulUpdateTensorDesc(ctx, {"momentum"});
+}
+
+/*static*/ Maybe<void> MultiTensorMomentumUpdateOp::InferPhysicalTensorDesc(
+    user_op::InferContext* ctx) {
+  return InferLogicalTensorDesc(ctx);
+}
+
+/* static */ Maybe<void> MultiTensorMomentumUpdateOp::GetSbp(user_op::SbpContext* ctx) {
+  ctx->NewBuilder().Broadcast(ctx->inputs()).Build();
+  return Maybe<void>::Ok();
+}
+
+/* static */ Maybe<void> MultiTensorMomentumUpdateOp::ModifyInputArg(
+    const GetInputArgModifier& GetInputArgModifierFn, const user_op::UserOpConfWrapper& conf) {
+  return StatefulUpdateInputArgModifyFn(GetInputArgModifierFn, conf, {"momentum"});
+}
+
+/* static */ Maybe<void> MultiTensorMomentumUpdateOp::InferDataType(user_op::InferContext* ctx) {
+  return InferStatefulUpdateDataType(ctx, {"momentum"});
+}
+
+/* static */ Maybe<void> MultiTensorAmsgradUpdateOp::InferLogicalTensorDesc(
+    user_op::InferContext* ctx) {
+  return InferStatefulUpdateTensorDesc(ctx, {"m", "v", "max_v"});
+}
+
+/*static*/ Maybe<void> MultiTensorAmsgradUpdateOp::InferPhysicalTensorDesc(
+    user_op::InferContext* ctx) {
+  return InferLogicalTensorDesc(ctx);
+}
+
+/* static */ Maybe<void> MultiTensorAmsgradUpdateOp::GetSbp(user_op::SbpContext* ctx) {
+  ctx->NewBuilder().Broadcast(ctx->inputs()).Build();
+  return Maybe<void>::Ok();
+}
+
+/* static */ Maybe<void> MultiTensorAmsgradUpdateOp::ModifyInputArg(
+    const GetInputArgModifier& GetInputArgModifierFn, const user_op::UserOpConfWrapper& conf) {
+  return StatefulUpdateInputArgModifyFn(GetInputArgModifierFn, conf, {"m", "v", "max_v"});
+}
+
+/* static */ Maybe<void> MultiTensorAmsgradUpdateOp::InferDataType(user_op::InferContext* ctx) {
+  return InferStatefulUpdateDataType(ctx, {"m", "v", "max_v"});
+}
+
+/* static */ Maybe<void> MultiTensorRmspropUpdateOp::InferLogicalTensorDesc(
+    user_op::InferContext* ctx) {
+  return InferStatefulUpdateTensorDesc(ctx, {"mean_square"});
+}
+
+/*static*/ Maybe<void> MultiTensorRmspropUpdateOp::InferPhysicalTensorDesc(
+    user_op::InferContext* ctx) {
+  return InferLogicalTensorDesc(ctx);
+}
+
+/* static */ Maybe<void> MultiTensorRmspropUpdateOp::GetSbp(user_op::SbpContext* ctx) {
+  ctx->NewBuilder().Broadcast(ctx->inputs()).Build();
+  return Maybe<void>::Ok();
+}
+
+/* static */ Maybe<void> MultiTensorRmspropUpdateOp::ModifyInputArg(
+    const GetInputArgModifier& GetInputArgModifierFn, const user_op::UserOpConfWrapper& conf) {
+  return StatefulUpdateInputArgModifyFn(GetInputArgModifierFn, conf, {"mean_square"});
+}
+
+/* static */ Maybe<void> MultiTensorRmspropUpdateOp::InferDataType(user_op::InferContext* ctx) {
+  return InferStatefulUpdateDataType(ctx, {"mean_square"});
+}
+
+/* static */ Maybe<void> MultiTensorLambUpdateOp::InferLogicalTensorDesc(
+    user_op::InferContext* ctx) {
+  return InferStatefulUpdateTensorDesc(ctx, {"m", "v"});
+}
+
+/*static*/ Maybe<void> MultiTensorLambUpdateOp::InferPhysicalTensorDesc(
+    user_op::InferContext* ctx) {
+  return InferLogicalTensorDesc(ctx);
+}
+
+/* static */ Maybe<void> MultiTensorLambUpdateOp::GetSbp(user_op::SbpContext* ctx) {
+  ctx->NewBuilder().Broadcast(ctx->inputs()).Build();
+  return Maybe<void>::Ok();
+}
+
+/* static */ Maybe<void> MultiTensorLambUpdateOp::ModifyInputArg(
+    const GetInputArgModifier& GetInputArgModifierFn, const user_op::UserOpConfWrapper& conf) {
+  return StatefulUpdateInputArgModifyFn(GetInputArgModifierFn, conf, {"m", "v"});
+}
+
+/* static */ Maybe<void> MultiTensorLambUpdateOp::InferDataType(user_op::InferContext* ctx) {
+  return InferStatefulUpdateDataType(ctx, {"m", "v"});
+}
+
+/* static */ Maybe<void> MultiTensorScaleByTensorOp::InferLogicalTensorDesc(
+    user_op::InferContext* ctx) {
+  return CheckScalarShape(&ctx->InputTensorDesc("scale", 0));
+}
+
+/*static*/ Maybe<void> MultiTensorScaleByTensorOp::InferPhysicalTensorDesc(
+    user_op::InferContext* ctx) {
+  return InferLogicalTensorDesc(ctx);
+}
+
+/* static */ Maybe<void> MultiTensorScaleByTensorOp::GetSbp(user_op::SbpContext* ctx) {
+  const int64_t input_size = ctx->user_op_conf().input_size("x");
+  std::vector<user_op::OpArg> x_args;
+  x_args.reserve(input_size);
+  int64_t min_num_axes = ctx->LogicalTensorDesc4InputArgNameAndIndex("x", 0).shape().NumAxes();
+  for (int64_t i = 0; i < input_size; ++i) {
+    x_args.emplace_back("x", i);
+    const auto& x_i = ctx->LogicalTensorDesc4InputArgNameAndIndex("x", i);
+    min_num_axes = std::min(min_num_axes, x_i.shape().NumAxes());
+  }
+  // Scaling is linear, so every x can stay as it is, only the scale must be broadcast.
+  for (int64_t axis = 0; axis < min_num_axes; ++axis) {
+    ctx->NewBuilder().Split(x_args, axis).Broadcast(user_op::OpArg("scale", 0)).Build();
+  }
+  ctx->NewBuilder().PartialSum(x_args).Broadcast(user_op::OpArg("scale", 0)).Build();
+  ctx->NewBuilder().Broadcast(ctx->inputs()).Build();
+  return Maybe<void>::Ok();
+}
+
+/* static */ Maybe<void> MultiTensorScaleByTensorOp::ModifyInputArg(
+    const GetInputArgModifier& GetInputArgModifierFn, const user_op::UserOpConfWrapper& conf) {
+  for (int64_t i = 0; i < conf.input_size("x"); i++) {
+    JUST(SetInputArgModifierMutable(GetInputArgModifierFn, "x", i));
+  }
+  return Maybe<void>::Ok();
+}
+
+/* static */ Maybe<void> MultiTensorScaleByTensorOp::InferDataType(user_op::InferContext* ctx) {
+  const DataType data_type = ctx->InputDType("x", 0);
+  for (int64_t i = 1; i < ctx->input_size("x"); i++) {
+    CHECK_EQ_OR_RETURN(ctx->InputDType("x", i), data_type)
+        << ctx->op_name() << ": the " << i << " th input has the different data type with others";
+  }
+  return CheckScalarDataType(&ctx->InputTensorDesc("scale", 0), data_type);
+}
+
 }  // namespace oneflow
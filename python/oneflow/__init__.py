@@ -393,6 +393,7 @@ from . import (
     backends,
     amp,
 )
+from oneflow.amp import autocast
 import oneflow.utils.data
 import oneflow.framework.docstr as docstr
 import oneflow.cuda
@@ -15,3 +15,4 @@ limitations under the License.
 """
 from .grad_scaler import GradScaler
 from .grad_scaler import StaticGradScaler
+from .autocast_mode import autocast, is_autocast_enabled, get_autocast_dtype
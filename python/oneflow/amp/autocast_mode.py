@@ -0,0 +1,106 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import functools
+
+import oneflow
+import oneflow._oneflow_internal
+from oneflow._oneflow_internal.amp import AutoAutocastMode
+
+
+def is_autocast_enabled():
+    r"""
+    Returns True if autocast is currently enabled in this thread.
+    """
+    return oneflow._oneflow_internal.amp.is_autocast_enabled()
+
+
+def get_autocast_dtype():
+    r"""
+    Returns the low precision data type used by autocast in this thread.
+    """
+    return oneflow._oneflow_internal.amp.get_autocast_dtype()
+
+
+class autocast:
+    r"""
+    Context-manager that runs the eager ops in mixed precision.
+
+    Inside an enabled region, the inputs of the ops in the white list of auto mixed precision
+    (e.g. matmul and conv2d) are casted to ``dtype``, the inputs of the ops in the black list are
+    casted to float32, and the ops in the gray and clear lists run in ``dtype`` once any of their
+    inputs is in ``dtype``. The other ops run in the data type of their inputs. These are the
+    same lists as the auto mixed precision of :class:`oneflow.nn.Graph`.
+
+    Only the tensors on ``device_type`` are casted, the inplace ops are never casted. Backward
+    ops run in the data type of the corresponding forward ops, so the backward pass should not
+    be put in the region.
+
+    This context manager is thread local; it will not affect computation in other threads.
+
+    Also functions as a decorator. (Make sure to instantiate with parenthesis.)
+
+    Args:
+        device_type (str): the device type of the tensors to autocast, "cuda" or "cpu".
+        dtype (oneflow.dtype, optional): the low precision data type. The default value is None,
+            which is oneflow.float16 for "cuda" and oneflow.bfloat16 for "cpu".
+        enabled (bool, optional): whether autocast is enabled in the region. Default: True
+
+    .. code-block:: python
+
+        >>> import oneflow as flow
+        >>> a = flow.randn(2, 3, device="cuda")
+        >>> b = flow.randn(3, 4, device="cuda")
+        >>> with flow.autocast("cuda"):
+        ...     c = flow.matmul(a, b)
+        >>> c.dtype
+        oneflow.float16
+    """
+
+    def __init__(self, device_type, dtype=None, enabled=True):
+        if device_type not in ("cuda", "cpu"):
+            raise ValueError(
+                "autocast only supports 'cuda' and 'cpu' device_type, got {}".format(
+                    device_type
+                )
+            )
+        if dtype is None:
+            dtype = oneflow.float16 if device_type == "cuda" else oneflow.bfloat16
+        if dtype not in (oneflow.float16, oneflow.bfloat16):
+            raise ValueError(
+                "autocast only supports oneflow.float16 and oneflow.bfloat16 dtype, "
+                "got {}".format(dtype)
+            )
+        self.device_type = device_type
+        self.dtype = dtype
+        self.enabled = enabled
+
+    def __call__(self, func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with autocast(self.device_type, self.dtype, self.enabled):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    def __enter__(self):
+        self.autocast_mode = AutoAutocastMode(
+            self.enabled, self.device_type, self.dtype
+        )
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        # Restore the previous mode right now instead of when self is collected.
+        del self.autocast_mode
@@ -13,15 +13,96 @@ WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 See the License for the specific language governing permissions and
 limitations under the License.
 """
+import oneflow as flow
+from oneflow.nn.utils.clip_grad import _group_grads, _multi_tensor_dtypes
+
+
+def _full_like_loss(value, dtype, loss):
+    if loss.is_global:
+        return flow.full(
+            (1,), value, dtype=dtype, placement=loss.placement, sbp=flow.sbp.broadcast
+        )
+    return flow.full((1,), value, dtype=dtype, device=loss.device)
+
+
+def _to_like(tensor, other):
+    if other.is_global:
+        return tensor.to_global(placement=other.placement, sbp=flow.sbp.broadcast)
+    return tensor.to(other.device)
+
+
+def _grads_of(optimizer):
+    grads = []
+    for param_group in optimizer.param_groups:
+        for param in param_group.parameters:
+            if param.grad is not None:
+                grads.append(param.grad)
+    return grads
+
+
+def _count_not_finite(group):
+    # One multi_count_not_finite per group checks all the gradients in it together.
+    dtype = group[0].dtype
+    if dtype in _multi_tensor_dtypes or (
+        dtype == flow.float16 and not group[0].is_global and group[0].is_cuda
+    ):
+        return flow._C.multi_count_not_finite(group)
+    return flow._C.multi_count_not_finite([g.to(dtype=flow.float32) for g in group])
+
+
+def _scale_grads(group, scale):
+    scale = scale.to(dtype=group[0].dtype)
+    if group[0].dtype in _multi_tensor_dtypes and all(
+        g.is_contiguous() for g in group
+    ):
+        flow._C.multi_tensor_scale_by_tensor(group, scale)
+    else:
+        for g in group:
+            g.mul_(scale)
 
 
 class GradScaler(object):
+    r"""Dynamic loss scaler of mixed precision training.
+
+    In :class:`oneflow.nn.Graph`, the scaler is passed to ``set_grad_scaler`` and the loss
+    scaling is done by the job passes. In eager mode, the scaler is used like this:
+
+    .. code-block:: python
+
+        scaler = flow.amp.GradScaler()
+        for x, y in data:
+            optimizer.zero_grad()
+            with flow.autocast("cuda"):
+                loss = loss_fn(model(x), y)
+            scaler.scale(loss).backward()
+            scaler.unscale_(optimizer)  # optional, e.g. to clip the unscaled gradients
+            scaler.step(optimizer)
+            scaler.update()
+
+    The gradients of all the parameters of an optimizer are checked for inf/nan by one fused
+    ``multi_count_not_finite`` per device and dtype, ``step`` skips ``optimizer.step()`` if
+    any of them is not finite, and ``update`` adjusts the scale by the
+    ``dynamic_loss_scale_schedule`` kernel: the scale is multiplied by ``growth_factor``
+    after ``growth_interval`` consecutive finite steps, and divided by it (but not below 1.0)
+    after a step with inf/nan gradients.
+
+    Args:
+        init_scale (float, optional): the initial scale. Default: 2.0**16
+        growth_factor (float, optional): the factor to multiply the scale by. Default: 2.0
+        backoff_factor (float, optional): the factor to multiply the scale by after a step with
+            inf/nan gradients, only 1.0/growth_factor is supported. Default: 0.5
+        growth_interval (int, optional): the number of consecutive finite steps before growing
+            the scale. Default: 2000
+        enabled (bool, optional): if False, the eager methods are no-ops. Default: True
+    """
+
     def __init__(
         self,
         init_scale=2.0 ** 16,
         growth_factor=2.0,
         backoff_factor=0.5,
         growth_interval=2000,
+        enabled=True,
     ):
         self._init_scale = init_scale
         self._growth_factor = growth_factor
@@ -32,19 +113,157 @@ class GradScaler(object):
                 "got {}".format(backoff_factor)
             )
         self._growth_interval = growth_interval
+        self._enabled = enabled
+        # Created by the first scale(), on the device (or placement) of the loss.
+        self._scale = None
+        self._growth_tracker = None
+        # id(optimizer) -> the number of inf/nan gradients of it in this iteration.
+        self._found_inf_per_optimizer = {}
 
     def _generate_conf_for_graph(self, train_conf):
         train_conf.dynamic_loss_scale_policy.initial_loss_scale = self._init_scale
         train_conf.dynamic_loss_scale_policy.increment_period = self._growth_interval
         train_conf.dynamic_loss_scale_policy.multiplier = self._growth_factor
 
+    def is_enabled(self):
+        return self._enabled
+
+    def get_scale(self):
+        r"""Returns the current scale as a python float, it synchronizes with the device."""
+        if not self._enabled:
+            return 1.0
+        if self._scale is None:
+            return self._init_scale
+        return self._scale.item()
+
+    def scale(self, outputs):
+        r"""Multiplies a tensor or a list (or tuple) of tensors by the scale."""
+        if not self._enabled:
+            return outputs
+        if isinstance(outputs, (list, tuple)):
+            return type(outputs)(self.scale(output) for output in outputs)
+        if self._scale is None:
+            self._scale = _full_like_loss(self._init_scale, flow.float32, outputs)
+            self._growth_tracker = _full_like_loss(0, flow.int64, outputs)
+        return outputs * self._scale.to(dtype=outputs.dtype)
+
+    def unscale_(self, optimizer):
+        r"""Divides the gradients of ``optimizer`` by the scale in place, and checks them for
+        inf/nan. It is called by ``step`` if it has not been called in this iteration.
+        """
+        if not self._enabled:
+            return
+        if self._scale is None:
+            raise RuntimeError("scale() should be called before unscale_().")
+        if id(optimizer) in self._found_inf_per_optimizer:
+            raise RuntimeError(
+                "unscale_() has already been called on this optimizer "
+                "since the last update()."
+            )
+        inv_scale = flow.reciprocal(self._scale)
+        found_inf = flow.zeros_like(self._growth_tracker)
+        for group in _group_grads(_grads_of(optimizer)):
+            found_inf += _to_like(_count_not_finite(group), found_inf)
+            _scale_grads(group, _to_like(inv_scale, group[0]))
+        self._found_inf_per_optimizer[id(optimizer)] = found_inf
+
+    def step(self, optimizer, *args, **kwargs):
+        r"""Unscales the gradients of ``optimizer`` if needed, and calls
+        ``optimizer.step(*args, **kwargs)`` unless there are inf/nan gradients.
+
+        Returns the return value of ``optimizer.step``, or None if the step is skipped.
+        """
+        if not self._enabled:
+            return optimizer.step(*args, **kwargs)
+        if id(optimizer) not in self._found_inf_per_optimizer:
+            self.unscale_(optimizer)
+        # The only host synchronization of the loss scaling.
+        if self._found_inf_per_optimizer[id(optimizer)].item() == 0:
+            return optimizer.step(*args, **kwargs)
+        return None
+
+    def update(self, new_scale=None):
+        r"""Updates the scale at the end of an iteration.
+
+        Args:
+            new_scale (float, optional): if given, the scale is set to it instead of being
+                updated by the inf/nan check of this iteration.
+        """
+        if not self._enabled:
+            return
+        if self._scale is None:
+            raise RuntimeError("scale() should be called before update().")
+        if new_scale is not None:
+            self._scale.fill_(new_scale)
+        else:
+            if len(self._found_inf_per_optimizer) == 0:
+                raise RuntimeError("No inf checks were recorded prior to update().")
+            found_inf = None
+            for optimizer_found_inf in self._found_inf_per_optimizer.values():
+                found_inf = (
+                    optimizer_found_inf
+                    if found_inf is None
+                    else found_inf + optimizer_found_inf
+                )
+            flow._C.dynamic_loss_scale_schedule(
+                found_inf,
+                self._scale,
+                self._growth_tracker,
+                increment_period=self._growth_interval,
+                multiplier=self._growth_factor,
+            )
+        self._found_inf_per_optimizer = {}
+
 
 class StaticGradScaler(object):
+    r"""Static loss scaler of mixed precision training.
+
+    It is used like :class:`GradScaler` in eager mode, but the scale never changes and
+    ``step`` never skips ``optimizer.step()``.
+
+    Args:
+        scale_factor (float): the scale, must be greater than 0.0.
+    """
+
     def __init__(self, scale_factor):
         if scale_factor <= 0.0:
             raise ValueError("StaticGradScaler's scale_factor must > 0.0")
 
         self._scale_factor = scale_factor
+        self._unscaled_optimizers = set()
 
     def _generate_conf_for_graph(self, train_conf):
         train_conf.loss_scale_factor = self._scale_factor
+
+    def get_scale(self):
+        return self._scale_factor
+
+    def scale(self, outputs):
+        if isinstance(outputs, (list, tuple)):
+            return type(outputs)(self.scale(output) for output in outputs)
+        return outputs * self._scale_factor
+
+    def unscale_(self, optimizer):
+        if id(optimizer) in self._unscaled_optimizers:
+            raise RuntimeError(
+                "unscale_() has already been called on this optimizer "
+                "since the last update()."
+            )
+        for group in _group_grads(_grads_of(optimizer)):
+            inv_scale = _full_like_loss(
+                1.0 / self._scale_factor, group[0].dtype, group[0]
+            )
+            _scale_grads(group, inv_scale)
+        self._unscaled_optimizers.add(id(optimizer))
+
+    def step(self, optimizer, *args, **kwargs):
+        if id(optimizer) not in self._unscaled_optimizers:
+            self.unscale_(optimizer)
+        return optimizer.step(*args, **kwargs)
+
+    def update(self, new_scale=None):
+        if new_scale is not None:
+            if new_scale <= 0.0:
+                raise ValueError("StaticGradScaler's scale_factor must > 0.0")
+            self._scale_factor = new_scale
+        self._unscaled_optimizers = set()
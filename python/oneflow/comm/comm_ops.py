@@ -18,7 +18,33 @@ import oneflow as flow
 import numpy as np
 
 
-def all_reduce(tensor):
+class Work(object):
+    r"""Handle of a collective launched with ``async_op=True``.
+
+    The collective runs on the communication stream of the virtual machine, so the
+    host is free to launch other operations until :meth:`wait` is called. Operations
+    launched later that use the output tensors always see the result of the collective.
+    """
+
+    def __init__(self, tensors):
+        self._work = flow._oneflow_internal.comm.Work(tensors)
+
+    def is_completed(self):
+        """Returns True if the collective has finished."""
+        return self._work.is_completed()
+
+    def wait(self):
+        """Blocks until the collective has finished."""
+        self._work.wait()
+        return True
+
+
+def _check_device(tensor):
+    if tensor.device.type != "cpu":
+        assert tensor.device.index == flow.env.get_local_rank()
+
+
+def all_reduce(tensor, async_op=False):
     """
     Reduces the tensor data across all machines in such a way that all get
     the final result.
@@ -26,6 +52,8 @@ def all_reduce(tensor):
 
     Args:
         tensor (Tensor): the input tensor
+        async_op (bool, optional): Whether this op should be an async op.
+            If True, a :class:`Work` handle is returned.
 
     For example:
 
@@ -50,18 +78,20 @@ def all_reduce(tensor):
 
     """
     assert isinstance(tensor, flow._oneflow_internal.Tensor)
-    assert tensor.device.index == flow.env.get_local_rank()
+    _check_device(tensor)
     assert tensor.is_local
     device_type = tensor.device.type
     placement = flow.env.all_device_placement(device_type)
-    result = tensor.to_global(placement=placement, sbp=flow.sbp.partial_sum).to_global(
-        placement=placement, sbp=flow.sbp.broadcast
-    )
+    result = tensor.to_global(
+        placement=placement, sbp=flow.sbp.partial_sum, check_meta=not async_op
+    ).to_global(placement=placement, sbp=flow.sbp.broadcast)
 
     tensor.data = result.to_local()
+    if async_op:
+        return Work([tensor])
 
 
-def all_gather(tensor_list, tensor):
+def all_gather(tensor_list, tensor, async_op=False):
     """
     Gathers tensors from the whole group in a list.
 
@@ -69,6 +99,8 @@ def all_gather(tensor_list, tensor):
         tensor_list (list[Tensor]): Output list. It should contain
             correctly-sized tensors to be used for output of the collective.
         tensor (Tensor): Tensor to be broadcast from current process.
+        async_op (bool, optional): Whether this op should be an async op.
+            If True, a :class:`Work` handle is returned.
 
     For example:
 
@@ -103,13 +135,15 @@ def all_gather(tensor_list, tensor):
     assert isinstance(tensor, flow._oneflow_internal.Tensor)
     assert isinstance(tensor_list, list)
     assert len(tensor_list) == flow.env.get_world_size()
-    assert tensor.device.index == flow.env.get_local_rank()
+    _check_device(tensor)
     assert tensor.is_local
     tensor = tensor.expand(*([1] + list(tensor.shape)))
     device_type = tensor.device.type
     placement = flow.env.all_device_placement(device_type)
     tensor = (
-        tensor.to_global(placement=placement, sbp=flow.sbp.split(0))
+        tensor.to_global(
+            placement=placement, sbp=flow.sbp.split(0), check_meta=not async_op
+        )
         .to_global(placement=placement, sbp=flow.sbp.broadcast)
         .to_local()
     )
@@ -117,9 +151,11 @@ def all_gather(tensor_list, tensor):
     # TODO(): getitem has bug on global tensor with size = [2, 1].
     for i in range(tensor.shape[0]):
         tensor_list[i] = tensor[i]
+    if async_op:
+        return Work(tensor_list)
 
 
-def broadcast(tensor, src):
+def broadcast(tensor, src, async_op=False):
     """
     Broadcasts the tensor to the whole group.
     ``tensor`` must have the same number of elements in all processes
@@ -129,6 +165,8 @@ def broadcast(tensor, src):
         tensor (Tensor): Data to be sent if ``src`` is the rank of current
             process, and tensor to be used to save received data otherwise.
         src (int): Source rank.
+        async_op (bool, optional): Whether this op should be an async op.
+            If True, a :class:`Work` handle is returned.
 
     .. code-block:: python
 
@@ -154,6 +192,8 @@ def broadcast(tensor, src):
     assert isinstance(tensor, flow._oneflow_internal.Tensor)
     assert tensor.is_local
     flow._C.broadcast(tensor, src_rank=src, inplace=True)
+    if async_op:
+        return Work([tensor])
 
 
 def scatter(tensor, scatter_list=None, src=0):
@@ -212,7 +252,7 @@ def reduce(tensor, dst):
         tensor.data = original_tensor
 
 
-def all_to_all(output_tensor_list, input_tensor_list):
+def all_to_all(output_tensor_list, input_tensor_list, async_op=False):
     """
     Each process scatters list of input tensors to all processes in a group and
     return gathered list of tensors in output list.
@@ -221,35 +261,58 @@ def all_to_all(output_tensor_list, input_tensor_list):
         output_tensor_list (list[Tensor]): List of tensors to be gathered one
             per rank.
         input_tensor_list (list[Tensor]): List of tensors to scatter one per rank.
+        async_op (bool, optional): Whether this op should be an async op.
+            If True, a :class:`Work` handle is returned.
 
     """
 
     def _check_list(tensor_list):
         assert isinstance(tensor_list, list)
         assert len(tensor_list) == flow.env.get_world_size()
-        shape = tensor_list[0].shape
         dtype = tensor_list[0].dtype
         device = tensor_list[0].device
         for tensor in tensor_list:
             assert isinstance(tensor, flow._oneflow_internal.Tensor)
             assert tensor.is_local
-            assert shape == tensor.shape
             assert dtype == tensor.dtype
             assert device == tensor.device
 
     _check_list(output_tensor_list)
     _check_list(input_tensor_list)
 
-    assert input_tensor_list[0].shape == output_tensor_list[0].shape
     assert input_tensor_list[0].dtype == output_tensor_list[0].dtype
     assert input_tensor_list[0].device == output_tensor_list[0].device
 
-    for i in range(flow.env.get_world_size()):
-        flow.comm.scatter(
-            output_tensor_list[i],
-            input_tensor_list if i == flow.env.get_rank() else [],
-            src=i,
-        )
+    shape = input_tensor_list[0].shape
+    if all(
+        tensor.shape == shape for tensor in input_tensor_list + output_tensor_list
+    ):
+        # Every rank sends the i-th chunk to the i-th rank and receives the i-th
+        # chunk from the i-th rank in a single collective.
+        result = flow._C.local_all_to_all(flow.stack(input_tensor_list))
+        for i in range(flow.env.get_world_size()):
+            output_tensor_list[i].data = result[i]
+    else:
+        # Uneven splits can't be stacked, rank i sends its chunks to the other
+        # ranks in turn.
+        rank = flow.env.get_rank()
+        for i in range(flow.env.get_world_size()):
+            if i == rank:
+                for j in range(flow.env.get_world_size()):
+                    if j != rank:
+                        flow.comm.send(input_tensor_list[j], j, send_meta=False)
+                output_tensor_list[i].data = input_tensor_list[i]
+            else:
+                output = output_tensor_list[i]
+                flow.comm.recv(
+                    i,
+                    shape=output.shape,
+                    dtype=output.dtype,
+                    device=output.device,
+                    out=output,
+                )
+    if async_op:
+        return Work(output_tensor_list)
 
 
 def barrier():
@@ -260,13 +323,15 @@ def barrier():
     flow._oneflow_internal.eager.Sync()
 
 
-def reduce_scatter(output, input_list):
+def reduce_scatter(output, input_list, async_op=False):
     """
     Reduces, then scatters a list of tensors to all processes in a group.
 
     Args:
         output (Tensor): Output tensor.
         input_list (list[Tensor]): List of tensors to reduce and scatter.
+        async_op (bool, optional): Whether this op should be an async op.
+            If True, a :class:`Work` handle is returned.
 
     """
     assert isinstance(output, flow._oneflow_internal.Tensor)
@@ -274,23 +339,30 @@ def reduce_scatter(output, input_list):
     assert isinstance(input_list, list)
     assert len(input_list) == flow.env.get_world_size()
     output_shape = output.shape
-    device_type = output.device.type
-    placement = flow.env.all_device_placement(device_type)
-    reduced_tensor_list = []
     for tensor in input_list:
         assert tensor.is_local
         assert tensor.shape == output_shape
-        tensor = tensor.to_global(
-            placement=placement, sbp=flow.sbp.partial_sum
-        ).to_global(placement=placement, sbp=flow.sbp.broadcast)
-        reduced_tensor_list.append(tensor.to_local())
-    output.data = reduced_tensor_list[flow.env.get_rank()]
+    device_type = output.device.type
+    placement = flow.env.all_device_placement(device_type)
+    # partial_sum -> split(0) is done by eager_ccl_reduce_scatter, every rank
+    # only receives the reduced chunk it keeps.
+    tensor = flow.stack(input_list).to_global(
+        placement=placement, sbp=flow.sbp.partial_sum, check_meta=False
+    )
+    tensor = tensor.to_global(placement=placement, sbp=flow.sbp.split(0))
+    output.data = tensor.to_local().reshape(output_shape)
+    if async_op:
+        return Work([output])
 
 
 def gather(tensor, gather_list=None, dst=0):
     """
     Gathers a list of tensors in a single process.
 
+    Every other rank sends its tensor to ``dst`` point-to-point, so only ``dst``
+    receives data and only its ``gather_list`` is filled. ``gather_list`` is left
+    untouched on the other ranks.
+
     Args:
         tensor (Tensor): Input tensor.
         gather_list (list[Tensor], optional): List of appropriately-sized
@@ -301,22 +373,22 @@ def gather(tensor, gather_list=None, dst=0):
     """
     assert isinstance(tensor, flow._oneflow_internal.Tensor)
     assert tensor.is_local
-    shape = tensor.shape
-    dtype = tensor.dtype
-    tensor = tensor.expand(*([1] + list(shape)))
-    device_type = tensor.device.type
-    placement = flow.env.all_device_placement(device_type)
-    tensor = tensor.to_global(placement=placement, sbp=flow.sbp.split(0)).to_global(
-        placement=placement, sbp=flow.sbp.broadcast
-    )
+    assert isinstance(dst, int)
+    # Only the destination rank receives data, other ranks send their tensor to
+    # it directly.
+    if flow.env.get_rank() != dst:
+        flow.comm.send(tensor, dst, send_meta=False)
+        return
 
     if gather_list is None:
-        gather_list = [
-            flow.empty(shape, dtype=dtype) for _ in range(flow.env.get_world_size())
-        ]
+        gather_list = [None for _ in range(flow.env.get_world_size())]
 
-    assert gather_list is not None
     assert isinstance(gather_list, list)
     assert len(gather_list) == flow.env.get_world_size()
-    for i in range(tensor.shape[0]):
-        gather_list[i] = tensor[i].to_local()
+    for i in range(len(gather_list)):
+        if i == dst:
+            gather_list[i] = flow._C.identity(tensor)
+        else:
+            gather_list[i] = flow.comm.recv(
+                i, shape=tensor.shape, dtype=tensor.dtype, device=tensor.device
+            )
@@ -13,8 +13,12 @@ WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 See the License for the specific language governing permissions and
 limitations under the License.
 """
+from concurrent.futures import Future, ThreadPoolExecutor
 from contextlib import contextmanager
 import os
+import shutil
+import threading
+import uuid
 import warnings
 from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
 from pathlib import Path
@@ -33,6 +37,12 @@ import oneflow.framework.dtype as dtype_util
 import oneflow.framework.id_util as id_util
 from oneflow.framework.tensor import Tensor
 import oneflow.nn.graph.graph as graph_util
+from oneflow.framework.sharded_checkpoint import (
+    load_index,
+    load_sharded_tensor,
+    make_index_entry,
+    save_index,
+)
 import pickle
 
 SNAPSHOT_DONE_FILENAME = "snapshot_done"
@@ -97,42 +107,183 @@ class FileBackendVariableBlob:
     def dtype(self) -> oneflow.dtype:
         return self.dtype_
 
-    def numpy(self) -> np.ndarray:
+    def numpy(self, mmap: bool = False) -> np.ndarray:
         if not self.has_meta_info_:
             raise RuntimeError("This variable does not have meta info")
-        return np.fromfile(
-            self.file_path,
-            dtype=dtype_util.convert_oneflow_dtype_to_numpy_dtype(self.dtype),
-        ).reshape(self.shape)
-
-
-def _save_tensor_to_disk(tensor: "oneflow.Tensor", dir_name: Union[str, Path]) -> None:
+        np_dtype = dtype_util.convert_oneflow_dtype_to_numpy_dtype(self.dtype)
+        if mmap:
+            if np.prod(self.shape).item() == 0:
+                # Empty file cannot be mapped.
+                return np.empty(self.shape, dtype=np_dtype)
+            # Copy-on-write mapping, pages are read from disk on the first access and
+            # writes to the array are never carried through to the file.
+            return np.memmap(self.file_path, dtype=np_dtype, mode="c", shape=self.shape)
+        return np.fromfile(self.file_path, dtype=np_dtype).reshape(self.shape)
+
+
+def _save_array_to_disk(
+    array: np.ndarray,
+    dtype: oneflow.dtype,
+    dir_name: Union[str, Path],
+    sync_to_disk: bool = False,
+) -> None:
     os.makedirs(dir_name, exist_ok=True)
     meta_info = variable_meta_info_pb.VariableMetaInfo()
-    meta_info.shape.dim[:] = tensor.shape
+    meta_info.shape.dim[:] = array.shape
     meta_info.data_type = oneflow._oneflow_internal.deprecated.GetProtoDtype4OfDtype(
-        tensor.dtype
+        dtype
     )
     data_path = os.path.join(dir_name, DATA_FILENAME)
     with open(data_path, "wb") as f:
-        f.write(tensor.numpy().tobytes())
+        f.write(np.ascontiguousarray(array).data)
+        if sync_to_disk:
+            f.flush()
+            os.fsync(f.fileno())
 
     with open(os.path.join(dir_name, META_INFO_FILENAME), "w") as f:
         f.write(text_format.MessageToString(meta_info))
+        if sync_to_disk:
+            f.flush()
+            os.fsync(f.fileno())
+
+
+def _save_tensor_to_disk(tensor: "oneflow.Tensor", dir_name: Union[str, Path]) -> None:
+    _save_array_to_disk(tensor.numpy(), tensor.dtype, dir_name)
+
+
+def _snapshot_tensor(tensor: "oneflow.Tensor") -> np.ndarray:
+    # NOTE: numpy() of a local cpu tensor shares memory with the tensor, which may be
+    # updated in place by later training steps, so it must be copied.
+    array = tensor.numpy()
+    if tensor.device == flow.device("cpu"):
+        array = array.copy()
+    return array
+
+
+def _fsync_dir(dir_name: Union[str, Path]) -> None:
+    fd = os.open(dir_name, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class AsyncCheckpointWriter(object):
+    r"""Writes snapshots of checkpoints to disk in background threads.
+
+    The tensors of a checkpoint are written by a thread pool in parallel, then the pickled
+    data is written and the whole directory is renamed to the destination path at last,
+    so a checkpoint directory is either complete or absent. At most ``max_pending_snapshots``
+    snapshots are kept in host memory, saving more blocks until a pending one is written.
+    """
+
+    def __init__(self, num_threads: int = 4, max_pending_snapshots: int = 2):
+        assert num_threads >= 1, "num_threads must be >= 1."
+        assert max_pending_snapshots >= 1, "max_pending_snapshots must be >= 1."
+        self._tensor_executor = ThreadPoolExecutor(
+            num_threads, thread_name_prefix="oneflow_ckpt_writer"
+        )
+        # Checkpoints are committed in the order they were saved.
+        self._commit_executor = ThreadPoolExecutor(
+            1, thread_name_prefix="oneflow_ckpt_committer"
+        )
+        self._pending_snapshots = threading.BoundedSemaphore(max_pending_snapshots)
+
+    def acquire(self):
+        self._pending_snapshots.acquire()
+
+    def release(self):
+        self._pending_snapshots.release()
+
+    def submit(
+        self,
+        path: Path,
+        tmp_path: Path,
+        pickled_bytes: Optional[bytes],
+        snapshots: List[Tuple[Path, np.ndarray, oneflow.dtype]],
+    ) -> Future:
+        r"""Write a snapshot acquired by ``acquire()``, ``pickled_bytes`` is None if this
+        rank need not write the checkpoint."""
+        try:
+            tensor_futures = [
+                self._tensor_executor.submit(
+                    _save_array_to_disk, array, dtype, dir_name, True
+                )
+                for (dir_name, array, dtype) in snapshots
+            ]
+            snapshots.clear()
+            return self._commit_executor.submit(
+                self._commit, path, tmp_path, pickled_bytes, tensor_futures
+            )
+        except:
+            self.release()
+            raise
+
+    def _commit(self, path, tmp_path, pickled_bytes, tensor_futures):
+        try:
+            for f in tensor_futures:
+                f.result()
+            tensor_futures.clear()
+            if pickled_bytes is None:
+                return None
+            tmp_path.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path / PICKLE_FILENAME, "wb") as f:
+                f.write(pickled_bytes)
+                f.flush()
+                os.fsync(f.fileno())
+            _fsync_dir(tmp_path)
+            if path.exists():
+                old_path = path.with_name(f".{path.name}.old-{uuid.uuid4().hex}")
+                os.rename(path, old_path)
+                os.rename(tmp_path, path)
+                shutil.rmtree(old_path, ignore_errors=True)
+            else:
+                os.rename(tmp_path, path)
+            _fsync_dir(path.parent)
+            return str(path)
+        except:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            raise
+        finally:
+            self.release()
+
+
+_async_checkpoint_writer = None
+_async_checkpoint_writer_lock = threading.Lock()
+
+
+def _get_async_checkpoint_writer() -> AsyncCheckpointWriter:
+    global _async_checkpoint_writer
+    with _async_checkpoint_writer_lock:
+        if _async_checkpoint_writer is None:
+            _async_checkpoint_writer = AsyncCheckpointWriter(
+                num_threads=int(os.getenv("ONEFLOW_ASYNC_SAVE_NUM_THREADS", 4)),
+                max_pending_snapshots=int(
+                    os.getenv("ONEFLOW_ASYNC_SAVE_MAX_PENDING_SNAPSHOTS", 2)
+                ),
+            )
+        return _async_checkpoint_writer
 
 
 ValueContainer = Union[FileBackendVariableBlob, np.ndarray, "oneflow.Tensor"]
 
 
 def _LoadSingleVariable(
-    path: Optional[str], global_src_rank: Optional[int] = None
+    path: Optional[str],
+    global_src_rank: Optional[int] = None,
+    mmap: bool = False,
+    preloaded_arrays: Optional[Dict[str, np.ndarray]] = None,
 ) -> "flow.Tensor":
+    def load_array():
+        if preloaded_arrays is not None and path in preloaded_arrays:
+            return preloaded_arrays.pop(path)
+        return FileBackendVariableBlob(path).numpy(mmap=mmap)
+
     if global_src_rank is not None:
         rank = flow.env.get_rank()
         if rank == global_src_rank:
             assert isinstance(path, str)
-            file_backed_blob = FileBackendVariableBlob(path)
-            loaded = flow.tensor(file_backed_blob.numpy(), dtype=file_backed_blob.dtype)
+            loaded = flow.from_numpy(load_array())
         else:
             loaded = flow.tensor([])
         loaded = loaded.to_global(
@@ -141,7 +292,41 @@ def _LoadSingleVariable(
         return loaded
 
     assert isinstance(path, str)
-    return flow.tensor(FileBackendVariableBlob(path).numpy())
+    # NOTE: the tensor shares memory with the loaded array, which is a memory-mapped
+    # file in mmap mode.
+    return flow.from_numpy(load_array())
+
+
+def _preload_arrays(paths: List[str]) -> Dict[str, np.ndarray]:
+    num_threads = min(
+        int(os.getenv("ONEFLOW_LOAD_NUM_THREADS", 8)), max(len(paths), 1)
+    )
+    if num_threads <= 1:
+        return {p: FileBackendVariableBlob(p).numpy() for p in paths}
+    # Reading files releases GIL, so files are read in parallel by threads.
+    with ThreadPoolExecutor(num_threads) as executor:
+        arrays = executor.map(lambda p: FileBackendVariableBlob(p).numpy(), paths)
+        return dict(zip(paths, arrays))
+
+
+def _save_sharded_tensor(tensor: "oneflow.Tensor") -> Dict[str, Any]:
+    rel_dir_name = f"global_tensor_{tensor.global_id()}"
+    abs_dir_name = save_load_path / rel_dir_name
+    if flow.sbp.partial_sum in tensor.sbp:
+        tensor = tensor.to_global(
+            sbp=[
+                flow.sbp.broadcast if sbp == flow.sbp.partial_sum else sbp
+                for sbp in tensor.sbp
+            ]
+        )
+    entry, local_slices = make_index_entry(tensor, "shard_{rank}/" + DATA_FILENAME)
+    sharded_index[rel_dir_name] = entry
+    if local_slices is not None:
+        # Only the local shard is written, and each distinct shard is written once.
+        _save_tensor_to_disk(
+            tensor.to_local(), abs_dir_name / f"shard_{flow.env.get_rank()}"
+        )
+    return {"path": rel_dir_name, "sharded": True}
 
 
 def _broadcast_py_object(obj, src: int = 0):
@@ -161,6 +346,8 @@ def tensor_getstate(self):
         # save_load_path is not None means setstate/getstate is called inside
         # flow.save or flow.load
         assert isinstance(save_load_path, Path)
+        if sharded_index is not None and not self.is_local:
+            return _save_sharded_tensor(self)
         if global_src_dsk_rank is None:
             assert self.is_local
             rel_dir_name = id_util.UniqueStr("tensor_")
@@ -177,7 +364,15 @@ def tensor_getstate(self):
                 placement=flow.placement("cpu", [global_src_dsk_rank]),
             ).to_local()
         if global_src_dsk_rank is None or global_src_dsk_rank == flow.env.get_rank():
-            _save_tensor_to_disk(tensor, abs_dir_name)
+            if sharded_index is not None and flow.env.get_rank() != 0:
+                # Local tensors in sharded checkpoints are written by rank 0.
+                return {"path": rel_dir_name}
+            if tensor_snapshots is not None:
+                tensor_snapshots.append(
+                    (abs_dir_name, _snapshot_tensor(tensor), tensor.dtype)
+                )
+            else:
+                _save_tensor_to_disk(tensor, abs_dir_name)
 
         return {"path": rel_dir_name}
     else:
@@ -203,7 +398,23 @@ def tensor_setstate(self, pickle_dict):
         assert isinstance(save_load_path, Path)
         rel_dir_name = pickle_dict["path"]
         abs_dir_name = save_load_path / rel_dir_name
-        tmp_tensor = _LoadSingleVariable(str(abs_dir_name), global_src_dsk_rank)
+        if pickle_dict.get("sharded", False):
+            if sharded_index is None:
+                raise RuntimeError(
+                    "Sharded checkpoint can not be loaded with global_src_rank."
+                )
+            return self.__init__(
+                load_sharded_tensor(
+                    abs_dir_name, sharded_index[rel_dir_name], map_location
+                )
+            )
+        if deferred_tensors is not None:
+            # The tensor is initialized after all tensor files are read in parallel.
+            deferred_tensors.append((self, pickle_dict))
+            return
+        tmp_tensor = _LoadSingleVariable(
+            str(abs_dir_name), global_src_dsk_rank, mmap_load, preloaded_arrays
+        )
         if map_location is not None:
             if isinstance(map_location, flow.device):
                 tmp_tensor = tmp_tensor.to(map_location)
@@ -280,25 +491,59 @@ def legacy_load(
 
 
 @contextmanager
-def tensor_pickling_context(path: Path, global_src_dst_rank: Optional[int], mp):
+def tensor_pickling_context(
+    path: Path,
+    global_src_dst_rank: Optional[int],
+    mp,
+    snapshots=None,
+    mmap=False,
+    deferred=None,
+    index=None,
+):
     global save_load_path
     global global_src_dsk_rank
     global map_location
+    global tensor_snapshots
+    global mmap_load
+    global preloaded_arrays
+    global deferred_tensors
+    global sharded_index
     global_src_dsk_rank = global_src_dst_rank
     save_load_path = path
     map_location = mp
+    tensor_snapshots = snapshots
+    mmap_load = mmap
+    deferred_tensors = deferred
+    sharded_index = index
     try:
         yield
     finally:
         global_src_dsk_rank = None
         save_load_path = None
         map_location = None
+        tensor_snapshots = None
+        mmap_load = False
+        preloaded_arrays = None
+        deferred_tensors = None
+        sharded_index = None
+
+
+def _init_deferred_tensors() -> None:
+    global deferred_tensors
+    global preloaded_arrays
+    tensors, deferred_tensors = deferred_tensors, None
+    preloaded_arrays = _preload_arrays(
+        [str(save_load_path / pickle_dict["path"]) for _, pickle_dict in tensors]
+    )
+    for tensor, pickle_dict in tensors:
+        tensor_setstate(tensor, pickle_dict)
 
 
 def load(
     path: str,
     global_src_rank: Optional[int] = None,
     map_location: Optional[Union[str, flow.device, flow.placement]] = None,
+    mmap: bool = False,
 ) -> Any:
     r"""Loads an object saved with oneflow.save() from a directory.
 
@@ -312,6 +557,21 @@ def load(
             `flow.placement('cuda', [global_src_rank])`
         map_location (str, flow.device or flow.placement, optional):
             indicates the location where all tensors should be loaded.
+        mmap (bool, optional): If True, the loaded cpu tensors are
+            backed by copy-on-write memory-mapped files, whose data is
+            only read from disk when being accessed or moved to another
+            device. Otherwise tensor files are read in parallel by
+            ONEFLOW_LOAD_NUM_THREADS (default 8) threads.
+            Default: ``False``.
+
+    For checkpoints saved with ``sharded=True``, every rank reads the
+    pickled data itself, and global tensors are loaded on `map_location`
+    if it is a placement (by default the saved placement, or all ranks if
+    the saved placement does not fit the current world size). The saved
+    sbp is kept if the placement has the same number of dimensions, else
+    the first split axis is kept for 1D placements. Each rank only reads
+    the byte ranges of its own shard. If `map_location` is a device, whole
+    tensors are loaded as local tensors.
 
     Returns:
         The loaded object
@@ -329,6 +589,9 @@ def load(
     if is_legacy:
         return legacy_load(path, global_src_rank)
 
+    index = None
+    if global_src_rank is None:
+        index = load_index(path)
     if global_src_rank is not None:
         if rank == global_src_rank:
             pickle_bytes = pickle_path.read_bytes()
@@ -344,8 +607,26 @@ def load(
         assert isinstance(
             map_location, (flow.device, flow.placement)
         ), "'map_location' only supports str, device or placement."
-    with tensor_pickling_context(path, global_src_rank, map_location):
+    deferred = None
+    if (
+        not mmap
+        and index is None
+        and (global_src_rank is None or global_src_rank == rank)
+    ):
+        # Tensors are initialized after unpickling, so that their files are known
+        # and read in parallel.
+        deferred = []
+    with tensor_pickling_context(
+        path,
+        global_src_rank,
+        map_location,
+        mmap=mmap,
+        deferred=deferred,
+        index=index,
+    ):
         res = pickle.loads(pickle_bytes)
+        if deferred is not None:
+            _init_deferred_tensors()
     assert res["protocol_version"] == PROTOCOL_VERSION
     return res["data"]
 
@@ -388,8 +669,12 @@ def save_one_embedding_info(state_dict: Any, path: Union[str, Path]) -> None:
 
 
 def save(
-    obj: Any, path: Union[str, Path], global_dst_rank: Optional[int] = None,
-) -> None:
+    obj: Any,
+    path: Union[str, Path],
+    global_dst_rank: Optional[int] = None,
+    async_save: bool = False,
+    sharded: bool = False,
+) -> Optional[Future]:
     r"""Save an object to a directory.
 
     Args:
@@ -400,9 +685,54 @@ def save(
             will be saved by the process whose rank ==
             global_src_rank, while other processes will not do any
             disk I/O.
+        async_save (bool, optional): If True, tensors are snapshotted
+            to host memory and written to disk by background threads,
+            and a ``concurrent.futures.Future`` is returned immediately.
+            The checkpoint is written to a temporary directory which is
+            renamed to `path` after all files are synced to disk.
+            The number of writer threads and the max number of pending
+            snapshots in memory are set by environment variables
+            ONEFLOW_ASYNC_SAVE_NUM_THREADS (default 4) and
+            ONEFLOW_ASYNC_SAVE_MAX_PENDING_SNAPSHOTS (default 2), saving
+            blocks when there are too many pending snapshots.
+            An nn.Graph can not be saved asynchronously, save its
+            ``state_dict()`` instead. Default: ``False``.
+        sharded (bool, optional): If True, every rank writes only the
+            local shards of split global tensors (a shard duplicated by
+            broadcast is written once), and rank 0 writes the pickled
+            data, local tensors and an index recording the placement,
+            sbp and shard ranges of global tensors. `path` must be on a
+            file system shared by all ranks. The checkpoint can be
+            loaded with a different world size or placement, see
+            :func:`oneflow.load`. Sharded saving is synchronous and does
+            not support nn.Graph, save its ``state_dict()`` instead.
+            Default: ``False``.
+
+    Returns:
+        A future of the saving if `async_save` is True, else None.
     """
     path: Path = Path(path)
 
+    if sharded:
+        if global_dst_rank is not None:
+            raise ValueError(
+                "global_dst_rank can not be specified when sharded=True."
+            )
+        if async_save:
+            raise ValueError("async_save can not be True when sharded=True.")
+        if isinstance(obj, graph_util.Graph):
+            raise ValueError(
+                "sharded save does not support nn.Graph, save graph.state_dict() instead."
+            )
+        return _sharded_save(obj, path)
+
+    if async_save:
+        if isinstance(obj, graph_util.Graph):
+            raise ValueError(
+                "async_save does not support nn.Graph, save graph.state_dict() instead."
+            )
+        return _async_save(obj, path, global_dst_rank)
+
     if isinstance(obj, graph_util.Graph):
         graph: graph_util.Graph = obj
         if not graph._is_compiled:
@@ -430,12 +760,7 @@ def save(
         pickle_path.write_bytes(pickled_bytes)
 
     if global_dst_rank is not None:
-        assert isinstance(
-            global_dst_rank, int
-        ), f"global_dst_rank expected type int, but got {type(global_dst_rank)}."
-        assert (
-            global_dst_rank >= 0 and global_dst_rank < flow.env.get_world_size()
-        ), f"out of range (expected to be in range of [0, {flow.env.get_world_size()}), but got {global_dst_rank})."
+        _check_global_dst_rank(global_dst_rank)
         if flow.env.get_rank() == global_dst_rank:
             write_to_path(path)
     else:
@@ -443,6 +768,55 @@ def save(
         write_to_path(path)
 
 
+def _sharded_save(obj: Any, path: Path) -> None:
+    obj = {"protocol_version": PROTOCOL_VERSION, "data": obj}
+    index = {}
+    with tensor_pickling_context(path, None, None, index=index):
+        pickled_bytes = pickle.dumps(obj)
+    if flow.env.get_rank() == 0:
+        path.mkdir(exist_ok=True)
+        (path / PICKLE_FILENAME).write_bytes(pickled_bytes)
+        save_index(path, index)
+    # The checkpoint is complete after all ranks have written their shards.
+    flow.comm.barrier()
+
+
+def _check_global_dst_rank(global_dst_rank):
+    assert isinstance(
+        global_dst_rank, int
+    ), f"global_dst_rank expected type int, but got {type(global_dst_rank)}."
+    assert (
+        global_dst_rank >= 0 and global_dst_rank < flow.env.get_world_size()
+    ), f"out of range (expected to be in range of [0, {flow.env.get_world_size()}), but got {global_dst_rank})."
+
+
+def _async_save(obj: Any, path: Path, global_dst_rank: Optional[int]) -> Future:
+    if global_dst_rank is not None:
+        _check_global_dst_rank(global_dst_rank)
+    path = path.absolute()
+    tmp_path = path.with_name(f".{path.name}.tmp-{uuid.uuid4().hex}")
+    writer = _get_async_checkpoint_writer()
+    writer.acquire()
+    snapshots = []
+    try:
+        obj = {"protocol_version": PROTOCOL_VERSION, "data": obj}
+        # Tensors are snapshotted to host memory while pickling, collective
+        # communications of global tensors are done in the calling thread.
+        with tensor_pickling_context(tmp_path, global_dst_rank, None, snapshots):
+            pickled_bytes = pickle.dumps(obj)
+    except:
+        writer.release()
+        raise
+    if global_dst_rank is not None and flow.env.get_rank() != global_dst_rank:
+        pickled_bytes = None
+    return writer.submit(path, tmp_path, pickled_bytes, snapshots)
+
+
 save_load_path = None
 global_src_dsk_rank = None
 map_location = None
+tensor_snapshots = None
+mmap_load = False
+preloaded_arrays = None
+deferred_tensors = None
+sharded_index = None
@@ -0,0 +1,224 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+import oneflow as flow
+import oneflow.framework.dtype as dtype_util
+from oneflow.framework.balanced_splitter import BalancedRanges
+
+SHARDED_INDEX_FILENAME = "sharded_index.json"
+SHARDED_INDEX_VERSION = 1
+
+Slices = List[Tuple[int, int]]
+
+
+def sbp_to_str(sbp: "flow.sbp.sbp", num_axes: int) -> str:
+    if sbp == flow.sbp.broadcast:
+        return "B"
+    if sbp == flow.sbp.partial_sum:
+        return "P"
+    for axis in range(num_axes):
+        if sbp == flow.sbp.split(axis):
+            return f"S({axis})"
+    raise ValueError(f"Unsupported sbp {sbp}.")
+
+
+def sbp_from_str(sbp_str: str) -> "flow.sbp.sbp":
+    if sbp_str == "B":
+        return flow.sbp.broadcast
+    if sbp_str == "P":
+        return flow.sbp.partial_sum
+    if sbp_str.startswith("S(") and sbp_str.endswith(")"):
+        return flow.sbp.split(int(sbp_str[2:-1]))
+    raise ValueError(f"Unsupported sbp {sbp_str}.")
+
+
+def shard_slices(
+    shape: Sequence[int],
+    hierarchy: Sequence[int],
+    nd_sbp: Sequence[str],
+    coord: Sequence[int],
+) -> Slices:
+    r"""Get the [start, end) range on each axis of the shard of a global tensor located
+    at ``coord`` of the placement hierarchy. Splitting is balanced in the same way as
+    eager boxing does."""
+    slices = [(0, dim) for dim in shape]
+    for parallel_num, sbp_str, idx in zip(hierarchy, nd_sbp, coord):
+        if sbp_str.startswith("S("):
+            axis = int(sbp_str[2:-1])
+            start, end = slices[axis]
+            sub_start, sub_end = BalancedRanges(end - start, parallel_num)[idx]
+            slices[axis] = (start + sub_start, start + sub_end)
+    return slices
+
+
+def placement_shards(
+    shape: Sequence[int], ranks: np.ndarray, nd_sbp: Sequence[str]
+) -> List[Tuple[int, Slices]]:
+    r"""Get the (rank, slices) of all distinct shards of a global tensor, a shard which is
+    duplicated by broadcast is owned by the first rank holding it."""
+    shards = []
+    seen = set()
+    for coord in np.ndindex(*ranks.shape):
+        slices = shard_slices(shape, ranks.shape, nd_sbp, coord)
+        if tuple(slices) in seen:
+            continue
+        seen.add(tuple(slices))
+        shards.append((int(ranks[coord]), slices))
+    return shards
+
+
+def make_index_entry(
+    tensor: "flow.Tensor", shard_file_format: str
+) -> Tuple[Dict[str, Any], Optional[Slices]]:
+    r"""Make the index entry of a global tensor without partial sbp, and return it with the
+    slices of the shard this rank should write, which is None if this rank writes nothing."""
+    shape = tuple(tensor.shape)
+    ranks = np.array(tensor.placement.ranks)
+    nd_sbp = [sbp_to_str(sbp, len(shape)) for sbp in tensor.sbp]
+    assert "P" not in nd_sbp, "partial sbp should be converted to broadcast first"
+    rank = flow.env.get_rank()
+    local_slices = None
+    shards = []
+    for shard_rank, slices in placement_shards(shape, ranks, nd_sbp):
+        if shard_rank == rank:
+            local_slices = slices
+        shards.append(
+            {
+                "file": shard_file_format.format(rank=shard_rank),
+                "offsets": [start for start, _ in slices],
+                "shape": [end - start for start, end in slices],
+            }
+        )
+    entry = {
+        "shape": list(shape),
+        "dtype": str(tensor.dtype),
+        "placement": {"type": tensor.placement.type, "ranks": ranks.tolist()},
+        "sbp": nd_sbp,
+        "shards": shards,
+    }
+    return entry, local_slices
+
+
+def save_index(path: Union[str, Path], entries: Dict[str, Dict[str, Any]]) -> None:
+    with open(os.path.join(path, SHARDED_INDEX_FILENAME), "w") as f:
+        json.dump({"version": SHARDED_INDEX_VERSION, "tensors": entries}, f)
+
+
+def load_index(path: Union[str, Path]) -> Optional[Dict[str, Dict[str, Any]]]:
+    index_path = os.path.join(path, SHARDED_INDEX_FILENAME)
+    if not os.path.exists(index_path):
+        return None
+    with open(index_path) as f:
+        index = json.load(f)
+    assert (
+        index["version"] == SHARDED_INDEX_VERSION
+    ), f"Unsupported sharded checkpoint version {index['version']}."
+    return index["tensors"]
+
+
+def _entry_dtype(entry: Dict[str, Any]) -> "flow.dtype":
+    return getattr(flow, entry["dtype"].split(".")[-1])
+
+
+def _target_layout(
+    entry: Dict[str, Any], placement: Optional["flow.placement"]
+) -> Tuple["flow.placement", List["flow.sbp.sbp"]]:
+    saved_ranks = np.array(entry["placement"]["ranks"])
+    saved_nd_sbp = entry["sbp"]
+    if placement is None:
+        if saved_ranks.max() < flow.env.get_world_size():
+            placement = flow.placement(entry["placement"]["type"], saved_ranks.tolist())
+        else:
+            placement = flow.placement(
+                entry["placement"]["type"], list(range(flow.env.get_world_size()))
+            )
+    num_hierarchy_axes = np.array(placement.ranks).ndim
+    if num_hierarchy_axes == len(saved_nd_sbp):
+        nd_sbp = saved_nd_sbp
+    elif num_hierarchy_axes == 1:
+        # Keep the first split axis when resharding to a 1D placement.
+        splits = [sbp_str for sbp_str in saved_nd_sbp if sbp_str.startswith("S(")]
+        nd_sbp = splits[:1] or ["B"]
+    else:
+        nd_sbp = ["B"] * num_hierarchy_axes
+    return placement, [sbp_from_str(sbp_str) for sbp_str in nd_sbp]
+
+
+def read_slices(
+    tensor_dir: Union[str, Path], entry: Dict[str, Any], slices: Slices
+) -> np.ndarray:
+    r"""Read the region ``slices`` of a sharded tensor, only the byte ranges overlapping
+    the region are read from the memory-mapped shard files."""
+    np_dtype = dtype_util.convert_oneflow_dtype_to_numpy_dtype(_entry_dtype(entry))
+    out = np.empty([end - start for start, end in slices], dtype=np_dtype)
+    if out.size == 0:
+        return out
+    for shard in entry["shards"]:
+        if np.prod(shard["shape"]) == 0:
+            continue
+        src_index = []
+        dst_index = []
+        for (start, end), offset, length in zip(
+            slices, shard["offsets"], shard["shape"]
+        ):
+            lo, hi = max(start, offset), min(end, offset + length)
+            if lo >= hi:
+                break
+            src_index.append(slice(lo - offset, hi - offset))
+            dst_index.append(slice(lo - start, hi - start))
+        else:
+            shard_array = np.memmap(
+                os.path.join(tensor_dir, shard["file"]),
+                dtype=np_dtype,
+                mode="r",
+                shape=tuple(shard["shape"]),
+            )
+            out[tuple(dst_index)] = shard_array[tuple(src_index)]
+            del shard_array
+    return out
+
+
+def load_sharded_tensor(
+    tensor_dir: Union[str, Path],
+    entry: Dict[str, Any],
+    map_location: Optional[Union["flow.device", "flow.placement"]] = None,
+) -> "flow.Tensor":
+    r"""Load a sharded tensor as a local tensor on ``map_location`` if it is a device, or as a
+    global tensor on ``map_location`` (default: the saved placement, or all ranks if the saved
+    placement does not fit the current world size) otherwise. The saved sbp is kept if
+    possible, every rank only reads the region of its own shard."""
+    shape = entry["shape"]
+    full_slices = [(0, dim) for dim in shape]
+    if isinstance(map_location, flow.device):
+        return flow.from_numpy(read_slices(tensor_dir, entry, full_slices)).to(
+            map_location
+        )
+    placement, sbp = _target_layout(entry, map_location)
+    ranks = np.array(placement.ranks)
+    coords = np.argwhere(ranks == flow.env.get_rank())
+    if len(coords) == 0:
+        local = flow.tensor([], dtype=_entry_dtype(entry))
+    else:
+        nd_sbp = [sbp_to_str(s, len(shape)) for s in sbp]
+        slices = shard_slices(shape, ranks.shape, nd_sbp, coords[0])
+        local = flow.from_numpy(read_slices(tensor_dir, entry, slices))
+    return local.to_global(placement=placement, sbp=sbp, check_meta=True)
@@ -454,6 +454,32 @@ def zero_(self):
     return self
 
 
+def _share_memory_(self):
+    r"""Moves the storage to shared memory. This is a no-op if the storage is already
+    in shared memory or the tensor is not on CPU. Sending a tensor in shared memory
+    to another process through :mod:`oneflow.multiprocessing` only sends a handle.
+    """
+    from oneflow.multiprocessing import shared_memory_pool
+
+    assert self.is_local, "share_memory_() only supports local tensors"
+    # CUDA tensors are not moved, the same as pytorch.
+    if self.device.type != "cpu" or self.numel() == 0 or self.is_shared():
+        return self
+
+    def fill(array):
+        array[...] = self.numpy()
+
+    self.data = shared_memory_pool.new_shared_tensor(self.shape, self.dtype, fill)
+    return self
+
+
+def _is_shared(self):
+    r"""Returns true if the storage of this tensor is in shared memory."""
+    from oneflow.multiprocessing import shared_memory_pool
+
+    return shared_memory_pool.is_shared(self)
+
+
 def _is_consistent(self):
     raise RuntimeError(".is_consistent has been removed, please use .is_global instead")
 
@@ -560,6 +586,8 @@ def RegisterMethods():
     Tensor.is_consistent = _is_consistent
     Tensor.to_consistent = _to_consistent
     Tensor.new_tensor = _new_tensor
+    Tensor.share_memory_ = _share_memory_
+    Tensor.is_shared = _is_shared
     Tensor.cumsum = _cumsum
     Tensor.cumprod = _cumprod
     Tensor.mv = _mv
@@ -15,12 +15,10 @@ limitations under the License.
 """
 from multiprocessing.reduction import ForkingPickler
 
-import numpy as np
-
 import oneflow as flow
 from oneflow.nn.parameter import Parameter
 from oneflow.framework.tensor import Tensor
-from oneflow.multiprocessing import shared_memory
+from oneflow.multiprocessing import shared_memory_pool
 
 
 try:
@@ -40,19 +38,9 @@ def rebuild_empty_tensor(shape, dtype, requires_grad):
     return t.reshape(*shape)
 
 
-def rebuild_shm_tensor(shm, shape, dtype, requires_grad):
-    def delete_shm():
-        shm.close()
-        try:
-            shm.unlink()
-        except:
-            pass
-
-    arr = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
-    t = flow.from_numpy(arr)
-    t._register_storage_delete_hook(delete_shm)
+def rebuild_shm_tensor(handle, requires_grad):
+    t = shared_memory_pool.rebuild_shared_tensor(*handle)
     t.requires_grad = requires_grad
-
     return t
 
 
@@ -62,51 +50,30 @@ def rebuild_empty_parameter(shape, dtype, requires_grad):
     return Parameter(t, requires_grad=requires_grad)
 
 
-def rebuild_shm_parameter(shm, shape, dtype, requires_grad):
-    def delete_shm():
-        shm.close()
-        shm.unlink()
-
-    arr = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
-    t = flow.from_numpy(arr)
-    t._register_storage_delete_hook(delete_shm)
+def rebuild_shm_parameter(handle, requires_grad):
+    t = shared_memory_pool.rebuild_shared_tensor(*handle)
     return Parameter(t, requires_grad=requires_grad)
 
 
 def reduce_tensor(tensor):
-    tensor_data = tensor.numpy()
     requires_grad = tensor.requires_grad
 
-    if tensor_data.nbytes == 0:
+    if tensor.numel() == 0:
         return (rebuild_empty_tensor, (tensor.shape, tensor.dtype, requires_grad))
     else:
-        shm = shared_memory.SharedMemory(create=True, size=tensor_data.nbytes)
-        shm_numpy = np.ndarray(
-            tensor_data.shape, dtype=tensor_data.dtype, buffer=shm.buf
-        )
-        shm_numpy[:] = tensor_data[:]
-        return (
-            rebuild_shm_tensor,
-            (shm, tensor_data.shape, tensor_data.dtype, requires_grad),
-        )
+        # Only a handle is sent if the tensor is already in shared memory.
+        handle = shared_memory_pool.share_tensor(tensor)
+        return (rebuild_shm_tensor, (handle, requires_grad))
 
 
 def reduce_parameter(tensor):
-    tensor_data = tensor.numpy()
     requires_grad = tensor.requires_grad
 
-    if tensor_data.nbytes == 0:
-        return (rebuild_empty_parameter, (tensor, shape, tensor.dtype, requires_grad))
+    if tensor.numel() == 0:
+        return (rebuild_empty_parameter, (tensor.shape, tensor.dtype, requires_grad))
     else:
-        shm = shared_memory.SharedMemory(create=True, size=tensor_data.nbytes)
-        shm_numpy = np.ndarray(
-            tensor_data.shape, dtype=tensor_data.dtype, buffer=shm.buf
-        )
-        shm_numpy[:] = tensor_data[:]
-        return (
-            rebuild_shm_parameter,
-            (shm, tensor_data.shape, tensor_data.dtype, requires_grad),
-        )
+        handle = shared_memory_pool.share_tensor(tensor)
+        return (rebuild_shm_parameter, (handle, requires_grad))
 
 
 def init_reductions():
@@ -71,3 +71,8 @@ class SharedMemory:
         called once (and only once) across all processes which have access
         to the shared memory block."""
         return self.shm_.unlink()
+
+    def _add_refcnt(self, delta):
+        """Adds ``delta`` to the reference count stored at the head of the block
+        and returns the new value."""
+        return self.shm_._add_refcnt(delta)
@@ -0,0 +1,224 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import bisect
+import os
+import threading
+from collections import defaultdict
+
+import numpy as np
+
+import oneflow as flow
+from oneflow.multiprocessing import shared_memory
+
+# The head of a segment holds the reference count shared by all processes mapping
+# it, tensor data starts after it.
+HEADER_SIZE = 64
+_MIN_SEGMENT_SIZE = 4096
+
+
+def _size_class(nbytes):
+    # 4 size classes per power of two, so at most 25% of a segment is wasted
+    if nbytes <= _MIN_SEGMENT_SIZE:
+        return _MIN_SEGMENT_SIZE
+    step = 1 << ((nbytes - 1).bit_length() - 3)
+    return (nbytes + step - 1) // step * step
+
+
+class SharedMemoryPool(object):
+    r"""Per-process pool of reusable shared memory segments.
+
+    A segment is reused or unlinked only by the pool of the process which created
+    it, and only after its reference count dropped to zero, i.e. no tensor in any
+    process maps it any more. At most ``max_cached_bytes`` of idle segments are
+    kept.
+    """
+
+    def __init__(self, max_cached_bytes):
+        self._max_cached_bytes = max_cached_bytes
+        self._cached_bytes = 0
+        self._size2segments = defaultdict(list)
+        self._lock = threading.Lock()
+
+    def acquire(self, nbytes):
+        size = _size_class(nbytes + HEADER_SIZE)
+        with self._lock:
+            segments = self._size2segments[size]
+            for i, shm in enumerate(segments):
+                if shm._add_refcnt(0) == 0:
+                    del segments[i]
+                    self._cached_bytes -= size
+                    shm._add_refcnt(1)
+                    return shm
+        shm = shared_memory.SharedMemory(create=True, size=size)
+        shm._add_refcnt(1)
+        return shm
+
+    def release(self, shm, decref=True):
+        if decref:
+            shm._add_refcnt(-1)
+        with self._lock:
+            self._size2segments[shm.size].append(shm)
+            self._cached_bytes += shm.size
+            if self._cached_bytes > self._max_cached_bytes:
+                self._trim()
+
+    def _trim(self):
+        for size, segments in self._size2segments.items():
+            for shm in list(segments):
+                if self._cached_bytes <= self._max_cached_bytes:
+                    return
+                if shm._add_refcnt(0) == 0:
+                    segments.remove(shm)
+                    self._cached_bytes -= size
+                    shm.close()
+                    shm.unlink()
+
+    def cached_bytes(self):
+        with self._lock:
+            return self._cached_bytes
+
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    global _pool, _pool_pid
+    with _pool_lock:
+        # a forked child must not reuse the segments of its parent
+        if _pool is None or _pool_pid != os.getpid():
+            max_cached_mb = int(
+                os.getenv("ONEFLOW_SHARED_MEMORY_POOL_MAX_CACHED_MB", 1024)
+            )
+            _pool = SharedMemoryPool(max_cached_mb * 1024 * 1024)
+            _pool_pid = os.getpid()
+        return _pool
+
+
+# Base addresses of the segments mapped by tensors in this process, sorted, and
+# the segment of each base address.
+_bases = []
+_base2shm = {}
+_registry_lock = threading.Lock()
+
+
+def _data_ptr(array):
+    return array.__array_interface__["data"][0]
+
+
+def _register(shm):
+    base = _data_ptr(np.frombuffer(shm.buf, dtype=np.uint8))
+    with _registry_lock:
+        bisect.insort(_bases, base)
+        _base2shm[base] = shm
+    return base
+
+
+def _unregister(base):
+    with _registry_lock:
+        del _bases[bisect.bisect_left(_bases, base)]
+        del _base2shm[base]
+
+
+def _find_segment(array):
+    ptr = _data_ptr(array)
+    with _registry_lock:
+        i = bisect.bisect_right(_bases, ptr) - 1
+        if i < 0:
+            return None
+        shm = _base2shm[_bases[i]]
+        if ptr - _bases[i] + array.nbytes > shm.size:
+            return None
+        return shm, _bases[i]
+
+
+def _tensor_on_segment(shm, offset, shape, strides, dtype, release):
+    array = np.ndarray(
+        shape, dtype=dtype, buffer=shm.buf, offset=offset, strides=strides
+    )
+    tensor = flow.from_numpy(array)
+    base = _register(shm)
+
+    def delete_shm():
+        _unregister(base)
+        release()
+
+    tensor._register_storage_delete_hook(delete_shm)
+    return tensor
+
+
+def new_shared_tensor(shape, dtype, fill=None):
+    r"""Returns a CPU tensor whose storage is a segment of the shared memory pool.
+
+    Args:
+        shape (tuple): shape of the tensor.
+        dtype (oneflow.dtype): data type of the tensor.
+        fill (callable, optional): called with a numpy view of the storage to
+            initialize it before the tensor is created.
+    """
+    np_dtype = np.dtype(flow.convert_oneflow_dtype_to_numpy_dtype(dtype))
+    shape = tuple(shape)
+    pool = get_pool()
+    shm = pool.acquire(int(np.prod(shape)) * np_dtype.itemsize)
+    if fill is not None:
+        fill(np.ndarray(shape, dtype=np_dtype, buffer=shm.buf, offset=HEADER_SIZE))
+    return _tensor_on_segment(
+        shm, HEADER_SIZE, shape, None, np_dtype, lambda: pool.release(shm)
+    )
+
+
+def is_shared(tensor):
+    if not tensor.is_local or tensor.device.type != "cpu" or tensor.numel() == 0:
+        return False
+    return _find_segment(tensor.numpy()) is not None
+
+
+def share_tensor(tensor):
+    r"""Returns a handle to the data of ``tensor`` in shared memory, which can be
+    passed to :func:`rebuild_shared_tensor` in another process.
+
+    A tensor not in shared memory is copied to a pooled segment first. The handle
+    owns a reference to the segment, which is released by the tensor rebuilt from
+    it.
+    """
+    array = tensor.numpy()
+    segment = None
+    if tensor.is_local and tensor.device.type == "cpu":
+        segment = _find_segment(array)
+    if segment is not None:
+        shm, base = segment
+        shm._add_refcnt(1)
+        offset = _data_ptr(array) - base
+        return (shm.name, offset, array.shape, array.strides, array.dtype)
+    pool = get_pool()
+    shm = pool.acquire(array.nbytes)
+    np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf, offset=HEADER_SIZE)[
+        ...
+    ] = array
+    # the reference of the pool is handed to the receiver
+    pool.release(shm, decref=False)
+    return (shm.name, HEADER_SIZE, array.shape, None, array.dtype)
+
+
+def rebuild_shared_tensor(name, offset, shape, strides, dtype):
+    shm = shared_memory.SharedMemory(name=name)
+
+    def release():
+        shm._add_refcnt(-1)
+        shm.close()
+
+    return _tensor_on_segment(shm, offset, shape, strides, dtype, release)
@@ -0,0 +1,167 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import hashlib
+import os
+import shutil
+import threading
+from collections import namedtuple
+from typing import Dict, Optional
+
+import oneflow
+import oneflow.core.job.job_pb2 as job_pb
+from oneflow.env import get_rank, get_world_size
+
+_FULL_JOB_FILE = "full_job.pb"
+_COMPILED_JOB_FILE = "compiled_job.pb"
+_PLAN_FILE = "plan.pb"
+
+# Environment variables that never change the compiled job or plan.
+_NON_COMPILE_ENV_FLAGS = ("ONEFLOW_GRAPH_COMPILE_CACHE_DIR",)
+_NON_COMPILE_ENV_PREFIXES = ("ONEFLOW_TEST_",)
+
+
+def _compile_env_flags():
+    # Job passes and kernels read their switches from ONEFLOW_* environment variables,
+    # so all of them take part in the key except the ones known to be irrelevant.
+    return [
+        (name, os.environ[name])
+        for name in sorted(os.environ)
+        if name.startswith("ONEFLOW_")
+        and name not in _NON_COMPILE_ENV_FLAGS
+        and not name.startswith(_NON_COMPILE_ENV_PREFIXES)
+    ]
+
+
+CompileCacheEntry = namedtuple(
+    "CompileCacheEntry", ["full_job_proto", "compiled_job_str", "plan_str"]
+)
+
+
+class GraphCompileCache(object):
+    r"""Content-addressed on-disk cache of the completed job and compiled plan of nn.Graph.
+
+    Every rank keeps its own copy of an entry in ``<cache_dir>/<key>/rank_<rank>``, the entry is
+    written to a temporary directory first and renamed at last, so a partially written entry is
+    never visible to readers.
+    """
+
+    def __init__(self, cache_dir: str):
+        self._cache_dir = cache_dir
+        self._hits = 0
+        self._misses = 0
+        self._saves = 0
+        self._lock = threading.Lock()
+
+    @property
+    def cache_dir(self):
+        return self._cache_dir
+
+    def key(self, forward_job_proto, config_proto, resource_proto) -> str:
+        # NOTE: job id is not a part of the key, the restored plan is moved to the job
+        # id of the graph being compiled. The other ids in the plan are kept, so the id
+        # counters are a part of the key: a plan is only restored when it was compiled
+        # after the same ids had been generated, e.g. by the same graphs in a prior run.
+        sha = hashlib.sha256()
+        sha.update(oneflow.__version__.encode())
+        sha.update(oneflow._oneflow_internal.nn.graph.GetIdMgrState().encode())
+        sha.update(b"world_size:%d" % get_world_size())
+        for name, value in _compile_env_flags():
+            sha.update(("%s=%s;" % (name, value)).encode())
+        for proto in (forward_job_proto, config_proto, resource_proto):
+            data = proto.SerializeToString(deterministic=True)
+            sha.update(b"%d:" % len(data))
+            sha.update(data)
+        return sha.hexdigest()
+
+    def _entry_dir(self, key: str) -> str:
+        return os.path.join(self._cache_dir, key, "rank_" + str(get_rank()))
+
+    def load(self, key: str) -> Optional[CompileCacheEntry]:
+        entry_dir = self._entry_dir(key)
+        if not os.path.isdir(entry_dir):
+            return None
+        try:
+            with open(os.path.join(entry_dir, _FULL_JOB_FILE), "rb") as f:
+                full_job_proto = job_pb.Job()
+                full_job_proto.ParseFromString(f.read())
+            with open(os.path.join(entry_dir, _COMPILED_JOB_FILE), "rb") as f:
+                compiled_job_str = f.read()
+            with open(os.path.join(entry_dir, _PLAN_FILE), "rb") as f:
+                plan_str = f.read()
+        except Exception:
+            # A broken entry is treated as a miss and will be overwritten.
+            return None
+        return CompileCacheEntry(full_job_proto, compiled_job_str, plan_str)
+
+    def save(self, key: str, full_job_proto, compiled_job_str: bytes, plan_str: bytes):
+        entry_dir = self._entry_dir(key)
+        tmp_dir = entry_dir + ".tmp." + str(os.getpid())
+        os.makedirs(tmp_dir, exist_ok=True)
+        for file_name, data in (
+            (_FULL_JOB_FILE, full_job_proto.SerializeToString()),
+            (_COMPILED_JOB_FILE, compiled_job_str),
+            (_PLAN_FILE, plan_str),
+        ):
+            with open(os.path.join(tmp_dir, file_name), "wb") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+        if os.path.isdir(entry_dir):
+            shutil.rmtree(entry_dir, ignore_errors=True)
+        try:
+            os.rename(tmp_dir, entry_dir)
+        except OSError:
+            # Another process has saved the same entry concurrently.
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            return
+        with self._lock:
+            self._saves += 1
+
+    def record(self, is_hit: bool):
+        with self._lock:
+            if is_hit:
+                self._hits += 1
+            else:
+                self._misses += 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self._hits, "misses": self._misses, "saves": self._saves}
+
+
+_cache_dir2cache = dict()
+
+
+def get_compile_cache(cache_dir: str) -> GraphCompileCache:
+    cache_dir = os.path.abspath(os.path.expanduser(cache_dir))
+    if cache_dir not in _cache_dir2cache:
+        _cache_dir2cache[cache_dir] = GraphCompileCache(cache_dir)
+    return _cache_dir2cache[cache_dir]
+
+
+def compile_cache_stats(cache_dir: str = None) -> Dict[str, int]:
+    r"""Get the hit/miss/save counters of the nn.Graph compile cache in this process.
+
+    Args:
+        cache_dir (str, optional): only count the cache in this directory. The default value is None, which sums up all caches.
+    """
+    if cache_dir is not None:
+        return get_compile_cache(cache_dir).stats()
+    total = {"hits": 0, "misses": 0, "saves": 0}
+    for cache in _cache_dir2cache.values():
+        for k, v in cache.stats().items():
+            total[k] += v
+    return total
@@ -31,13 +31,15 @@ import oneflow.framework.c_api_util as c_api_util
 import oneflow.framework.graph_build_util as graph_build_util
 import oneflow.framework.session_context as session_ctx
 from oneflow.amp import GradScaler, StaticGradScaler
-from oneflow.env import get_rank
+from oneflow.env import get_rank, get_world_size
 from oneflow.framework.multi_client_session import MultiClientSession
 from oneflow.framework.tensor import Tensor, TensorTuple
 from oneflow.framework.tensor_tuple_util import convert_to_tensor_tuple
-from oneflow.nn.graph.block import Block, BlockType, get_block_cls
+from oneflow.nn.graph.block import Block, BlockType, LazyBuilder, get_block_cls
+from oneflow.nn.graph.compile_cache import get_compile_cache
 from oneflow.nn.graph.graph_config import GraphConfig
 from oneflow.nn.graph.optimizer import OptDict, VariableConfig
+from oneflow.nn.graph.shape_bucket import ShapePlanCache, input_shape_signature
 from oneflow.nn.graph.util import (
     add_indent,
     ArgsTree,
@@ -130,6 +132,12 @@ class Graph(object):
         # completed graph job proto
         self._compiled_job_proto = None
         self._job_id = None
+        # compile cache entry to restore the completed job and compiled plan
+        self._compile_cache = None
+        self._compile_cache_key = None
+        self._compile_cache_entry = None
+        # compiled plans of other input shapes in shape bucket mode
+        self._shape_plan_cache = None
         self._args_repr = []
         self._outs_repr = []
         self._debug = False
@@ -220,14 +228,35 @@ class Graph(object):
             Donot override this function.
         """
 
+        if self.config._shape_bucket_conf is not None:
+            args, kwargs = self.__select_shape_plan(*args, **kwargs)
+
         if not self._is_compiled:
+            compile_start = time.perf_counter()
             self._compile(*args, **kwargs)
+            if self._shape_plan_cache is not None:
+                self._shape_plan_cache.record_compile_time(
+                    self._shape_plan_cache.current_signature,
+                    time.perf_counter() - compile_start,
+                )
             self.__print(
                 0, 2, lambda: f"{self.name} with operators:\n" + self.__repr__()
             )
 
         return self.__run(*args, **kwargs)
 
+    def shape_plan_stats(self):
+        r"""Statistics of the compiled plans in shape bucket mode, which is enabled by
+        ``self.config.enable_shape_buckets()``.
+
+        Returns:
+            dict: map from input shape signature to its hits, misses, compile time in seconds,
+            evictions, hit rate and whether its plan is cached now.
+        """
+        if self._shape_plan_cache is None:
+            return OrderedDict()
+        return self._shape_plan_cache.stats()
+
     def add_optimizer(
         self, optim: Optimizer, *, lr_sch: LRScheduler = None, is_sparse: bool = False,
     ):
@@ -585,9 +614,14 @@ class Graph(object):
         return self.config.proto
 
     @property
-    def _optimization_conf_proto(self):
+    def _session_resource_proto(self):
         return self._session.resource
 
+    @property
+    def _optimization_conf_proto(self):
+        # NOTE: kept for compatibility, this is the resource proto of the session.
+        return self._session_resource_proto
+
     @property
     def _graph_proto(self):
         if not self._is_compiled:
@@ -690,6 +724,8 @@ class Graph(object):
     def _create_states_builder(self):
         state2lazy_builder = dict()
         for state_block in self._state():
+            # State blocks are built again when the graph builds a new plan in shape bucket mode.
+            state_block.build_finished = False
             state_tensor = state_block.origin
             op_name = state_block.name_prefix + state_block.name
             if state_tensor in state2lazy_builder:
@@ -704,6 +740,7 @@ class Graph(object):
                 else:
                     state_config = None
                 # Init a new lazy tensor builder
+                state_block.set_lazy_origin_builder(LazyBuilder())
                 state_block.lazy_origin_builder().name = op_name
                 state_block.lazy_origin_builder().method = partial(
                     graph_build_util.build_graph_state,
@@ -839,11 +876,22 @@ class Graph(object):
                 self._debug_max_py_stack_depth,
                 self._debug_only_user_py_stack,
             ):
+                if self._compile_cache_entry is not None:
+                    self._c_nn_graph.job = self._compile_cache_entry.compiled_job_str
+                    self._c_nn_graph.plan = self._compile_cache_entry.plan_str
                 self._c_nn_graph.complie_and_init_runtime()
             # Get compiled job
             compiled_job_str = self._c_nn_graph.get_current_job_str()
             self._compiled_job_proto = job_pb.Job()
             self._compiled_job_proto.ParseFromString(compiled_job_str)
+            if self._compile_cache_key is not None and self._compile_cache_entry is None:
+                self._compile_cache.save(
+                    self._compile_cache_key,
+                    self._full_job_proto,
+                    compiled_job_str,
+                    self._c_nn_graph.plan,
+                )
+            self._compile_cache_entry = None
 
             compile_and_init_end = time.perf_counter()
             self.__print(
@@ -963,13 +1011,18 @@ class Graph(object):
             oneflow._oneflow_internal.FillVariableTensorMgr(
                 state_op_names, self._state_tensor_tuple
             )
-            # Complete the graph job proto
-            oneflow._oneflow_internal.CurJobBuildAndInferCtx_Complete()
-            # Save full graph job proto after job Complete for find real output blob shape and build it.
-            self._full_job_proto = c_api_util.GetCurrentJob()
             self._job_id = (
                 oneflow._oneflow_internal.JobBuildAndInferCtx_GetCurrentJobId()
             )
+            self.__lookup_compile_cache(enable_mlir_inference_opt)
+            if self._compile_cache_entry is not None:
+                # Job passes are skipped by restoring the completed job from compile cache.
+                self._full_job_proto = self._compile_cache_entry.full_job_proto
+            else:
+                # Complete the graph job proto
+                oneflow._oneflow_internal.CurJobBuildAndInferCtx_Complete()
+                # Save full graph job proto after job Complete for find real output blob shape and build it.
+                self._full_job_proto = c_api_util.GetCurrentJob()
             self.__print(
                 0, 1, self._shallow_repr() + " end building graph with compile passes."
             )
@@ -1022,6 +1075,126 @@ class Graph(object):
             seq_to_func_return(self._eager_outputs_buffer[0], True),
         )
 
+    def __lookup_compile_cache(self, enable_mlir_inference_opt):
+        if self.config._compile_cache_dir is None:
+            return
+        if enable_mlir_inference_opt:
+            # MLIR inference optimization creates new variables during job completion,
+            # which cannot be restored from compile cache.
+            self.__print(
+                1,
+                0,
+                self._shallow_repr()
+                + " compile cache is ignored with ONEFLOW_MLIR_ENABLE_INFERENCE_OPTIMIZATION.",
+            )
+            return
+        self._compile_cache = get_compile_cache(self.config._compile_cache_dir)
+        self._compile_cache_key = self._compile_cache.key(
+            c_api_util.GetCurrentJob(),
+            self._config_proto,
+            self._session_resource_proto,
+        )
+        entry = self._compile_cache.load(self._compile_cache_key)
+        is_hit = entry is not None
+        if get_world_size() > 1:
+            # All ranks must agree on hit, because plan compilation needs all ranks to join.
+            with oneflow._oneflow_internal.lazy_mode.guard(False):
+                hit_cnt = oneflow.tensor([int(is_hit)], dtype=oneflow.int64)
+                oneflow.comm.all_reduce(hit_cnt)
+                is_hit = hit_cnt.item() == get_world_size()
+        self._compile_cache.record(is_hit)
+        self._compile_cache_entry = entry if is_hit else None
+        self.__print(
+            0,
+            0,
+            self._shallow_repr()
+            + " compile cache "
+            + ("hit" if is_hit else "miss")
+            + " with key "
+            + self._compile_cache_key
+            + ".",
+        )
+
+    _plan_state_attrs = (
+        "_name",
+        "_is_compiled",
+        "_forward_job_proto",
+        "_full_job_proto",
+        "_compiled_job_proto",
+        "_job_id",
+        "_compile_cache_key",
+        "_compile_cache_entry",
+        "_args_repr",
+        "_outs_repr",
+        "_eager_outputs",
+        "_outputs_tensor_tuple",
+        "_eager_outputs_buffer",
+        "_outputs_tensor_tuple_buffer",
+        "_cur_index_of_ouputs_buffer",
+        "_state_tensor_tuple",
+        "_c_nn_graph",
+    )
+
+    def __dump_plan_state(self):
+        return {k: self.__dict__.get(k, None) for k in self._plan_state_attrs}
+
+    def __load_plan_state(self, plan_state):
+        for k, v in plan_state.items():
+            object.__setattr__(self, k, v)
+
+    def __new_plan_state(self, plan_index):
+        plan_state = {k: None for k in self._plan_state_attrs}
+        base_name = self._shape_plan_cache.base_name
+        # Every plan is a job with unique name.
+        plan_state["_name"] = (
+            base_name if plan_index == 0 else base_name + "_plan_" + str(plan_index)
+        )
+        plan_state["_is_compiled"] = False
+        plan_state["_args_repr"] = []
+        plan_state["_outs_repr"] = []
+        plan_state["_cur_index_of_ouputs_buffer"] = 0
+        return plan_state
+
+    def __select_shape_plan(self, *args, **kwargs):
+        if self._shape_plan_cache is None:
+            if self.training:
+                raise RuntimeError(
+                    f"{self._shallow_repr()} shape bucket mode only supports graph without optimizer."
+                )
+            self._shape_plan_cache = ShapePlanCache(**self.config._shape_bucket_conf)
+            self._shape_plan_cache.base_name = self._name
+        cache = self._shape_plan_cache
+        args, kwargs = cache.pad_to_bucket(*args, **kwargs)
+        signature = input_shape_signature(*args, **kwargs)
+        if signature == cache.current_signature:
+            cache.record_hit(signature)
+            return args, kwargs
+
+        if cache.current_signature is not None:
+            cache.put(cache.current_signature, self.__dump_plan_state())
+        if signature in cache:
+            cache.record_hit(signature)
+            self.__load_plan_state(cache.pop(signature))
+        else:
+            cache.record_miss(signature)
+            self.__load_plan_state(self.__new_plan_state(cache.new_plan_index()))
+            self.__print(
+                0,
+                0,
+                self._shallow_repr() + " new plan for input signature " + str(signature),
+            )
+        cache.current_signature = signature
+        evicted = cache.evict()
+        if len(evicted) > 0:
+            # Ensure vm has finished running the evicted plans before closing them.
+            oneflow._oneflow_internal.eager.Sync()
+            for plan_state in evicted:
+                if plan_state["_c_nn_graph"] is not None:
+                    # Release the runtime and its buffers now instead of waiting for gc.
+                    plan_state["_c_nn_graph"].close()
+            evicted.clear()
+        return args, kwargs
+
     def __rebuild_outputs(self, out2name=None):
         # NOTE(chengcheng):
         #   Lazy build output eager tensors.
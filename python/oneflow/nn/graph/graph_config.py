@@ -30,6 +30,8 @@ class GraphConfig(object):
     def __init__(self):
         super().__init__()
         self._outputs_buffer_size = 2
+        self._compile_cache_dir = os.getenv("ONEFLOW_GRAPH_COMPILE_CACHE_DIR")
+        self._shape_bucket_conf = None
         self.proto = job_conf_pb.JobConfigProto()
         self._train(False)
 
@@ -293,6 +295,97 @@ class GraphConfig(object):
         """
         self.proto.enable_straighten_algorithm_in_task_graph = mode
 
+    def enable_compile_cache(self, mode: bool = True, *, cache_dir: str = None):
+        r"""If set to true, the completed job and the compiled plan of the graph are saved in a
+        persistent on-disk cache, and a later process building the same graph loads them from the
+        cache instead of running job completion and plan compilation again.
+
+        The cache entry is keyed on the forward graph, the graph config, the session resource, the
+        world size and the OneFlow version, so any change of them leads to a new compilation.
+        The cache can also be enabled with the environment variable ``ONEFLOW_GRAPH_COMPILE_CACHE_DIR``.
+
+        For example:
+
+        .. code-block:: python
+
+            import oneflow as flow
+
+            class Graph(flow.nn.Graph):
+                def __init__(self):
+                    super().__init__()
+                    self.linear = flow.nn.Linear(3, 8, False)
+                    self.config.enable_compile_cache(True, cache_dir="./graph_cache")
+                def build(self, x):
+                    return self.linear(x)
+
+            graph = Graph()
+
+        Args:
+            mode (bool, optional): The default vaule is True.
+            cache_dir (str, optional): directory of the cache. The default value is ``~/.cache/oneflow/graph``.
+        """
+        assert type(mode) is bool
+        if not mode:
+            self._compile_cache_dir = None
+            return
+        if cache_dir is None:
+            cache_dir = os.path.join(
+                os.path.expanduser("~"), ".cache", "oneflow", "graph"
+            )
+        self._compile_cache_dir = cache_dir
+
+    def enable_shape_buckets(
+        self,
+        mode: bool = True,
+        *,
+        max_num_plans: int = 8,
+        buckets: dict = None,
+        pad_value: float = 0,
+    ):
+        r"""If set to true, the graph compiles a plan for every new input shape signature instead of
+        requiring the same input shapes in all calls, and keeps at most ``max_num_plans`` compiled
+        plans in a LRU cache. All plans share the same parameter and buffer tensors.
+
+        If ``buckets`` is given, sizes of the declared input dims are rounded up to the nearest bucket
+        size by padding inputs with ``pad_value`` before dispatching to a plan, so outputs are in
+        the padded shape. Sizes larger than the largest bucket are not padded.
+
+        Only inference graphs (graphs without optimizer) support this mode at the moment.
+
+        For example:
+
+        .. code-block:: python
+
+            import oneflow as flow
+
+            class Graph(flow.nn.Graph):
+                def __init__(self):
+                    super().__init__()
+                    self.linear = flow.nn.Linear(8, 8, False)
+                    # Round sequence length (dim 1) up to 32, 64 or 128.
+                    self.config.enable_shape_buckets(True, max_num_plans=3, buckets={1: [32, 64, 128]})
+                def build(self, x):
+                    return self.linear(x)
+
+            graph = Graph()
+
+        Args:
+            mode (bool, optional): The default vaule is True.
+            max_num_plans (int, optional): max number of compiled plans kept. The default vaule is 8.
+            buckets (dict, optional): map from input dim to the sorted bucket sizes of the dim. The default vaule is None.
+            pad_value (float, optional): value to pad inputs to bucket sizes. The default vaule is 0.
+        """
+        assert type(mode) is bool
+        if not mode:
+            self._shape_bucket_conf = None
+            return
+        assert isinstance(max_num_plans, int) and max_num_plans >= 1
+        self._shape_bucket_conf = {
+            "max_num_plans": max_num_plans,
+            "buckets": buckets,
+            "pad_value": pad_value,
+        }
+
     def _generate_optimizer_and_variable_configs(
         self, opt_dict: OptDict = None, variables_conf: OrderedDict = None,
     ):
@@ -0,0 +1,170 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import bisect
+from collections import OrderedDict
+from typing import Dict, Sequence
+
+import oneflow
+from oneflow.framework.tensor import Tensor
+from oneflow.nn.graph.util import ArgsTree
+
+
+def _tensor_signature(t):
+    if not isinstance(t, Tensor):
+        return None
+    if t.is_global:
+        return (
+            tuple(t.shape),
+            t.dtype,
+            str(t.placement),
+            tuple(str(sbp) for sbp in t.sbp),
+        )
+    return (tuple(t.shape), t.dtype, str(t.device))
+
+
+def input_shape_signature(*args, **kwargs):
+    r"""Signature of graph inputs which requires a dedicated plan, it contains the structure
+    of inputs and the shape/dtype/device(placement and sbp) of every input tensor."""
+    leaves = []
+    args_tree = ArgsTree((args, kwargs), False)
+    for node in args_tree.iter_nodes():
+        if isinstance(node, (list, tuple, dict)):
+            leaves.append((type(node).__name__, len(node)))
+        else:
+            leaves.append(_tensor_signature(node))
+    return tuple(leaves)
+
+
+class ShapePlanCache(object):
+    r"""A bounded LRU of compiled plans of one nn.Graph keyed by input shape signature.
+
+    The value of an item is the compiled states of nn.Graph for a shape signature, the states of
+    the current plan live in nn.Graph itself. The least recently used item is evicted when the
+    number of plans exceeds ``max_num_plans``.
+    """
+
+    def __init__(
+        self,
+        max_num_plans: int = 8,
+        buckets: Dict[int, Sequence[int]] = None,
+        pad_value: float = 0,
+    ):
+        assert max_num_plans >= 1, "max_num_plans must be >= 1."
+        self.max_num_plans = max_num_plans
+        self.buckets = OrderedDict()
+        if buckets is not None:
+            for dim, sizes in buckets.items():
+                assert isinstance(dim, int) and dim >= 0
+                assert len(sizes) > 0, f"buckets of dim {dim} cannot be empty."
+                self.buckets[dim] = sorted(int(s) for s in sizes)
+        self.pad_value = pad_value
+        self.base_name = None
+        self.current_signature = None
+        self._signature2plan_state = OrderedDict()
+        self._signature2stats = OrderedDict()
+        self._plan_cnt = 0
+
+    def new_plan_index(self):
+        idx = self._plan_cnt
+        self._plan_cnt += 1
+        return idx
+
+    def __contains__(self, signature):
+        return signature in self._signature2plan_state
+
+    def __len__(self):
+        return len(self._signature2plan_state)
+
+    def _stats(self, signature):
+        if signature not in self._signature2stats:
+            self._signature2stats[signature] = {
+                "hits": 0,
+                "misses": 0,
+                "compile_time": 0.0,
+                "evictions": 0,
+            }
+        return self._signature2stats[signature]
+
+    def record_hit(self, signature):
+        self._stats(signature)["hits"] += 1
+
+    def record_miss(self, signature):
+        self._stats(signature)["misses"] += 1
+
+    def record_compile_time(self, signature, seconds):
+        self._stats(signature)["compile_time"] += seconds
+
+    def put(self, signature, plan_state):
+        self._signature2plan_state[signature] = plan_state
+        self._signature2plan_state.move_to_end(signature)
+
+    def pop(self, signature):
+        return self._signature2plan_state.pop(signature)
+
+    def evict(self):
+        r"""Pop the least recently used plan states out of capacity, the current plan is always kept."""
+        evicted = []
+        num_current = 0 if self.current_signature is None else 1
+        while len(self._signature2plan_state) + num_current > self.max_num_plans:
+            signature, plan_state = self._signature2plan_state.popitem(last=False)
+            self._stats(signature)["evictions"] += 1
+            evicted.append(plan_state)
+        return evicted
+
+    def pad_to_bucket(self, *args, **kwargs):
+        r"""Round the shapes of input tensors up to the declared buckets by padding with ``pad_value``.
+
+        A dim whose size exceeds the largest bucket is kept as it is.
+        """
+        if len(self.buckets) == 0:
+            return args, kwargs
+
+        def pad(t):
+            if not isinstance(t, Tensor):
+                return t
+            pad_list = []
+            need_pad = False
+            for dim in reversed(range(t.ndim)):
+                extra = 0
+                if dim in self.buckets:
+                    sizes = self.buckets[dim]
+                    i = bisect.bisect_left(sizes, t.shape[dim])
+                    if i < len(sizes):
+                        extra = sizes[i] - t.shape[dim]
+                need_pad = need_pad or extra > 0
+                pad_list.extend([0, extra])
+            if not need_pad:
+                return t
+            return oneflow.nn.functional.pad(
+                t, pad_list, mode="constant", value=self.pad_value
+            )
+
+        args_tree = ArgsTree((args, kwargs), False)
+        return args_tree.map_leaf(pad)
+
+    def stats(self):
+        r"""Per shape signature statistics: hits, misses, compile time in seconds, evictions and hit rate."""
+        ret = OrderedDict()
+        for signature, item in self._signature2stats.items():
+            item = dict(item)
+            total = item["hits"] + item["misses"]
+            item["hit_rate"] = item["hits"] / total if total > 0 else 0.0
+            item["cached"] = (
+                signature in self._signature2plan_state
+                or signature == self.current_signature
+            )
+            ret[signature] = item
+        return ret
@@ -1165,6 +1165,22 @@ class Module(object):
         """
         return self._apply(lambda t: t.half() if t.is_floating_point() else t)
 
+    def bfloat16(self: T) -> T:
+        r"""
+        bfloat16()
+
+        Casts all floating point parameters and buffers to ``bfloat16`` datatype.
+
+        .. note::
+            This method modifies the module in-place.
+
+        Returns:
+            Module: self
+        """
+        return self._apply(
+            lambda t: t.to(flow.bfloat16) if t.is_floating_point() else t
+        )
+
     def _get_name(self):
         return self.__class__.__name__
 
@@ -39,7 +39,41 @@ def local_gen_random_seed(seed=None):
     return (seed, has_seed)
 
 
+def _persistent_read_stats(reset: bool = False) -> dict:
+    r"""Return the I/O counters shared by all OFRecord and OneRec readers of this
+    process: ``bytes_read``, and ``stall_count`` and ``stall_seconds`` of the reads
+    which waited for the readahead. The readahead keeps
+    ``ONEFLOW_PERSISTENT_IN_STREAM_READAHEAD_MB`` (default 8) of every part file in
+    flight and starts on the next part file before the current one ends.
+
+    Args:
+        reset (bool): reset the counters after reading them. Default: ``False``
+    """
+    stats = flow._oneflow_internal.GetPersistentReadStats()
+    if reset:
+        flow._oneflow_internal.ResetPersistentReadStats()
+    return stats
+
+
 class OFRecordReader(Module):
+    r"""
+    nn.OFRecordReader reads OFRecord part files into a Tensor carrying OFRecords.
+
+    ``num_loader_threads`` threads read disjoint shards of the local part files
+    concurrently. Batches are taken from the shards in a fixed order, from each in
+    proportion to its size in bytes, so that every shard is read about once while
+    the reader goes through the local part files once. Each shard starts its next
+    epoch on its own, so a batch may mix the end of one epoch of a shard with the
+    start of the next one.
+
+    When ``indexed`` is True, records are read by random access through the sidecar
+    indices built by ``python3 -m oneflow.utils.data.ofrecord_index``. Every epoch
+    reads a global permutation of all records (the identity if not ``random_shuffle``)
+    split evenly across ranks, and ``shuffle_buffer_size`` and ``num_loader_threads``
+    are ignored. ``cursor`` is an ``(epoch, position)`` pair returned by
+    :meth:`current_cursor` to resume reading from.
+    """
+
     def __init__(
         self,
         ofrecord_dir: str,
@@ -55,11 +89,19 @@ class OFRecordReader(Module):
         placement: flow.placement = None,
         sbp: Union[flow.sbp.sbp, List[flow.sbp.sbp]] = None,
         name: Optional[str] = None,
+        num_loader_threads: int = 1,
+        indexed: bool = False,
+        cursor: Optional[Tuple[int, int]] = None,
     ):
         super().__init__()
 
         if name is not None:
             print("WARNING: name has been deprecated and has NO effect.\n")
+        if num_loader_threads < 1:
+            raise ValueError(
+                "num_loader_threads should be a positive integer, but got %d"
+                % num_loader_threads
+            )
         self.ofrecord_dir = ofrecord_dir
         self.batch_size = batch_size
         self.data_part_num = data_part_num
@@ -68,6 +110,13 @@ class OFRecordReader(Module):
         self.random_shuffle = random_shuffle
         self.shuffle_buffer_size = shuffle_buffer_size
         self.shuffle_after_epoch = shuffle_after_epoch
+        self.num_loader_threads = num_loader_threads
+        self.indexed = indexed
+        if cursor is not None and not indexed:
+            raise ValueError("cursor is only supported by the indexed OFRecordReader")
+        (self._start_epoch, self._start_position) = cursor or (0, 0)
+        self._num_read = 0
+        self._num_records_per_epoch = None
 
         self.placement = placement
         if placement is None:
@@ -104,6 +153,10 @@ class OFRecordReader(Module):
                 random_shuffle=self.random_shuffle,
                 shuffle_after_epoch=self.shuffle_after_epoch,
                 seed=self.seed,
+                num_loader_threads=self.num_loader_threads,
+                indexed=self.indexed,
+                start_epoch=self._start_epoch,
+                start_position=self._start_position,
                 sbp=self.sbp,
                 placement=self.placement,
             )
@@ -119,10 +172,50 @@ class OFRecordReader(Module):
                 random_shuffle=self.random_shuffle,
                 shuffle_after_epoch=self.shuffle_after_epoch,
                 seed=self.seed,
+                num_loader_threads=self.num_loader_threads,
+                indexed=self.indexed,
+                start_epoch=self._start_epoch,
+                start_position=self._start_position,
                 device=self.device,
             )
+        if self.indexed:
+            local_res = res.to_local() if self.placement is not None else res
+            if self._num_records_per_epoch is None:
+                self._init_num_records_per_epoch(res.shape[0] // local_res.shape[0])
+            self._num_read += local_res.shape[0]
         return res
 
+    def _init_num_records_per_epoch(self, num_shards):
+        from oneflow.utils.data.ofrecord_index import count_records, part_file_paths
+
+        if self.placement is None:
+            num_shards = flow.env.get_world_size()
+        part_paths = part_file_paths(
+            self.ofrecord_dir,
+            self.data_part_num,
+            self.part_name_prefix,
+            self.part_name_suffix_length,
+        )
+        self._num_records_per_epoch = count_records(part_paths) // num_shards
+
+    def current_cursor(self) -> Tuple[int, int]:
+        r"""Return the ``(epoch, position)`` of the next record read by this rank.
+
+        A new indexed OFRecordReader created with the same arguments and this cursor
+        continues exactly from here.
+        """
+        if not self.indexed:
+            raise RuntimeError("cursor is only supported by the indexed OFRecordReader")
+        position = self._start_position + self._num_read
+        if self._num_records_per_epoch is None:
+            return (self._start_epoch, position)
+        return (
+            self._start_epoch + position // self._num_records_per_epoch,
+            position % self._num_records_per_epoch,
+        )
+
+    read_stats = staticmethod(_persistent_read_stats)
+
 
 class OFRecordRawDecoder(Module):
     def __init__(
@@ -1032,6 +1125,7 @@ class OneRecReader(Module):
         shuffle_buffer_size (int): shuffle buffer size, default to 1024
         shuffle_after_epoch (bool): if shuffle after each epoch
         verify_example (bool): if verify example, defaults to True
+        num_loader_threads (int): number of threads reading disjoint shards of the local files concurrently, clamped to the number of local files, defaults to 1. Batches are taken from the shards in proportion to their sizes in bytes
         placement (Optional[oneflow._oneflow_internal.placement]): The placement attribute allows you to specify which physical device the output tensor is stored on.
         sbp (Optional[Union[oneflow._oneflow_internal.sbp.sbp, List[oneflow._oneflow_internal.sbp.sbp]]]): When creating a global tensor, specify the SBP of the output tensor.
 
@@ -1076,6 +1170,7 @@ class OneRecReader(Module):
         verify_example: bool = True,
         placement: flow.placement = None,
         sbp: Union[flow.sbp.sbp, List[flow.sbp.sbp]] = None,
+        num_loader_threads: int = 1,
     ):
 
         super().__init__()
@@ -1085,6 +1180,11 @@ class OneRecReader(Module):
 
         if shuffle_mode not in ["batch", "instance"]:
             raise ValueError("shuffle_mode should be 'batch' or 'instance'")
+        if num_loader_threads < 1:
+            raise ValueError(
+                "num_loader_threads should be a positive integer, but got %d"
+                % num_loader_threads
+            )
 
         self.files = files
         self.batch_size = batch_size
@@ -1092,6 +1192,7 @@ class OneRecReader(Module):
         self.shuffle_buffer_size = shuffle_buffer_size
         self.shuffle_after_epoch = shuffle_after_epoch
         self.verify_example = verify_example
+        self.num_loader_threads = num_loader_threads
 
         self.op = flow.stateful_op("OneRecReader").Output("out").Build()
 
@@ -1107,6 +1208,7 @@ class OneRecReader(Module):
                 shuffle_after_epoch=self.shuffle_after_epoch,
                 random_seed=self.random_seed,
                 verify_example=self.verify_example,
+                num_loader_threads=self.num_loader_threads,
                 device=self.device,
             )
         else:
@@ -1120,11 +1222,14 @@ class OneRecReader(Module):
                 shuffle_after_epoch=self.shuffle_after_epoch,
                 random_seed=self.random_seed,
                 verify_example=self.verify_example,
+                num_loader_threads=self.num_loader_threads,
                 placement=self.placement,
                 sbp=self.sbp,
             )
         return output
 
+    read_stats = staticmethod(_persistent_read_stats)
+
 
 class GPTIndexedBinDataReader(Module):
     def __init__(
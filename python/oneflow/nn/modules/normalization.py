@@ -149,6 +149,15 @@ def layer_norm(input, normalized_shape, weight=None, bias=None, eps=1e-05):
                 f"Given normalized_shape={normalized_shape}, expected input with shape [*, {str(normalized_shape)[1:-1]}], but got input of size {input.shape}"
             )
 
+    if not input.is_cuda and input.dtype == flow.bfloat16:
+        # normalize bfloat16 in float32, so mean and variance are accumulated in fp32
+        return layer_norm(
+            input.float(),
+            normalized_shape,
+            weight.float() if weight is not None else None,
+            bias.float() if bias is not None else None,
+            eps,
+        ).to(flow.bfloat16)
     if not input.is_cuda:
         reduce_axis = []
         for dim in range(len(input.shape)):
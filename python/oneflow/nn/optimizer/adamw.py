@@ -57,6 +57,8 @@ class AdamW(Optimizer):
         weight_decay (float, optional): weight decay (L2 penalty) (In the equation is λ, default: 0)
         amsgrad (bool, optional): whether to use the AMSGrad variant of this algorithm. (default: False) 
         do_bias_correction (bool, optional): Whether do bias correction (default: True)
+        foreach (bool, optional): whether to update all the local parameters of the same device and dtype with one multi-tensor kernel in eager mode, the state is allocated in flat contiguous buffers. (default: False)
+        fused (bool, optional): the same as ``foreach``. (default: False)
 
     .. _Adam\\: A Method for Stochastic Optimization:
         https://arxiv.org/abs/1412.6980
@@ -119,6 +121,8 @@ class AdamW(Optimizer):
         weight_decay: float = 0,
         amsgrad: bool = False,
         do_bias_correction: bool = True,
+        foreach: bool = False,
+        fused: bool = False,
     ):
         assert lr >= 0.0, f"Invalid learning rate: {lr}"
         assert eps >= 0.0, f"Invalid epsilon value: {eps}"
@@ -138,6 +142,7 @@ class AdamW(Optimizer):
         options["bias_correction2"] = 1.0
         options["do_bias_correction"] = do_bias_correction
         options["amsgrad"] = amsgrad
+        options["foreach"] = foreach or fused
         super().__init__(params, options)
 
         for param_group in self.param_groups:
@@ -195,7 +200,11 @@ class AdamW(Optimizer):
                     "amsgrad": param_group["amsgrad"],
                 }
 
-                for param in param_group.parameters:
+                params = param_group.parameters
+                foreach = param_group.options.get("foreach", False)
+                if foreach:
+                    params = self._foreach_update(param_group)
+                for param in params:
                     if param.grad is None:
                         continue
 
@@ -228,6 +237,50 @@ class AdamW(Optimizer):
             self._state["step"] += 1
             return loss
 
+    def _foreach_update(self, param_group):
+        amsgrad = param_group["amsgrad"]
+        state_names = ("exp_avg", "exp_avg_sq")
+        if amsgrad:
+            state_names += ("max_exp_avg_sq",)
+        buckets, rest = self._foreach_buckets(param_group, state_names=state_names)
+        for (device, _), params in buckets.items():
+            learning_rate = flow.full(
+                (1,), param_group["lr"], dtype=flow.float32, device=device
+            )
+            if amsgrad:
+                flow._C.multi_tensor_amsgrad_update(
+                    model=params,
+                    model_diff=[param.grad for param in params],
+                    m=[self._state[param]["exp_avg"] for param in params],
+                    v=[self._state[param]["exp_avg_sq"] for param in params],
+                    max_v=[self._state[param]["max_exp_avg_sq"] for param in params],
+                    learning_rate=learning_rate,
+                    beta1=param_group["betas"][0],
+                    beta2=param_group["betas"][1],
+                    bias_correction1_val=param_group["bias_correction1"],
+                    bias_correction2_val=param_group["bias_correction2"],
+                    scale=1.0,
+                    weight_decay=param_group["weight_decay"],
+                    epsilon=param_group["eps"],
+                )
+            else:
+                flow._C.multi_tensor_adam_update(
+                    model=params,
+                    model_diff=[param.grad for param in params],
+                    m=[self._state[param]["exp_avg"] for param in params],
+                    v=[self._state[param]["exp_avg_sq"] for param in params],
+                    learning_rate=learning_rate,
+                    beta1=param_group["betas"][0],
+                    beta2=param_group["betas"][1],
+                    bias_correction1_val=param_group["bias_correction1"],
+                    bias_correction2_val=param_group["bias_correction2"],
+                    do_bias_correction=param_group["do_bias_correction"],
+                    scale=1.0,
+                    weight_decay=param_group["weight_decay"],
+                    epsilon=param_group["eps"],
+                )
+        return rest
+
     def _generate_conf_for_graph(self, train_conf, vars_conf):
         new_opt_confs = []
         for param_group in self.param_groups:
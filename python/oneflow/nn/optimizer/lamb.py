@@ -54,6 +54,8 @@ class LAMB(Optimizer):
         do_bias_correction (bool, optional): whether to do bias correction (default: True)
         amsgrad (bool, optional): whether to use the AMSGrad variant of this algorithm. 
         NOT SUPPORTED now! (default: False)
+        foreach (bool, optional): whether to update all the local parameters of the same device and dtype with one multi-tensor kernel in eager mode, the state is allocated in flat contiguous buffers. (default: False)
+        fused (bool, optional): the same as ``foreach``. (default: False)
         
     .. _Large Batch Optimization for Deep Learning\\: Training BERT in 76 minutes:
         https://arxiv.org/abs/1904.00962
@@ -113,6 +115,8 @@ class LAMB(Optimizer):
         adam_w_mode: bool = True,
         do_bias_correction: bool = True,
         amsgrad: bool = False,
+        foreach: bool = False,
+        fused: bool = False,
     ):
         if amsgrad:
             # TODO: supported amsgrad in Lamb
@@ -137,6 +141,7 @@ class LAMB(Optimizer):
         options["bias_correction1"] = 1.0
         options["bias_correction2"] = 1.0
         options["do_bias_correction"] = do_bias_correction
+        options["foreach"] = foreach or fused
 
         super().__init__(params, options)
 
@@ -190,7 +195,10 @@ class LAMB(Optimizer):
                 else:
                     kwargs["l2"] = param_group["weight_decay"]
                     kwargs["weight_decay"] = 0.0
-                for param in param_group.parameters:
+                params = param_group.parameters
+                if param_group.options.get("foreach", False):
+                    params = self._foreach_update(param_group, kwargs)
+                for param in params:
                     if param.grad is None:
                         continue
                     if "exp_avg" not in self._state[param]:
@@ -208,6 +216,32 @@ class LAMB(Optimizer):
 
             return loss
 
+    def _foreach_update(self, param_group, kwargs):
+        buckets, rest = self._foreach_buckets(
+            param_group, state_names=("exp_avg", "exp_avg_sq")
+        )
+        for (device, _), params in buckets.items():
+            learning_rate = flow.full(
+                (1,), param_group["lr"], dtype=flow.float32, device=device
+            )
+            flow._C.multi_tensor_lamb_update(
+                model=params,
+                model_diff=[param.grad for param in params],
+                m=[self._state[param]["exp_avg"] for param in params],
+                v=[self._state[param]["exp_avg_sq"] for param in params],
+                learning_rate=learning_rate,
+                beta1=kwargs["beta1"],
+                beta2=kwargs["beta2"],
+                bias_correction1_val=kwargs["bias_correction1"],
+                bias_correction2_val=kwargs["bias_correction2"],
+                do_bias_correction=kwargs["do_bias_correction"],
+                scale=1.0,
+                weight_decay=kwargs["weight_decay"],
+                epsilon=kwargs["epsilon"],
+                l2=kwargs["l2"],
+            )
+        return rest
+
     def _generate_conf_for_graph(self, train_conf, vars_conf):
         new_opt_confs = []
         for param_group in self.param_groups:
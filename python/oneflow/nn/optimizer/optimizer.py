@@ -121,6 +121,9 @@ class _RequiredParameter(object):
 
 required = _RequiredParameter()
 
+# The dtypes which have multi-tensor update kernels on every device.
+_foreach_dtypes = (flow.float32, flow.float64)
+
 
 class Optimizer(object):
     def __init__(self, parameters, options):
@@ -426,6 +429,49 @@ class Optimizer(object):
                 f"params argument given to the optimizer should be an iterable of Tensors or dicts, but got {type(parameters)}"
             )
 
+    def _foreach_buckets(self, param_group, state_names=()):
+        """Bucket the parameters of ``param_group`` for multi-tensor updates.
+
+        Returns ``(buckets, rest)``. ``buckets`` maps ``(device, dtype)`` to the
+        parameters which can be updated together by one multi-tensor kernel, and
+        ``rest`` holds the parameters which must be updated one by one, e.g. global
+        tensors or those whose gradient has a different dtype. Parameters without
+        gradient are in neither of them.
+
+        The state named in ``state_names`` is allocated lazily for every bucket as
+        one flat buffer per name, and each parameter gets a view of its own slice.
+        """
+        buckets = collections.OrderedDict()
+        rest = []
+        for param in param_group.parameters:
+            if param.grad is None:
+                continue
+            if (
+                param.is_global
+                or param.dtype not in _foreach_dtypes
+                or param.grad.dtype != param.dtype
+                or not param.is_contiguous()
+                or not param.grad.is_contiguous()
+            ):
+                rest.append(param)
+                continue
+            buckets.setdefault((str(param.device), param.dtype), []).append(param)
+        for params in buckets.values():
+            for name in state_names:
+                self._init_flat_state(params, name)
+        return buckets, rest
+
+    def _init_flat_state(self, params, name):
+        params = [param for param in params if name not in self._state[param]]
+        if len(params) == 0:
+            return
+        numels = [param.numel() for param in params]
+        flat = flow.zeros(sum(numels), dtype=params[0].dtype, device=params[0].device)
+        offset = 0
+        for param, numel in zip(params, numels):
+            self._state[param][name] = flat.narrow(0, offset, numel).view(param.shape)
+            offset += numel
+
     def _generate_grad_clip_conf_for_optim_conf(self, param_group, optimizer_conf):
         if not param_group._enable_clip_grad:
             return
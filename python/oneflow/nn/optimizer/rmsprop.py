@@ -79,6 +79,8 @@ class RMSprop(Optimizer):
         centered (bool, optional) : if ``True``, compute the centered RMSProp,
             the gradient is normalized by an estimation of its variance
         weight_decay (float, optional): weight decay (L2 penalty) (default: 0)
+        foreach (bool, optional): whether to update all the local parameters of the same device and dtype with one multi-tensor kernel in eager mode, the state is allocated in flat contiguous buffers. Centered RMSProp is always updated per parameter. (default: False)
+        fused (bool, optional): the same as ``foreach``. (default: False)
 
     For example: 
 
@@ -135,6 +137,8 @@ class RMSprop(Optimizer):
         weight_decay: float = 0,
         momentum: float = 0.0,
         centered: bool = False,
+        foreach: bool = False,
+        fused: bool = False,
     ):
         assert lr >= 0.0, f"Invalid learning rate: {lr}"
         assert alpha >= 0.0, f"Invalid alpha value: {alpha}"
@@ -147,6 +151,7 @@ class RMSprop(Optimizer):
         options["eps"] = eps
         options["weight_decay"] = weight_decay
         options["centered"] = centered
+        options["foreach"] = foreach or fused
         super().__init__(params, options)
 
         for param_group in self.param_groups:
@@ -188,7 +193,11 @@ class RMSprop(Optimizer):
                     "decay_rate": param_group["alpha"],
                     "l2": param_group["weight_decay"],
                 }
-                for param in param_group.parameters:
+                params = param_group.parameters
+                foreach = param_group.options.get("foreach", False)
+                if foreach and not param_group["centered"]:
+                    params = self._foreach_update(param_group)
+                for param in params:
                     if param.grad is None:
                         continue
 
@@ -213,6 +222,25 @@ class RMSprop(Optimizer):
             self._state["step"] = self._state["step"] + 1
             return loss
 
+    def _foreach_update(self, param_group):
+        buckets, rest = self._foreach_buckets(param_group, state_names=("square_avg",))
+        for (device, _), params in buckets.items():
+            learning_rate = flow.full(
+                (1,), param_group["lr"], dtype=flow.float32, device=device
+            )
+            flow._C.multi_tensor_rmsprop_update(
+                model=params,
+                model_diff=[param.grad for param in params],
+                mean_square=[self._state[param]["square_avg"] for param in params],
+                learning_rate=learning_rate,
+                decay_rate=param_group["alpha"],
+                scale=1.0,
+                weight_decay=0.0,
+                epsilon=param_group["eps"],
+                l2=param_group["weight_decay"],
+            )
+        return rest
+
     def _generate_conf_for_graph(self, train_conf, vars_conf):
         new_opt_confs = []
         for param_group in self.param_groups:
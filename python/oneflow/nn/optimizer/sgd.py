@@ -49,6 +49,8 @@ class SGD(Optimizer):
         lr (float, optional): learning rate (default: 1e-3)
         momentum (float, optional): Momentum factor (default: 0.0)
         weight_decay (float, optional): weight decay (L2 penalty) (default: 0.0)
+        foreach (bool, optional): whether to update all the local parameters of the same device and dtype with one multi-tensor kernel in eager mode, the momentum buffers are allocated in flat contiguous buffers. (default: False)
+        fused (bool, optional): the same as ``foreach``. (default: False)
 
     For example: 
 
@@ -105,6 +107,8 @@ class SGD(Optimizer):
         weight_decay: float = 0.0,
         nesterov: bool = False,
         maximize: bool = False,
+        foreach: bool = False,
+        fused: bool = False,
     ):
         assert lr >= 0.0, f"Invalid learning rate: {lr}"
         assert momentum >= 0.0, f"Invalid momentum: {momentum}"
@@ -120,6 +124,7 @@ class SGD(Optimizer):
         options["weight_decay"] = weight_decay
         options["nesterov"] = nesterov
         options["maximize"] = maximize
+        options["foreach"] = foreach or fused
         super().__init__(params, options)
 
         for param_group in self.param_groups:
@@ -152,7 +157,11 @@ class SGD(Optimizer):
             for param_group in self.param_groups:
                 lr = param_group["lr"]
                 l2 = param_group["weight_decay"]
-                for param in param_group.parameters:
+                params = param_group.parameters
+                foreach = param_group.options.get("foreach", False)
+                if foreach:
+                    params = self._foreach_update(param_group)
+                for param in params:
                     if param.grad is None:
                         continue
                     if param_group["momentum"] == 0.0:
@@ -181,6 +190,40 @@ class SGD(Optimizer):
             self._state["step"] = self._state["step"] + 1
             return loss
 
+    def _foreach_update(self, param_group):
+        momentum = param_group["momentum"]
+        buckets, rest = self._foreach_buckets(
+            param_group, state_names=("momentum_buf",) if momentum != 0.0 else ()
+        )
+        for (device, _), params in buckets.items():
+            learning_rate = flow.full(
+                (1,), param_group["lr"], dtype=flow.float32, device=device
+            )
+            if momentum == 0.0:
+                flow._C.multi_tensor_sgd_update(
+                    model=params,
+                    model_diff=[param.grad for param in params],
+                    learning_rate=learning_rate,
+                    scale=1.0,
+                    weight_decay=0.0,
+                    l2=param_group["weight_decay"],
+                )
+            else:
+                flow._C.multi_tensor_momentum_update(
+                    model=params,
+                    model_diff=[param.grad for param in params],
+                    momentum=[self._state[param]["momentum_buf"] for param in params],
+                    learning_rate=learning_rate,
+                    beta=momentum,
+                    dampening=param_group["dampening"],
+                    nesterov=param_group["nesterov"],
+                    maximize=param_group["maximize"],
+                    scale=1.0,
+                    weight_decay=0.0,
+                    l2=param_group["weight_decay"],
+                )
+        return rest
+
     def _generate_conf_for_graph(self, train_conf, vars_conf):
         new_opt_confs = []
         for param_group in self.param_groups:
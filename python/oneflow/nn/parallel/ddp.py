@@ -38,10 +38,13 @@ def grad_setting_fn(module, param):
 
 def allreduce_fn(module, param):
     ddp_state_for_reversed_params = module._ddp_state_for_reversed_params
-    buckets = module._buckets
-    bucket_tensors = module._bucket_tensors
 
     def allreduce(grad):
+        if module._grad_ready_order is not None:
+            module._grad_ready_order.append(param)
+        # buckets may be rebuilt after the first iteration
+        buckets = module._buckets
+        bucket_tensors = module._bucket_tensors
         ddp_state_for_reversed_params[param][0] = True
         for index, bucket in enumerate(buckets):
             deleted = all(ddp_state_for_reversed_params[x][1] for x in bucket)
@@ -65,10 +68,120 @@ def allreduce_fn(module, param):
     return allreduce
 
 
+def numel_in_bucket(tensor: flow.Tensor):
+    def align(x: int, unit_size: int):
+        return (x + (unit_size - 1)) // unit_size * unit_size
+
+    # tensor memory should be align to 512 bytes for cuda operations
+    # TODO(jianhao): expose the `kCudaMemAllocAlignSize` from C++ to
+    # avoid this hardcoded "512"
+    return align(tensor.numel(), 512 // tensor.dtype.bytes)
+
+
+def assign_buckets(params, bucket_size, bucket_cap_bytes):
+    """Splits params into buckets of the same dtype.
+
+    A bucket is closed when it holds ``bucket_size`` params, or ``bucket_cap_bytes``
+    bytes if ``bucket_size`` is None. Buckets are sorted by the position of their
+    last param in ``params``, which is the order they are all-reduced in.
+    """
+    buckets = []
+    open_buckets = {}
+    for param in params:
+        bucket, nbytes = open_buckets.get(param.dtype, ([], 0))
+        bucket.append(param)
+        nbytes += numel_in_bucket(param) * param.dtype.bytes
+        if bucket_size is not None:
+            full = len(bucket) >= bucket_size
+        else:
+            full = nbytes >= bucket_cap_bytes
+        if full:
+            buckets.append(bucket)
+            open_buckets.pop(param.dtype, None)
+        else:
+            open_buckets[param.dtype] = (bucket, nbytes)
+    buckets.extend(bucket for bucket, _ in open_buckets.values())
+    position = {param: i for i, param in enumerate(params)}
+    buckets.sort(key=lambda bucket: position[bucket[-1]])
+    return buckets
+
+
+def build_buckets(module, params):
+    buckets = assign_buckets(params, module._bucket_size, module._bucket_cap_bytes)
+    module._buckets = buckets
+    module._bucket_index = {}
+    module._param_grad_offset_in_bucket = {}
+    module._bucket_tensors = []
+    with flow.no_grad():
+        for index, bucket in enumerate(buckets):
+            offset_in_bucket = 0
+            for param in bucket:
+                assert param.is_leaf
+                module._bucket_index[param] = index
+                module._param_grad_offset_in_bucket[param] = offset_in_bucket
+                offset_in_bucket += numel_in_bucket(param)
+            module._bucket_tensors.append(
+                flow.zeros(
+                    offset_in_bucket, dtype=bucket[0].dtype, device=bucket[0].device
+                )
+            )
+        # The grads are views of the old bucket tensors, move them into the new ones.
+        for param in params:
+            if param.grad is None:
+                continue
+            grad = param.grad
+            start = module._param_grad_offset_in_bucket[param]
+            param.grad = flow._C.slice_view_1d_contiguous(
+                module._bucket_tensors[module._bucket_index[param]],
+                start,
+                start + param.numel(),
+            ).view(param.shape)
+            param.grad.copy_(grad)
+            param._is_grad_acc_inplace = True
+
+
+def rebuild_buckets_in_ready_order(module):
+    params = list(module._ddp_state_for_reversed_params.keys())
+    ready_params = list(dict.fromkeys(module._grad_ready_order))
+    module._grad_ready_order = None
+    position = {param: i for i, param in enumerate(params)}
+    order = [position[param] for param in ready_params]
+    ready_params = set(ready_params)
+    order += [i for i, param in enumerate(params) if param not in ready_params]
+    # All ranks must all-reduce the buckets in the same order, so every rank
+    # follows the order observed on rank 0.
+    order = flow.tensor(order, dtype=flow.int64)
+    flow._C.broadcast(order, src_rank=0, inplace=True)
+    build_buckets(module, [params[i] for i in order.numpy().tolist()])
+
+
 def DistributedDataParallel(
-    module: "flow.nn.Module", *, broadcast_buffers: bool = True, bucket_size: int = 10
+    module: "flow.nn.Module",
+    *,
+    broadcast_buffers: bool = True,
+    bucket_size: int = None,
+    bucket_cap_mb: float = 25,
+    rebuild_buckets: bool = True,
 ):
-    assert all(x.dtype == flow.float32 for x in module.parameters())
+    r"""Wraps ``module`` for data parallel training in eager mode.
+
+    Gradients are all-reduced in buckets while the backward pass is still running.
+
+    Args:
+        module (oneflow.nn.Module): the module to wrap.
+        broadcast_buffers (bool): broadcast the buffers of rank 0 before every forward.
+            Default: ``True``
+        bucket_size (int, optional): the number of parameters in a bucket. If set,
+            ``bucket_cap_mb`` is ignored. Default: ``None``
+        bucket_cap_mb (float): a bucket is closed once its size reaches this many MiB.
+            Parameters of different dtypes are put in different buckets. Default: ``25``
+        rebuild_buckets (bool): rebuild the buckets after the first iteration in the
+            order the gradients become ready. Default: ``True``
+    """
+    assert all(
+        x.dtype in (flow.float32, flow.float16, flow.bfloat16, flow.float64)
+        for x in module.parameters()
+    )
     if parse_boolean_from_env("ONEFLOW_DISABLE_VIEW", False):
         warnings.warn(
             "because the environment variable 'ONEFLOW_DISABLE_VIEW' is set to true, so the view mechanism is disabled, and we will set bucket_size = 1"
@@ -90,42 +203,13 @@ def DistributedDataParallel(
     reversed_param_list = list(
         reversed(list([param for param in module.parameters() if param.requires_grad]))
     )
-    module._param_grad_offset_in_bucket = {}
-
-    def numel_in_bucket(tensor: flow.Tensor):
-        def align(x: int, unit_size: int):
-            return (x + (unit_size - 1)) // unit_size * unit_size
-
-        # tensor memory should be align to 512 bytes for cuda operations,
-        # 4 is the bytes of a float number
-        # TODO(jianhao): expose the `kCudaMemAllocAlignSize` from C++ to
-        # avoid this hardcoded "512"
-        return align(tensor.numel(), 512 // 4)
-
-    offset_in_bucket = 0
-    with flow.no_grad():
-        for i, param in enumerate(reversed_param_list):
-            assert param.is_leaf
-            if i % bucket_size == 0:
-                offset_in_bucket = 0
-            module._param_grad_offset_in_bucket[param] = offset_in_bucket
-            offset_in_bucket += numel_in_bucket(param)
-
-    module._bucket_index = {
-        x: i // bucket_size for i, x in enumerate(reversed_param_list)
-    }
-    module._buckets = [
-        reversed_param_list[i : i + bucket_size]
-        for i in range(0, len(reversed_param_list), bucket_size)
-    ]
-
-    bucket_elems = 0
-    module._bucket_tensors = []
-    for b in module._buckets:
-        bucket_elems = sum([numel_in_bucket(x) for x in b])
-        module._bucket_tensors.append(
-            flow.zeros(bucket_elems, dtype=flow.float32, device=device)
-        )
+    module._bucket_size = bucket_size
+    module._bucket_cap_bytes = int(bucket_cap_mb * 1024 * 1024)
+    build_buckets(module, reversed_param_list)
+    # The ready order is recorded from the first backward on and the buckets are
+    # rebuilt by the next forward, on every rank at the same call.
+    module._grad_ready_order = None
+    module._record_grad_ready_order = rebuild_buckets
 
     ddp_state_for_reversed_params = OrderedDict(
         reversed([(x, [False, False]) for x in module.parameters() if x.requires_grad])
@@ -150,6 +234,11 @@ def DistributedDataParallel(
             param._register_post_grad_accumulation_hook(allreduce_fn(module, param))
 
     def post_forward_hook(module, input, output):
+        if module._grad_ready_order is not None:
+            rebuild_buckets_in_ready_order(module)
+        elif module._record_grad_ready_order:
+            module._grad_ready_order = []
+            module._record_grad_ready_order = False
         ddp_state_for_reversed_params = module._ddp_state_for_reversed_params
         for state in ddp_state_for_reversed_params.values():
             state[0], state[1] = False, False
@@ -14,6 +14,7 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 
+import collections
 import warnings
 from typing import Union, Iterable
 
@@ -27,6 +28,9 @@ from oneflow.nn.module import Module
 
 _tensor_or_tensors = Union[Tensor, Iterable[Tensor]]
 
+# The dtypes which have multi-tensor reduce and scale kernels.
+_multi_tensor_dtypes = (flow.float32, flow.float64)
+
 
 def clip_grad_norm_(
     parameters: _tensor_or_tensors,
@@ -85,97 +89,98 @@ def clip_grad_norm_(
 
     if isinstance(parameters, (Tensor, flow._oneflow_internal.Tensor)):
         parameters = [parameters]
-    parameters = [p for p in parameters if p.grad is not None]
+    grads = [p.grad.detach() for p in parameters if p.grad is not None]
     max_norm = float(max_norm)
     norm_type = float(norm_type)
-    if len(parameters) == 0:
+    if len(grads) == 0:
         return flow.tensor(0.0)
 
-    if parameters[0].is_global:
+    if grads[0].is_global:
         assert all(
-            [p.is_global for p in parameters]
+            [g.is_global for g in grads]
         ), "All parameters must be global tensor."
-        sbp_broadcast = [flow.sbp.broadcast for _ in parameters[0].sbp]
-        param0_placement = parameters[0].placement
-        if norm_type == float("inf"):
-            norms = [
-                p.grad.detach()
-                .to_global(sbp=sbp_broadcast)
-                .abs()
-                .max()
-                .to_global(placement=param0_placement)
-                for p in parameters
-            ]
-            total_norm = norms[0] if len(norms) == 1 else flow.max(flow.stack(norms))
-        elif norm_type == float("-inf"):
-            norms = [
-                p.grad.detach()
-                .to_global(sbp=sbp_broadcast)
-                .abs()
-                .min()
-                .to_global(placement=param0_placement)
-                for p in parameters
-            ]
-            total_norm = norms[0] if len(norms) == 1 else flow.min(flow.stack(norms))
-        else:
-            total_norm = flow.linalg.vector_norm(
-                flow.stack(
-                    [
-                        flow.linalg.vector_norm(
-                            p.grad.detach().to_global(sbp=sbp_broadcast), norm_type
-                        ).to_global(placement=param0_placement)
-                        for p in parameters
-                    ]
-                ),
-                norm_type,
-            )
-        if error_if_nonfinite and flow.logical_or(
-            total_norm.isnan(), total_norm.isinf()
-        ):
-            raise RuntimeError(
-                f"The total norm of order {norm_type} for gradients from "
-                "`parameters` is non-finite, so it cannot be clipped. To disable "
-                "this error and scale the gradients by the non-finite norm anyway, "
-                "set `error_if_nonfinite=False`"
+        param0_placement = grads[0].placement
+
+        def to_total(norm):
+            sbp_broadcast = [flow.sbp.broadcast for _ in norm.sbp]
+            return norm.to_global(sbp=sbp_broadcast).to_global(
+                placement=param0_placement
             )
-        clip_coef = max_norm / (total_norm + 1e-6)
-        clip_coef_clamped = clip_coef.clamp(max=1.0)
-        for p in parameters:
-            p.grad.detach().mul_(clip_coef_clamped.to_global(placement=p.placement))
+
+    else:
+        device = grads[0].device
+
+        def to_total(norm):
+            return norm.to(device)
+
+    grad_groups = _group_grads(grads)
+    if norm_type == 0.0:
+        # The 0-norm counts the gradients which have any non-zero element.
+        norms = [to_total(flow.linalg.vector_norm(g, norm_type)) for g in grads]
+        total_norm = flow.linalg.vector_norm(flow.stack(norms), norm_type)
     else:
-        device = parameters[0].grad.device
-        if norm_type == float("inf"):
-            norms = [p.grad.detach().abs().max().to(device) for p in parameters]
-            total_norm = norms[0] if len(norms) == 1 else flow.max(flow.stack(norms))
-        elif norm_type == float("-inf"):
-            norms = [p.grad.detach().abs().min().to(device) for p in parameters]
-            total_norm = norms[0] if len(norms) == 1 else flow.min(flow.stack(norms))
+        group_norms = []
+        for group in grad_groups:
+            if group[0].dtype not in _multi_tensor_dtypes:
+                group = [g.float() for g in group]
+            if norm_type == float("inf"):
+                norm = flow._C.multi_reduce_max_abs(group)
+            elif norm_type == float("-inf"):
+                norm = flow._C.multi_reduce_min_abs(group)
+            else:
+                norm = flow._C.multi_reduce_sum_pow_abs(group, norm_type)
+            group_norms.append(to_total(norm))
+        if len(group_norms) == 1:
+            total_norm = group_norms[0]
         else:
-            total_norm = flow.linalg.vector_norm(
-                flow.stack(
-                    [
-                        flow.linalg.vector_norm(p.grad.detach(), norm_type).to(device)
-                        for p in parameters
-                    ]
-                ),
-                norm_type,
-            )
-        if error_if_nonfinite and flow.logical_or(
-            total_norm.isnan(), total_norm.isinf()
+            dtype = group_norms[0].dtype
+            stacked = flow.stack([norm.to(dtype=dtype) for norm in group_norms])
+            if norm_type == float("inf"):
+                total_norm = flow.max(stacked)
+            elif norm_type == float("-inf"):
+                total_norm = flow.min(stacked)
+            else:
+                total_norm = flow.sum(stacked)
+        if norm_type != float("inf") and norm_type != float("-inf"):
+            total_norm = flow.pow(total_norm, 1.0 / norm_type)
+    if error_if_nonfinite and flow.logical_or(total_norm.isnan(), total_norm.isinf()):
+        raise RuntimeError(
+            f"The total norm of order {norm_type} for gradients from "
+            "`parameters` is non-finite, so it cannot be clipped. To disable "
+            "this error and scale the gradients by the non-finite norm anyway, "
+            "set `error_if_nonfinite=False`"
+        )
+    clip_coef = max_norm / (total_norm + 1e-6)
+    clip_coef_clamped = clip_coef.clamp(max=1.0)
+    for group in grad_groups:
+        if group[0].is_global:
+            coef = clip_coef_clamped.to_global(placement=group[0].placement)
+        else:
+            coef = clip_coef_clamped.to(group[0].device)
+        coef = coef.to(dtype=group[0].dtype)
+        if group[0].dtype in _multi_tensor_dtypes and all(
+            g.is_contiguous() for g in group
         ):
-            raise RuntimeError(
-                f"The total norm of order {norm_type} for gradients from "
-                "`parameters` is non-finite, so it cannot be clipped. To disable "
-                "this error and scale the gradients by the non-finite norm anyway, "
-                "set `error_if_nonfinite=False`"
-            )
-        clip_coef = max_norm / (total_norm + 1e-6)
-        clip_coef_clamped = clip_coef.clamp(max=1.0)
-        for p in parameters:
-            p.grad.detach().mul_(clip_coef_clamped.to(p.grad.device))
+            flow._C.multi_tensor_scale_by_tensor(group, coef)
+        else:
+            for g in group:
+                g.mul_(coef)
     return total_norm
 
 
+def _group_grads(grads):
+    # Gradients are reduced and scaled by one multi-tensor op per group, so the
+    # gradients in a group must share the device (or placement and sbp) and dtype.
+    groups = collections.OrderedDict()
+    for g in grads:
+        if g.is_global:
+            key = (str(g.placement), str(g.sbp), g.dtype)
+        else:
+            key = (str(g.device), g.dtype)
+        groups.setdefault(key, []).append(g)
+    return list(groups.values())
+
+
 def clip_grad_value_(parameters: _tensor_or_tensors, clip_value: float) -> None:
     r"""Clips gradient of an iterable of parameters at specified value.
 
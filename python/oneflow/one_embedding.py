@@ -127,6 +127,13 @@ def _init(
         persistent_table["capacity_hint"] = (
             persistent_table["capacity_hint"] // parallel_num
         )
+    if kv_store.__contains__("device_type"):
+        assert kv_store["device_type"] in ["cuda", "cpu"]
+        if kv_store["device_type"] == "cpu":
+            assert parallel_num == 1, "one_embedding on cpu only supports a single rank"
+            if kv_store.__contains__("caches"):
+                for cache in caches:
+                    assert cache["value_memory_kind"] == "host"
     key_value_store_options["kv_store"] = kv_store
     # initializer
     if tables is not None:
@@ -187,6 +194,7 @@ class Embedding(Module):
             store_options,
             default_initializer,
         )
+        self.device = key_value_store_options["kv_store"].get("device_type", "cuda")
         self.key_value_store_options = json.dumps(key_value_store_options)
         self.embedding_tables = json.dumps(embedding_tables)
         self.num_tables = len(embedding_tables["tables"])
@@ -201,7 +209,7 @@ class Embedding(Module):
     def _save_to_state_dict(self, destination, prefix, keep_vars):
         super()._save_to_state_dict(self, destination, prefix, keep_vars)
         snapshot_timestamp_tensor = flow.tensor(
-            datetime.datetime.now().timestamp(), dtype=flow.float64, device="cuda"
+            datetime.datetime.now().timestamp(), dtype=flow.float64, device=self.device
         )
         # Broadcast timestamp tensor from master rank.
         flow.comm.broadcast(snapshot_timestamp_tensor, src=0)
@@ -409,7 +417,12 @@ def make_cached_ssd_store_options(
 
 
 def make_cached_host_mem_store_options(
-    cache_budget_mb, persistent_path, capacity, size_factor=1, physical_block_size=512,
+    cache_budget_mb,
+    persistent_path,
+    capacity,
+    size_factor=1,
+    physical_block_size=512,
+    device="cuda",
 ):
     """make host use GPU as cache store_options param of MultiTableEmbedding
 
@@ -419,6 +432,7 @@ def make_cached_host_mem_store_options(
         capacity (int): total capacity of Embedding
         size_factor (int, optional): store size factor of embedding_dim, if SGD update, and momentum = 0, should be 1, if momentum > 0, it should be 2. if Adam, should be 3. Defaults to 1.
         physical_block_size (int, optional): physical_block_size should be sector size. Defaults to 512.
+        device (str, optional): "cuda" or "cpu". If "cpu", the Embedding runs on cpu with a single host memory full cache and cache_budget_mb is unused, only a single rank is supported. Defaults to "cuda".
 
     Returns:
         dict: host use GPU as cache store_options param of MultiTableEmbedding
@@ -426,22 +440,29 @@ def make_cached_host_mem_store_options(
     See also :func:`oneflow.one_embedding.make_cached_ssd_store_options`
     """
     assert isinstance(persistent_path, (str, list, tuple))
-    assert cache_budget_mb > 0
+    assert device in ["cuda", "cpu"]
     assert capacity > 0
+    host_cache = {
+        "policy": "full",
+        "capacity": int(capacity),
+        "value_memory_kind": "host",
+    }
+    if device == "cpu":
+        caches = [host_cache]
+    else:
+        assert cache_budget_mb > 0
+        caches = [
+            {
+                "policy": "lru",
+                "cache_memory_budget_mb": cache_budget_mb,
+                "value_memory_kind": "device",
+            },
+            host_cache,
+        ]
     options = {
         "kv_store": {
-            "caches": [
-                {
-                    "policy": "lru",
-                    "cache_memory_budget_mb": cache_budget_mb,
-                    "value_memory_kind": "device",
-                },
-                {
-                    "policy": "full",
-                    "capacity": int(capacity),
-                    "value_memory_kind": "host",
-                },
-            ],
+            "device_type": device,
+            "caches": caches,
             "persistent_table": {
                 "path": persistent_path,
                 "physical_block_size": physical_block_size,
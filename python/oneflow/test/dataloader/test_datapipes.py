@@ -0,0 +1,143 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import os
+import struct
+import tempfile
+import threading
+import time
+import unittest
+
+import oneflow as flow
+import oneflow.unittest
+from oneflow.utils.data import (
+    DataLoader,
+    FileLister,
+    Mapper,
+    pipeline_stats,
+)
+
+
+def _write_text_files(data_dir, num_files, num_lines):
+    for i in range(num_files):
+        with open(os.path.join(data_dir, "part-{}.txt".format(i)), "w") as f:
+            for j in range(num_lines):
+                f.write("{}-{}\n".format(i, j))
+    with open(os.path.join(data_dir, "README"), "w") as f:
+        f.write("not a part\n")
+
+
+def _slow_square(x):
+    time.sleep(0.01)
+    return x * x
+
+
+@flow.unittest.skip_unless_1n1d()
+class TestDataPipes(flow.unittest.TestCase):
+    def test_file_lister_and_line_reader(test_case):
+        with tempfile.TemporaryDirectory() as data_dir:
+            _write_text_files(data_dir, 3, 4)
+            paths = list(FileLister(data_dir, "*.txt"))
+            test_case.assertEqual(
+                [os.path.basename(path) for path in paths],
+                ["part-0.txt", "part-1.txt", "part-2.txt"],
+            )
+            lines = list(FileLister(data_dir, "*.txt").readlines())
+            test_case.assertEqual(len(lines), 12)
+            test_case.assertEqual(lines[:2], ["0-0", "0-1"])
+
+    def test_record_reader(test_case):
+        with tempfile.TemporaryDirectory() as data_dir:
+            records = [b"a" * i for i in range(1, 6)]
+            with open(os.path.join(data_dir, "part-0"), "wb") as f:
+                for record in records:
+                    f.write(struct.pack("<q", len(record)))
+                    f.write(record)
+            test_case.assertEqual(list(FileLister(data_dir).read_records()), records)
+
+    def test_map_keeps_order_and_bounds_in_flight(test_case):
+        in_flight = [0, 0]
+        lock = threading.Lock()
+
+        def fn(x):
+            with lock:
+                in_flight[0] += 1
+                in_flight[1] = max(in_flight[1], in_flight[0])
+            time.sleep(0.002)
+            with lock:
+                in_flight[0] -= 1
+            return x + 1
+
+        source = Mapper(range(50), lambda x: x)
+        dp = source.map(fn, num_workers=4, max_in_flight=3)
+        test_case.assertEqual(list(dp), list(range(1, 51)))
+        test_case.assertLessEqual(in_flight[1], 3)
+
+    def test_map_process_workers(test_case):
+        dp = Mapper(Mapper(range(20), int), _slow_square, 2, "process")
+        test_case.assertEqual(list(dp), [x * x for x in range(20)])
+
+    def test_batch_shuffle_shard(test_case):
+        source = Mapper(range(23), lambda x: x)
+        test_case.assertEqual(
+            list(source.batch(5, drop_last=True)),
+            [list(range(i, i + 5)) for i in range(0, 20, 5)],
+        )
+        test_case.assertEqual(len(list(source.batch(5))), 5)
+        shuffler = source.shuffle(buffer_size=8, seed=3)
+        epoch0, epoch1 = list(shuffler), list(shuffler)
+        test_case.assertEqual(sorted(epoch0), list(range(23)))
+        test_case.assertNotEqual(epoch0, list(range(23)))
+        test_case.assertNotEqual(epoch0, epoch1)
+        test_case.assertEqual(list(source.shuffle(buffer_size=8, seed=3)), epoch0)
+        shards = [list(source.shard(3, i)) for i in range(3)]
+        test_case.assertEqual(sorted(sum(shards, [])), list(range(23)))
+        test_case.assertEqual(shards[1][:3], [1, 4, 7])
+
+    def test_prefetch(test_case):
+        def fail(x):
+            if x == 7:
+                raise ValueError("bad item")
+            return x
+
+        source = Mapper(range(10), lambda x: x)
+        test_case.assertEqual(list(source.prefetch(3)), list(range(10)))
+        with test_case.assertRaisesRegex(ValueError, "bad item"):
+            list(source.map(fail).prefetch(3))
+
+    def test_dataloader_workers_and_stats(test_case):
+        with tempfile.TemporaryDirectory() as data_dir:
+            _write_text_files(data_dir, 4, 10)
+            dp = FileLister(data_dir, "*.txt").readlines().shard().map(str.upper)
+            for num_workers in [0, 2]:
+                dataloader = DataLoader(dp, batch_size=None, num_workers=num_workers)
+                lines = list(dataloader)
+                test_case.assertEqual(
+                    sorted(lines),
+                    sorted("{}-{}".format(i, j) for i in range(4) for j in range(10)),
+                )
+            stages = pipeline_stats(dp)
+            test_case.assertEqual(
+                [stage["name"] for stage in stages],
+                ["FileLister", "LineReader", "Sharder", "Mapper"],
+            )
+            # only the single-process pass is counted in this process
+            test_case.assertEqual(stages[1]["num_items"], 40)
+            test_case.assertEqual(stages[-1]["num_items"], 40)
+            test_case.assertGreaterEqual(stages[-1]["seconds"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import unittest
+
+import numpy as np
+
+import oneflow as flow
+import oneflow.unittest
+
+
+class TabularDataset(flow.utils.data.Dataset):
+    def __init__(self, length=100, dim=8):
+        self.features = np.arange(length * dim, dtype=np.float32).reshape(length, dim)
+        self.labels = np.arange(length, dtype=np.int64)
+        self.num_getitem_calls = 0
+        self.num_getitems_calls = 0
+
+    def __getitem__(self, index):
+        self.num_getitem_calls += 1
+        return self.features[index], self.labels[index]
+
+    def __getitems__(self, indices):
+        self.num_getitems_calls += 1
+        features = self.features[indices]
+        labels = self.labels[indices]
+        return list(zip(features, labels))
+
+    def __len__(self):
+        return len(self.labels)
+
+
+@flow.unittest.skip_unless_1n1d()
+class TestDatasetGetItems(flow.unittest.TestCase):
+    def test_getitems(test_case):
+        dataset = TabularDataset()
+        dataloader = flow.utils.data.DataLoader(dataset, batch_size=16)
+        for i, (features, labels) in enumerate(dataloader):
+            test_case.assertEqual(features.dtype, flow.float32)
+            test_case.assertEqual(labels.dtype, flow.int64)
+            test_case.assertTrue(
+                np.array_equal(labels.numpy(), np.arange(i * 16, min(i * 16 + 16, 100)))
+            )
+            test_case.assertTrue(
+                np.array_equal(features.numpy(), dataset.features[labels.numpy()])
+            )
+        test_case.assertEqual(dataset.num_getitem_calls, 0)
+        test_case.assertEqual(dataset.num_getitems_calls, 7)
+
+    def test_subset_getitems(test_case):
+        dataset = TabularDataset()
+        subset = flow.utils.data.Subset(dataset, list(range(50, 100)))
+        dataloader = flow.utils.data.DataLoader(subset, batch_size=10)
+        labels = np.concatenate([labels.numpy() for _, labels in dataloader])
+        test_case.assertTrue(np.array_equal(labels, np.arange(50, 100)))
+        test_case.assertEqual(dataset.num_getitem_calls, 0)
+
+    def test_getitems_multiprocess(test_case):
+        dataset = TabularDataset()
+        dataloader = flow.utils.data.DataLoader(dataset, batch_size=16, num_workers=2)
+        labels = np.concatenate([labels.numpy() for _, labels in dataloader])
+        test_case.assertTrue(np.array_equal(labels, np.arange(100)))
+
+    def test_collate_numpy_arrays(test_case):
+        batch = [np.full((2, 3), i, dtype=np.float64) for i in range(4)]
+        out = flow.utils.data._utils.collate.default_collate(batch)
+        test_case.assertEqual(out.dtype, flow.float64)
+        test_case.assertTrue(np.array_equal(out.numpy(), np.stack(batch)))
+        # arrays of different shapes fall back to stacking tensors
+        with test_case.assertRaises(Exception):
+            flow.utils.data._utils.collate.default_collate(
+                [np.zeros(2), np.zeros(3)]
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,181 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import unittest
+
+import numpy as np
+
+import oneflow as flow
+import oneflow.unittest
+from oneflow.utils.data import DataLoader, DistributedSampler, RandomSampler
+
+
+class RangeDataset(flow.utils.data.Dataset):
+    def __init__(self, length):
+        self.length = length
+
+    def __getitem__(self, index):
+        return np.array(index, dtype=np.int64)
+
+    def __len__(self):
+        return self.length
+
+
+@flow.unittest.skip_unless_1n1d()
+class TestSamplerState(flow.unittest.TestCase):
+    def test_random_sampler_permutation(test_case):
+        for n in [1, 2, 7, 100, 1025]:
+            sampler = RandomSampler(range(n), seed=1)
+            epoch0 = list(sampler)
+            epoch1 = list(sampler)
+            test_case.assertEqual(sorted(epoch0), list(range(n)))
+            test_case.assertEqual(sorted(epoch1), list(range(n)))
+            test_case.assertEqual(sampler.epoch, 2)
+        test_case.assertNotEqual(epoch0, epoch1)
+        test_case.assertEqual(list(RandomSampler(range(1025), seed=1)), epoch0)
+
+    def test_random_sampler_resume(test_case):
+        sampler = RandomSampler(range(50))
+        expected = list(sampler)
+        it = iter(sampler)
+        consumed = [next(it) for _ in range(20)]
+        state = sampler.state_dict()
+        test_case.assertEqual(state["num_consumed"], 20)
+        test_case.assertEqual(state["epoch"], 1)
+
+        resumed = RandomSampler(range(50))
+        resumed.load_state_dict(state)
+        rest = list(resumed)
+        reference = RandomSampler(range(50), seed=state["seed"])
+        test_case.assertEqual(list(reference), expected)
+        test_case.assertEqual(consumed + rest, list(reference))
+        test_case.assertEqual(resumed.state_dict()["epoch"], 2)
+
+    def test_random_sampler_abandoned_pass(test_case):
+        sampler = RandomSampler(range(50), seed=5)
+        it = iter(sampler)
+        abandoned = [next(it) for _ in range(10)]
+        test_case.assertEqual(sampler.state_dict()["num_consumed"], 10)
+        next_epoch = list(sampler)
+        test_case.assertEqual(sampler.epoch, 2)
+        test_case.assertEqual(sampler.state_dict()["num_consumed"], 0)
+        reference = RandomSampler(range(50), seed=5)
+        test_case.assertEqual(list(reference)[:10], abandoned)
+        test_case.assertEqual(list(reference), next_epoch)
+        # the abandoned iterator no longer updates the state
+        next(it)
+        test_case.assertEqual(sampler.state_dict()["num_consumed"], 0)
+
+    def test_random_sampler_replacement(test_case):
+        sampler = RandomSampler(range(10), replacement=True, num_samples=40, seed=3)
+        indices = list(sampler)
+        test_case.assertEqual(len(indices), 40)
+        test_case.assertTrue(all(0 <= i < 10 for i in indices))
+        sampler.load_state_dict({"seed": 3, "epoch": 0, "num_consumed": 15})
+        test_case.assertEqual(list(sampler), indices[15:])
+
+    def test_distributed_sampler(test_case):
+        for drop_last in [False, True]:
+            for shuffle in [False, True]:
+                samplers = [
+                    DistributedSampler(
+                        range(10),
+                        num_replicas=3,
+                        rank=rank,
+                        shuffle=shuffle,
+                        drop_last=drop_last,
+                    )
+                    for rank in range(3)
+                ]
+                parts = [list(sampler) for sampler in samplers]
+                for part, sampler in zip(parts, samplers):
+                    test_case.assertEqual(len(part), len(sampler))
+                indices = sum(parts, [])
+                if drop_last:
+                    test_case.assertEqual(len(indices), 9)
+                    test_case.assertEqual(len(set(indices)), 9)
+                else:
+                    test_case.assertEqual(len(indices), 12)
+                    test_case.assertEqual(set(indices), set(range(10)))
+                if not shuffle:
+                    test_case.assertEqual(parts[1][:3], [1, 4, 7])
+
+    def test_distributed_sampler_resume(test_case):
+        sampler = DistributedSampler(range(100), num_replicas=4, rank=1, seed=7)
+        sampler.set_epoch(3)
+        expected = list(sampler)
+        it = iter(sampler)
+        for _ in range(10):
+            next(it)
+        state = sampler.state_dict()
+        test_case.assertEqual(state, {"seed": 7, "epoch": 3, "num_consumed": 10})
+
+        resumed = DistributedSampler(range(100), num_replicas=4, rank=1)
+        resumed.load_state_dict(state)
+        resumed.set_epoch(3)
+        test_case.assertEqual(list(resumed), expected[10:])
+        # the position is dropped when moving on to another epoch
+        resumed.load_state_dict(state)
+        resumed.set_epoch(4)
+        test_case.assertEqual(len(list(resumed)), 25)
+
+    def test_dataloader_abandoned_pass(test_case):
+        for num_workers in [0, 2]:
+            dataset = RangeDataset(64)
+            dataloader = DataLoader(
+                dataset, batch_size=8, shuffle=True, num_workers=num_workers
+            )
+            it = iter(dataloader)
+            abandoned = np.concatenate([next(it).numpy() for _ in range(2)])
+            del it
+            it = iter(dataloader)
+            state = dataloader.state_dict()
+            test_case.assertEqual(state["sampler"]["epoch"], 1)
+            test_case.assertEqual(state["sampler"]["num_consumed"], 0)
+            first = next(it).numpy()
+            test_case.assertEqual(
+                dataloader.state_dict()["sampler"]["num_consumed"], 8
+            )
+            test_case.assertFalse(np.array_equal(first, abandoned[:8]))
+            rest = [batch.numpy() for batch in it]
+            indices = np.concatenate([first] + rest)
+            test_case.assertTrue(np.array_equal(np.sort(indices), np.arange(64)))
+
+    def test_dataloader_resume(test_case):
+        for num_workers in [0, 2]:
+            dataset = RangeDataset(64)
+            dataloader = DataLoader(
+                dataset, batch_size=8, shuffle=True, num_workers=num_workers
+            )
+            it = iter(dataloader)
+            seen = [next(it).numpy() for _ in range(3)]
+            state = dataloader.state_dict()
+            test_case.assertEqual(state["sampler"]["num_consumed"], 24)
+            del it
+
+            resumed = DataLoader(
+                dataset, batch_size=8, shuffle=True, num_workers=num_workers
+            )
+            resumed.load_state_dict(state)
+            rest = [batch.numpy() for batch in resumed]
+            test_case.assertEqual(len(rest), 5)
+            indices = np.concatenate(seen + rest)
+            test_case.assertTrue(np.array_equal(np.sort(indices), np.arange(64)))
+            test_case.assertEqual(resumed.state_dict()["sampler"]["epoch"], 1)
+            test_case.assertEqual(resumed.state_dict()["sampler"]["num_consumed"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import os
+import unittest
+
+import numpy as np
+
+import oneflow as flow
+import oneflow.unittest
+from oneflow.utils.data import DataLoader, Dataset
+from oneflow.utils.data._utils.pin_memory import PinnedBufferPool
+
+
+class PairDataset(Dataset):
+    def __init__(self, length):
+        self.length = length
+
+    def __getitem__(self, index):
+        return np.full((3, 4), index, dtype=np.float32), index
+
+    def __len__(self):
+        return self.length
+
+
+@flow.unittest.skip_unless_1n1d()
+class TestStaging(flow.unittest.TestCase):
+    def test_pool_reuses_buffers(test_case):
+        pool = PinnedBufferPool("cpu", num_buffers=2)
+        outputs = []
+        for i in range(6):
+            batch = {"x": flow.full((2, 5), i), "y": [flow.tensor([i]), "name"]}
+            staged = pool.stage(batch)
+            test_case.assertEqual(staged["y"][1], "name")
+            test_case.assertEqual(staged["x"].device, flow.device("cpu"))
+            outputs.append(staged)
+        test_case.assertEqual(pool.num_allocations, 4)
+        # staged batches don't alias the recycled buffers
+        for i, staged in enumerate(outputs):
+            test_case.assertTrue(np.all(staged["x"].numpy() == i))
+            test_case.assertEqual(staged["y"][0].item(), i)
+
+    def test_pool_reallocates_on_shape_change(test_case):
+        pool = PinnedBufferPool("cpu", num_buffers=1)
+        pool.stage(flow.zeros(4))
+        pool.stage(flow.zeros(4))
+        test_case.assertEqual(pool.num_allocations, 1)
+        staged = pool.stage(flow.ones(2, 3))
+        test_case.assertEqual(staged.shape, flow.Size([2, 3]))
+        test_case.assertEqual(pool.num_allocations, 2)
+
+    def test_dataloader_device(test_case):
+        for num_workers, worker_mode in [(0, "process"), (2, "process"), (2, "thread")]:
+            dataloader = DataLoader(
+                PairDataset(40),
+                batch_size=8,
+                num_workers=num_workers,
+                worker_mode=worker_mode,
+                device="cpu",
+                num_staging_buffers=3,
+            )
+            for _ in range(2):
+                for i, (features, labels) in enumerate(dataloader):
+                    test_case.assertEqual(features.device, flow.device("cpu"))
+                    expected = np.arange(i * 8, i * 8 + 8)
+                    test_case.assertTrue(np.array_equal(labels.numpy(), expected))
+                    test_case.assertTrue(
+                        np.all(features.numpy() == expected.reshape(8, 1, 1))
+                    )
+            test_case.assertEqual(dataloader._staging_pool.num_allocations, 6)
+
+    @unittest.skipIf(os.getenv("ONEFLOW_TEST_CPU_ONLY"), "only test gpu cases")
+    def test_dataloader_cuda(test_case):
+        dataloader = DataLoader(PairDataset(32), batch_size=8, device="cuda")
+        labels = [labels for _, labels in dataloader]
+        test_case.assertTrue(all(x.device == flow.device("cuda") for x in labels))
+        test_case.assertTrue(
+            np.array_equal(flow.cat(labels).numpy(), np.arange(32, dtype=np.int64))
+        )
+        test_case.assertTrue(dataloader._staging_pool.pin_memory)
+
+
+if __name__ == "__main__":
+    unittest.main()
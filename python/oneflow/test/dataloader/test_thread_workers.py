@@ -0,0 +1,121 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import threading
+import unittest
+
+import numpy as np
+
+import oneflow as flow
+import oneflow.unittest
+from oneflow.utils.data import DataLoader, Dataset, IterableDataset
+from oneflow.utils.data.dataloader import get_worker_info
+
+
+class SquareDataset(Dataset):
+    def __init__(self, length):
+        self.length = length
+        self.thread_ids = set()
+
+    def __getitem__(self, index):
+        self.thread_ids.add(threading.get_ident())
+        return np.array(index * index, dtype=np.int64)
+
+    def __len__(self):
+        return self.length
+
+
+class ShardedRangeDataset(IterableDataset):
+    def __init__(self, length):
+        self.length = length
+
+    def __iter__(self):
+        worker_info = get_worker_info()
+        return iter(range(worker_info.id, self.length, worker_info.num_workers))
+
+
+class TensorDataset(SquareDataset):
+    def __getitem__(self, index):
+        return flow.tensor(super().__getitem__(index))
+
+
+class FailingDataset(SquareDataset):
+    def __getitem__(self, index):
+        if index == 13:
+            raise ValueError("bad sample")
+        return super().__getitem__(index)
+
+
+@flow.unittest.skip_unless_1n1d()
+class TestThreadWorkers(flow.unittest.TestCase):
+    def test_map_dataset_order(test_case):
+        dataset = SquareDataset(100)
+        dataloader = DataLoader(
+            dataset,
+            batch_size=8,
+            num_workers=4,
+            prefetch_factor=3,
+            worker_mode="thread",
+        )
+        for _ in range(2):
+            values = np.concatenate([batch.numpy() for batch in dataloader])
+            test_case.assertTrue(np.array_equal(values, np.arange(100) ** 2))
+        test_case.assertNotIn(threading.get_ident(), dataset.thread_ids)
+        test_case.assertGreater(len(dataset.thread_ids), 1)
+
+    def test_persistent_workers(test_case):
+        dataloader = DataLoader(
+            SquareDataset(30),
+            batch_size=4,
+            num_workers=2,
+            persistent_workers=True,
+            worker_mode="thread",
+        )
+        for _ in range(3):
+            values = np.concatenate([batch.numpy() for batch in dataloader])
+            test_case.assertTrue(np.array_equal(values, np.arange(30) ** 2))
+
+    def test_iterable_dataset(test_case):
+        dataloader = DataLoader(
+            ShardedRangeDataset(21), batch_size=4, num_workers=3, worker_mode="thread"
+        )
+        values = np.concatenate([batch.numpy() for batch in dataloader])
+        test_case.assertEqual(sorted(values.tolist()), list(range(21)))
+        test_case.assertIsNone(get_worker_info())
+
+    def test_batches_not_shared(test_case):
+        # the batches stay in the memory of the main process
+        for dataset in (SquareDataset(16), TensorDataset(16)):
+            dataloader = DataLoader(
+                dataset, batch_size=4, num_workers=2, worker_mode="thread"
+            )
+            for batch in dataloader:
+                test_case.assertFalse(batch.is_shared())
+
+    def test_worker_exception(test_case):
+        dataloader = DataLoader(
+            FailingDataset(32), batch_size=4, num_workers=2, worker_mode="thread"
+        )
+        with test_case.assertRaisesRegex(ValueError, "bad sample"):
+            for _ in dataloader:
+                pass
+
+    def test_invalid_worker_mode(test_case):
+        with test_case.assertRaises(ValueError):
+            DataLoader(SquareDataset(4), num_workers=2, worker_mode="fiber")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import os
+import time
+import unittest
+
+import oneflow as flow
+import oneflow.unittest
+
+
+class _TransformerBlock(flow.nn.Module):
+    def __init__(self, hidden_size, num_heads):
+        super().__init__()
+        self.num_heads = num_heads
+        self.ln1 = flow.nn.LayerNorm(hidden_size)
+        self.qkv = flow.nn.Linear(hidden_size, 3 * hidden_size)
+        self.proj = flow.nn.Linear(hidden_size, hidden_size)
+        self.ln2 = flow.nn.LayerNorm(hidden_size)
+        self.fc1 = flow.nn.Linear(hidden_size, 4 * hidden_size)
+        self.fc2 = flow.nn.Linear(4 * hidden_size, hidden_size)
+
+    def forward(self, x):
+        batch, seq, hidden = x.shape
+        head_dim = hidden // self.num_heads
+        q, k, v = self.qkv(self.ln1(x)).chunk(3, dim=-1)
+        q, k, v = [
+            t.reshape(batch, seq, self.num_heads, head_dim).permute(0, 2, 1, 3)
+            for t in (q, k, v)
+        ]
+        scores = flow.matmul(q, k.transpose(-2, -1)) / (head_dim ** 0.5)
+        attn = flow.matmul(flow.softmax(scores, dim=-1), v)
+        attn = attn.permute(0, 2, 1, 3).reshape(batch, seq, hidden)
+        x = x + self.proj(attn)
+        return x + self.fc2(flow.nn.functional.gelu(self.fc1(self.ln2(x))))
+
+
+def _param_bytes(module):
+    return sum(p.nelement() * p.element_size() for p in module.parameters())
+
+
+def _forward_ms(block, x, num_iters):
+    with flow.no_grad():
+        # warm up, numpy() waits for the eager queue to drain
+        block(x).numpy()
+        start = time.perf_counter()
+        for _ in range(num_iters):
+            out = block(x)
+        out.numpy()
+    return (time.perf_counter() - start) * 1000 / num_iters
+
+
+@flow.unittest.skip_unless_1n1d()
+class TestBFloat16CpuBenchmark(oneflow.unittest.TestCase):
+    def test_transformer_block_fp32_vs_bf16(test_case):
+        hidden_size = int(os.getenv("ONEFLOW_TEST_BF16_BENCHMARK_HIDDEN", 512))
+        seq_len = int(os.getenv("ONEFLOW_TEST_BF16_BENCHMARK_SEQ", 128))
+        batch_size = int(os.getenv("ONEFLOW_TEST_BF16_BENCHMARK_BATCH", 4))
+        num_iters = int(os.getenv("ONEFLOW_TEST_BF16_BENCHMARK_ITERS", 10))
+        block = _TransformerBlock(hidden_size, num_heads=8)
+        x = flow.randn(batch_size, seq_len, hidden_size)
+        fp32_ms = _forward_ms(block, x, num_iters)
+        fp32_bytes = _param_bytes(block) + x.nelement() * x.element_size()
+        block.bfloat16()
+        x = x.to(flow.bfloat16)
+        bf16_ms = _forward_ms(block, x, num_iters)
+        bf16_bytes = _param_bytes(block) + x.nelement() * x.element_size()
+        test_case.assertEqual(block(x).dtype, flow.bfloat16)
+        print(
+            f"transformer block hidden={hidden_size} seq={seq_len} batch={batch_size},"
+            f" fp32: {fp32_ms:.2f} ms {fp32_bytes / 2 ** 20:.1f} MiB,"
+            f" bf16: {bf16_ms:.2f} ms {bf16_bytes / 2 ** 20:.1f} MiB"
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
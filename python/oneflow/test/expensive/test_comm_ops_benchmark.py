@@ -0,0 +1,206 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import unittest
+
+import oneflow as flow
+import oneflow.unittest
+
+# Run reduce_scatter, all_to_all and gather on CPU in every process launched by
+# oneflow.distributed.launch, and compare them with the implementations based on
+# all-reduce, scatter and broadcast they replace. Rank 0 writes the latency of
+# every op to the result file.
+_BENCHMARK_SCRIPT = r"""
+import json
+import sys
+import time
+
+import numpy as np
+import oneflow as flow
+
+
+def legacy_reduce_scatter(output, input_list):
+    placement = flow.env.all_device_placement("cpu")
+    reduced = []
+    for tensor in input_list:
+        tensor = tensor.to_global(placement=placement, sbp=flow.sbp.partial_sum)
+        tensor = tensor.to_global(placement=placement, sbp=flow.sbp.broadcast)
+        reduced.append(tensor.to_local())
+    output.data = reduced[flow.env.get_rank()]
+
+
+def legacy_all_to_all(output_list, input_list):
+    for i in range(flow.env.get_world_size()):
+        flow.comm.scatter(
+            output_list[i], input_list if i == flow.env.get_rank() else [], src=i
+        )
+
+
+def legacy_gather(tensor, gather_list, dst):
+    placement = flow.env.all_device_placement("cpu")
+    tensor = tensor.expand(*([1] + list(tensor.shape)))
+    tensor = tensor.to_global(placement=placement, sbp=flow.sbp.split(0))
+    tensor = tensor.to_global(placement=placement, sbp=flow.sbp.broadcast)
+    for i in range(tensor.shape[0]):
+        gather_list[i] = tensor[i].to_local()
+
+
+def sync():
+    placement = flow.env.all_device_placement("cpu")
+    flow.zeros(1).to_global(placement=placement, sbp=flow.sbp.partial_sum).to_global(
+        placement=placement, sbp=flow.sbp.broadcast
+    ).numpy()
+
+
+def bench(fn, iters):
+    fn()
+    sync()
+    start = time.perf_counter()
+    for _ in range(iters):
+        fn()
+    sync()
+    return (time.perf_counter() - start) / iters
+
+
+numel, iters, result_path = int(sys.argv[1]), int(sys.argv[2]), sys.argv[3]
+world_size = flow.env.get_world_size()
+rank = flow.env.get_rank()
+inputs = [flow.randn(numel) for _ in range(world_size)]
+tensor = flow.randn(numel)
+
+outputs = {}
+
+
+def run(name, impl, fn):
+    outputs[(name, impl)] = [flow.zeros(numel) for _ in range(world_size)]
+    return bench(lambda: fn(outputs[(name, impl)]), iters)
+
+
+latency = {
+    ("reduce_scatter", "native"): run(
+        "reduce_scatter", "native", lambda o: flow.comm.reduce_scatter(o[0], inputs)
+    ),
+    ("reduce_scatter", "legacy"): run(
+        "reduce_scatter", "legacy", lambda o: legacy_reduce_scatter(o[0], inputs)
+    ),
+    ("all_to_all", "native"): run(
+        "all_to_all", "native", lambda o: flow.comm.all_to_all(o, inputs)
+    ),
+    ("all_to_all", "legacy"): run(
+        "all_to_all", "legacy", lambda o: legacy_all_to_all(o, inputs)
+    ),
+    ("gather", "native"): run(
+        "gather", "native", lambda o: flow.comm.gather(tensor, gather_list=o, dst=0)
+    ),
+    ("gather", "legacy"): run(
+        "gather", "legacy", lambda o: legacy_gather(tensor, o, 0)
+    ),
+}
+
+for name in ("reduce_scatter", "all_to_all", "gather"):
+    if name == "reduce_scatter":
+        native = outputs[(name, "native")][:1]
+        legacy = outputs[(name, "legacy")][:1]
+    elif name == "gather" and rank != 0:
+        # only dst receives data from the native gather
+        continue
+    else:
+        native = outputs[(name, "native")]
+        legacy = outputs[(name, "legacy")]
+    for a, b in zip(native, legacy):
+        assert np.allclose(a.numpy(), b.numpy(), atol=1e-5), name
+
+if rank == 0:
+    with open(result_path, "w") as f:
+        json.dump({"%s/%s" % k: v for k, v in latency.items()}, f)
+"""
+
+
+def _bytes_moved(name, impl, world_size, chunk_bytes):
+    # Total bytes sent by all ranks for one call, assuming ring all-reduce and
+    # all-gather.
+    w = world_size
+    if name == "reduce_scatter":
+        return (w - 1) * w * chunk_bytes * (2 if impl == "legacy" else 1)
+    if name == "all_to_all":
+        return (w - 1) * w * chunk_bytes
+    # The native gather sends every chunk to dst only, the legacy one is an
+    # all-gather.
+    return (w - 1) * chunk_bytes * (w if impl == "legacy" else 1)
+
+
+def _free_port():
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _run_benchmark(world_size, numel, iters, tmp_dir):
+    script_path = os.path.join(tmp_dir, "comm_ops_benchmark.py")
+    with open(script_path, "w") as f:
+        f.write(_BENCHMARK_SCRIPT)
+    result_path = os.path.join(tmp_dir, f"result_{world_size}.json")
+    subprocess.check_call(
+        [
+            sys.executable,
+            "-m",
+            "oneflow.distributed.launch",
+            "--nproc_per_node",
+            str(world_size),
+            "--master_port",
+            str(_free_port()),
+            script_path,
+            str(numel),
+            str(iters),
+            result_path,
+        ]
+    )
+    with open(result_path) as f:
+        return json.load(f)
+
+
+@flow.unittest.skip_unless_1n1d()
+class TestCommOpsBenchmark(oneflow.unittest.TestCase):
+    def test_comm_ops_vs_world_size(test_case):
+        world_sizes = [
+            int(x)
+            for x in os.getenv("ONEFLOW_TEST_COMM_BENCHMARK_WORLD_SIZES", "2,4").split(
+                ","
+            )
+        ]
+        numel = int(os.getenv("ONEFLOW_TEST_COMM_BENCHMARK_NUMEL", 1 << 20))
+        iters = int(os.getenv("ONEFLOW_TEST_COMM_BENCHMARK_ITERS", 10))
+        chunk_bytes = numel * 4
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            for world_size in world_sizes:
+                result = _run_benchmark(world_size, numel, iters, tmp_dir)
+                for name in ("reduce_scatter", "all_to_all", "gather"):
+                    for impl in ("legacy", "native"):
+                        moved = _bytes_moved(name, impl, world_size, chunk_bytes)
+                        print(
+                            f"world_size: {world_size}, {name} ({impl}):"
+                            f" {result[f'{name}/{impl}'] * 1000:.2f}ms,"
+                            f" {moved / (1 << 20):.0f}MB moved"
+                        )
+
+
+if __name__ == "__main__":
+    unittest.main()
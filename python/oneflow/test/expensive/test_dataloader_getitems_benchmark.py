@@ -0,0 +1,86 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import os
+import time
+import unittest
+
+import numpy as np
+
+import oneflow as flow
+import oneflow.unittest
+from oneflow.utils.data import DataLoader, Dataset
+
+
+class _TabularDataset(Dataset):
+    def __init__(self, num_samples, num_features):
+        self.features = np.random.rand(num_samples, num_features).astype(np.float32)
+        self.labels = np.random.randint(0, 2, (num_samples,)).astype(np.int64)
+
+    def __getitem__(self, index):
+        return self.features[index], self.labels[index]
+
+    def __len__(self):
+        return len(self.labels)
+
+
+class _BatchedTabularDataset(_TabularDataset):
+    def __getitems__(self, indices):
+        return list(zip(self.features[indices], self.labels[indices]))
+
+
+def _per_sample_collate(batch):
+    # the collate before preallocation: convert every sample to a tensor, then stack
+    features, labels = zip(*batch)
+    return (
+        flow._C.stack([flow.tensor(x) for x in features], dim=0),
+        flow.tensor(np.array(labels)),
+    )
+
+
+def _samples_per_second(loader, num_samples):
+    start = time.perf_counter()
+    for features, labels in loader:
+        pass
+    return num_samples / (time.perf_counter() - start)
+
+
+@flow.unittest.skip_unless_1n1d()
+class TestDataLoaderGetItemsBenchmark(oneflow.unittest.TestCase):
+    def test_tabular_dataloader_throughput(test_case):
+        num_samples = int(os.getenv("ONEFLOW_TEST_GETITEMS_BENCHMARK_SAMPLES", 1 << 17))
+        batch_size = int(os.getenv("ONEFLOW_TEST_GETITEMS_BENCHMARK_BATCH_SIZE", 1024))
+        num_features = 32
+        per_sample = DataLoader(
+            _TabularDataset(num_samples, num_features),
+            batch_size=batch_size,
+            collate_fn=_per_sample_collate,
+        )
+        batched = DataLoader(
+            _BatchedTabularDataset(num_samples, num_features), batch_size=batch_size
+        )
+        per_sample_throughput = _samples_per_second(per_sample, num_samples)
+        batched_throughput = _samples_per_second(batched, num_samples)
+        print(
+            f"{num_samples} samples of {num_features} features,"
+            f" batch size {batch_size}, per-sample fetch and collate:"
+            f" {per_sample_throughput:.0f} samples/s, __getitems__ and"
+            f" preallocated collate: {batched_throughput:.0f} samples/s"
+        )
+        test_case.assertGreater(batched_throughput, per_sample_throughput)
+
+
+if __name__ == "__main__":
+    unittest.main()
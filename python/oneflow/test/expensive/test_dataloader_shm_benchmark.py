@@ -0,0 +1,79 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import os
+import time
+import unittest
+
+import oneflow as flow
+import oneflow.unittest
+from oneflow.utils.data import DataLoader, Dataset
+
+
+class _ImageDataset(Dataset):
+    def __init__(self, num_samples, image_size):
+        self.num_samples = num_samples
+        self.image_size = image_size
+
+    def __len__(self):
+        return self.num_samples
+
+    def __getitem__(self, index):
+        return flow.ones(3, self.image_size, self.image_size) * index
+
+
+def _stack_collate(batch):
+    # collate without shared memory, the batch is copied when it is sent to the
+    # main process
+    return flow.stack(batch)
+
+
+def _throughput(loader, num_epochs):
+    nbytes = 0
+    start = time.perf_counter()
+    for _ in range(num_epochs):
+        for batch in loader:
+            nbytes += batch.numel() * 4
+    return nbytes / (time.perf_counter() - start) / (1 << 20)
+
+
+@flow.unittest.skip_unless_1n1d()
+class TestDataLoaderSharedMemoryBenchmark(oneflow.unittest.TestCase):
+    def test_dataloader_shared_memory_throughput(test_case):
+        num_workers = int(os.getenv("ONEFLOW_TEST_SHM_BENCHMARK_NUM_WORKERS", 4))
+        batch_size = int(os.getenv("ONEFLOW_TEST_SHM_BENCHMARK_BATCH_SIZE", 64))
+        num_epochs = int(os.getenv("ONEFLOW_TEST_SHM_BENCHMARK_EPOCHS", 2))
+        dataset = _ImageDataset(batch_size * 16, 224)
+        result = {}
+        for name, collate_fn in (("copy", _stack_collate), ("shared", None)):
+            loader = DataLoader(
+                dataset,
+                batch_size=batch_size,
+                num_workers=num_workers,
+                collate_fn=collate_fn,
+                persistent_workers=True,
+            )
+            # warm up the workers and the shared memory pool
+            next(iter(loader))
+            result[name] = _throughput(loader, num_epochs)
+        print(
+            f"batches of {batch_size}x3x224x224 float32 with {num_workers} workers,"
+            f" copied: {result['copy']:.0f}MB/s,"
+            f" shared memory: {result['shared']:.0f}MB/s"
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
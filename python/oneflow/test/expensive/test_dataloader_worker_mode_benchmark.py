@@ -0,0 +1,102 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import os
+import time
+import unittest
+import zlib
+
+import numpy as np
+
+import oneflow as flow
+import oneflow.unittest
+from oneflow.utils.data import DataLoader, Dataset
+
+
+class _DecodeHeavyDataset(Dataset):
+    # zlib and numpy release the GIL, like image decoding and augmentation do
+    def __init__(self, num_samples, image_size):
+        image = np.random.randint(0, 16, (image_size, image_size, 3), dtype=np.uint8)
+        self.encoded = zlib.compress(image.tobytes())
+        self.image_size = image_size
+        self.num_samples = num_samples
+
+    def __getitem__(self, index):
+        image = np.frombuffer(zlib.decompress(self.encoded), dtype=np.uint8)
+        image = image.reshape(self.image_size, self.image_size, 3)
+        image = (image.astype(np.float32) - 7.5) / 4.5
+        return np.ascontiguousarray(image.transpose(2, 0, 1)), index
+
+    def __len__(self):
+        return self.num_samples
+
+
+class _PythonHeavyDataset(Dataset):
+    # tokenization in pure Python holds the GIL
+    def __init__(self, num_samples, num_words):
+        self.text = " ".join("word%d" % (i % 97) for i in range(num_words))
+        self.num_samples = num_samples
+
+    def __getitem__(self, index):
+        vocab = {}
+        ids = [vocab.setdefault(word, len(vocab)) for word in self.text.split()]
+        return np.array(ids[:64], dtype=np.int64), index
+
+    def __len__(self):
+        return self.num_samples
+
+
+def _samples_per_second(dataset, batch_size, num_workers, worker_mode):
+    loader = DataLoader(
+        dataset,
+        batch_size=batch_size,
+        num_workers=num_workers,
+        worker_mode=worker_mode,
+    )
+    start = time.perf_counter()
+    num_samples = 0
+    for _, indices in loader:
+        num_samples += indices.shape[0]
+    assert num_samples == len(dataset)
+    return num_samples / (time.perf_counter() - start)
+
+
+@flow.unittest.skip_unless_1n1d()
+class TestDataLoaderWorkerModeBenchmark(oneflow.unittest.TestCase):
+    def test_process_vs_thread_workers(test_case):
+        num_samples = int(
+            os.getenv("ONEFLOW_TEST_WORKER_MODE_BENCHMARK_SAMPLES", 1 << 12)
+        )
+        num_workers = int(os.getenv("ONEFLOW_TEST_WORKER_MODE_BENCHMARK_WORKERS", 4))
+        batch_size = 32
+        for name, dataset in [
+            ("decode-heavy", _DecodeHeavyDataset(num_samples, 224)),
+            ("python-heavy", _PythonHeavyDataset(num_samples, 4096)),
+        ]:
+            throughput = {
+                worker_mode: _samples_per_second(
+                    dataset, batch_size, num_workers, worker_mode
+                )
+                for worker_mode in ["process", "thread"]
+            }
+            print(
+                f"{name} dataset, {num_samples} samples, {num_workers} workers,"
+                f" process workers: {throughput['process']:.0f} samples/s,"
+                f" thread workers: {throughput['thread']:.0f} samples/s"
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,135 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import unittest
+
+import oneflow as flow
+import oneflow.unittest
+
+# Train a model with one large embedding and many small layers on CPU in every
+# process launched by oneflow.distributed.launch, with the bucketing by parameter
+# count DDP used before and with the bucketing by bytes. Rank 0 writes the step
+# time of both to the result file.
+_BENCHMARK_SCRIPT = r"""
+import json
+import sys
+import time
+
+import oneflow as flow
+from oneflow.nn.parallel import DistributedDataParallel as ddp
+
+
+class Model(flow.nn.Module):
+    def __init__(self, num_embeddings, num_layers):
+        super().__init__()
+        self.embedding = flow.nn.Embedding(num_embeddings, 64)
+        self.layers = flow.nn.Sequential(
+            *[flow.nn.Linear(64, 64) for _ in range(num_layers)]
+        )
+
+    def forward(self, x):
+        return self.layers(self.embedding(x)).sum()
+
+
+def step_time(ddp_kwargs, num_embeddings, num_layers, iters):
+    flow.manual_seed(0)
+    model = ddp(Model(num_embeddings, num_layers), **ddp_kwargs)
+    optimizer = flow.optim.SGD(model.parameters(), lr=0.01)
+    x = flow.randint(0, num_embeddings, (256,))
+
+    def step():
+        loss = model(x)
+        loss.backward()
+        optimizer.step()
+        optimizer.zero_grad()
+        return loss
+
+    # the first iterations also rebuild the buckets
+    for _ in range(2):
+        step().numpy()
+    start = time.perf_counter()
+    for _ in range(iters):
+        loss = step()
+    loss.numpy()
+    return (time.perf_counter() - start) / iters
+
+
+num_embeddings, num_layers = int(sys.argv[1]), int(sys.argv[2])
+iters, result_path = int(sys.argv[3]), sys.argv[4]
+result = {
+    "count": step_time(
+        dict(bucket_size=10, rebuild_buckets=False), num_embeddings, num_layers, iters
+    ),
+    "bytes": step_time(dict(), num_embeddings, num_layers, iters),
+}
+if flow.env.get_rank() == 0:
+    with open(result_path, "w") as f:
+        json.dump(result, f)
+"""
+
+
+def _free_port():
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@flow.unittest.skip_unless_1n1d()
+class TestDDPBenchmark(oneflow.unittest.TestCase):
+    def test_ddp_bucketing_step_time(test_case):
+        world_size = int(os.getenv("ONEFLOW_TEST_DDP_BENCHMARK_WORLD_SIZE", 2))
+        num_embeddings = int(
+            os.getenv("ONEFLOW_TEST_DDP_BENCHMARK_EMBEDDINGS", 1 << 18)
+        )
+        num_layers = int(os.getenv("ONEFLOW_TEST_DDP_BENCHMARK_LAYERS", 32))
+        iters = int(os.getenv("ONEFLOW_TEST_DDP_BENCHMARK_ITERS", 10))
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            script_path = os.path.join(tmp_dir, "ddp_benchmark.py")
+            with open(script_path, "w") as f:
+                f.write(_BENCHMARK_SCRIPT)
+            result_path = os.path.join(tmp_dir, "result.json")
+            subprocess.check_call(
+                [
+                    sys.executable,
+                    "-m",
+                    "oneflow.distributed.launch",
+                    "--nproc_per_node",
+                    str(world_size),
+                    "--master_port",
+                    str(_free_port()),
+                    script_path,
+                    str(num_embeddings),
+                    str(num_layers),
+                    str(iters),
+                    result_path,
+                ]
+            )
+            with open(result_path) as f:
+                result = json.load(f)
+        print(
+            f"world_size: {world_size}, step time with buckets of 10 params:"
+            f" {result['count'] * 1000:.2f}ms, with buckets of 25MB:"
+            f" {result['bytes'] * 1000:.2f}ms"
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
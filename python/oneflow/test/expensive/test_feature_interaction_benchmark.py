@@ -0,0 +1,122 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import os
+import time
+import unittest
+
+import numpy as np
+
+import oneflow as flow
+import oneflow.unittest
+
+
+def _unfused_dot_interaction(dense, sparse, li, lj):
+    T = flow.cat([dense.unsqueeze(1), sparse], dim=1)
+    Z = flow.matmul(T, T, transpose_b=True)
+    return flow.cat([dense, Z[:, li, lj]], dim=1)
+
+
+def _fused_dot_interaction(dense, sparse, li, lj):
+    return flow._C.fused_dot_feature_interaction(
+        [dense.unsqueeze(1), sparse],
+        output_concat=dense,
+        self_interaction=False,
+        output_padding=0,
+        pooling="none",
+    )
+
+
+def _unfused_cross_interaction(x, weight, x0, bias):
+    return flow._C.matmul(x, weight, transpose_b=True) * x0 + bias + x
+
+
+def _fused_cross_interaction(x, weight, x0, bias):
+    return flow._C.fused_cross_feature_interaction(x, weight, x0, bias, "vector")
+
+
+def _run_ms(fn, args, num_iters, backward):
+    def run():
+        out = fn(*args)
+        if backward:
+            out.sum().backward()
+        return out
+
+    # warm up, numpy() waits for the eager queue to drain
+    run().numpy()
+    start = time.perf_counter()
+    for _ in range(num_iters):
+        out = run()
+    out.numpy()
+    return (time.perf_counter() - start) * 1000 / num_iters
+
+
+@flow.unittest.skip_unless_1n1d()
+class TestFeatureInteractionBenchmark(oneflow.unittest.TestCase):
+    def test_dlrm_feature_interaction_fused_vs_unfused(test_case):
+        batch_size = int(os.getenv("ONEFLOW_TEST_INTERACTION_BENCHMARK_BATCH", 2048))
+        num_sparse = int(os.getenv("ONEFLOW_TEST_INTERACTION_BENCHMARK_SPARSE", 26))
+        embedding_size = int(
+            os.getenv("ONEFLOW_TEST_INTERACTION_BENCHMARK_EMBEDDING", 128)
+        )
+        num_iters = int(os.getenv("ONEFLOW_TEST_INTERACTION_BENCHMARK_ITERS", 10))
+        num_rows = num_sparse + 1
+        li = flow.tensor([i for i in range(num_rows) for j in range(i)])
+        lj = flow.tensor([j for i in range(num_rows) for j in range(i)])
+        for backward in [False, True]:
+            dense = flow.randn(batch_size, embedding_size, requires_grad=backward)
+            sparse = flow.randn(
+                batch_size, num_sparse, embedding_size, requires_grad=backward
+            )
+            x, x0 = [
+                flow.randn(batch_size, embedding_size, requires_grad=backward)
+                for _ in range(2)
+            ]
+            weight = flow.randn(1, embedding_size, requires_grad=backward)
+            bias = flow.randn(embedding_size, requires_grad=backward)
+            test_case.assertTrue(
+                np.allclose(
+                    _fused_dot_interaction(dense, sparse, li, lj).numpy(),
+                    _unfused_dot_interaction(dense, sparse, li, lj).numpy(),
+                    rtol=1e-3,
+                    atol=1e-3,
+                )
+            )
+            for name, fused, unfused, args in [
+                (
+                    "dot",
+                    _fused_dot_interaction,
+                    _unfused_dot_interaction,
+                    (dense, sparse, li, lj),
+                ),
+                (
+                    "cross",
+                    _fused_cross_interaction,
+                    _unfused_cross_interaction,
+                    (x, weight, x0, bias),
+                ),
+            ]:
+                fused_ms = _run_ms(fused, args, num_iters, backward)
+                unfused_ms = _run_ms(unfused, args, num_iters, backward)
+                print(
+                    f"{name} interaction on cpu, batch={batch_size},"
+                    f" features={num_rows}, embedding={embedding_size},"
+                    f" {'forward+backward' if backward else 'forward'},"
+                    f" unfused: {unfused_ms:.2f} ms, fused: {fused_ms:.2f} ms"
+                )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+import oneflow as flow
+import oneflow.unittest
+
+# Measure the time from graph construction to the end of the first call, which is the
+# startup cost paid by every process restart.
+_BENCHMARK_SCRIPT = r"""
+import json
+import sys
+import time
+
+sys.path.insert(0, sys.argv[3])
+from resnet50_model import resnet50
+
+import oneflow as flow
+from oneflow.nn.graph.compile_cache import compile_cache_stats
+
+cache_dir, device = sys.argv[1], sys.argv[2]
+model = resnet50().to(device)
+optimizer = flow.optim.SGD(model.parameters(), lr=0.1, momentum=0.9)
+
+
+class TrainGraph(flow.nn.Graph):
+    def __init__(self):
+        super().__init__()
+        self.model = model
+        self.add_optimizer(optimizer)
+        self.config.enable_compile_cache(True, cache_dir=cache_dir)
+
+    def build(self, x):
+        loss = self.model(x).sum()
+        loss.backward()
+        return loss
+
+
+x = flow.randn(2, 3, 224, 224, device=device)
+start = time.perf_counter()
+graph = TrainGraph()
+graph(x).numpy()
+startup = time.perf_counter() - start
+print(json.dumps({"startup": startup, "stats": compile_cache_stats(cache_dir)}))
+"""
+
+
+def _run_benchmark_script(cache_dir, device):
+    out = subprocess.check_output(
+        [
+            sys.executable,
+            "-c",
+            _BENCHMARK_SCRIPT,
+            cache_dir,
+            device,
+            os.path.dirname(os.path.abspath(__file__)),
+        ]
+    )
+    return json.loads(out.decode().strip().splitlines()[-1])
+
+
+def _test_compile_cache_cold_vs_warm_start(test_case, device):
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cold = _run_benchmark_script(cache_dir, device)
+        warm = _run_benchmark_script(cache_dir, device)
+    test_case.assertEqual(cold["stats"]["misses"], 1)
+    test_case.assertEqual(warm["stats"]["hits"], 1)
+    print(
+        f"resnet50 train graph on {device}, cold start: {cold['startup']:.2f}s,"
+        f" warm start: {warm['startup']:.2f}s,"
+        f" speedup: {cold['startup'] / warm['startup']:.2f}x"
+    )
+
+
+@flow.unittest.skip_unless_1n1d()
+class TestGraphCompileCacheBenchmark(oneflow.unittest.TestCase):
+    def test_compile_cache_cold_vs_warm_start_cpu(test_case):
+        _test_compile_cache_cold_vs_warm_start(test_case, "cpu")
+
+    @unittest.skipIf(os.getenv("ONEFLOW_TEST_CPU_ONLY"), "only test cpu cases")
+    def test_compile_cache_cold_vs_warm_start_gpu(test_case):
+        _test_compile_cache_cold_vs_warm_start(test_case, "cuda")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+import oneflow as flow
+import oneflow.unittest
+
+# Measure the time and the peak RSS increment of loading a checkpoint in a fresh
+# process, and touching only one of its tensors.
+_BENCHMARK_SCRIPT = r"""
+import json
+import resource
+import sys
+import time
+
+import oneflow as flow
+
+save_dir, mmap = sys.argv[1], sys.argv[2] == "1"
+rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+start = time.perf_counter()
+state_dict = flow.load(save_dir, mmap=mmap)
+startup = time.perf_counter() - start
+state_dict["weight_0"].sum().numpy()
+rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({"startup": startup, "peak_rss_mb": (rss_after - rss_before) / 1024}))
+"""
+
+
+def _run_benchmark_script(save_dir, mmap):
+    out = subprocess.check_output(
+        [sys.executable, "-c", _BENCHMARK_SCRIPT, save_dir, "1" if mmap else "0"]
+    )
+    return json.loads(out.decode().strip().splitlines()[-1])
+
+
+@flow.unittest.skip_unless_1n1d()
+class TestMmapLoadBenchmark(oneflow.unittest.TestCase):
+    def test_mmap_load_vs_eager_load(test_case):
+        num_tensors = int(os.getenv("ONEFLOW_TEST_MMAP_LOAD_NUM_TENSORS", 16))
+        # 64MB per tensor
+        state_dict = {
+            f"weight_{i}": flow.randn(4096, 4096) for i in range(num_tensors)
+        }
+        with tempfile.TemporaryDirectory() as save_dir:
+            flow.save(state_dict, save_dir)
+            del state_dict
+            eager = _run_benchmark_script(save_dir, mmap=False)
+            mmap = _run_benchmark_script(save_dir, mmap=True)
+        print(
+            f"load {num_tensors * 64}MB checkpoint,"
+            f" eager: {eager['startup']:.2f}s {eager['peak_rss_mb']:.0f}MB,"
+            f" mmap: {mmap['startup']:.2f}s {mmap['peak_rss_mb']:.0f}MB"
+        )
+        test_case.assertLess(mmap["startup"], eager["startup"])
+        test_case.assertLess(mmap["peak_rss_mb"], eager["peak_rss_mb"])
+
+
+if __name__ == "__main__":
+    unittest.main()
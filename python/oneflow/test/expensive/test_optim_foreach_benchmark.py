@@ -0,0 +1,75 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import os
+import time
+import unittest
+
+import oneflow as flow
+import oneflow.unittest
+from oneflow.nn.parameter import Parameter
+
+
+def _make_params(num_params, device):
+    # many small tensors, like the biases and norms of a deep model
+    shapes = [(64,), (16, 16), (8,), (32, 4)]
+    params = []
+    for i in range(num_params):
+        param = Parameter(flow.randn(*shapes[i % len(shapes)], device=device))
+        param.grad = flow.randn(*param.shape, device=device)
+        params.append(param)
+    return params
+
+
+def _step_ms(optim_cls, optim_kwargs, device, num_params, num_steps, foreach):
+    params = _make_params(num_params, device)
+    optimizer = optim_cls(params, foreach=foreach, **optim_kwargs)
+    # the first step allocates the optimizer state, numpy() waits for it
+    optimizer.step()
+    params[0].numpy()
+    start = time.perf_counter()
+    for _ in range(num_steps):
+        optimizer.step()
+    params[0].numpy()
+    return (time.perf_counter() - start) * 1000 / num_steps
+
+
+@flow.unittest.skip_unless_1n1d()
+class TestOptimForeachBenchmark(oneflow.unittest.TestCase):
+    def test_foreach_vs_per_param_step(test_case):
+        num_params = int(os.getenv("ONEFLOW_TEST_FOREACH_BENCHMARK_PARAMS", 1000))
+        num_steps = int(os.getenv("ONEFLOW_TEST_FOREACH_BENCHMARK_STEPS", 20))
+        devices = ["cpu"] if os.getenv("ONEFLOW_TEST_CPU_ONLY") else ["cpu", "cuda"]
+        for device in devices:
+            for optim_cls, optim_kwargs in [
+                (flow.optim.SGD, {"lr": 0.1}),
+                (flow.optim.Adam, {"lr": 1e-3}),
+                (flow.optim.AdamW, {"lr": 1e-3, "weight_decay": 0.01}),
+            ]:
+                step_ms = {
+                    foreach: _step_ms(
+                        optim_cls, optim_kwargs, device, num_params, num_steps, foreach
+                    )
+                    for foreach in [False, True]
+                }
+                print(
+                    f"{optim_cls.__name__} on {device}, {num_params} params,"
+                    f" per-param step: {step_ms[False]:.2f} ms,"
+                    f" foreach step: {step_ms[True]:.2f} ms"
+                )
+
+
+if __name__ == "__main__":
+    unittest.main()
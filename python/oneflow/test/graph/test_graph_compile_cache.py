@@ -0,0 +1,143 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+
+import oneflow as flow
+import oneflow.unittest
+
+_TRAIN_SCRIPT = r"""
+import json
+import sys
+import numpy as np
+import oneflow as flow
+from oneflow.nn.graph.compile_cache import compile_cache_stats
+
+cache_dir, device = sys.argv[1], sys.argv[2]
+flow.manual_seed(1)
+model = flow.nn.Sequential(flow.nn.Linear(8, 16), flow.nn.ReLU(), flow.nn.Linear(16, 4))
+model.to(device)
+optimizer = flow.optim.SGD(model.parameters(), lr=0.1)
+
+
+class TrainGraph(flow.nn.Graph):
+    def __init__(self):
+        super().__init__()
+        self.model = model
+        self.add_optimizer(optimizer)
+        self.config.enable_compile_cache(True, cache_dir=cache_dir)
+
+    def build(self, x):
+        loss = self.model(x).sum()
+        loss.backward()
+        return loss
+
+
+graph = TrainGraph()
+x = flow.tensor(np.arange(32, dtype=np.float32).reshape(4, 8) / 32.0, device=device)
+losses = [graph(x).numpy().item() for _ in range(3)]
+print(json.dumps({"losses": losses, "stats": compile_cache_stats(cache_dir)}))
+"""
+
+
+def _run_train_script(cache_dir, device):
+    out = subprocess.check_output(
+        [sys.executable, "-c", _TRAIN_SCRIPT, cache_dir, device]
+    )
+    return json.loads(out.decode().strip().splitlines()[-1])
+
+
+def _test_graph_compile_cache(test_case, device):
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cold = _run_train_script(cache_dir, device)
+        test_case.assertEqual(cold["stats"]["hits"], 0)
+        test_case.assertEqual(cold["stats"]["misses"], 1)
+        test_case.assertEqual(cold["stats"]["saves"], 1)
+        test_case.assertEqual(len(os.listdir(cache_dir)), 1)
+
+        warm = _run_train_script(cache_dir, device)
+        test_case.assertEqual(warm["stats"]["hits"], 1)
+        test_case.assertEqual(warm["stats"]["misses"], 0)
+        test_case.assertEqual(warm["stats"]["saves"], 0)
+        test_case.assertTrue(np.allclose(cold["losses"], warm["losses"], 1e-5, 1e-5))
+
+
+def _test_graph_compile_cache_key(test_case):
+    from oneflow.nn.graph.compile_cache import GraphCompileCache
+
+    class LinearGraph(flow.nn.Graph):
+        def __init__(self, linear):
+            super().__init__()
+            self.linear = linear
+
+        def build(self, x):
+            return self.linear(x)
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        g = LinearGraph(flow.nn.Linear(3, 8))
+        g(flow.randn(4, 3))
+        cache = GraphCompileCache(cache_dir)
+        protos = (g._graph_proto, g._config_proto, g._session_resource_proto)
+        key = cache.key(*protos)
+        test_case.assertEqual(key, cache.key(*protos))
+
+        # Compile-affecting env flags are part of the key, the cache dir is not.
+        flag = "ONEFLOW_ENABLE_MULTI_TENSOR_MODEL_UPDATE"
+        env_names = (flag, "ONEFLOW_GRAPH_COMPILE_CACHE_DIR")
+        saved_env = {k: os.environ.get(k) for k in env_names}
+        try:
+            os.environ["ONEFLOW_GRAPH_COMPILE_CACHE_DIR"] = cache_dir
+            test_case.assertEqual(key, cache.key(*protos))
+            os.environ[flag] = "compile-cache-key-test"
+            test_case.assertNotEqual(key, cache.key(*protos))
+        finally:
+            for k, v in saved_env.items():
+                if v is None:
+                    os.environ.pop(k, None)
+                else:
+                    os.environ[k] = v
+        # Compiling another graph generates ids the restored plan may use.
+        LinearGraph(flow.nn.Linear(3, 8))(flow.randn(4, 3))
+        test_case.assertNotEqual(key, cache.key(*protos))
+        test_case.assertIsNone(cache.load(key))
+        cache.save(key, g._full_graph_proto, b"job", b"plan")
+        entry = cache.load(key)
+        test_case.assertEqual(entry.full_job_proto, g._full_graph_proto)
+        test_case.assertEqual(entry.compiled_job_str, b"job")
+        test_case.assertEqual(entry.plan_str, b"plan")
+
+
+@flow.unittest.skip_unless_1n1d()
+class TestGraphCompileCache(oneflow.unittest.TestCase):
+    def test_graph_compile_cache_key(test_case):
+        _test_graph_compile_cache_key(test_case)
+
+    def test_graph_compile_cache_cpu(test_case):
+        _test_graph_compile_cache(test_case, "cpu")
+
+    @unittest.skipIf(os.getenv("ONEFLOW_TEST_CPU_ONLY"), "only test cpu cases")
+    def test_graph_compile_cache_gpu(test_case):
+        _test_graph_compile_cache(test_case, "cuda")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,126 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import os
+import unittest
+import numpy as np
+
+import oneflow as flow
+import oneflow.unittest
+
+
+class _LinearGraph(flow.nn.Graph):
+    def __init__(self, linear, **shape_bucket_kwargs):
+        super().__init__()
+        self.linear = linear
+        self.config.enable_shape_buckets(True, **shape_bucket_kwargs)
+
+    def build(self, x):
+        return self.linear(x)
+
+
+def _test_shape_bucket_multi_plans(test_case, device):
+    linear = flow.nn.Linear(8, 4).to(device)
+    linear.eval()
+    graph = _LinearGraph(linear, max_num_plans=2)
+
+    def check(seq_len):
+        x = flow.randn(2, seq_len, 8, device=device)
+        test_case.assertTrue(
+            np.allclose(graph(x).numpy(), linear(x).numpy(), 1e-4, 1e-4)
+        )
+
+    check(3)
+    check(3)
+    check(5)
+    check(3)
+    # Plan of seq_len 5 is evicted, since the capacity is 2 and 7 is new.
+    check(7)
+    check(5)
+
+    stats = list(graph.shape_plan_stats().values())
+    test_case.assertEqual(len(stats), 3)
+    seq3, seq5, seq7 = stats
+    test_case.assertEqual((seq3["hits"], seq3["misses"]), (2, 1))
+    test_case.assertEqual((seq5["hits"], seq5["misses"]), (0, 2))
+    test_case.assertEqual(seq5["evictions"], 1)
+    test_case.assertEqual((seq7["hits"], seq7["misses"]), (0, 1))
+    test_case.assertGreater(seq7["compile_time"], 0)
+    test_case.assertFalse(seq3["cached"])
+    test_case.assertTrue(seq5["cached"])
+    test_case.assertTrue(seq7["cached"])
+
+
+def _test_shape_bucket_padding(test_case, device):
+    linear = flow.nn.Linear(8, 4).to(device)
+    linear.eval()
+    graph = _LinearGraph(linear, buckets={1: [4, 8]})
+    for seq_len in (1, 3, 4, 6, 8):
+        x = flow.randn(2, seq_len, 8, device=device)
+        out = graph(x)
+        expected_len = 4 if seq_len <= 4 else 8
+        test_case.assertEqual(out.shape, flow.Size([2, expected_len, 4]))
+        test_case.assertTrue(
+            np.allclose(
+                out[:, :seq_len].numpy(), linear(x).numpy(), 1e-4, 1e-4
+            )
+        )
+    # Only two plans are compiled for five sequence lengths.
+    stats = graph.shape_plan_stats()
+    test_case.assertEqual(len(stats), 2)
+    test_case.assertEqual(sum(s["misses"] for s in stats.values()), 2)
+    test_case.assertEqual(sum(s["hits"] for s in stats.values()), 3)
+
+
+def _test_shape_bucket_share_parameters(test_case, device):
+    linear = flow.nn.Linear(8, 4).to(device)
+    linear.eval()
+    graph = _LinearGraph(linear)
+    x1 = flow.randn(3, 8, device=device)
+    x2 = flow.randn(5, 8, device=device)
+    graph(x1)
+    graph(x2)
+    # Updating the parameter is seen by all plans.
+    with flow.no_grad():
+        linear.weight.fill_(1.0)
+    for x in (x1, x2):
+        test_case.assertTrue(
+            np.allclose(graph(x).numpy(), linear(x).numpy(), 1e-4, 1e-4)
+        )
+
+
+def _devices():
+    if os.getenv("ONEFLOW_TEST_CPU_ONLY"):
+        return ("cpu",)
+    return ("cpu", "cuda")
+
+
+@flow.unittest.skip_unless_1n1d()
+class TestGraphShapeBucket(oneflow.unittest.TestCase):
+    def test_shape_bucket_multi_plans(test_case):
+        for device in _devices():
+            _test_shape_bucket_multi_plans(test_case, device)
+
+    def test_shape_bucket_padding(test_case):
+        for device in _devices():
+            _test_shape_bucket_padding(test_case, device)
+
+    def test_shape_bucket_share_parameters(test_case):
+        for device in _devices():
+            _test_shape_bucket_share_parameters(test_case, device)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,234 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import os
+import unittest
+from collections import OrderedDict
+
+import numpy as np
+from oneflow.test_utils.test_util import GenArgList
+
+import oneflow as flow
+from oneflow.nn.parameter import Parameter
+
+
+def _devices():
+    if os.getenv("ONEFLOW_TEST_CPU_ONLY"):
+        return ["cpu"]
+    return ["cpu", "cuda"]
+
+
+def _make_params(device, shapes):
+    return [
+        Parameter(
+            flow.tensor(np.random.uniform(size=s).astype(np.float32), device=device)
+        )
+        for s in shapes
+    ]
+
+
+def _test_grad_scaler_step_impl(test_case, device):
+    shapes = [(3,), (4, 5), (1,), (2, 3)] * 10
+    params = _make_params(device, shapes)
+    ref_params = [Parameter(p.detach().clone()) for p in params]
+    optimizer = flow.optim.SGD(params, lr=0.1)
+    ref_optimizer = flow.optim.SGD(ref_params, lr=0.1)
+    scaler = flow.amp.GradScaler(init_scale=1024.0, growth_interval=2)
+    for _ in range(3):
+        loss = sum((p * p).sum() for p in params)
+        scaler.scale(loss).backward()
+        scaler.step(optimizer)
+        scaler.update()
+        optimizer.zero_grad()
+        ref_loss = sum((p * p).sum() for p in ref_params)
+        ref_loss.backward()
+        ref_optimizer.step()
+        ref_optimizer.zero_grad()
+    for p, ref_p in zip(params, ref_params):
+        test_case.assertTrue(
+            np.allclose(p.numpy(), ref_p.numpy(), rtol=1e-4, atol=1e-5)
+        )
+    # The scale grows once after 2 consecutive finite steps.
+    test_case.assertEqual(scaler.get_scale(), 2048.0)
+
+
+def _test_grad_scaler_skip_inf_impl(test_case, device):
+    params = _make_params(device, [(3,), (4, 5)])
+    init_values = [p.numpy() for p in params]
+    optimizer = flow.optim.SGD(params, lr=0.1)
+    scaler = flow.amp.GradScaler(init_scale=1024.0)
+    loss = params[0].sum() + (params[1] * float("inf")).sum()
+    scaler.scale(loss).backward()
+    scaler.unscale_(optimizer)
+    with test_case.assertRaises(RuntimeError):
+        scaler.unscale_(optimizer)
+    test_case.assertIsNone(scaler.step(optimizer))
+    scaler.update()
+    for p, init_value in zip(params, init_values):
+        test_case.assertTrue(np.array_equal(p.numpy(), init_value))
+    test_case.assertEqual(scaler.get_scale(), 512.0)
+
+
+def _test_grad_scaler_unscale_impl(test_case, device):
+    params = _make_params(device, [(3,), (4, 5), (2, 2)])
+    optimizer = flow.optim.SGD(params, lr=0.1)
+    scaler = flow.amp.GradScaler(init_scale=64.0)
+    loss = sum((p * 3).sum() for p in params)
+    scaler.scale(loss).backward()
+    scaler.unscale_(optimizer)
+    for p in params:
+        test_case.assertTrue(np.allclose(p.grad.numpy(), np.full(p.shape, 3.0)))
+    scaler.step(optimizer)
+    scaler.update()
+    test_case.assertEqual(scaler.get_scale(), 64.0)
+
+
+def _test_static_grad_scaler_impl(test_case, device):
+    params = _make_params(device, [(3,), (4, 5)])
+    optimizer = flow.optim.SGD(params, lr=0.1)
+    scaler = flow.amp.StaticGradScaler(128.0)
+    loss = sum((p * 2).sum() for p in params)
+    scaler.scale(loss).backward()
+    scaler.unscale_(optimizer)
+    for p in params:
+        test_case.assertTrue(np.allclose(p.grad.numpy(), np.full(p.shape, 2.0)))
+    scaler.step(optimizer)
+    scaler.update()
+    test_case.assertEqual(scaler.get_scale(), 128.0)
+
+
+@flow.unittest.skip_unless_1n1d()
+class TestGradScaler(flow.unittest.TestCase):
+    def test_grad_scaler(test_case):
+        arg_dict = OrderedDict()
+        arg_dict["test_fun"] = [
+            _test_grad_scaler_step_impl,
+            _test_grad_scaler_skip_inf_impl,
+            _test_grad_scaler_unscale_impl,
+            _test_static_grad_scaler_impl,
+        ]
+        arg_dict["device"] = _devices()
+        for arg in GenArgList(arg_dict):
+            arg[0](test_case, *arg[1:])
+
+    def test_grad_scaler_disabled(test_case):
+        params = _make_params("cpu", [(3,)])
+        optimizer = flow.optim.SGD(params, lr=0.1)
+        scaler = flow.amp.GradScaler(enabled=False)
+        loss = params[0].sum()
+        test_case.assertIs(scaler.scale(loss), loss)
+        loss.backward()
+        scaler.step(optimizer)
+        scaler.update()
+        test_case.assertEqual(scaler.get_scale(), 1.0)
+
+
+@flow.unittest.skip_unless_1n1d()
+@unittest.skipIf(os.getenv("ONEFLOW_TEST_CPU_ONLY"), "only test gpu cases")
+class TestAutocast(flow.unittest.TestCase):
+    def test_autocast_lists(test_case):
+        a = flow.randn(4, 8, device="cuda")
+        b = flow.randn(8, 5, device="cuda")
+        bias = flow.randn(5, device="cuda")
+        with flow.autocast("cuda"):
+            test_case.assertTrue(flow.amp.is_autocast_enabled())
+            test_case.assertEqual(flow.amp.get_autocast_dtype(), flow.float16)
+            # white list op runs in float16
+            c = flow.matmul(a, b)
+            test_case.assertEqual(c.dtype, flow.float16)
+            # gray list op follows its float16 input
+            d = c + bias
+            test_case.assertEqual(d.dtype, flow.float16)
+            # gray list op with only float32 inputs is not casted
+            test_case.assertEqual((a + a).dtype, flow.float32)
+            # unlisted op is not casted
+            test_case.assertEqual(flow.exp(a).dtype, flow.float32)
+            with flow.autocast("cuda", enabled=False):
+                test_case.assertEqual(flow.matmul(a, b).dtype, flow.float32)
+            # tensors on other devices are not casted
+            test_case.assertEqual(
+                flow.matmul(a.cpu(), b.cpu()).dtype, flow.float32
+            )
+        test_case.assertFalse(flow.amp.is_autocast_enabled())
+        test_case.assertEqual(flow.matmul(a, b).dtype, flow.float32)
+        test_case.assertTrue(
+            np.allclose(c.numpy(), flow.matmul(a, b).numpy(), rtol=1e-2, atol=1e-2)
+        )
+
+    def test_autocast_backward(test_case):
+        a = flow.randn(4, 8, device="cuda", requires_grad=True)
+        b = flow.randn(8, 5, device="cuda", requires_grad=True)
+        with flow.autocast("cuda"):
+            loss = flow.matmul(a, b).sum()
+        loss.backward()
+        # The casts are recorded by autograd, so the gradients are in float32.
+        test_case.assertEqual(a.grad.dtype, flow.float32)
+        test_case.assertTrue(
+            np.allclose(
+                a.grad.numpy(),
+                np.tile(b.numpy().sum(axis=1), (4, 1)),
+                rtol=1e-2,
+                atol=1e-2,
+            )
+        )
+
+    def test_autocast_linear_with_bias(test_case):
+        linear = flow.nn.Linear(8, 5).to("cuda")
+        x = flow.randn(4, 8, device="cuda")
+        with flow.autocast("cuda"):
+            y = linear(x)
+            test_case.assertEqual(y.dtype, flow.float16)
+            loss = y.float().sum()
+        loss.backward()
+        test_case.assertEqual(linear.weight.grad.dtype, flow.float32)
+        test_case.assertEqual(linear.bias.grad.dtype, flow.float32)
+        test_case.assertTrue(
+            np.allclose(
+                linear.weight.grad.numpy(),
+                np.tile(x.numpy().sum(axis=0), (5, 1)),
+                rtol=1e-2,
+                atol=1e-2,
+            )
+        )
+        test_case.assertTrue(np.allclose(linear.bias.grad.numpy(), np.full((5,), 4.0)))
+        test_case.assertTrue(
+            np.allclose(
+                y.numpy(),
+                (flow.matmul(x, linear.weight.T) + linear.bias).numpy(),
+                rtol=1e-2,
+                atol=1e-2,
+            )
+        )
+
+    def test_autocast_inplace_keeps_output_dtype(test_case):
+        a = flow.randn(4, 5, device="cuda")
+        b = flow.randn(4, 5, device="cuda")
+        with flow.autocast("cuda"):
+            a += b.half()
+            test_case.assertEqual(a.dtype, flow.float32)
+
+    def test_autocast_decorator(test_case):
+        @flow.autocast("cuda")
+        def matmul(a, b):
+            return flow.matmul(a, b)
+
+        a = flow.randn(4, 8, device="cuda")
+        b = flow.randn(8, 5, device="cuda")
+        test_case.assertEqual(matmul(a, b).dtype, flow.float16)
+        test_case.assertFalse(flow.amp.is_autocast_enabled())
+
+
+if __name__ == "__main__":
+    unittest.main()
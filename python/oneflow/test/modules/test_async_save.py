@@ -0,0 +1,83 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+import oneflow as flow
+import oneflow.unittest
+from oneflow.framework.check_point_v2 import AsyncCheckpointWriter
+
+
+@flow.unittest.skip_unless_1n1d()
+class TestAsyncSave(flow.unittest.TestCase):
+    def test_async_save_and_load(test_case):
+        m = flow.nn.Sequential(flow.nn.Linear(4, 8), flow.nn.BatchNorm1d(8))
+        state_dict = m.state_dict()
+        expected = {k: v.numpy().copy() for k, v in state_dict.items()}
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            save_dir = os.path.join(tmp_dir, "ckpt")
+            future = flow.save(state_dict, save_dir, async_save=True)
+            # The snapshot is not affected by updates after saving.
+            with flow.no_grad():
+                for p in m.parameters():
+                    p.fill_(0)
+            test_case.assertEqual(future.result(), os.path.abspath(save_dir))
+            test_case.assertEqual(os.listdir(tmp_dir), ["ckpt"])
+            loaded = flow.load(save_dir)
+        test_case.assertEqual(set(loaded.keys()), set(expected.keys()))
+        for k, v in expected.items():
+            test_case.assertTrue(np.array_equal(loaded[k].numpy(), v))
+
+    def test_async_save_overwrite(test_case):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            save_dir = os.path.join(tmp_dir, "ckpt")
+            futures = [
+                flow.save({"step": flow.tensor([i])}, save_dir, async_save=True)
+                for i in range(4)
+            ]
+            for f in futures:
+                f.result()
+            test_case.assertEqual(os.listdir(tmp_dir), ["ckpt"])
+            test_case.assertEqual(flow.load(save_dir)["step"].numpy().item(), 3)
+
+    def test_async_save_graph(test_case):
+        class LinearGraph(flow.nn.Graph):
+            def __init__(self):
+                super().__init__()
+                self.linear = flow.nn.Linear(4, 8)
+
+            def build(self, x):
+                return self.linear(x)
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            with test_case.assertRaises(ValueError):
+                flow.save(LinearGraph(), tmp_dir, async_save=True)
+
+    def test_async_checkpoint_writer_bounded_snapshots(test_case):
+        writer = AsyncCheckpointWriter(num_threads=2, max_pending_snapshots=1)
+        writer.acquire()
+        # The only pending snapshot is taken, so acquiring again would block.
+        test_case.assertFalse(writer._pending_snapshots.acquire(blocking=False))
+        writer.release()
+        test_case.assertTrue(writer._pending_snapshots.acquire(blocking=False))
+        writer.release()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import unittest
+from collections import OrderedDict
+
+import numpy as np
+
+import oneflow as flow
+import oneflow.unittest
+from oneflow.test_utils.test_util import GenArgList
+
+
+def _compare(test_case, fn, *shapes):
+    inputs = [flow.randn(*shape) for shape in shapes]
+    expected = fn(*inputs).numpy()
+    out = fn(*[x.to(flow.bfloat16) for x in inputs])
+    test_case.assertEqual(out.dtype, flow.bfloat16)
+    test_case.assertTrue(
+        np.allclose(out.float().numpy(), expected, rtol=2e-2, atol=2e-2)
+    )
+
+
+def _test_elementwise(test_case, shape):
+    _compare(test_case, lambda x, y: x + y, shape, shape)
+    _compare(test_case, lambda x, y: x * y, shape, shape[-1:])
+    _compare(test_case, lambda x: flow.nn.functional.gelu(x), shape)
+    _compare(test_case, lambda x: flow.exp(x), shape)
+
+
+def _test_softmax(test_case, shape):
+    _compare(test_case, lambda x: flow.softmax(x, dim=-1), shape)
+    _compare(test_case, lambda x: flow.log_softmax(x, dim=-1), shape)
+
+
+def _test_reduce(test_case, shape):
+    _compare(test_case, lambda x: x.sum(dim=-1) / shape[-1], shape)
+    _compare(test_case, lambda x: flow.amax(x, dim=-1), shape)
+
+
+def _test_matmul(test_case, shape):
+    _compare(test_case, lambda x, y: flow.matmul(x, y) / shape[-1], shape, shape[::-1])
+
+
+def _test_layer_norm(test_case, shape):
+    _compare(
+        test_case,
+        lambda x, w, b: flow.nn.functional.layer_norm(x, shape[-1:], w, b),
+        shape,
+        shape[-1:],
+        shape[-1:],
+    )
+
+
+@flow.unittest.skip_unless_1n1d()
+class TestBFloat16Cpu(flow.unittest.TestCase):
+    def test_bf16_cpu_ops(test_case):
+        arg_dict = OrderedDict()
+        arg_dict["test_fun"] = [
+            _test_elementwise,
+            _test_softmax,
+            _test_reduce,
+            _test_matmul,
+            _test_layer_norm,
+        ]
+        arg_dict["shape"] = [(16, 32), (4, 64)]
+        for arg in GenArgList(arg_dict):
+            arg[0](test_case, *arg[1:])
+
+
+if __name__ == "__main__":
+    unittest.main()
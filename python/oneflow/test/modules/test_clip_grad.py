@@ -66,6 +66,30 @@ def _test_clip_grad_norm_impl(test_case, shape, device, max_norm, norm_type):
     )
 
 
+def _test_clip_grad_norm_many_params_impl(test_case, device, max_norm, norm_type):
+    # more tensors than one multi-tensor op takes, in two dtypes
+    shapes = [(3,), (4, 5), (1,), (2, 3, 4)] * 40
+    dtypes = [flow.float32] * 100 + [flow.float64] * 60
+    np_grads = [np.random.uniform(-1, 1, size=s) for s in shapes]
+    params = []
+    for np_grad, dtype in zip(np_grads, dtypes):
+        param = flow.nn.Parameter(
+            flow.zeros(np_grad.shape, dtype=dtype, device=flow.device(device))
+        )
+        param.grad = flow.tensor(np_grad, dtype=dtype, device=flow.device(device))
+        params.append(param)
+    of_total_norm = flow.nn.utils.clip_grad_norm_(params, max_norm, norm_type)
+
+    np_flat = np.concatenate([g.flatten() for g in np_grads])
+    np_total_norm = np.linalg.norm(np_flat, float(norm_type))
+    clip_coef = min(max_norm / (np_total_norm + 1e-6), 1.0)
+    test_case.assertTrue(np.allclose(of_total_norm.numpy(), np_total_norm, 1e-4, 1e-4))
+    for param, np_grad in zip(params, np_grads):
+        test_case.assertTrue(
+            np.allclose(param.grad.numpy(), np_grad * clip_coef, 1e-4, 1e-4)
+        )
+
+
 def _clip_grad_value_np(input, clip_value):
     np_out = np.maximum(0, input)
     np_grad = np.array(np_out > 0, dtype=np.float32)
@@ -158,6 +182,14 @@ class TestClipGrad(flow.unittest.TestCase):
         for arg in GenArgList(arg_dict):
             _test_clip_grad_norm_impl(test_case, *arg)
 
+    def test_clip_grad_many_params(test_case):
+        arg_dict = OrderedDict()
+        arg_dict["device"] = ["cpu", "cuda"]
+        arg_dict["max_norm"] = [0.5, 1000.0]
+        arg_dict["norm_type"] = ["inf", "-inf", 1.0, 2.0, 3.5]
+        for arg in GenArgList(arg_dict):
+            _test_clip_grad_norm_many_params_impl(test_case, *arg)
+
     def test_clip_value(test_case):
         arg_dict = OrderedDict()
         arg_dict["shape"] = [(2, 3), (2, 3, 4), (2, 4, 5, 6)]
@@ -17,6 +17,7 @@ limitations under the License.
 import numpy as np
 import unittest
 import os
+import time
 
 import oneflow as flow
 import oneflow.unittest
@@ -176,6 +177,134 @@ class TestReduceScatter(flow.unittest.TestCase):
         )
 
 
+class TestCommOpsCpu(flow.unittest.TestCase):
+    @flow.unittest.skip_unless_1n2d()
+    def test_all_to_all_cpu_1n2d(test_case):
+        rank = flow.env.get_rank()
+        input_list = [
+            flow.tensor([[0, 1], [2, 3]]) + i * 4 + rank * 8 for i in range(2)
+        ]
+        output_list = [flow.zeros(2, 2, dtype=flow.int64) for _ in range(2)]
+        flow.comm.all_to_all(output_list, input_list)
+        for i in range(2):
+            test_case.assertTrue(
+                np.array_equal(
+                    output_list[i].numpy(),
+                    np.array([[0, 1], [2, 3]]) + rank * 4 + i * 8,
+                )
+            )
+
+    @flow.unittest.skip_unless_1n2d()
+    def test_all_to_all_uneven_cpu_1n2d(test_case):
+        rank = flow.env.get_rank()
+        # the chunk rank r sends to rank j has r + j + 1 rows
+        input_list = [flow.ones(rank + j + 1, 2) * (rank * 10 + j) for j in range(2)]
+        output_list = [flow.zeros(i + rank + 1, 2) for i in range(2)]
+        flow.comm.all_to_all(output_list, input_list)
+        for i in range(2):
+            test_case.assertTrue(
+                np.array_equal(
+                    output_list[i].numpy(), np.ones((i + rank + 1, 2)) * (i * 10 + rank)
+                )
+            )
+
+    @flow.unittest.skip_unless_1n2d()
+    def test_reduce_scatter_cpu_1n2d(test_case):
+        rank = flow.env.get_rank()
+        output = flow.zeros(3, 2)
+        input_list = [flow.ones(3, 2) * (rank + 1) * (i + 1) for i in range(2)]
+        flow.comm.reduce_scatter(output, input_list)
+        test_case.assertTrue(
+            np.allclose(output.numpy(), np.ones((3, 2)) * 3 * (rank + 1))
+        )
+
+    @flow.unittest.skip_unless_1n2d()
+    def test_gather_cpu_1n2d(test_case):
+        rank = flow.env.get_rank()
+        input = flow.tensor([[1, 2], [3, 4]], dtype=flow.int32) + rank
+        if rank == 1:
+            tensor_list = [flow.zeros(2, 2, dtype=flow.int32) for _ in range(2)]
+            flow.comm.gather(input, gather_list=tensor_list, dst=1)
+            for i in range(2):
+                test_case.assertTrue(
+                    np.array_equal(
+                        tensor_list[i].numpy(), np.array([[1, 2], [3, 4]]) + i
+                    )
+                )
+        else:
+            flow.comm.gather(input, dst=1)
+
+    @flow.unittest.skip_unless_1n2d()
+    def test_gather_list_on_non_dst_cpu_1n2d(test_case):
+        rank = flow.env.get_rank()
+        input = flow.tensor([[1, 2], [3, 4]], dtype=flow.int32) + rank
+        tensor_list = [flow.zeros(2, 2, dtype=flow.int32) for _ in range(2)]
+        flow.comm.gather(input, gather_list=tensor_list, dst=0)
+        for i in range(2):
+            # only dst receives data, gather_list is left untouched elsewhere
+            expected = np.array([[1, 2], [3, 4]]) + i if rank == 0 else np.zeros((2, 2))
+            test_case.assertTrue(np.array_equal(tensor_list[i].numpy(), expected))
+
+    @flow.unittest.skip_unless_1n2d()
+    def test_async_ops_cpu_1n2d(test_case):
+        rank = flow.env.get_rank()
+        tensor = flow.ones(2, 3) * (rank + 1)
+        work = flow.comm.all_reduce(tensor, async_op=True)
+        test_case.assertTrue(work.wait())
+        test_case.assertTrue(work.is_completed())
+        test_case.assertTrue(np.allclose(tensor.numpy(), np.ones((2, 3)) * 3))
+
+        tensor_list = [flow.zeros(2, 3) for _ in range(2)]
+        work = flow.comm.all_gather(tensor_list, flow.ones(2, 3) * rank, async_op=True)
+        work.wait()
+        for i in range(2):
+            test_case.assertTrue(
+                np.allclose(tensor_list[i].numpy(), np.ones((2, 3)) * i)
+            )
+
+        tensor = flow.ones(2, 3) * rank
+        flow.comm.broadcast(tensor, 1, async_op=True).wait()
+        test_case.assertTrue(np.allclose(tensor.numpy(), np.ones((2, 3))))
+
+        output = flow.zeros(2, 3)
+        input_list = [flow.ones(2, 3) * (rank + 1) * (i + 1) for i in range(2)]
+        flow.comm.reduce_scatter(output, input_list, async_op=True).wait()
+        test_case.assertTrue(
+            np.allclose(output.numpy(), np.ones((2, 3)) * 3 * (rank + 1))
+        )
+
+        input_list = [flow.ones(2, 3) * (i + rank * 2) for i in range(2)]
+        output_list = [flow.zeros(2, 3) for _ in range(2)]
+        flow.comm.all_to_all(output_list, input_list, async_op=True).wait()
+        for i in range(2):
+            test_case.assertTrue(
+                np.allclose(output_list[i].numpy(), np.ones((2, 3)) * (rank + i * 2))
+            )
+
+    @flow.unittest.skip_unless_1n2d()
+    def test_async_all_reduce_overlap_cpu_1n2d(test_case):
+        x = flow.ones(1024, 1024)
+        grad = x
+        # A chain of matmuls that takes seconds on CPU, the collective can't
+        # start before it ends.
+        for _ in range(32):
+            grad = flow.matmul(grad, x) / 1024
+        start = time.perf_counter()
+        work = flow.comm.all_reduce(grad, async_op=True)
+        launch_time = time.perf_counter() - start
+        # The host returns without waiting for the collective and the matmuls it
+        # depends on, so independent work can be launched in the meantime.
+        test_case.assertFalse(work.is_completed())
+        other = flow.matmul(flow.ones(256, 256), flow.ones(256, 256))
+        test_case.assertFalse(work.is_completed())
+        work.wait()
+        wait_time = time.perf_counter() - start
+        test_case.assertTrue(work.is_completed())
+        test_case.assertLess(launch_time * 10, wait_time)
+        test_case.assertTrue(np.allclose(grad.numpy(), np.ones((1024, 1024)) * 2))
+        test_case.assertTrue(np.allclose(other.numpy(), np.ones((256, 256)) * 256))
+
+
 @unittest.skipIf(os.getenv("ONEFLOW_TEST_CPU_ONLY"), "only test cpu cases")
 @flow.unittest.skip_unless_1n2d()
 class TestDocs(flow.unittest.TestCase):
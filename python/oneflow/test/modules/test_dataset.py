@@ -14,8 +14,12 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 
+import json
 import math
 import os
+import subprocess
+import sys
+import tempfile
 import unittest
 
 import cv2
@@ -367,5 +371,185 @@ class TestOFRecordBytesDecoder(flow.unittest.TestCase):
         test_case.assertTrue(np.array_equal(img, gt_np))
 
 
+def _write_index_ofrecords(data_dir, part_num, records_per_part):
+    import struct
+
+    import oneflow.core.record.record_pb2 as record_pb
+
+    for part in range(part_num):
+        path = os.path.join(data_dir, "part-" + str(part))
+        with open(path, "wb") as f:
+            for i in range(records_per_part):
+                record = record_pb.OFRecord()
+                record.feature["idx"].int64_list.value.append(
+                    part * records_per_part + i
+                )
+                data = record.SerializeToString()
+                f.write(struct.pack("<q", len(data)))
+                f.write(data)
+
+
+def _read_index_ofrecords(data_dir, part_num, batch_size, num_batches, **kwargs):
+    record_reader = flow.nn.OFRecordReader(
+        data_dir, batch_size=batch_size, data_part_num=part_num, **kwargs
+    )
+    idx_decoder = flow.nn.OFRecordRawDecoder("idx", shape=(), dtype=flow.int64)
+    return [idx_decoder(record_reader()).numpy() for _ in range(num_batches)]
+
+
+_READ_STATS_SCRIPT = """
+import json
+import sys
+
+import oneflow as flow
+
+data_dir, part_num = sys.argv[1], int(sys.argv[2])
+record_reader = flow.nn.OFRecordReader(
+    data_dir, batch_size=part_num * 2, data_part_num=part_num
+)
+idx_decoder = flow.nn.OFRecordRawDecoder("idx", shape=(), dtype=flow.int64)
+idx_decoder(record_reader()).numpy()
+print(json.dumps(flow.nn.OFRecordReader.read_stats()))
+"""
+
+
+def _read_stats_in_subprocess(data_dir, part_num, readahead_mb):
+    env = dict(os.environ, ONEFLOW_PERSISTENT_IN_STREAM_READAHEAD_MB=str(readahead_mb))
+    output = subprocess.check_output(
+        [sys.executable, "-c", _READ_STATS_SCRIPT, data_dir, str(part_num)], env=env
+    )
+    return json.loads(output.decode().strip().splitlines()[-1])
+
+
+@flow.unittest.skip_unless_1n1d()
+class TestOFRecordReaderMultiLoader(flow.unittest.TestCase):
+    def test_multi_loader_covers_epoch(test_case):
+        with tempfile.TemporaryDirectory() as data_dir:
+            _write_index_ofrecords(data_dir, 4, 8)
+            batches = _read_index_ofrecords(data_dir, 4, 4, 8, num_loader_threads=2)
+        indices = np.concatenate(batches)
+        test_case.assertEqual(sorted(indices.tolist()), list(range(32)))
+
+    def test_multi_loader_uneven_shards(test_case):
+        with tempfile.TemporaryDirectory() as data_dir:
+            # 2 loaders over 3 part files, one shard is twice as large as the other
+            _write_index_ofrecords(data_dir, 3, 8)
+            batches = _read_index_ofrecords(data_dir, 3, 4, 6, num_loader_threads=2)
+        indices = np.concatenate(batches)
+        test_case.assertEqual(sorted(indices.tolist()), list(range(24)))
+
+    def test_multi_loader_deterministic(test_case):
+        with tempfile.TemporaryDirectory() as data_dir:
+            _write_index_ofrecords(data_dir, 4, 8)
+            kwargs = dict(
+                random_shuffle=True,
+                shuffle_buffer_size=4,
+                random_seed=12345,
+                num_loader_threads=3,
+            )
+            first = _read_index_ofrecords(data_dir, 4, 4, 16, **kwargs)
+            second = _read_index_ofrecords(data_dir, 4, 4, 16, **kwargs)
+        for lhs, rhs in zip(first, second):
+            test_case.assertTrue(np.array_equal(lhs, rhs))
+
+    def test_read_stats(test_case):
+        part_num, records_per_part = 16, 2
+        with tempfile.TemporaryDirectory() as data_dir:
+            _write_index_ofrecords(data_dir, part_num, records_per_part)
+            file_size = sum(
+                os.path.getsize(os.path.join(data_dir, "part-" + str(part)))
+                for part in range(part_num)
+            )
+            # a batch holds every record, so the first batch has read every part
+            # file at least once; the loader may have read further epochs ahead
+            stats = _read_stats_in_subprocess(data_dir, part_num, readahead_mb=0)
+            test_case.assertGreaterEqual(stats["bytes_read"], file_size)
+            # without a readahead no read ever waits for one
+            test_case.assertEqual(stats["stall_count"], 0)
+            test_case.assertEqual(stats["stall_seconds"], 0.0)
+            stats = _read_stats_in_subprocess(data_dir, part_num, readahead_mb=1)
+            test_case.assertGreaterEqual(stats["bytes_read"], file_size)
+
+
+@flow.unittest.skip_unless_1n1d()
+class TestIndexedOFRecordReader(flow.unittest.TestCase):
+    def _build_dataset(test_case, data_dir):
+        from oneflow.utils.data import ofrecord_index
+
+        _write_index_ofrecords(data_dir, 4, 8)
+        ofrecord_index.main([data_dir, "--data_part_num", "4"])
+        part_paths = ofrecord_index.part_file_paths(data_dir, 4)
+        test_case.assertEqual(ofrecord_index.count_records(part_paths), 32)
+
+    def test_indexed_global_shuffle(test_case):
+        with tempfile.TemporaryDirectory() as data_dir:
+            test_case._build_dataset(data_dir)
+            batches = _read_index_ofrecords(
+                data_dir, 4, 4, 16, indexed=True, random_shuffle=True, random_seed=7
+            )
+        first_epoch = np.concatenate(batches[:8]).tolist()
+        second_epoch = np.concatenate(batches[8:]).tolist()
+        test_case.assertEqual(sorted(first_epoch), list(range(32)))
+        test_case.assertEqual(sorted(second_epoch), list(range(32)))
+        test_case.assertNotEqual(first_epoch, second_epoch)
+        test_case.assertNotEqual(first_epoch, list(range(32)))
+
+    def test_indexed_resume(test_case):
+        with tempfile.TemporaryDirectory() as data_dir:
+            test_case._build_dataset(data_dir)
+            kwargs = dict(
+                batch_size=4,
+                data_part_num=4,
+                random_shuffle=True,
+                random_seed=7,
+                indexed=True,
+            )
+            idx_decoder = flow.nn.OFRecordRawDecoder("idx", shape=(), dtype=flow.int64)
+            reader = flow.nn.OFRecordReader(data_dir, **kwargs)
+            for _ in range(3):
+                reader()
+            cursor = reader.current_cursor()
+            test_case.assertEqual(cursor, (0, 12))
+            expected = [idx_decoder(reader()).numpy() for _ in range(6)]
+            test_case.assertEqual(reader.current_cursor(), (1, 4))
+            resumed = flow.nn.OFRecordReader(data_dir, cursor=cursor, **kwargs)
+            for lhs in expected:
+                test_case.assertTrue(
+                    np.array_equal(lhs, idx_decoder(resumed()).numpy())
+                )
+
+
+@flow.unittest.skip_unless_1n1d()
+class TestBlockCompressedOFRecord(flow.unittest.TestCase):
+    def test_block_compressed_ofrecord(test_case):
+        from oneflow.utils.data import block_compress
+
+        with tempfile.TemporaryDirectory() as data_dir:
+            raw_dir = os.path.join(data_dir, "raw")
+            compressed_dir = os.path.join(data_dir, "compressed")
+            os.makedirs(raw_dir)
+            _write_index_ofrecords(raw_dir, 2, 16)
+            # small blocks so that records straddle block boundaries
+            block_compress.main(
+                [raw_dir, "--output_dir", compressed_dir, "--block_size", "100"]
+            )
+            for name in ("part-0", "part-1"):
+                compressed_path = os.path.join(compressed_dir, name)
+                restored_path = os.path.join(data_dir, name)
+                test_case.assertTrue(
+                    block_compress.is_block_compressed(compressed_path)
+                )
+                block_compress.decompress_file(compressed_path, restored_path)
+                with open(os.path.join(raw_dir, name), "rb") as f:
+                    raw = f.read()
+                with open(restored_path, "rb") as f:
+                    test_case.assertEqual(f.read(), raw)
+            # read more than one epoch to cover the wrap around
+            raw_batches = _read_index_ofrecords(raw_dir, 2, 4, 12)
+            compressed_batches = _read_index_ofrecords(compressed_dir, 2, 4, 12)
+        for lhs, rhs in zip(raw_batches, compressed_batches):
+            test_case.assertTrue(np.array_equal(lhs, rhs))
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -257,6 +257,115 @@ class TestDDP(flow.unittest.TestCase):
         for dev_type in test_device:
             test_case._test_ddp_two_iters(dev_type)
 
+    def _test_ddp_low_precision_grads(test_case, dev_type):
+        for dtype in [flow.float16, flow.bfloat16]:
+
+            class Mul(flow.nn.Module):
+                def __init__(self):
+                    super().__init__()
+                    self.w = flow.nn.Parameter(flow.ones(2, dtype=dtype))
+
+                def forward(self, x):
+                    return x * self.w.to(flow.float32)
+
+            rank = flow.env.get_rank()
+            x = flow.Tensor([rank + 1, rank + 1]).to(dev_type)
+            m = ddp(Mul().to(dev_type))
+            y = m(x)
+            y.sum().backward()
+
+            test_case.assertEqual(m.w.grad.dtype, dtype)
+            test_case.assertTrue(
+                np_allclose_with_shape(
+                    m.w.grad.to(flow.float32).numpy(), np.array([1.5, 1.5])
+                )
+            )
+
+    def test_ddp_low_precision_grads(test_case):
+        for dev_type in test_device:
+            test_case._test_ddp_low_precision_grads(dev_type)
+
+    def _test_ddp_bucket_cap(test_case, dev_type):
+        from oneflow.nn.parallel.ddp import assign_buckets
+
+        params = [
+            flow.nn.Parameter(flow.zeros(1024, dtype=flow.float32, device=dev_type)),
+            flow.nn.Parameter(flow.zeros(1024, dtype=flow.float16, device=dev_type)),
+            flow.nn.Parameter(flow.zeros(1024, dtype=flow.float32, device=dev_type)),
+            flow.nn.Parameter(flow.zeros(4096, dtype=flow.float32, device=dev_type)),
+            flow.nn.Parameter(flow.zeros(10, dtype=flow.float16, device=dev_type)),
+        ]
+        buckets = assign_buckets(params, None, 8192)
+        test_case.assertEqual(
+            [[params.index(x) for x in bucket] for bucket in buckets],
+            [[0, 2], [3], [1, 4]],
+        )
+        for bucket in buckets:
+            test_case.assertEqual(len(set(x.dtype for x in bucket)), 1)
+
+    def test_ddp_bucket_cap(test_case):
+        for dev_type in test_device:
+            test_case._test_ddp_bucket_cap(dev_type)
+
+    def _test_ddp_rebuild_buckets(test_case, dev_type):
+        class Model(flow.nn.Module):
+            def __init__(self):
+                super().__init__()
+                self.w1 = flow.nn.Parameter(flow.Tensor([1]))
+                self.w2 = flow.nn.Parameter(flow.Tensor([2]))
+                self.w3 = flow.nn.Parameter(flow.Tensor([3]))
+                self.w4 = flow.nn.Parameter(flow.Tensor([1]).to(flow.float16))
+
+            def forward(self, x):
+                x = x * self.w3
+                x = x * self.w1
+                x = x * self.w2
+                return x + self.w4.to(flow.float32)
+
+        rank = flow.env.get_rank()
+        x = flow.Tensor([rank + 1]).to(dev_type)
+        m = Model().to(dev_type)
+        m = ddp(m, bucket_cap_mb=0)
+        for _ in range(3):
+            y = m(x)
+            y.backward()
+
+        # the buckets are all-reduced in the order the gradients become ready
+        order = [[id(x) for x in bucket] for bucket in m._buckets]
+        test_case.assertEqual(len(order), 4)
+        test_case.assertLess(order.index([id(m.w2)]), order.index([id(m.w1)]))
+        test_case.assertLess(order.index([id(m.w1)]), order.index([id(m.w3)]))
+        test_case.assertTrue(np_allclose_with_shape(m.w1.grad.numpy(), np.array([27])))
+        test_case.assertTrue(
+            np_allclose_with_shape(m.w2.grad.numpy(), np.array([13.5]))
+        )
+        test_case.assertTrue(np_allclose_with_shape(m.w3.grad.numpy(), np.array([9])))
+        test_case.assertTrue(np_allclose_with_shape(m.w4.grad.numpy(), np.array([3])))
+
+    def test_ddp_rebuild_buckets(test_case):
+        for dev_type in test_device:
+            test_case._test_ddp_rebuild_buckets(dev_type)
+
+    def _test_ddp_rebuild_buckets_without_backward(test_case, dev_type):
+        rank = flow.env.get_rank()
+        x = flow.Tensor([rank + 1]).to(dev_type)
+        m = flow.nn.Linear(1, 1, bias=False).to(dev_type)
+        flow.nn.init.ones_(m.weight)
+        m = ddp(m, bucket_cap_mb=0)
+        # no gradient is ready before the rebuild, which every rank still joins
+        m(x)
+        m(x)
+        test_case.assertIsNone(m._grad_ready_order)
+        y = m(x)
+        y.sum().backward()
+        test_case.assertTrue(
+            np_allclose_with_shape(m.weight.grad.numpy(), np.array([[1.5]]))
+        )
+
+    def test_ddp_rebuild_buckets_without_backward(test_case):
+        for dev_type in test_device:
+            test_case._test_ddp_rebuild_buckets_without_backward(dev_type)
+
     def _test_broadcast_buffer(test_case, dev_type):
         rank = flow.env.get_rank()
 
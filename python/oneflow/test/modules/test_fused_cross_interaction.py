@@ -124,7 +124,10 @@ def _test_fused_cross_feature_interaction_v2(
     )
 
 
-@unittest.skipIf(os.getenv("ONEFLOW_TEST_CPU_ONLY"), "only test cpu cases")
+def _get_devices():
+    return ["cpu"] if os.getenv("ONEFLOW_TEST_CPU_ONLY") else ["cpu", "cuda"]
+
+
 @flow.unittest.skip_unless_1n1d()
 class TestFusedCrossFeatureInteraction(flow.unittest.TestCase):
     def test_fused_cross_feature_interaction_v1(test_case):
@@ -133,7 +136,7 @@ class TestFusedCrossFeatureInteraction(flow.unittest.TestCase):
         args_dict["batchsize"] = [1, 2, 4]
         args_dict["in_feature"] = [32, 64, 96, 128]
         args_dict["dtype"] = [flow.float32]
-        args_dict["device"] = ["cuda"]
+        args_dict["device"] = _get_devices()
 
         for arg in GenArgList(args_dict):
             arg[0](test_case, *arg[1:])
@@ -144,7 +147,7 @@ class TestFusedCrossFeatureInteraction(flow.unittest.TestCase):
         args_dict["batchsize"] = [1, 2, 4]
         args_dict["in_feature"] = [32, 64, 96, 128]
         args_dict["dtype"] = [flow.float32]
-        args_dict["device"] = ["cuda"]
+        args_dict["device"] = _get_devices()
 
         for arg in GenArgList(args_dict):
             arg[0](test_case, *arg[1:])
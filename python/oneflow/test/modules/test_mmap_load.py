@@ -0,0 +1,92 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+import oneflow as flow
+import oneflow.unittest
+from oneflow.framework.check_point_v2 import FileBackendVariableBlob
+
+
+def _test_load_state_dict(test_case, mmap, map_location=None):
+    m = flow.nn.Sequential(flow.nn.Linear(4, 8), flow.nn.BatchNorm1d(8))
+    state_dict = m.state_dict()
+    state_dict["empty"] = flow.zeros(0, 3)
+    state_dict["scalar"] = flow.tensor(3.0)
+    expected = {k: v.numpy().copy() for k, v in state_dict.items()}
+    with tempfile.TemporaryDirectory() as save_dir:
+        flow.save(state_dict, save_dir)
+        loaded = flow.load(save_dir, map_location=map_location, mmap=mmap)
+        test_case.assertEqual(set(loaded.keys()), set(expected.keys()))
+        for k, v in expected.items():
+            if map_location is not None:
+                test_case.assertEqual(loaded[k].device, flow.device(map_location))
+            test_case.assertEqual(loaded[k].shape, flow.Size(v.shape))
+            test_case.assertTrue(np.array_equal(loaded[k].numpy(), v))
+        m.load_state_dict({k: loaded[k] for k in m.state_dict().keys()})
+
+
+@flow.unittest.skip_unless_1n1d()
+class TestMmapLoad(flow.unittest.TestCase):
+    def test_load(test_case):
+        _test_load_state_dict(test_case, mmap=False)
+
+    def test_mmap_load(test_case):
+        _test_load_state_dict(test_case, mmap=True)
+
+    @unittest.skipIf(os.getenv("ONEFLOW_TEST_CPU_ONLY"), "only test cpu cases")
+    def test_mmap_load_to_cuda(test_case):
+        _test_load_state_dict(test_case, mmap=True, map_location="cuda")
+
+    def test_load_shared_tensor(test_case):
+        x = flow.randn(2, 3)
+        with tempfile.TemporaryDirectory() as save_dir:
+            flow.save({"a": x, "b": [x, flow.ones(3)]}, save_dir)
+            loaded = flow.load(save_dir)
+        # A tensor referenced twice is loaded once and shared.
+        test_case.assertIs(loaded["a"], loaded["b"][0])
+        test_case.assertTrue(np.array_equal(loaded["a"].numpy(), x.numpy()))
+        test_case.assertTrue(np.array_equal(loaded["b"][1].numpy(), np.ones(3)))
+
+    def test_mmap_load_copy_on_write(test_case):
+        with tempfile.TemporaryDirectory() as save_dir:
+            flow.save({"x": flow.ones(2, 3)}, save_dir)
+            x = flow.load(save_dir, mmap=True)["x"]
+            x.add_(1)
+            test_case.assertTrue(np.array_equal(x.numpy(), np.full((2, 3), 2.0)))
+            # Writes to the mapped tensor are not carried through to the file.
+            y = flow.load(save_dir, mmap=True)["x"]
+            test_case.assertTrue(np.array_equal(y.numpy(), np.ones((2, 3))))
+
+    def test_file_backend_variable_blob_mmap(test_case):
+        with tempfile.TemporaryDirectory() as save_dir:
+            flow.save({"x": flow.arange(6, dtype=flow.int32).reshape(2, 3)}, save_dir)
+            blob_dir = [
+                os.path.join(save_dir, d)
+                for d in os.listdir(save_dir)
+                if os.path.isdir(os.path.join(save_dir, d))
+            ][0]
+            blob = FileBackendVariableBlob(blob_dir)
+            array = blob.numpy(mmap=True)
+            test_case.assertIsInstance(array, np.memmap)
+            test_case.assertTrue(np.array_equal(array, blob.numpy()))
+
+
+if __name__ == "__main__":
+    unittest.main()
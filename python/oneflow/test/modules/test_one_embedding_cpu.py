@@ -0,0 +1,95 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import unittest
+import tempfile
+
+import os
+
+# dynamic memory allocation can't be tested in unittest
+os.environ["ONEFLOW_ONE_EMBEDDING_USE_DYNAMIC_MEMORY_ALLOCATION"] = "0"
+import numpy as np
+
+import oneflow as flow
+import oneflow.unittest
+
+
+def _test_one_embedding_cpu_sgd(test_case, persistent_path):
+    embedding_size = 4
+    learning_rate = 0.1
+    tables = [
+        flow.one_embedding.make_table_options(
+            flow.one_embedding.make_constant_initializer(value=1.0)
+        )
+        for _ in range(2)
+    ]
+    store_options = flow.one_embedding.make_cached_host_mem_store_options(
+        cache_budget_mb=0, persistent_path=persistent_path, capacity=1024, device="cpu",
+    )
+    embedding = flow.one_embedding.MultiTableEmbedding(
+        name="cpu_embedding",
+        embedding_dim=embedding_size,
+        dtype=flow.float,
+        key_type=flow.int64,
+        tables=tables,
+        store_options=store_options,
+    )
+
+    class TrainGraph(flow.nn.Graph):
+        def __init__(self):
+            super().__init__()
+            self.embedding_lookup = embedding
+            self.add_optimizer(
+                flow.optim.SGD(
+                    self.embedding_lookup.parameters(), lr=learning_rate, momentum=0.0
+                )
+            )
+
+        def build(self, ids):
+            embeddings = self.embedding_lookup(ids)
+            loss = embeddings.sum()
+            loss.backward()
+            return embeddings, loss
+
+    # ids of different tables must not collide
+    ids = np.array([[0, 100], [1, 100], [1, 101], [1, 102]], dtype=np.int64)
+    unique_ids, counts = np.unique(ids, return_counts=True)
+    count_of = dict(zip(unique_ids.tolist(), counts.tolist()))
+    graph = TrainGraph()
+    embeddings, loss = graph(flow.tensor(ids))
+    test_case.assertEqual(embeddings.device, flow.device("cpu"))
+    test_case.assertTrue(
+        np.array_equal(embeddings.numpy(), np.ones((4, 2, embedding_size)))
+    )
+    test_case.assertAlmostEqual(loss.numpy().item(), ids.size * embedding_size)
+
+    # every occurrence of an id contributed a gradient of one in the first step
+    expected = np.vectorize(lambda i: 1.0 - learning_rate * count_of[i])(ids)
+    expected = np.repeat(expected[..., np.newaxis], embedding_size, axis=-1)
+    embeddings, loss = graph(flow.tensor(ids))
+    test_case.assertTrue(np.allclose(embeddings.numpy(), expected, atol=1e-6))
+    test_case.assertAlmostEqual(loss.numpy().item(), expected.sum(), places=4)
+
+
+@flow.unittest.skip_unless_1n1d()
+class OneEmbeddingCpuTestCase(flow.unittest.TestCase):
+    def test_one_embedding_cpu_sgd(test_case):
+        with tempfile.TemporaryDirectory() as persistent_path:
+            _test_one_embedding_cpu_sgd(test_case, persistent_path)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,154 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import os
+import tempfile
+import unittest
+from collections import OrderedDict
+
+import numpy as np
+from oneflow.test_utils.test_util import GenArgList
+
+import oneflow as flow
+from oneflow.nn.parameter import Parameter
+
+
+def _devices():
+    if os.getenv("ONEFLOW_TEST_CPU_ONLY"):
+        return ["cpu"]
+    return ["cpu", "cuda"]
+
+
+def _train(device, optim_cls, optim_kwargs, shapes, init_values, grads, foreach):
+    params = [
+        Parameter(flow.tensor(init_values[i], device=flow.device(device)))
+        for i in range(len(shapes))
+    ]
+    optimizer = optim_cls(params, foreach=foreach, **optim_kwargs)
+    for step_grads in grads:
+        for param, grad in zip(params, step_grads):
+            param.grad = flow.tensor(grad, device=flow.device(device))
+        optimizer.step()
+        optimizer.zero_grad()
+    return [param.numpy() for param in params], optimizer
+
+
+def compare_foreach_with_per_param(
+    test_case, device, optim_cls, optim_kwargs, train_iters
+):
+    # Mix tiny and odd-sized tensors so that the flat state buffers have many slices.
+    shapes = [(3,), (4, 5), (1,), (7, 2, 3), (16,)] * 30
+    init_values = [np.random.uniform(size=s).astype(np.float32) for s in shapes]
+    grads = [
+        [np.random.uniform(-1, 1, size=s).astype(np.float32) for s in shapes]
+        for _ in range(train_iters)
+    ]
+    expected, _ = _train(
+        device, optim_cls, optim_kwargs, shapes, init_values, grads, False
+    )
+    actual, _ = _train(
+        device, optim_cls, optim_kwargs, shapes, init_values, grads, True
+    )
+    for e, a in zip(expected, actual):
+        test_case.assertTrue(np.allclose(e, a, rtol=1e-4, atol=1e-5))
+
+
+@flow.unittest.skip_unless_1n1d()
+class TestOptimForeach(flow.unittest.TestCase):
+    def test_foreach_matches_per_param(test_case):
+        arg_dict = OrderedDict()
+        arg_dict["device"] = _devices()
+        arg_dict["optim"] = [
+            (flow.optim.SGD, {"lr": 0.1}),
+            (flow.optim.SGD, {"lr": 0.1, "weight_decay": 0.01}),
+            (flow.optim.SGD, {"lr": 0.1, "momentum": 0.9}),
+            (flow.optim.SGD, {"lr": 0.1, "momentum": 0.9, "nesterov": True}),
+            (
+                flow.optim.SGD,
+                {"lr": 0.1, "momentum": 0.9, "dampening": 0.1, "weight_decay": 0.01},
+            ),
+            (flow.optim.Adam, {"lr": 0.01}),
+            (flow.optim.Adam, {"lr": 0.01, "weight_decay": 0.01}),
+            (flow.optim.Adam, {"lr": 0.01, "do_bias_correction": False}),
+            (flow.optim.Adam, {"lr": 0.01, "amsgrad": True}),
+            (flow.optim.Adam, {"lr": 0.01, "amsgrad": True, "weight_decay": 0.01}),
+            (flow.optim.AdamW, {"lr": 0.01, "weight_decay": 0.01}),
+            (flow.optim.AdamW, {"lr": 0.01, "weight_decay": 0.01, "amsgrad": True}),
+            (flow.optim.RMSprop, {"lr": 0.01}),
+            (flow.optim.RMSprop, {"lr": 0.01, "weight_decay": 0.01}),
+            # centered RMSprop has no multi-tensor kernel and is updated per parameter
+            (flow.optim.RMSprop, {"lr": 0.01, "centered": True}),
+            (flow.optim.LAMB, {"lr": 0.01, "weight_decay": 0.01}),
+            (flow.optim.LAMB, {"lr": 0.01, "weight_decay": 0.01, "adam_w_mode": False}),
+            (flow.optim.LAMB, {"lr": 0.01, "do_bias_correction": False}),
+        ]
+        arg_dict["train_iters"] = [5]
+        for device, (optim_cls, optim_kwargs), train_iters in GenArgList(arg_dict):
+            compare_foreach_with_per_param(
+                test_case, device, optim_cls, optim_kwargs, train_iters
+            )
+
+    def test_foreach_skips_param_without_grad(test_case):
+        for device in _devices():
+            x = Parameter(flow.ones(4, device=device))
+            y = Parameter(flow.ones(4, device=device))
+            adam = flow.optim.Adam([x, y], lr=0.1, foreach=True)
+            x.grad = flow.ones(4, device=device)
+            adam.step()
+            test_case.assertTrue(np.array_equal(y.numpy(), np.ones(4)))
+            test_case.assertFalse(np.array_equal(x.numpy(), np.ones(4)))
+            test_case.assertNotIn("exp_avg", adam.state_dict()["state"][1])
+
+    def test_foreach_state_dict(test_case):
+        shapes = [(3,), (4, 5), (2,)]
+        init_values = [np.random.uniform(size=s).astype(np.float32) for s in shapes]
+        grads = [
+            [np.random.uniform(-1, 1, size=s).astype(np.float32) for s in shapes]
+            for _ in range(6)
+        ]
+        for device in _devices():
+            expected, _ = _train(
+                device, flow.optim.Adam, {"lr": 0.01}, shapes, init_values, grads, True
+            )
+            _, optimizer = _train(
+                device,
+                flow.optim.Adam,
+                {"lr": 0.01},
+                shapes,
+                init_values,
+                grads[:3],
+                True,
+            )
+            with tempfile.TemporaryDirectory() as save_dir:
+                flow.save(optimizer.state_dict(), save_dir)
+                state_dict = flow.load(save_dir)
+            params = [
+                Parameter(flow.tensor(param.numpy(), device=flow.device(device)))
+                for param in optimizer.param_groups[0].parameters
+            ]
+            resumed = flow.optim.Adam(params, lr=0.01, foreach=True)
+            resumed.load_state_dict(state_dict)
+            for step_grads in grads[3:]:
+                for param, grad in zip(params, step_grads):
+                    param.grad = flow.tensor(grad, device=flow.device(device))
+                resumed.step()
+            for e, param in zip(expected, params):
+                test_case.assertTrue(
+                    np.allclose(e, param.numpy(), rtol=1e-4, atol=1e-5)
+                )
+
+
+if __name__ == "__main__":
+    unittest.main()
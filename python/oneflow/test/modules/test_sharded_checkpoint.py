@@ -0,0 +1,162 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+import oneflow as flow
+import oneflow.unittest
+from oneflow.framework.sharded_checkpoint import (
+    SHARDED_INDEX_FILENAME,
+    load_index,
+    placement_shards,
+    shard_slices,
+)
+
+
+def _shared_save_dir(name):
+    # All ranks of 1n2d tests run on the same machine.
+    save_dir = os.path.join(tempfile.gettempdir(), "oneflow_test_" + name)
+    if flow.env.get_rank() == 0:
+        shutil.rmtree(save_dir, ignore_errors=True)
+    flow.comm.barrier()
+    return save_dir
+
+
+def _remove_shared_save_dir(save_dir):
+    flow.comm.barrier()
+    if flow.env.get_rank() == 0:
+        shutil.rmtree(save_dir, ignore_errors=True)
+
+
+class TestShardedCheckpoint(flow.unittest.TestCase):
+    @flow.unittest.skip_unless_1n1d()
+    def test_shard_slices(test_case):
+        test_case.assertEqual(
+            shard_slices((5, 4), (2,), ["S(0)"], (0,)), [(0, 3), (0, 4)]
+        )
+        test_case.assertEqual(
+            shard_slices((5, 4), (2,), ["S(0)"], (1,)), [(3, 5), (0, 4)]
+        )
+        test_case.assertEqual(
+            shard_slices((4, 6), (2, 3), ["S(0)", "S(1)"], (1, 2)), [(2, 4), (4, 6)]
+        )
+        test_case.assertEqual(
+            shard_slices((8,), (2, 2), ["S(0)", "S(0)"], (1, 1)), [(6, 8)]
+        )
+        test_case.assertEqual(shard_slices((4, 6), (2,), ["B"], (1,)), [(0, 4), (0, 6)])
+
+    @flow.unittest.skip_unless_1n1d()
+    def test_placement_shards_skip_broadcast_duplicates(test_case):
+        ranks = np.arange(4).reshape(2, 2)
+        shards = placement_shards((4, 6), ranks, ["B", "S(1)"])
+        test_case.assertEqual(
+            shards, [(0, [(0, 4), (0, 3)]), (1, [(0, 4), (3, 6)])],
+        )
+
+    @flow.unittest.skip_unless_1n1d()
+    def test_sharded_save_load_1n1d(test_case):
+        x = flow.randn(5, 3).to_global(
+            placement=flow.placement("cpu", [0]), sbp=flow.sbp.split(0)
+        )
+        with tempfile.TemporaryDirectory() as save_dir:
+            flow.save({"x": x, "step": flow.tensor(3)}, save_dir, sharded=True)
+            test_case.assertTrue(
+                os.path.exists(os.path.join(save_dir, SHARDED_INDEX_FILENAME))
+            )
+            entry = list(load_index(save_dir).values())[0]
+            test_case.assertEqual(entry["sbp"], ["S(0)"])
+            test_case.assertEqual(entry["shape"], [5, 3])
+            loaded = flow.load(save_dir)
+            test_case.assertEqual(loaded["x"].sbp, (flow.sbp.split(0),))
+            test_case.assertTrue(np.array_equal(loaded["x"].numpy(), x.numpy()))
+            test_case.assertEqual(loaded["step"].item(), 3)
+            loaded = flow.load(save_dir, map_location="cpu")
+            test_case.assertTrue(loaded["x"].is_local)
+            test_case.assertTrue(np.array_equal(loaded["x"].numpy(), x.numpy()))
+
+    @flow.unittest.skip_unless_1n1d()
+    def test_sharded_save_invalid_args(test_case):
+        class LinearGraph(flow.nn.Graph):
+            def __init__(self):
+                super().__init__()
+                self.linear = flow.nn.Linear(4, 8)
+
+            def build(self, x):
+                return self.linear(x)
+
+        state_dict = {"step": flow.tensor(3)}
+        with tempfile.TemporaryDirectory() as save_dir:
+            with test_case.assertRaises(ValueError):
+                flow.save(state_dict, save_dir, global_dst_rank=0, sharded=True)
+            with test_case.assertRaises(ValueError):
+                flow.save(state_dict, save_dir, async_save=True, sharded=True)
+            with test_case.assertRaises(ValueError):
+                flow.save(LinearGraph(), save_dir, sharded=True)
+
+    @flow.unittest.skip_unless_1n2d()
+    def test_sharded_save_load_reshard(test_case):
+        placement = flow.placement("cpu", [0, 1])
+        x_np = np.arange(7 * 4, dtype=np.float32).reshape(7, 4)
+        x = flow.tensor(x_np).to_global(placement=placement, sbp=flow.sbp.broadcast)
+        state_dict = {
+            "s0": x.to_global(sbp=flow.sbp.split(0)),
+            "s1": x.to_global(sbp=flow.sbp.split(1)),
+            "b": x,
+            "p": flow.tensor(x_np / 2).to_global(
+                placement=placement, sbp=flow.sbp.partial_sum
+            ),
+        }
+        # Partial sum tensors are saved as broadcast.
+        expected_sbp = {k: v.sbp for k, v in state_dict.items()}
+        expected_sbp["p"] = (flow.sbp.broadcast,)
+        save_dir = _shared_save_dir("sharded_save_load_reshard")
+        flow.save(state_dict, save_dir, sharded=True)
+        shard_dirs = [
+            d for d in os.listdir(save_dir) if os.path.isdir(os.path.join(save_dir, d))
+        ]
+        for entry in load_index(save_dir).values():
+            num_shards = 1 if entry["sbp"] == ["B"] else 2
+            test_case.assertEqual(len(entry["shards"]), num_shards)
+        test_case.assertEqual(len(shard_dirs), 4)
+
+        loaded = flow.load(save_dir)
+        for k in state_dict.keys():
+            test_case.assertEqual(loaded[k].placement, placement)
+            test_case.assertEqual(loaded[k].sbp, expected_sbp[k])
+            test_case.assertTrue(np.array_equal(loaded[k].numpy(), x_np))
+
+        # Reshard to a placement of a different size.
+        loaded = flow.load(save_dir, map_location=flow.placement("cpu", [1]))
+        for k in state_dict.keys():
+            test_case.assertEqual(loaded[k].placement, flow.placement("cpu", [1]))
+            test_case.assertEqual(loaded[k].sbp, expected_sbp[k])
+            test_case.assertTrue(np.array_equal(loaded[k].numpy(), x_np))
+
+        # Reshard to a 2D placement, the sbp is broadcast.
+        loaded = flow.load(save_dir, map_location=flow.placement("cpu", [[0], [1]]))
+        test_case.assertEqual(
+            loaded["s0"].sbp, (flow.sbp.broadcast, flow.sbp.broadcast)
+        )
+        test_case.assertTrue(np.array_equal(loaded["s0"].numpy(), x_np))
+        _remove_shared_save_dir(save_dir)
+
+
+if __name__ == "__main__":
+    unittest.main()
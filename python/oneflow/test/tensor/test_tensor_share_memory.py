@@ -0,0 +1,83 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import os
+import unittest
+
+import numpy as np
+
+import oneflow as flow
+import oneflow.unittest
+from oneflow.multiprocessing import shared_memory_pool
+
+
+def _add_one_in_subprocess(queue, done):
+    tensor = queue.get()
+    tensor.add_(1)
+    done.put(tensor.is_shared())
+
+
+@flow.unittest.skip_unless_1n1d()
+class TestTensorShareMemory(flow.unittest.TestCase):
+    def test_share_memory_(test_case):
+        x = flow.arange(12, dtype=flow.float32).reshape(3, 4)
+        test_case.assertFalse(x.is_shared())
+        test_case.assertTrue(x.share_memory_() is x)
+        test_case.assertTrue(x.is_shared())
+        test_case.assertTrue(x[1:].is_shared())
+        test_case.assertTrue(np.array_equal(x.numpy(), np.arange(12).reshape(3, 4)))
+        test_case.assertTrue(x.share_memory_() is x)
+        test_case.assertFalse((x + 1).is_shared())
+
+    def test_send_shared_tensor_to_subprocess(test_case):
+        flow._oneflow_internal.eager.Sync()
+        x = flow.zeros(4, 16).share_memory_()
+        ctx = flow.multiprocessing.get_context("fork")
+        queue = ctx.Queue()
+        done = ctx.Queue()
+        p = ctx.Process(target=_add_one_in_subprocess, args=(queue, done))
+        p.start()
+        queue.put(x)
+        test_case.assertTrue(done.get(timeout=60))
+        p.join()
+        # the subprocess has written to the same storage
+        test_case.assertTrue(np.array_equal(x.numpy(), np.ones((4, 16))))
+
+    def test_pool_reuse(test_case):
+        pool = shared_memory_pool.SharedMemoryPool(1 << 30)
+        shm = pool.acquire(10000)
+        name = shm.name
+        pool.release(shm)
+        test_case.assertEqual(pool.cached_bytes(), shm.size)
+        shm = pool.acquire(9000)
+        test_case.assertEqual(shm.name, name)
+        # still referenced by another process
+        shm._add_refcnt(1)
+        pool.release(shm)
+        other = pool.acquire(9000)
+        test_case.assertNotEqual(other.name, name)
+        shm._add_refcnt(-1)
+        pool.release(other)
+        test_case.assertEqual(pool.acquire(9000).name, name)
+
+    def test_pool_trim(test_case):
+        pool = shared_memory_pool.SharedMemoryPool(0)
+        shm = pool.acquire(10000)
+        pool.release(shm)
+        test_case.assertEqual(pool.cached_bytes(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -39,6 +39,17 @@ from oneflow.utils.data.decorator import (
     non_deterministic,
 )
 from oneflow.utils.data.distributed import DistributedSampler
+from oneflow.utils.data.datapipes import (
+    FileLister,
+    LineReader,
+    RecordReader,
+    Mapper,
+    Batcher,
+    Shuffler,
+    Sharder,
+    Prefetcher,
+    pipeline_stats,
+)
 
 
 __all__ = [
@@ -60,4 +71,13 @@ __all__ = [
     "guaranteed_datapipes_determinism",
     "non_deterministic",
     "DistributedSampler",
+    "FileLister",
+    "LineReader",
+    "RecordReader",
+    "Mapper",
+    "Batcher",
+    "Shuffler",
+    "Sharder",
+    "Prefetcher",
+    "pipeline_stats",
 ]
@@ -22,7 +22,12 @@ static methods.
 import re
 import collections
 
+import numpy as np
+
 import oneflow as flow
+from oneflow.framework.dtype import convert_numpy_dtype_to_oneflow_dtype
+from oneflow.multiprocessing import shared_memory_pool
+from . import worker as _worker
 
 
 string_classes = (str, bytes)
@@ -71,13 +76,42 @@ default_convert_err_msg_format = (
 )
 
 
+def stack_arrays(arrays, shared):
+    r"""Stacks numpy arrays of the same shape and dtype into one preallocated
+    tensor, which is allocated in shared memory if ``shared`` is True."""
+    shape = (len(arrays),) + tuple(arrays[0].shape)
+
+    def fill(out):
+        np.stack(arrays, out=out)
+
+    if shared:
+        try:
+            dtype = convert_numpy_dtype_to_oneflow_dtype(arrays[0].dtype)
+        except NotImplementedError:
+            dtype = None
+        if dtype is not None:
+            return shared_memory_pool.new_shared_tensor(shape, dtype, fill)
+    out = np.empty(shape, dtype=arrays[0].dtype)
+    fill(out)
+    return flow.from_numpy(out)
+
+
 def default_collate(batch):
     r"""Puts each data field into a tensor with outer dimension batch size"""
 
     elem = batch[0]
     elem_type = type(elem)
     if isinstance(elem, (flow.Tensor, flow._oneflow_internal.Tensor)):
-        # TODO: tensor.storage()._new_shared(numel)
+        if (
+            _worker._is_process_worker
+            and elem.is_local
+            and elem.device.type == "cpu"
+            and elem.dtype != flow.bfloat16
+            and all(b.shape == elem.shape and b.dtype == elem.dtype for b in batch)
+        ):
+            # If we're in a background process, stack directly into shared memory,
+            # so that only a handle is sent to the main process.
+            return stack_arrays([b.numpy() for b in batch], shared=True)
         return flow._C.stack(batch, dim=0)
     elif (
         elem_type.__module__ == "numpy"
@@ -89,7 +123,11 @@ def default_collate(batch):
             if np_str_obj_array_pattern.search(elem.dtype.str) is not None:
                 raise TypeError(default_collate_err_msg_format.format(elem.dtype))
 
-            return default_collate([flow.tensor(b) for b in batch])
+            if any(b.shape != elem.shape or b.dtype != elem.dtype for b in batch):
+                return default_collate([flow.tensor(b) for b in batch])
+            # Write the samples straight into the output instead of converting
+            # every sample to a tensor first.
+            return stack_arrays(batch, shared=_worker._is_process_worker)
         elif elem.shape == ():  # scalars
             return flow.tensor(batch)
     elif isinstance(elem, float):
@@ -23,7 +23,9 @@ static methods.
 
 import oneflow as flow
 import collections.abc
+import itertools
 import queue
+import threading
 
 from . import MP_STATUS_CHECK_INTERVAL
 from oneflow._utils import ExceptionWrapper
@@ -32,7 +34,7 @@ container_abcs = collections.abc
 string_classes = (str, bytes)
 
 
-def _pin_memory_loop(in_queue, out_queue, device_id, done_event):
+def _pin_memory_loop(in_queue, out_queue, device_id, done_event, pin_memory_fn=None):
     # This setting is thread local, and prevents the copy in pin_memory from
     # consuming all CPU cores.
     flow.set_num_threads(1)
@@ -48,7 +50,7 @@ def _pin_memory_loop(in_queue, out_queue, device_id, done_event):
         idx, data = r
         if not done_event.is_set() and not isinstance(data, ExceptionWrapper):
             try:
-                data = pin_memory(data)
+                data = (pin_memory if pin_memory_fn is None else pin_memory_fn)(data)
             except Exception:
                 data = ExceptionWrapper(
                     where="in pin memory thread for device {}".format(device_id)
@@ -78,3 +80,79 @@ def pin_memory(data):
         return data.pin_memory()
     else:
         return data
+
+
+class PinnedBufferPool(object):
+    r"""Stages batches to :attr:`device` through a fixed ring of host buffers.
+
+    Every tensor of a batch is copied into a buffer of the next slot of the ring, and
+    the buffer is copied to :attr:`device`. Buffers are pinned when CUDA is available
+    and reused as long as the shapes and dtypes of the batches stay the same, so a
+    steady stream of batches allocates ``num_buffers`` sets of buffers once. The copy
+    to the device is an instruction on the host-to-device stream of the device, which
+    runs asynchronously to the caller, and the virtual machine orders a later write to
+    the same buffer after it, so a slot can be reused right away.
+
+    With a CPU :attr:`device` the batch is copied out of the ring, which makes the pool
+    testable without GPUs.
+    """
+
+    def __init__(self, device, num_buffers: int = 4):
+        if num_buffers <= 0:
+            raise ValueError(
+                "num_buffers should be a positive integer, "
+                "but got num_buffers={}".format(num_buffers)
+            )
+        self.device = flow.device(device)
+        self.num_buffers = num_buffers
+        self.pin_memory = flow.cuda.is_available()
+        # slot => {position of the tensor in the batch => buffer}
+        self._slots = [dict() for _ in range(num_buffers)]
+        self._slot_locks = [threading.Lock() for _ in range(num_buffers)]
+        self._slot_idx_cycle = itertools.cycle(range(num_buffers))
+        self._lock = threading.Lock()
+        self.num_allocations = 0
+
+    def _buffer(self, slot, key, tensor):
+        buffer = slot.get(key)
+        if (
+            buffer is None
+            or buffer.shape != tensor.shape
+            or buffer.dtype != tensor.dtype
+        ):
+            buffer = flow.empty(
+                tensor.shape, dtype=tensor.dtype, pin_memory=self.pin_memory
+            )
+            slot[key] = buffer
+            with self._lock:
+                self.num_allocations += 1
+        return buffer
+
+    def _stage(self, data, slot, counter):
+        if isinstance(data, flow.Tensor):
+            if data.is_global:
+                return data
+            if data.device.type != "cpu":
+                return data.to(self.device)
+            buffer = self._buffer(slot, next(counter), data)
+            buffer.copy_(data)
+            return buffer.to(device=self.device, copy=True)
+        elif isinstance(data, string_classes):
+            return data
+        elif isinstance(data, container_abcs.Mapping):
+            return {k: self._stage(sample, slot, counter) for k, sample in data.items()}
+        elif isinstance(data, tuple) and hasattr(data, "_fields"):  # namedtuple
+            return type(data)(*(self._stage(sample, slot, counter) for sample in data))
+        elif isinstance(data, container_abcs.Sequence):
+            return [self._stage(sample, slot, counter) for sample in data]
+        else:
+            return data
+
+    def stage(self, data):
+        r"""Returns a copy of :attr:`data` with its tensors on :attr:`device`. Safe to
+        call from several threads.
+        """
+        with self._lock:
+            slot_idx = next(self._slot_idx_cycle)
+        with self._slot_locks[slot_idx]:
+            return self._stage(data, self._slots[slot_idx], itertools.count())
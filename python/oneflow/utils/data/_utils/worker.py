@@ -21,6 +21,7 @@ import random
 import os
 import sys
 import traceback
+import threading
 import queue
 from dataclasses import dataclass
 from typing import Union
@@ -85,6 +86,11 @@ else:
 
 
 _worker_info = None
+# whether this process is a worker process, whose batches are sent back through
+# shared memory; worker threads share the memory of the main process
+_is_process_worker = False
+# worker information of the worker threads of `_ThreadDataLoaderIter`
+_thread_local = threading.local()
 
 
 class WorkerInfo(object):
@@ -124,6 +130,8 @@ def get_worker_info():
       that this will be a different object in a different process than the one
       in the main process.
     When called in the main process, this returns ``None``.
+    With ``worker_mode="thread"`` the workers are threads of the main process, and
+    :attr:`dataset` is the dataset object of the main process.
     .. note::
        When used in a :attr:`worker_init_fn` passed over to
        :class:`~flow.utils.data.DataLoader`, this method can be useful to
@@ -132,7 +140,8 @@ def get_worker_info():
        sharded dataset, or use ``seed`` to seed other libraries used in dataset
        code.
     """
-    return _worker_info
+    worker_info = getattr(_thread_local, "worker_info", None)
+    return _worker_info if worker_info is None else worker_info
 
 
 r"""Dummy class used to signal the end of an IterableDataset"""
@@ -278,10 +287,11 @@ def _worker_loop(
 
             np.random.seed(np_seed)
 
-        global _worker_info
+        global _worker_info, _is_process_worker
         _worker_info = WorkerInfo(
             id=worker_id, num_workers=num_workers, seed=seed, dataset=dataset
         )
+        _is_process_worker = True
 
         from oneflow.utils.data import _DatasetKind
 
@@ -376,3 +386,91 @@ def _worker_loop(
     # Python subprocess will be exited by os._exit(), which skips destructors of
     # C++ objects, so we should explicitly call unlink_all_shared_memory() here
     unlink_all_shared_memory()
+
+
+def _thread_worker_loop(
+    dataset_kind,
+    dataset,
+    index_queue,
+    data_queue,
+    done_event,
+    auto_collation,
+    collate_fn,
+    drop_last,
+    base_seed,
+    init_fn,
+    worker_id,
+    num_workers,
+    pin_memory_fn,
+):
+    # The loop of a worker thread of `_ThreadDataLoaderIter`, which speaks the same
+    # protocol over `index_queue` and `data_queue` as `_worker_loop`. The thread runs
+    # in the main process, so nothing process-wide is touched: signal handlers, the
+    # number of threads and the random seeds stay as they are, and the worker info is
+    # thread local. Batches are put to `data_queue` as they are, without any copy.
+    seed = base_seed + worker_id
+    _thread_local.worker_info = WorkerInfo(
+        id=worker_id, num_workers=num_workers, seed=seed, dataset=dataset
+    )
+
+    from oneflow.utils.data import _DatasetKind
+
+    init_exception = None
+
+    try:
+        if init_fn is not None:
+            init_fn(worker_id)
+
+        fetcher = _DatasetKind.create_fetcher(
+            dataset_kind, dataset, auto_collation, collate_fn, drop_last
+        )
+    except Exception:
+        init_exception = ExceptionWrapper(
+            where="in DataLoader worker thread {}".format(worker_id)
+        )
+
+    # See `_worker_loop` for `iteration_end`
+    iteration_end = False
+
+    while True:
+        r = index_queue.get()
+        if isinstance(r, _ResumeIteration):
+            # Acknowledge the main thread
+            data_queue.put((r, None))
+            iteration_end = False
+            # Recreate the fetcher for worker-reuse policy
+            fetcher = _DatasetKind.create_fetcher(
+                dataset_kind, dataset, auto_collation, collate_fn, drop_last
+            )
+            continue
+        elif r is None:
+            # Received the final signal
+            assert done_event.is_set() or iteration_end
+            break
+        elif done_event.is_set() or iteration_end:
+            continue
+        idx, index = r
+        data: Union[_IterableDatasetStopIteration, ExceptionWrapper]
+
+        if init_exception is not None:
+            data = init_exception
+            init_exception = None
+        else:
+            try:
+                data = fetcher.fetch(index)
+                if pin_memory_fn is not None:
+                    data = pin_memory_fn(data)
+            except Exception as e:
+                if (
+                    isinstance(e, StopIteration)
+                    and dataset_kind == _DatasetKind.Iterable
+                ):
+                    data = _IterableDatasetStopIteration(worker_id)
+                    iteration_end = True
+                else:
+                    data = ExceptionWrapper(
+                        where="in DataLoader worker thread {}".format(worker_id)
+                    )
+        data_queue.put((idx, data))
+        del data, idx, index, r  # save memory
+    _thread_local.worker_info = None
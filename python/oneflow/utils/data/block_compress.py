@@ -0,0 +1,179 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import os
+import struct
+import sys
+from argparse import ArgumentParser
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List
+
+# Keep in sync with oneflow/core/persistence/block_compressed_in_stream.h
+_MAGIC = b"OFBLKLZ4"
+_BLOCK_INDEX_ENTRY = struct.Struct("<qqq")
+_TRAILER = struct.Struct("<qq8s")
+DEFAULT_BLOCK_SIZE = 4 << 20
+
+
+def is_block_compressed(path: str) -> bool:
+    if os.path.getsize(path) < _TRAILER.size:
+        return False
+    with open(path, "rb") as f:
+        f.seek(-len(_MAGIC), os.SEEK_END)
+        return f.read(len(_MAGIC)) == _MAGIC
+
+
+def _read_blocks(path: str, block_size: int) -> Iterator[bytes]:
+    with open(path, "rb") as f:
+        while True:
+            block = f.read(block_size)
+            if not block:
+                return
+            yield block
+
+
+def compress_file(
+    src: str,
+    dst: str,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+    level: int = 0,
+    num_workers: int = 8,
+) -> int:
+    """Write the block-compressed container of ``src`` to ``dst``.
+
+    The OFRecord and OneRec readers read ``dst`` as if it were ``src``, decompressing
+    blocks on a background thread pool. ``level`` > 0 uses LZ4 HC at that level.
+    Returns the size of ``dst``.
+    """
+    import oneflow
+
+    if is_block_compressed(src):
+        raise ValueError("%s is already block-compressed" % src)
+
+    def compress(block):
+        return oneflow._oneflow_internal.LZ4CompressBlock(block, level)
+
+    index = []
+    tmp_path = dst + ".tmp." + str(os.getpid())
+    max_pending = 2 * max(num_workers, 1)
+    with open(tmp_path, "wb") as f, ThreadPoolExecutor(max(num_workers, 1)) as executor:
+
+        def write_block(size, future):
+            compressed = future.result()
+            offset = index[-1][0] + index[-1][1] if index else 0
+            f.write(compressed)
+            index.append((offset, len(compressed), size))
+
+        # compress a bounded window of blocks concurrently and write them in order
+        pending = []
+        for block in _read_blocks(src, block_size):
+            pending.append((len(block), executor.submit(compress, block)))
+            if len(pending) >= max_pending:
+                write_block(*pending.pop(0))
+        for (size, future) in pending:
+            write_block(size, future)
+        for entry in index:
+            f.write(_BLOCK_INDEX_ENTRY.pack(*entry))
+        uncompressed_size = sum(entry[2] for entry in index)
+        f.write(_TRAILER.pack(len(index), uncompressed_size, _MAGIC))
+    os.replace(tmp_path, dst)
+    return os.path.getsize(dst)
+
+
+def decompress_file(src: str, dst: str):
+    """Restore the original file of the block-compressed ``src`` to ``dst``."""
+    import oneflow
+
+    with open(src, "rb") as f:
+        f.seek(-_TRAILER.size, os.SEEK_END)
+        (num_blocks, _, magic) = _TRAILER.unpack(f.read(_TRAILER.size))
+        if magic != _MAGIC:
+            raise ValueError("%s is not block-compressed" % src)
+        f.seek(-_TRAILER.size - num_blocks * _BLOCK_INDEX_ENTRY.size, os.SEEK_END)
+        index = [
+            _BLOCK_INDEX_ENTRY.unpack(f.read(_BLOCK_INDEX_ENTRY.size))
+            for _ in range(num_blocks)
+        ]
+        with open(dst, "wb") as out:
+            for (offset, compressed_size, size) in index:
+                f.seek(offset)
+                out.write(
+                    oneflow._oneflow_internal.LZ4DecompressBlock(
+                        f.read(compressed_size), size
+                    )
+                )
+
+
+def _input_files(inputs: List[str]) -> List[str]:
+    files = []
+    for path in inputs:
+        if os.path.isdir(path):
+            # sidecar indices refer to offsets in the uncompressed files
+            files.extend(
+                os.path.join(path, name)
+                for name in sorted(os.listdir(path))
+                if os.path.isfile(os.path.join(path, name))
+                and not name.endswith(".idx")
+            )
+        else:
+            files.append(path)
+    return files
+
+
+def parse_args(args=None):
+    parser = ArgumentParser(
+        description="Convert OFRecord or OneRec files to the block-compressed container"
+        " which is read transparently by OFRecordReader and OneRecReader"
+    )
+    parser.add_argument(
+        "inputs", nargs="+", type=str, help="Files or directories of files to convert"
+    )
+    parser.add_argument(
+        "--output_dir",
+        type=str,
+        required=True,
+        help="Where converted files are written",
+    )
+    parser.add_argument("--block_size", type=int, default=DEFAULT_BLOCK_SIZE)
+    parser.add_argument(
+        "--level",
+        type=int,
+        default=0,
+        help="0 for the fast LZ4 compressor, a positive value for LZ4 HC of that level",
+    )
+    parser.add_argument("--num_workers", type=int, default=8)
+    return parser.parse_args(args)
+
+
+def main(args=None):
+    args = parse_args(args)
+    os.makedirs(args.output_dir, exist_ok=True)
+    total_size = 0
+    total_compressed_size = 0
+    for path in _input_files(args.inputs):
+        dst = os.path.join(args.output_dir, os.path.basename(path))
+        compressed_size = compress_file(
+            path, dst, args.block_size, args.level, args.num_workers
+        )
+        size = os.path.getsize(path)
+        total_size += size
+        total_compressed_size += compressed_size
+        print("%s: %d -> %d bytes" % (dst, size, compressed_size))
+    if total_compressed_size > 0:
+        print("compression ratio: %.2f" % (total_size / total_compressed_size))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -18,8 +18,19 @@ import os
 import threading
 import itertools
 import queue
-
-from typing import Any, Callable, TypeVar, Generic, Sequence, List, Optional
+import weakref
+
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    TypeVar,
+    Generic,
+    Sequence,
+    List,
+    Optional,
+    Union,
+)
 import multiprocessing as python_multiprocessing
 
 import oneflow.multiprocessing as multiprocessing
@@ -143,6 +154,23 @@ class DataLoader(Generic[T_co]):
             If you are using oneflow with RDMA support in distributed training, the
             ``persistent_workers`` must be ``True`` otherwise will encounter segmentation
             fault. (default: ``False``)
+        worker_mode (str, optional, keyword-only arg): ``"process"`` runs the
+            :attr:`num_workers` workers in subprocesses, ``"thread"`` runs them in
+            threads of the main process. Thread workers hand batches over without
+            pickling or shared memory, and pay off when the dataset spends its time in
+            code that releases the GIL, e.g. NumPy, OpenCV or OneFlow ops. They share
+            the dataset object and the random state of the main process, so the
+            dataset must be thread-safe. (default: ``"process"``)
+        device (str or flow.device, optional, keyword-only arg): If not ``None``, every
+            batch is staged through a ring of reused pinned host buffers and copied to
+            this device by the loading pipeline, i.e. by the pin memory thread with
+            worker processes, by the workers with worker threads, or in ``__next__``
+            without workers. The copy runs asynchronously on the host-to-device stream,
+            so the batches handed to the training loop are already on their way to, or
+            resident on, the device. :attr:`pin_memory` has no effect then.
+            (default: ``None``)
+        num_staging_buffers (int, optional, keyword-only arg): Number of slots of the
+            ring of pinned host buffers used with :attr:`device`. (default: ``4``)
 
 
     .. warning:: If the ``spawn`` start method is used, :attr:`worker_init_fn`
@@ -191,7 +219,10 @@ class DataLoader(Generic[T_co]):
         generator=flow.Generator("cpu"),
         *,
         prefetch_factor: int = 2,
-        persistent_workers: bool = False
+        persistent_workers: bool = False,
+        worker_mode: str = "process",
+        device: Optional[Union[str, flow.device]] = None,
+        num_staging_buffers: int = 4
     ):
 
         if num_workers < 0:
@@ -215,12 +246,25 @@ class DataLoader(Generic[T_co]):
         if persistent_workers and num_workers == 0:
             raise ValueError("persistent_workers option needs num_workers > 0")
 
+        if worker_mode not in ("process", "thread"):
+            raise ValueError(
+                "worker_mode option should be 'process' or 'thread', "
+                "but got worker_mode={}".format(worker_mode)
+            )
+
         self.dataset = dataset
         self.prefetch_factor = prefetch_factor
         self.pin_memory = pin_memory
         self.timeout = timeout
         self.worker_init_fn = worker_init_fn
         self.multiprocessing_context = multiprocessing_context
+        self.worker_mode = worker_mode
+        self.device = None if device is None else flow.device(device)
+        self._staging_pool = (
+            None
+            if device is None
+            else _utils.pin_memory.PinnedBufferPool(device, num_staging_buffers)
+        )
 
         # Arg-check dataset related before checking samplers because we want to
         # tell users that iterable-style datasets are incompatible with custom
@@ -333,10 +377,13 @@ class DataLoader(Generic[T_co]):
         )
 
         self._iterator = self._get_iterator() if self.persistent_workers else None
+        self._last_iterator = None
 
     def _get_iterator(self) -> "_BaseDataLoaderIter":
         if self.num_workers == 0:
             return _SingleProcessDataLoaderIter(self)
+        elif self.worker_mode == "thread":
+            return _ThreadDataLoaderIter(self)
         else:
             self.check_worker_number_rationality()
             return _MultiProcessingDataLoaderIter(self)
@@ -349,6 +396,7 @@ class DataLoader(Generic[T_co]):
             "drop_last",
             "dataset",
             "persistent_workers",
+            "worker_mode",
         ):
             raise ValueError(
                 "{} attribute should not be set after {} is "
@@ -370,9 +418,12 @@ class DataLoader(Generic[T_co]):
                 self._iterator = self._get_iterator()
             else:
                 self._iterator._reset(self)
-            return self._iterator
+            iterator = self._iterator
         else:
-            return self._get_iterator()
+            iterator = self._get_iterator()
+        # a weak reference, so that dropping the iterator still shuts its workers down
+        self._last_iterator = weakref.ref(iterator)
+        return iterator
 
     @property
     def _auto_collation(self):
@@ -390,6 +441,61 @@ class DataLoader(Generic[T_co]):
         else:
             return self.sampler
 
+    @property
+    def _stateful_sampler(self):
+        # The sampler whose `state_dict` describes the progress of the DataLoader,
+        # and the number of its indices consumed by each index of `_index_sampler`.
+        if self._auto_collation and isinstance(self.batch_sampler, BatchSampler):
+            sampler, num_indices = self.batch_sampler.sampler, self.batch_size
+        else:
+            sampler, num_indices = self._index_sampler, 1
+        if not hasattr(sampler, "state_dict") or not hasattr(
+            sampler, "load_state_dict"
+        ):
+            return None, num_indices
+        return sampler, num_indices
+
+    def _sampler_state_dict(self) -> Optional[Dict[str, Any]]:
+        sampler, _ = self._stateful_sampler
+        return None if sampler is None else sampler.state_dict()
+
+    def state_dict(self) -> Dict[str, Any]:
+        r"""Returns the state of the DataLoader, which is the state of its sampler with
+        ``num_consumed`` counting the samples of the batches already returned by the
+        current iterator. Samples that were prefetched by workers but not yet returned are
+        not counted, so they are loaded again after :meth:`load_state_dict`.
+
+        Only samplers with ``state_dict`` and ``load_state_dict`` methods, such as
+        :class:`~flow.utils.data.RandomSampler` and
+        :class:`~flow.utils.data.DistributedSampler`, are supported.
+        """
+        sampler, num_indices = self._stateful_sampler
+        if sampler is None:
+            raise TypeError(
+                "DataLoader.state_dict requires a sampler with state_dict and "
+                "load_state_dict methods"
+            )
+        iterator = self._last_iterator() if self._last_iterator is not None else None
+        if iterator is None or iterator._sampler_state is None:
+            # no iterator in progress
+            return {"sampler": sampler.state_dict()}
+        state = dict(iterator._sampler_state)
+        state["num_consumed"] += iterator._num_yielded * num_indices
+        return {"sampler": state}
+
+    def load_state_dict(self, state_dict: Dict[str, Any]) -> None:
+        r"""Restores the state saved by :meth:`state_dict`. The next iterator created from
+        the DataLoader continues after the samples already consumed.
+        """
+        sampler, _ = self._stateful_sampler
+        if sampler is None:
+            raise TypeError(
+                "DataLoader.load_state_dict requires a sampler with state_dict and "
+                "load_state_dict methods"
+            )
+        sampler.load_state_dict(state_dict["sampler"])
+        self._last_iterator = None
+
     def __len__(self) -> int:
         if self._dataset_kind == _DatasetKind.Iterable:
             # NOTE [ IterableDataset and __len__ ]
@@ -498,9 +604,19 @@ class _BaseDataLoaderIter(object):
         self._num_workers = loader.num_workers
         self._prefetch_factor = loader.prefetch_factor
         self._pin_memory = loader.pin_memory and flow.cuda.is_available()
+        # what is applied to every batch on its way out: staging to the device of the
+        # DataLoader, pinning, or nothing
+        if loader._staging_pool is not None:
+            self._pin_memory_fn = loader._staging_pool.stage
+        elif self._pin_memory:
+            self._pin_memory_fn = _utils.pin_memory.pin_memory
+        else:
+            self._pin_memory_fn = None
         self._timeout = loader.timeout
         self._collate_fn = loader.collate_fn
         self._sampler_iter = iter(self._index_sampler)
+        # state of the sampler when this pass started, see DataLoader.state_dict
+        self._sampler_state = loader._sampler_state_dict()
         self._generator = loader.generator
         self._base_seed = flow.tensor([0], dtype=flow.int64).uniform_().numpy().item()
         # self._base_seed = flow.empty((), dtype=flow.int64).random_(generator=loader.generator).item()
@@ -515,6 +631,7 @@ class _BaseDataLoaderIter(object):
 
     def _reset(self, loader, first_iter=False):
         self._sampler_iter = iter(self._index_sampler)
+        self._sampler_state = loader._sampler_state_dict()
         self._num_yielded = 0
         self._IterableDataset_len_called = loader._IterableDataset_len_called
 
@@ -527,7 +644,11 @@ class _BaseDataLoaderIter(object):
     def __next__(self) -> Any:
         if self._sampler_iter is None:
             self._reset()
-        data = self._next_data()
+        try:
+            data = self._next_data()
+        except StopIteration:
+            self._sampler_state = None
+            raise
         self._num_yielded += 1
         if (
             self._dataset_kind == _DatasetKind.Iterable
@@ -569,8 +690,8 @@ class _SingleProcessDataLoaderIter(_BaseDataLoaderIter):
     def _next_data(self):
         index = self._next_index()  # may raise StopIteration
         data = self._dataset_fetcher.fetch(index)  # may raise StopIteration
-        if self._pin_memory:
-            data = _utils.pin_memory.pin_memory(data)
+        if self._pin_memory_fn is not None:
+            data = self._pin_memory_fn(data)
         return data
 
 
@@ -948,7 +1069,7 @@ class _MultiProcessingDataLoaderIter(_BaseDataLoaderIter):
             self._index_queues.append(index_queue)
             self._workers.append(w)
 
-        if self._pin_memory:
+        if self._pin_memory_fn is not None:
             self._pin_memory_thread_done_event = threading.Event()
 
             # Queue is not type-annotated
@@ -958,8 +1079,9 @@ class _MultiProcessingDataLoaderIter(_BaseDataLoaderIter):
                 args=(
                     self._worker_result_queue,
                     self._data_queue,
-                    flow.cuda.current_device(),
+                    flow.cuda.current_device() if self._pin_memory else -1,
                     self._pin_memory_thread_done_event,
+                    self._pin_memory_fn,
                 ),
             )
             pin_memory_thread.daemon = True
@@ -1081,7 +1203,7 @@ class _MultiProcessingDataLoaderIter(_BaseDataLoaderIter):
                 raise RuntimeError(
                     "DataLoader timed out after {} seconds".format(self._timeout)
                 )
-        elif self._pin_memory:
+        elif self._pin_memory_fn is not None:
             while self._pin_memory_thread.is_alive():
                 success, data = self._try_get_data()
                 if success:
@@ -1280,3 +1402,106 @@ class _MultiProcessingDataLoaderIter(_BaseDataLoaderIter):
 
     def __del__(self):
         self._shutdown_workers()
+
+
+class _ThreadDataLoaderIter(_MultiProcessingDataLoaderIter):
+    r"""Iterates once over the DataLoader's dataset with worker threads, as specified
+    by the sampler.
+
+    The workers follow the protocol of :class:`_MultiProcessingDataLoaderIter`, so the
+    ordering, prefetching and handling of iterable-style datasets are the same, but
+    run in threads of this process and put the fetched (and pinned) batches on a
+    :class:`queue.Queue` as they are.
+    """
+
+    def __init__(self, loader):
+        _BaseDataLoaderIter.__init__(self, loader)
+
+        assert self._num_workers > 0
+        assert self._prefetch_factor > 0
+
+        self._worker_init_fn = loader.worker_init_fn
+        self._worker_queue_idx_cycle = itertools.cycle(range(self._num_workers))
+        self._worker_result_queue = queue.Queue()  # type: ignore[var-annotated]
+        self._data_queue = self._worker_result_queue
+        self._worker_pids_set = False
+        self._shutdown = False
+        self._workers_done_event = threading.Event()
+
+        self._index_queues = []
+        self._workers = []
+        for i in range(self._num_workers):
+            index_queue = queue.Queue()  # type: ignore[var-annotated]
+            w = threading.Thread(
+                target=_utils.worker._thread_worker_loop,
+                args=(
+                    self._dataset_kind,
+                    self._dataset,
+                    index_queue,
+                    self._worker_result_queue,
+                    self._workers_done_event,
+                    self._auto_collation,
+                    self._collate_fn,
+                    self._drop_last,
+                    self._base_seed,
+                    self._worker_init_fn,
+                    i,
+                    self._num_workers,
+                    self._pin_memory_fn,
+                ),
+            )
+            w.daemon = True
+            w.start()
+            self._index_queues.append(index_queue)
+            self._workers.append(w)
+        self._reset(loader, first_iter=True)
+
+    def _try_get_data(self, timeout=_utils.MP_STATUS_CHECK_INTERVAL):
+        try:
+            data = self._data_queue.get(timeout=timeout)
+            return (True, data)
+        except queue.Empty:
+            failed_workers = []
+            for worker_id, w in enumerate(self._workers):
+                if self._workers_status[worker_id] and not w.is_alive():
+                    failed_workers.append(w)
+                    self._mark_worker_as_unavailable(worker_id)
+            if len(failed_workers) > 0:
+                raise RuntimeError(
+                    "DataLoader worker thread(s) {} exited unexpectedly".format(
+                        ", ".join(w.name for w in failed_workers)
+                    )
+                )
+            return (False, None)
+
+    def _get_data(self):
+        # Batches are pinned or staged by the workers, there is no pin memory thread to
+        # watch.
+        if self._timeout > 0:
+            success, data = self._try_get_data(self._timeout)
+            if success:
+                return data
+            else:
+                raise RuntimeError(
+                    "DataLoader timed out after {} seconds".format(self._timeout)
+                )
+        else:
+            while True:
+                success, data = self._try_get_data()
+                if success:
+                    return data
+
+    def _shutdown_workers(self):
+        if _utils is None or _utils.python_exit_status is not False:
+            # Python is shutting down, the daemon threads go away with it.
+            return
+        if not self._shutdown:
+            self._shutdown = True
+            self._workers_done_event.set()
+            for worker_id in range(len(self._workers)):
+                if self._persistent_workers or self._workers_status[worker_id]:
+                    self._mark_worker_as_unavailable(worker_id, shutdown=True)
+            for w in self._workers:
+                # A worker busy in a long fetch finishes it before exiting, don't
+                # block on it forever.
+                w.join(timeout=_utils.MP_STATUS_CHECK_INTERVAL)
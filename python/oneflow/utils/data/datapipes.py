@@ -0,0 +1,525 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+r"""Built-in streaming datapipes.
+
+Every datapipe is an :class:`~flow.utils.data.IterableDataset`, so a pipeline can be
+given to :class:`~flow.utils.data.DataLoader` as it is. All but :class:`FileLister`
+are also registered as functions of ``IterDataPipe``, which makes them chainable::
+
+    >>> dp = FileLister(data_dir, "*.txt").shard().readlines().shuffle(1024)
+    >>> dp = dp.map(tokenize, num_workers=4).batch(32).prefetch(4)
+
+Every datapipe counts the items it produces and the time its consumer waits for
+them, see :func:`pipeline_stats`.
+"""
+import collections
+import concurrent.futures
+import fnmatch
+import os
+import queue
+import random
+import struct
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Union
+
+import oneflow as flow
+from oneflow._utils import ExceptionWrapper
+from oneflow.utils.data import IterDataPipe
+from oneflow.utils.data._utils.worker import get_worker_info
+from oneflow.utils.data.decorator import functional_datapipe
+
+
+class DataPipeStats(object):
+    r"""Throughput counters of a datapipe.
+
+    ``num_items`` is the number of items the datapipe has produced, ``seconds`` the
+    time its consumer waited for them, and ``upstream_seconds`` the part of it spent
+    waiting for the source datapipe, so ``seconds - upstream_seconds`` is the time
+    spent in the stage itself. The counters of a datapipe used in DataLoader worker
+    processes live in the workers.
+    """
+
+    __slots__ = ("num_items", "seconds", "upstream_seconds")
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.num_items = 0
+        self.seconds = 0.0
+        self.upstream_seconds = 0.0
+
+    @property
+    def items_per_second(self) -> float:
+        own_seconds = self.seconds - self.upstream_seconds
+        return self.num_items / own_seconds if own_seconds > 0 else float("inf")
+
+    def __repr__(self):
+        return "{}(num_items={}, seconds={:.6f}, upstream_seconds={:.6f})".format(
+            self.__class__.__name__,
+            self.num_items,
+            self.seconds,
+            self.upstream_seconds,
+        )
+
+
+class _StreamingDataPipe(IterDataPipe):
+    # Subclasses implement `_iter` and read their source through `_pull`, and
+    # `__iter__` keeps the counters of `stats`.
+    source_datapipe: Optional[IterDataPipe] = None
+
+    def __init__(self, source_datapipe: Optional[IterDataPipe] = None) -> None:
+        self.source_datapipe = source_datapipe
+        self.stats = DataPipeStats()
+
+    def _iter(self) -> Iterator:
+        raise NotImplementedError
+
+    def _pull(self, iterable) -> Iterator:
+        stats = self.stats
+        it = iter(iterable)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(it)
+            except StopIteration:
+                stats.upstream_seconds += time.perf_counter() - start
+                return
+            stats.upstream_seconds += time.perf_counter() - start
+            yield item
+
+    def __iter__(self) -> Iterator:
+        stats = self.stats
+        it = self._iter()
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(it)
+            except StopIteration:
+                stats.seconds += time.perf_counter() - start
+                return
+            stats.seconds += time.perf_counter() - start
+            stats.num_items += 1
+            yield item
+
+
+def pipeline_stats(datapipe: IterDataPipe) -> List[Dict[str, Any]]:
+    r"""Returns the throughput counters of the stages of a pipeline, from its source
+    to :attr:`datapipe`, as a list of dicts with keys ``name``, ``num_items``,
+    ``seconds``, ``upstream_seconds`` and ``items_per_second``.
+    """
+    stages = []
+    while isinstance(datapipe, _StreamingDataPipe):
+        stats = datapipe.stats
+        stages.append(
+            {
+                "name": type(datapipe).__name__,
+                "num_items": stats.num_items,
+                "seconds": stats.seconds,
+                "upstream_seconds": stats.upstream_seconds,
+                "items_per_second": stats.items_per_second,
+            }
+        )
+        datapipe = datapipe.source_datapipe
+    return stages[::-1]
+
+
+class FileLister(_StreamingDataPipe):
+    r"""Yields the paths of the files under :attr:`root`, sorted.
+
+    Args:
+        root (str or sequence of str): directories to list, or files to yield as they
+            are.
+        masks (str or sequence of str): Unix shell-style patterns the file names must
+            match one of. Default: ``""``, which matches every file.
+        recursive (bool): list sub-directories recursively. Default: ``False``.
+    """
+
+    def __init__(
+        self,
+        root: Union[str, Sequence[str]],
+        masks: Union[str, Sequence[str]] = "",
+        recursive: bool = False,
+    ) -> None:
+        super().__init__()
+        self.roots = [root] if isinstance(root, str) else list(root)
+        self.masks = [masks] if isinstance(masks, str) else list(masks)
+        self.recursive = recursive
+
+    def _match(self, name):
+        return any(mask == "" or fnmatch.fnmatch(name, mask) for mask in self.masks)
+
+    def _iter(self):
+        for root in self.roots:
+            if os.path.isfile(root):
+                yield root
+                continue
+            if self.recursive:
+                paths = [
+                    os.path.join(dirpath, name)
+                    for dirpath, _, names in os.walk(root)
+                    for name in names
+                ]
+            else:
+                paths = [entry.path for entry in os.scandir(root) if entry.is_file()]
+            for path in sorted(paths):
+                if self._match(os.path.basename(path)):
+                    yield path
+
+
+@functional_datapipe("readlines")
+class LineReader(_StreamingDataPipe):
+    r"""Reads the text files whose paths come from :attr:`source_datapipe` and yields
+    their lines.
+
+    Args:
+        source_datapipe (IterDataPipe): datapipe of file paths.
+        strip_newline (bool): remove the trailing newline of the lines. Default:
+            ``True``.
+        return_path (bool): yield ``(path, line)`` tuples. Default: ``False``.
+        encoding (str): encoding of the files. Default: ``"utf-8"``.
+    """
+
+    def __init__(
+        self,
+        source_datapipe: IterDataPipe,
+        strip_newline: bool = True,
+        return_path: bool = False,
+        encoding: str = "utf-8",
+    ) -> None:
+        super().__init__(source_datapipe)
+        self.strip_newline = strip_newline
+        self.return_path = return_path
+        self.encoding = encoding
+
+    def _iter(self):
+        for path in self._pull(self.source_datapipe):
+            with open(path, "r", encoding=self.encoding) as f:
+                for line in f:
+                    if self.strip_newline:
+                        line = line.rstrip("\r\n")
+                    yield (path, line) if self.return_path else line
+
+
+@functional_datapipe("read_records")
+class RecordReader(_StreamingDataPipe):
+    r"""Reads the record files whose paths come from :attr:`source_datapipe` and yields
+    the serialized records as :class:`bytes`.
+
+    A record file is a sequence of records, each prefixed by its length as a
+    little-endian int64, which is the layout of OFRecord part files.
+
+    Args:
+        source_datapipe (IterDataPipe): datapipe of file paths.
+        return_path (bool): yield ``(path, record)`` tuples. Default: ``False``.
+    """
+
+    def __init__(
+        self, source_datapipe: IterDataPipe, return_path: bool = False
+    ) -> None:
+        super().__init__(source_datapipe)
+        self.return_path = return_path
+
+    @staticmethod
+    def _read_records(f):
+        while True:
+            header = f.read(8)
+            if len(header) == 0:
+                return
+            if len(header) != 8:
+                raise ValueError("truncated record header in {}".format(f.name))
+            (size,) = struct.unpack("<q", header)
+            record = f.read(size)
+            if len(record) != size:
+                raise ValueError("truncated record in {}".format(f.name))
+            yield record
+
+    def _iter(self):
+        for path in self._pull(self.source_datapipe):
+            with open(path, "rb") as f:
+                for record in self._read_records(f):
+                    yield (path, record) if self.return_path else record
+
+
+@functional_datapipe("map")
+class Mapper(_StreamingDataPipe):
+    r"""Applies :attr:`fn` to the items of :attr:`source_datapipe`.
+
+    With :attr:`num_workers` > 0, :attr:`fn` runs on a pool of threads or processes,
+    with at most :attr:`max_in_flight` items submitted and not yet yielded, and the
+    items are yielded in the order of the source. Thread workers suit functions that
+    release the GIL (NumPy, OpenCV, OneFlow ops, I/O); process workers require
+    :attr:`fn` and the items to be picklable, and can't be started inside DataLoader
+    worker processes.
+
+    Args:
+        source_datapipe (IterDataPipe): the source datapipe.
+        fn (callable): the function applied to every item.
+        num_workers (int): size of the pool, ``0`` applies :attr:`fn` in the
+            consuming thread. Default: ``0``.
+        worker_mode (str): ``"thread"`` or ``"process"``. Default: ``"thread"``.
+        max_in_flight (int, optional): bound of the submitted items. Default:
+            ``2 * num_workers``.
+    """
+
+    def __init__(
+        self,
+        source_datapipe: IterDataPipe,
+        fn: Callable,
+        num_workers: int = 0,
+        worker_mode: str = "thread",
+        max_in_flight: Optional[int] = None,
+    ) -> None:
+        super().__init__(source_datapipe)
+        if num_workers < 0:
+            raise ValueError(
+                "num_workers should be non-negative, but got {}".format(num_workers)
+            )
+        if worker_mode not in ("thread", "process"):
+            raise ValueError(
+                "worker_mode should be 'thread' or 'process', "
+                "but got {}".format(worker_mode)
+            )
+        if max_in_flight is None:
+            max_in_flight = 2 * num_workers
+        if num_workers > 0 and max_in_flight < 1:
+            raise ValueError(
+                "max_in_flight should be positive, but got {}".format(max_in_flight)
+            )
+        self.fn = fn
+        self.num_workers = num_workers
+        self.worker_mode = worker_mode
+        self.max_in_flight = max_in_flight
+
+    def _iter(self):
+        if self.num_workers == 0:
+            for item in self._pull(self.source_datapipe):
+                yield self.fn(item)
+            return
+        if self.worker_mode == "thread":
+            executor = concurrent.futures.ThreadPoolExecutor(self.num_workers)
+        else:
+            executor = concurrent.futures.ProcessPoolExecutor(self.num_workers)
+        futures = collections.deque()
+        try:
+            for item in self._pull(self.source_datapipe):
+                if len(futures) >= self.max_in_flight:
+                    yield futures.popleft().result()
+                futures.append(executor.submit(self.fn, item))
+            while futures:
+                yield futures.popleft().result()
+        finally:
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait=False)
+
+
+@functional_datapipe("batch")
+class Batcher(_StreamingDataPipe):
+    r"""Groups the items of :attr:`source_datapipe` into lists of :attr:`batch_size`.
+
+    Args:
+        source_datapipe (IterDataPipe): the source datapipe.
+        batch_size (int): number of items in a batch.
+        drop_last (bool): drop the last batch if it is smaller than
+            :attr:`batch_size`. Default: ``False``.
+    """
+
+    def __init__(
+        self, source_datapipe: IterDataPipe, batch_size: int, drop_last: bool = False
+    ) -> None:
+        super().__init__(source_datapipe)
+        if batch_size <= 0:
+            raise ValueError(
+                "batch_size should be a positive integer, "
+                "but got batch_size={}".format(batch_size)
+            )
+        self.batch_size = batch_size
+        self.drop_last = drop_last
+
+    def _iter(self):
+        batch = []
+        for item in self._pull(self.source_datapipe):
+            batch.append(item)
+            if len(batch) == self.batch_size:
+                yield batch
+                batch = []
+        if len(batch) > 0 and not self.drop_last:
+            yield batch
+
+
+@functional_datapipe("shuffle")
+class Shuffler(_StreamingDataPipe):
+    r"""Shuffles the items of :attr:`source_datapipe` with a buffer of
+    :attr:`buffer_size` items: every item is taken at random from the buffer, and
+    replaced with the next item of the source.
+
+    Args:
+        source_datapipe (IterDataPipe): the source datapipe.
+        buffer_size (int): size of the shuffle buffer. Default: ``10000``.
+        seed (int, optional): random seed. Every pass over the datapipe is shuffled
+            differently, deterministically if :attr:`seed` is given. Default: drawn
+            from :mod:`random`.
+    """
+
+    def __init__(
+        self,
+        source_datapipe: IterDataPipe,
+        buffer_size: int = 10000,
+        seed: Optional[int] = None,
+    ) -> None:
+        super().__init__(source_datapipe)
+        if buffer_size <= 0:
+            raise ValueError(
+                "buffer_size should be a positive integer, "
+                "but got buffer_size={}".format(buffer_size)
+            )
+        self.buffer_size = buffer_size
+        self.seed = random.getrandbits(63) if seed is None else seed
+        self.epoch = 0
+
+    def _iter(self):
+        rng = random.Random(self.seed + self.epoch)
+        self.epoch += 1
+        buffer = []
+        for item in self._pull(self.source_datapipe):
+            if len(buffer) < self.buffer_size:
+                buffer.append(item)
+                continue
+            idx = rng.randrange(self.buffer_size)
+            yield buffer[idx]
+            buffer[idx] = item
+        rng.shuffle(buffer)
+        yield from buffer
+
+
+@functional_datapipe("shard")
+class Sharder(_StreamingDataPipe):
+    r"""Keeps every :attr:`num_shards`-th item of :attr:`source_datapipe`, starting at
+    the :attr:`shard_id`-th one.
+
+    By default the items are split across the ranks of the distributed group and
+    the workers of the :class:`~flow.utils.data.DataLoader` the datapipe runs in, so
+    that every item is loaded once.
+
+    Args:
+        source_datapipe (IterDataPipe): the source datapipe.
+        num_shards (int, optional): number of shards. Default: world size times
+            number of DataLoader workers.
+        shard_id (int, optional): the shard to keep. Default: rank times number of
+            DataLoader workers plus worker id.
+    """
+
+    def __init__(
+        self,
+        source_datapipe: IterDataPipe,
+        num_shards: Optional[int] = None,
+        shard_id: Optional[int] = None,
+    ) -> None:
+        super().__init__(source_datapipe)
+        if (num_shards is None) != (shard_id is None):
+            raise ValueError("num_shards and shard_id should be given together")
+        if num_shards is not None and not 0 <= shard_id < num_shards:
+            raise ValueError(
+                "shard_id should be in [0, {}), but got {}".format(num_shards, shard_id)
+            )
+        self.num_shards = num_shards
+        self.shard_id = shard_id
+
+    def _shard(self):
+        if self.num_shards is not None:
+            return self.num_shards, self.shard_id
+        num_shards, shard_id = flow.env.get_world_size(), flow.env.get_rank()
+        worker_info = get_worker_info()
+        if worker_info is not None:
+            num_shards *= worker_info.num_workers
+            shard_id = shard_id * worker_info.num_workers + worker_info.id
+        return num_shards, shard_id
+
+    def _iter(self):
+        num_shards, shard_id = self._shard()
+        for i, item in enumerate(self._pull(self.source_datapipe)):
+            if i % num_shards == shard_id:
+                yield item
+
+
+_PREFETCH_END = object()
+
+
+@functional_datapipe("prefetch")
+class Prefetcher(_StreamingDataPipe):
+    r"""Iterates :attr:`source_datapipe` in a background thread, which stays at most
+    :attr:`buffer_size` items ahead of the consumer.
+
+    The counters of the datapipe count the time the consumer waited for the buffer,
+    while ``upstream_seconds`` stays zero.
+
+    Args:
+        source_datapipe (IterDataPipe): the source datapipe.
+        buffer_size (int): number of prefetched items. Default: ``2``.
+    """
+
+    def __init__(self, source_datapipe: IterDataPipe, buffer_size: int = 2) -> None:
+        super().__init__(source_datapipe)
+        if buffer_size <= 0:
+            raise ValueError(
+                "buffer_size should be a positive integer, "
+                "but got buffer_size={}".format(buffer_size)
+            )
+        self.buffer_size = buffer_size
+
+    @staticmethod
+    def _produce(source_datapipe, buffer, done_event):
+        def put(item):
+            while not done_event.is_set():
+                try:
+                    buffer.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        try:
+            for item in source_datapipe:
+                if not put(item):
+                    return
+        except Exception:
+            put(ExceptionWrapper(where="in datapipe prefetch thread"))
+            return
+        put(_PREFETCH_END)
+
+    def _iter(self):
+        buffer = queue.Queue(self.buffer_size)
+        done_event = threading.Event()
+        thread = threading.Thread(
+            target=self._produce,
+            args=(self.source_datapipe, buffer, done_event),
+            daemon=True,
+        )
+        thread.start()
+        try:
+            while True:
+                item = buffer.get()
+                if item is _PREFETCH_END:
+                    return
+                if isinstance(item, ExceptionWrapper):
+                    item.reraise()
+                yield item
+        finally:
+            # also stops the thread when the consumer abandons the iterator
+            done_event.set()
+            thread.join()
@@ -62,7 +62,9 @@ class Dataset(Generic[T_co]):
     data sample for a given key. Subclasses could also optionally overwrite
     :meth:`__len__`, which is expected to return the size of the dataset by many
     :class:`~flow.utils.data.Sampler` implementations and the default options
-    of :class:`~flow.utils.data.DataLoader`.
+    of :class:`~flow.utils.data.DataLoader`. Subclasses could also optionally
+    implement :meth:`__getitems__`, which takes a list of indices and returns the
+    list of samples, to speed up fetching a batch of samples.
 
     .. note::
       :class:`~flow.utils.data.DataLoader` by default constructs a index
@@ -310,6 +312,12 @@ class Subset(Dataset[T_co]):
     def __getitem__(self, idx):
         return self.dataset[self.indices[idx]]
 
+    def __getitems__(self, indices):
+        indices = [self.indices[idx] for idx in indices]
+        if getattr(self.dataset, "__getitems__", None):
+            return self.dataset.__getitems__(indices)
+        return [self.dataset[idx] for idx in indices]
+
     def __len__(self):
         return len(self.indices)
 
@@ -15,10 +15,11 @@ limitations under the License.
 """
 import math
 import numpy as np
-from typing import TypeVar, Optional, Iterator
+from typing import Any, Dict, TypeVar, Optional, Iterator
 
 import oneflow as flow
 from oneflow.utils.data import Sampler, Dataset
+from oneflow.utils.data.sampler import _FeistelPermutation, _lazy_indices
 
 
 T_co = TypeVar("T_co", covariant=True)
@@ -60,6 +61,13 @@ class DistributedSampler(Sampler[T_co]):
         is necessary to make shuffling work properly across multiple epochs. Otherwise,
         the same ordering will be always used.
 
+    The indices of a rank are generated lazily from a constant-memory permutation of
+    the dataset, so no rank materializes the full list of indices. :meth:`state_dict`
+    captures ``(seed, epoch, num_consumed)``, and after :meth:`load_state_dict` the
+    next pass skips the indices this rank has already consumed in the saved epoch. A
+    pass abandoned before its end does not advance the epoch, which only changes through
+    :meth:`set_epoch`, and the next pass starts the epoch over.
+
     For example:
 
     .. code-block:: python
@@ -117,39 +125,72 @@ class DistributedSampler(Sampler[T_co]):
         self.total_size = self.num_samples * self.num_replicas
         self.shuffle = shuffle
         self.seed = seed
+        self._num_consumed = 0
+        self._resume = False
+        self._pass_id = 0
 
     def __iter__(self) -> Iterator[T_co]:
-        if self.shuffle:
-            # deterministically shuffle based on epoch and seed
-            g = flow.Generator("cpu")
-            g.manual_seed(self.seed + self.epoch)
-            indices = flow._C.randperm(len(self.dataset), generator=g).tolist()
-        else:
-            indices = list(range(len(self.dataset)))
-
-        if not self.drop_last:
-            # add extra samples to make it evenly divisible
-            padding_size = self.total_size - len(indices)
-            if padding_size <= len(indices):
-                indices += indices[:padding_size]
-            else:
-                indices += (indices * math.ceil(padding_size / len(indices)))[
-                    :padding_size
-                ]
-        else:
-            # remove tail of data to make it evenly divisible.
-            indices = indices[: self.total_size]
-        assert len(indices) == self.total_size
+        # The state is updated when the pass starts rather than when its first index
+        # is drawn, so that a DataLoader sees it right after creating its iterator.
+        n = len(self.dataset)
+        start = self._num_consumed if self._resume else 0
+        self._resume = False
+        self._num_consumed = start
+        self._pass_id += 1
+        # deterministically shuffle based on epoch and seed
+        permutation = (
+            _FeistelPermutation(n, self.seed, self.epoch) if self.shuffle else None
+        )
 
-        # subsample
-        indices = indices[self.rank : self.total_size : self.num_replicas]
-        assert len(indices) == self.num_samples
+        def index_fn(positions):
+            positions = positions % n
+            return positions if permutation is None else permutation(positions)
+
+        # Position p of the padded (or truncated) global order is the (p % n)-th index
+        # of the permutation, which adds extra samples from the head of the order to
+        # make it evenly divisible, or removes the tail of it if drop_last is True.
+        # This rank takes positions rank, rank + num_replicas, ...
+        indices = _lazy_indices(
+            index_fn,
+            self.rank + start * self.num_replicas,
+            self.total_size,
+            self.num_replicas,
+        )
+        return self._iter_pass(self._pass_id, indices)
 
-        return iter(indices)
+    def _iter_pass(self, pass_id: int, indices: Iterator[int]) -> Iterator[T_co]:
+        for index in indices:
+            # an abandoned pass no longer updates the state of the sampler
+            if pass_id == self._pass_id:
+                self._num_consumed += 1
+            yield index
+        if pass_id == self._pass_id:
+            self._num_consumed = 0
 
     def __len__(self) -> int:
         return self.num_samples
 
+    def state_dict(self) -> Dict[str, Any]:
+        r"""Returns the state of the sampler as a :class:`dict` with keys ``seed``,
+        ``epoch`` and ``num_consumed``, the number of indices of the epoch consumed by
+        this rank.
+        """
+        return {
+            "seed": self.seed,
+            "epoch": self.epoch,
+            "num_consumed": self._num_consumed,
+        }
+
+    def load_state_dict(self, state_dict: Dict[str, Any]) -> None:
+        r"""Restores the state saved by :meth:`state_dict`. The next pass over the
+        sampler continues the saved epoch after its ``num_consumed`` indices, unless
+        :meth:`set_epoch` moves the sampler to another epoch.
+        """
+        self.seed = state_dict["seed"]
+        self.epoch = state_dict["epoch"]
+        self._num_consumed = state_dict["num_consumed"]
+        self._resume = True
+
     def set_epoch(self, epoch: int) -> None:
         """Sets the epoch for this sampler. 
         When :attr:`shuffle=True`, this ensures all replicas use a different random 
@@ -159,4 +200,8 @@ class DistributedSampler(Sampler[T_co]):
         Args:
             epoch (int): Epoch number.
         """
+        if epoch != self.epoch:
+            # a resumed position only applies to the epoch it was saved in
+            self._num_consumed = 0
+            self._resume = False
         self.epoch = epoch
@@ -0,0 +1,158 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import os
+import struct
+import sys
+from argparse import ArgumentParser
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Sequence, Tuple
+
+from oneflow.utils.data.block_compress import is_block_compressed
+
+# Keep in sync with oneflow/user/data/indexed_ofrecord_dataset.h
+INDEX_SUFFIX = ".idx"
+_INDEX_MAGIC = b"OFRIDX01"
+_INDEX_HEADER = struct.Struct("<8sqq")
+_RECORD_SIZE = struct.Struct("<q")
+
+
+def index_path(part_path: str) -> str:
+    return part_path + INDEX_SUFFIX
+
+
+def part_file_paths(
+    data_dir: str,
+    data_part_num: int,
+    part_name_prefix: str = "part-",
+    part_name_suffix_length: int = -1,
+) -> List[str]:
+    """Paths of the part files read by ``flow.nn.OFRecordReader`` with the same arguments."""
+    return [
+        os.path.join(data_dir, part_name_prefix + str(i).zfill(part_name_suffix_length))
+        for i in range(data_part_num)
+    ]
+
+
+def build_index(part_path: str) -> int:
+    """Scan an OFRecord part file and write the offset of every record to its sidecar index.
+
+    Returns the number of records. The index is written to a temporary file and renamed, so
+    readers never see a partially written index.
+    """
+    if is_block_compressed(part_path):
+        raise ValueError(
+            "%s is block-compressed, index the uncompressed part file instead"
+            % part_path
+        )
+    file_size = os.path.getsize(part_path)
+    offsets = []
+    with open(part_path, "rb") as f:
+        offset = 0
+        while offset < file_size:
+            size_bytes = f.read(_RECORD_SIZE.size)
+            if len(size_bytes) != _RECORD_SIZE.size:
+                raise ValueError(
+                    "truncated record size at offset %d of %s" % (offset, part_path)
+                )
+            (record_size,) = _RECORD_SIZE.unpack(size_bytes)
+            next_offset = offset + _RECORD_SIZE.size + record_size
+            if record_size <= 0 or next_offset > file_size:
+                raise ValueError(
+                    "invalid record size %d at offset %d of %s"
+                    % (record_size, offset, part_path)
+                )
+            offsets.append(offset)
+            f.seek(next_offset)
+            offset = next_offset
+    tmp_path = index_path(part_path) + ".tmp." + str(os.getpid())
+    with open(tmp_path, "wb") as f:
+        f.write(_INDEX_HEADER.pack(_INDEX_MAGIC, file_size, len(offsets)))
+        f.write(struct.pack("<%dq" % len(offsets), *offsets))
+    os.replace(tmp_path, index_path(part_path))
+    return len(offsets)
+
+
+def read_index_header(part_path: str) -> Tuple[int, int]:
+    """Return ``(part file size, number of records)`` recorded in the index of a part file."""
+    with open(index_path(part_path), "rb") as f:
+        header = f.read(_INDEX_HEADER.size)
+    if len(header) != _INDEX_HEADER.size:
+        raise ValueError("%s is not an OFRecord index" % index_path(part_path))
+    (magic, file_size, num_records) = _INDEX_HEADER.unpack(header)
+    if magic != _INDEX_MAGIC:
+        raise ValueError("%s is not an OFRecord index" % index_path(part_path))
+    return (file_size, num_records)
+
+
+def count_records(part_paths: Sequence[str]) -> int:
+    return sum(read_index_header(path)[1] for path in part_paths)
+
+
+def parse_args(args=None):
+    parser = ArgumentParser(
+        description="Build the sidecar indices needed by OFRecordReader(indexed=True)"
+    )
+    parser.add_argument("data_dir", type=str, help="The directory of the part files")
+    parser.add_argument(
+        "--data_part_num", type=int, required=True, help="The number of part files"
+    )
+    parser.add_argument("--part_name_prefix", type=str, default="part-")
+    parser.add_argument("--part_name_suffix_length", type=int, default=-1)
+    parser.add_argument(
+        "--num_workers",
+        type=int,
+        default=8,
+        help="The number of part files indexed concurrently",
+    )
+    parser.add_argument(
+        "--force",
+        default=False,
+        action="store_true",
+        help="Rebuild indices which are already up to date",
+    )
+    return parser.parse_args(args)
+
+
+def _is_up_to_date(part_path: str) -> bool:
+    try:
+        return read_index_header(part_path)[0] == os.path.getsize(part_path)
+    except (OSError, ValueError):
+        return False
+
+
+def main(args=None):
+    args = parse_args(args)
+    part_paths = part_file_paths(
+        args.data_dir,
+        args.data_part_num,
+        args.part_name_prefix,
+        args.part_name_suffix_length,
+    )
+
+    def index_one(part_path):
+        if not args.force and _is_up_to_date(part_path):
+            return read_index_header(part_path)[1]
+        return build_index(part_path)
+
+    with ThreadPoolExecutor(max_workers=max(args.num_workers, 1)) as executor:
+        counts = list(executor.map(index_one, part_paths))
+    for part_path, count in zip(part_paths, counts):
+        print("%s: %d records" % (index_path(part_path), count))
+    print("total: %d records in %d part files" % (sum(counts), len(part_paths)))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -13,7 +13,18 @@ WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 See the License for the specific language governing permissions and
 limitations under the License.
 """
-from typing import Iterator, Optional, Sequence, List, TypeVar, Generic, Sized
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    Optional,
+    Sequence,
+    List,
+    TypeVar,
+    Generic,
+    Sized,
+)
 import numpy as np
 
 import oneflow as flow
@@ -21,6 +32,111 @@ import oneflow as flow
 
 T_co = TypeVar("T_co", covariant=True)
 
+_MASK64 = (1 << 64) - 1
+_GOLDEN64 = 0x9E3779B97F4A7C15
+# number of indices generated at a time by the lazy permutations below
+_PERMUTATION_CHUNK_SIZE = 4096
+
+
+def _mix64(z: int) -> int:
+    # splitmix64 finalizer
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return z ^ (z >> 31)
+
+
+def _mix64_array(z: np.ndarray) -> np.ndarray:
+    # same as _mix64, element-wise on an uint64 array (multiplication wraps around)
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return z ^ (z >> np.uint64(31))
+
+
+def _epoch_key(seed: int, epoch: int) -> int:
+    return _mix64((_mix64(seed & _MASK64) + epoch * _GOLDEN64) & _MASK64)
+
+
+class _FeistelPermutation(object):
+    r"""A pseudo-random permutation of ``range(n)`` that is evaluated index by index.
+
+    A balanced Feistel network keyed by ``(seed, epoch)`` is a bijection on
+    ``range(4 ** k)`` with ``4 ** k >= n``. Outputs that fall outside ``range(n)`` are
+    fed through the network again (cycle walking), which keeps the mapping a
+    bijection on ``range(n)``. Memory is constant in ``n`` and any position can be
+    evaluated without generating the ones before it.
+    """
+
+    _num_rounds = 6
+
+    def __init__(self, n: int, seed: int, epoch: int = 0) -> None:
+        half_bits = max(1, ((n - 1).bit_length() + 1) // 2)
+        self.n = n
+        self._n = np.uint64(n)
+        self._half_bits = np.uint64(half_bits)
+        self._half_mask = np.uint64((1 << half_bits) - 1)
+        key = _epoch_key(seed, epoch)
+        self._round_keys = []
+        for _ in range(self._num_rounds):
+            key = _mix64((key + _GOLDEN64) & _MASK64)
+            self._round_keys.append(np.uint64(key))
+
+    def _encrypt(self, x: np.ndarray) -> np.ndarray:
+        left = x >> self._half_bits
+        right = x & self._half_mask
+        for key in self._round_keys:
+            left, right = right, left ^ (_mix64_array(right ^ key) & self._half_mask)
+        return (left << self._half_bits) | right
+
+    def __call__(self, positions: np.ndarray) -> np.ndarray:
+        x = self._encrypt(positions.astype(np.uint64))
+        out_of_range = x >= self._n
+        while out_of_range.any():
+            x[out_of_range] = self._encrypt(x[out_of_range])
+            out_of_range = x >= self._n
+        return x.astype(np.int64)
+
+
+def _random_indices(n: int, seed: int, epoch: int) -> Callable:
+    # position -> index in range(n), drawn with replacement
+    key = np.uint64(_epoch_key(seed, epoch))
+
+    def draw(positions: np.ndarray) -> np.ndarray:
+        indices = _mix64_array(positions.astype(np.uint64) ^ key) % np.uint64(n)
+        return indices.astype(np.int64)
+
+    return draw
+
+
+def _lazy_indices(
+    index_fn: Optional[Callable], start: int, stop: int, step: int = 1
+) -> Iterator[int]:
+    r"""Yields ``index_fn(p)`` for positions ``p`` in ``range(start, stop, step)``,
+    evaluating :attr:`index_fn` on chunks of positions at a time. ``index_fn=None`` yields
+    the positions themselves.
+    """
+    chunk_stride = step * _PERMUTATION_CHUNK_SIZE
+    for chunk_start in range(start, stop, chunk_stride):
+        positions = np.arange(
+            chunk_start, min(stop, chunk_start + chunk_stride), step, dtype=np.int64
+        )
+        if index_fn is not None:
+            positions = index_fn(positions)
+        yield from positions.tolist()
+
+
+def _draw_seed(generator=None) -> int:
+    if generator is None:
+        return int(np.random.randint(0, np.iinfo(np.int64).max))
+    # TODO: use Tensor.random_
+    return int(
+        flow._C.randint(
+            high=np.iinfo(np.int64).max,
+            size=(1,),
+            dtype=flow.int64,
+            generator=generator,
+        ).numpy()[0]
+    )
+
 
 class Sampler(Generic[T_co]):
     r"""Base class for all Samplers.
@@ -90,12 +206,22 @@ class RandomSampler(Sampler[int]):
     r"""Samples elements randomly. If without replacement, then sample from a shuffled dataset.
     If with replacement, then user can specify :attr:`num_samples` to draw.
 
+    The order of an epoch is a pure function of ``(seed, epoch)`` and is generated
+    lazily, so starting an epoch is O(1) and uses constant memory. Every pass over the
+    sampler is an epoch: the epoch counter is advanced when a pass completes, and a
+    pass abandoned before its end is counted when the next one starts, so it is not
+    repeated. :meth:`state_dict` captures
+    the seed, the epoch and the number of indices already consumed in the epoch, and
+    after :meth:`load_state_dict` the next pass skips the consumed indices.
+
     Args:
         data_source (Dataset): dataset to sample from
         replacement (bool): samples are drawn on-demand with replacement if ``True``, default=``False``
         num_samples (int): number of samples to draw, default=`len(dataset)`. This argument
             is supposed to be specified only when `replacement` is ``True``.
-        generator (Generator): Generator used in sampling.
+        generator (Generator): Generator used to draw :attr:`seed` if it is not given.
+        seed (int, optional): random seed of the sampler. Default: drawn from
+            :attr:`generator`, or from numpy if :attr:`generator` is ``None``.
     """
     data_source: Sized
     replacement: bool
@@ -106,11 +232,18 @@ class RandomSampler(Sampler[int]):
         replacement: bool = False,
         num_samples: Optional[int] = None,
         generator=None,
+        seed: Optional[int] = None,
     ) -> None:
         self.data_source = data_source
         self.replacement = replacement
         self._num_samples = num_samples
         self.generator = generator
+        self.seed = _draw_seed(generator) if seed is None else seed
+        self.epoch = 0
+        self._num_consumed = 0
+        self._resume = False
+        self._in_progress = False
+        self._pass_id = 0
 
         if not isinstance(self.replacement, bool):
             raise TypeError(
@@ -138,33 +271,59 @@ class RandomSampler(Sampler[int]):
         return self._num_samples
 
     def __iter__(self):
-        n = len(self.data_source)
-        if self.generator is None:
-            generator = flow.Generator("cpu")
-            generator.manual_seed(np.random.randint(0, np.iinfo(np.int64).max))
-            # TODO: use Tensor.random_
-            # generator.manual_seed(
-            #     int(flow.empty((), dtype=flow.int64).random_().item())
-            # )
+        # The state is updated when the pass starts rather than when its first index
+        # is drawn, so that a DataLoader sees it right after creating its iterator.
+        if self._resume:
+            start = self._num_consumed
         else:
-            generator = self.generator
+            if self._in_progress:
+                # the previous pass was abandoned, it still counts as an epoch
+                self.epoch += 1
+            start = 0
+        self._resume = False
+        self._in_progress = True
+        self._num_consumed = start
+        self._pass_id += 1
+        n = len(self.data_source)
         if self.replacement:
-            for _ in range(self.num_samples // 32):
-                yield from flow._C.randint(
-                    high=n, size=(32,), dtype=flow.int64, generator=generator
-                ).numpy().tolist()
-            yield from flow._C.randint(
-                high=n,
-                size=(self.num_samples % 32,),
-                dtype=flow.int64,
-                generator=generator,
-            ).numpy().tolist()
+            index_fn = _random_indices(n, self.seed, self.epoch)
         else:
-            yield from flow._C.randperm(n, generator=generator).numpy().tolist()
+            index_fn = _FeistelPermutation(n, self.seed, self.epoch)
+        return self._iter_pass(self._pass_id, index_fn, start)
+
+    def _iter_pass(self, pass_id: int, index_fn: Callable, start: int):
+        for index in _lazy_indices(index_fn, start, self.num_samples):
+            # an abandoned pass no longer updates the state of the sampler
+            if pass_id == self._pass_id:
+                self._num_consumed += 1
+            yield index
+        if pass_id == self._pass_id:
+            self._in_progress = False
+            self._num_consumed = 0
+            self.epoch += 1
 
     def __len__(self):
         return self.num_samples
 
+    def state_dict(self) -> Dict[str, Any]:
+        r"""Returns the state of the sampler as a :class:`dict` with keys ``seed``,
+        ``epoch`` and ``num_consumed``.
+        """
+        return {
+            "seed": self.seed,
+            "epoch": self.epoch,
+            "num_consumed": self._num_consumed,
+        }
+
+    def load_state_dict(self, state_dict: Dict[str, Any]) -> None:
+        r"""Restores the state saved by :meth:`state_dict`. The next pass over the
+        sampler continues the saved epoch after its ``num_consumed`` indices.
+        """
+        self.seed = state_dict["seed"]
+        self.epoch = state_dict["epoch"]
+        self._num_consumed = state_dict["num_consumed"]
+        self._resume = True
+
 
 class SubsetRandomSampler(Sampler[int]):
     r"""Samples elements randomly from a given list of indices, without replacement.
@@ -228,8 +387,13 @@ class BatchSampler(Sampler[List[int]]):
         self.drop_last = drop_last
 
     def __iter__(self):
+        # start the pass of the sampler now, as a DataLoader reads the state of a
+        # stateful sampler right after creating its iterator
+        return self._iter_batches(iter(self.sampler))
+
+    def _iter_batches(self, sampler_iter: Iterator[int]):
         batch = []
-        for idx in self.sampler:
+        for idx in sampler_iter:
             batch.append(idx)
             if len(batch) == self.batch_size:
                 yield batch